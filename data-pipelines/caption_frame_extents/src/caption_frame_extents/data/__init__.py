@@ -10,6 +10,10 @@ from caption_frame_extents.data.ocr_visualization import (
     visualize_boxes_boundaries,
     visualize_boxes_centers,
 )
+from caption_frame_extents.data.tensor_transforms import (
+    TensorAnchorAwareResize,
+    TensorNormalizeImageNet,
+)
 from caption_frame_extents.data.transforms import (
     AnchorAwareResize,
     NormalizeImageNet,
@@ -31,4 +35,6 @@ __all__ = [
     "AnchorAwareResize",
     "NormalizeImageNet",
     "ResizeStrategy",
+    "TensorAnchorAwareResize",
+    "TensorNormalizeImageNet",
 ]
@@ -0,0 +1,260 @@
+"""Tensor-native equivalents of the anchor-aware transforms.
+
+Operate on batches of uint8 frames that are already on the inference device
+(e.g. frames decoded and cropped on the GPU), so the hot loop avoids
+device→host copies, PIL conversion and the host→device copy back.
+
+The resize reproduces Pillow's LANCZOS resampling: the same filter
+coefficients are quantized to Pillow's fixed-point precision, and each
+separable pass rounds and clips to 8 bits like Pillow does. Each pass is one
+float32 matmul with a dense (in, out) weight matrix, so sums can land on the
+other side of a rounding boundary than Pillow's integer arithmetic: output
+matches ``AnchorAwareResize`` to within ``RESIZE_TOLERANCE`` levels, and
+pixel for pixel almost everywhere.
+"""
+
+import math
+from functools import lru_cache
+from typing import Literal
+
+import numpy as np
+import torch
+
+from caption_frame_extents.data.transforms import ResizeStrategy
+
+# Fixed-point precision Pillow uses for 8-bit resampling coefficients
+_PRECISION_BITS = 32 - 8 - 2
+
+# Lanczos filter support (a = 3)
+_LANCZOS_SUPPORT = 3.0
+
+# Max difference from Pillow's output, in 8-bit levels. A pass can round one
+# level differently; the second pass can spread that to two.
+RESIZE_TOLERANCE = 2
+
+
+def _sinc(x: float) -> float:
+    if x == 0.0:
+        return 1.0
+    x = x * math.pi
+    return math.sin(x) / x
+
+
+def _lanczos(x: float) -> float:
+    if -_LANCZOS_SUPPORT <= x < _LANCZOS_SUPPORT:
+        return _sinc(x) * _sinc(x / _LANCZOS_SUPPORT)
+    return 0.0
+
+
+@lru_cache(maxsize=64)
+def lanczos_coefficients(in_size: int, out_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Compute Pillow-compatible LANCZOS coefficients for one axis.
+
+    Args:
+        in_size: Input length along the axis
+        out_size: Output length along the axis
+
+    Returns:
+        Tuple of (indices, weights), both shaped (out_size, kernel_size).
+        Weights are integers scaled by 2**22, as in Pillow; unused kernel
+        slots have weight 0.
+    """
+    scale = in_size / out_size
+    filterscale = max(scale, 1.0)
+    support = _LANCZOS_SUPPORT * filterscale
+    ksize = math.ceil(support) * 2 + 1
+
+    indices = np.zeros((out_size, ksize), dtype=np.int64)
+    weights = np.zeros((out_size, ksize), dtype=np.float64)
+
+    for xx in range(out_size):
+        center = (xx + 0.5) * scale
+        xmin = max(int(center - support + 0.5), 0)
+        xmax = min(int(center + support + 0.5), in_size) - xmin
+
+        kernel = [
+            _lanczos((x + xmin - center + 0.5) / filterscale) for x in range(xmax)
+        ]
+        total = sum(kernel)
+        if total != 0.0:
+            kernel = [k / total for k in kernel]
+
+        indices[xx, :] = xmin
+        indices[xx, :xmax] = np.arange(xmin, xmin + xmax)
+        for x, k in enumerate(kernel):
+            # Round half away from zero, as Pillow's normalize_coeffs_8bpc
+            weights[xx, x] = math.trunc(
+                k * (1 << _PRECISION_BITS) + (0.5 if k >= 0 else -0.5)
+            )
+
+    return indices, weights
+
+
+@lru_cache(maxsize=64)
+def lanczos_matrix(in_size: int, out_size: int) -> np.ndarray:
+    """Dense LANCZOS resampling matrix for one axis.
+
+    Args:
+        in_size: Input length along the axis
+        out_size: Output length along the axis
+
+    Returns:
+        float32 array of shape (in_size, out_size); ``pixels @ matrix``
+        resamples a row. Holds the quantized weights of
+        ``lanczos_coefficients`` scaled back to 1.
+    """
+    indices, weights = lanczos_coefficients(in_size, out_size)
+    columns = np.broadcast_to(np.arange(out_size)[:, None], indices.shape)
+    matrix = np.zeros((in_size, out_size), dtype=np.float64)
+    np.add.at(matrix, (indices, columns), weights / (1 << _PRECISION_BITS))
+    return matrix.astype(np.float32)
+
+
+class TensorAnchorAwareResize:
+    """Batched tensor version of ``AnchorAwareResize``.
+
+    Args:
+        target_width: Target width in pixels (default: 480)
+        target_height: Target height in pixels (default: 48)
+        strategy: Resize strategy (crop, mirror_tile, or adaptive)
+        crop_threshold: For adaptive mode, crop if width > target * (1 + threshold)
+
+    Example:
+        >>> transform = TensorAnchorAwareResize(strategy=ResizeStrategy.MIRROR_TILE)
+        >>> frames = torch.stack(cropped_frames_gpu)  # (N, H, W, 3) uint8
+        >>> resized = transform(frames, anchor_type="left")  # (N, 3, 48, 480) uint8
+    """
+
+    def __init__(
+        self,
+        target_width: int = 480,
+        target_height: int = 48,
+        strategy: ResizeStrategy = ResizeStrategy.MIRROR_TILE,
+        crop_threshold: float = 0.2,
+    ):
+        self.target_width = target_width
+        self.target_height = target_height
+        self.strategy = strategy
+        self.crop_threshold = crop_threshold
+        self._matrices: dict[tuple[int, int, torch.device], torch.Tensor] = {}
+
+    def __call__(
+        self,
+        frames: torch.Tensor,
+        anchor_type: Literal["left", "center", "right"],
+    ) -> torch.Tensor:
+        """Apply anchor-aware resize to a batch of frames.
+
+        Args:
+            frames: uint8 tensor of shape (N, H, W, 3), on any device
+            anchor_type: Caption anchor position
+
+        Returns:
+            uint8 tensor of shape (N, 3, target_height, target_width) on the
+            same device
+        """
+        if frames.ndim != 4 or frames.shape[-1] != 3:
+            raise ValueError(
+                f"Expected frames of shape (N, H, W, 3), got {tuple(frames.shape)}"
+            )
+
+        height, width = frames.shape[1], frames.shape[2]
+        images = frames.permute(0, 3, 1, 2)
+
+        # Step 1: Resize to target height, preserving aspect ratio
+        new_width = int(self.target_height * (width / height))
+        resized = self._resample(images, width, new_width, dim=3)
+        resized = self._resample(resized, height, self.target_height, dim=2)
+        resized = resized.to(torch.uint8)
+
+        # Step 2: Handle width (crop or tile based on strategy)
+        if new_width == self.target_width:
+            return resized.contiguous()
+
+        # All strategies crop oversized and mirror-tile undersized images,
+        # matching AnchorAwareResize
+        if new_width > self.target_width:
+            return self._crop(resized, anchor_type)
+        return self._mirror_tile(resized, anchor_type)
+
+    def _resample(
+        self, images: torch.Tensor, in_size: int, out_size: int, dim: int
+    ) -> torch.Tensor:
+        """Run one separable LANCZOS pass along ``dim`` (2 = height, 3 = width)."""
+        if in_size == out_size:
+            return images
+
+        key = (in_size, out_size, images.device)
+        if key not in self._matrices:
+            self._matrices[key] = torch.from_numpy(
+                lanczos_matrix(in_size, out_size)
+            ).to(images.device)
+        matrix = self._matrices[key]
+
+        values = images.movedim(dim, -1).to(torch.float32)
+        out = torch.floor(values @ matrix + 0.5).clamp_(0, 255)
+        return out.movedim(-1, dim)
+
+    def _crop(
+        self,
+        images: torch.Tensor,
+        anchor_type: Literal["left", "center", "right"],
+    ) -> torch.Tensor:
+        """Crop images to target width, preserving anchor region."""
+        width = images.shape[3]
+        if anchor_type == "left":
+            left = 0
+        elif anchor_type == "right":
+            left = width - self.target_width
+        else:  # center
+            left = (width - self.target_width) // 2
+        return images[..., left : left + self.target_width].contiguous()
+
+    def _mirror_tile(
+        self,
+        images: torch.Tensor,
+        anchor_type: Literal["left", "center", "right"],
+    ) -> torch.Tensor:
+        """Mirror-tile images to target width, filling away from anchor."""
+        width = images.shape[3]
+        if anchor_type == "left":
+            offset = 0
+        elif anchor_type == "right":
+            offset = self.target_width - width
+        else:  # center
+            offset = (self.target_width - width) // 2
+
+        # Mirrored copies are pasted outward from the source on both sides, so
+        # every column outside the source maps to the same column of the
+        # mirrored source (canvas position modulo source width)
+        columns = torch.arange(self.target_width) - offset
+        source = columns.remainder(width)
+        inside = (columns >= 0) & (columns < width)
+        index = torch.where(inside, source, width - 1 - source)
+
+        return images.index_select(3, index.to(images.device))
+
+
+class TensorNormalizeImageNet:
+    """Batched tensor version of ``NormalizeImageNet``."""
+
+    def __init__(self):
+        self.mean = torch.tensor([0.485, 0.456, 0.406], dtype=torch.float32).view(
+            1, 3, 1, 1
+        )
+        self.std = torch.tensor([0.229, 0.224, 0.225], dtype=torch.float32).view(
+            1, 3, 1, 1
+        )
+
+    def __call__(self, images: torch.Tensor) -> torch.Tensor:
+        """Normalize uint8 images to float32.
+
+        Args:
+            images: uint8 tensor of shape (N, 3, H, W)
+
+        Returns:
+            Normalized float32 tensor of shape (N, 3, H, W) on the same device
+        """
+        mean = self.mean.to(images.device)
+        std = self.std.to(images.device)
+        return (images.to(torch.float32) / 255.0 - mean) / std
@@ -12,8 +12,11 @@ from caption_frame_extents.inference.caption_frame_extents_db import (
 )
 from caption_frame_extents.inference.frame_extractor import (
     ChunkCache,
+    ChunkCacheStats,
     batch_extract_frames,
     extract_frame_from_chunk,
+    iter_chunks_parallel,
+    iter_frames_from_chunk,
 )
 from caption_frame_extents.inference.inference_repository import (
     CaptionFrameExtentsInferenceRunRepository,
@@ -27,7 +30,10 @@ __all__ = [
     "run_quality_checks",
     "extract_frame_from_chunk",
     "batch_extract_frames",
+    "iter_frames_from_chunk",
+    "iter_chunks_parallel",
     "ChunkCache",
+    "ChunkCacheStats",
     "PairResult",
     "create_caption_frame_extents_db",
     "read_caption_frame_extents_db",
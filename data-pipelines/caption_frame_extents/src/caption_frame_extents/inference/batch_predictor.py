@@ -5,6 +5,7 @@ Optimized for Modal GPU inference on full videos.
 """
 
 import sqlite3
+from collections.abc import Sequence
 from io import BytesIO
 from pathlib import Path
 from typing import Any
@@ -15,6 +16,10 @@ from PIL import Image as PILImage
 from rich.console import Console
 
 from caption_frame_extents.data.dataset import CaptionFrameExtentsDataset
+from caption_frame_extents.data.tensor_transforms import (
+    TensorAnchorAwareResize,
+    TensorNormalizeImageNet,
+)
 from caption_frame_extents.data.transforms import (
     AnchorAwareResize,
     NormalizeImageNet,
@@ -90,6 +95,14 @@ class BatchCaptionFrameExtentsPredictor:
         )
         self.normalize_transform = NormalizeImageNet()
 
+        # Tensor-native transforms for frames already on the device
+        self.tensor_resize_transform = TensorAnchorAwareResize(
+            target_width=480,
+            target_height=48,
+            strategy=self.transform_strategy,
+        )
+        self.tensor_normalize_transform = TensorNormalizeImageNet()
+
         # Label mapping
         self.labels = CaptionFrameExtentsDataset.LABELS
         self.label_to_idx = {label: idx for idx, label in enumerate(self.labels)}
@@ -140,6 +153,12 @@ class BatchCaptionFrameExtentsPredictor:
         # Precompute spatial features (same for all frames in this video)
         self._precompute_spatial_features()
 
+        # Transform constant inputs once per video instead of once per pair
+        self.ocr_viz_tensor = self._transform_image(self.ocr_viz_img).to(self.device)
+        self.spatial_tensor = torch.tensor(
+            self.spatial_features, dtype=torch.float32, device=self.device
+        )
+
         console.print(
             f"[green]✓ Loaded layout metadata from {self.layout_db_path.name}[/green]"
         )
@@ -184,43 +203,157 @@ class BatchCaptionFrameExtentsPredictor:
                 - probabilities: dict[str, float] (all 5 class probabilities)
                 - confidence: float (max probability)
         """
-        # Apply transforms
-        ocr_viz = self.resize_transform(self.ocr_viz_img, anchor_type=self.anchor_type)
-        ocr_viz = self.normalize_transform(ocr_viz)
-        ocr_viz = torch.from_numpy(ocr_viz)
-
-        frame1 = self.resize_transform(frame1_img, anchor_type=self.anchor_type)
-        frame1 = self.normalize_transform(frame1)
-        frame1 = torch.from_numpy(frame1)
-
-        frame2 = self.resize_transform(frame2_img, anchor_type=self.anchor_type)
-        frame2 = self.normalize_transform(frame2)
-        frame2 = torch.from_numpy(frame2)
-
-        spatial = torch.tensor(self.spatial_features, dtype=torch.float32)
-
         # Add batch dimension and move to device
-        ocr_viz = ocr_viz.unsqueeze(0).to(self.device)
-        frame1 = frame1.unsqueeze(0).to(self.device)
-        frame2 = frame2.unsqueeze(0).to(self.device)
-        spatial = spatial.unsqueeze(0).to(self.device)
+        ocr_viz = self.ocr_viz_tensor.unsqueeze(0).to(self.device)
+        frame1 = self._transform_image(frame1_img).unsqueeze(0).to(self.device)
+        frame2 = self._transform_image(frame2_img).unsqueeze(0).to(self.device)
+        spatial = self.spatial_tensor.unsqueeze(0).to(self.device)
 
         # Forward pass
         logits = self.model(ocr_viz, frame1, frame2, spatial)
         probs = torch.softmax(logits, dim=1).cpu().numpy()[0]
 
-        # Get prediction
-        pred_idx = int(np.argmax(probs))
-        predicted_label = self.labels[pred_idx]
+        return self._result_from_probs(probs)
+
+    def _transform_image(self, image: PILImage.Image) -> torch.Tensor:
+        """Resize and normalize one image into a (C, H, W) tensor."""
+        resized = self.resize_transform(image, anchor_type=self.anchor_type)
+        return torch.from_numpy(self.normalize_transform(resized))
 
+    def _result_from_probs(self, prob_dist: np.ndarray) -> dict[str, Any]:
+        """Build a prediction dict from one probability distribution."""
+        pred_idx = int(np.argmax(prob_dist))
         return {
-            "predicted_label": predicted_label,
+            "predicted_label": self.labels[pred_idx],
             "probabilities": {
-                label: float(probs[idx]) for idx, label in enumerate(self.labels)
+                label: float(prob_dist[idx]) for idx, label in enumerate(self.labels)
             },
-            "confidence": float(probs[pred_idx]),
+            "confidence": float(prob_dist[pred_idx]),
         }
 
+    @torch.no_grad()
+    def _predict_indexed(
+        self,
+        frames: torch.Tensor,
+        first_indices: torch.Tensor,
+        second_indices: torch.Tensor,
+    ) -> list[dict[str, Any]]:
+        """Run one forward pass on pairs built by indexing transformed frames.
+
+        Args:
+            frames: Transformed frames, shape (N, C, H, W)
+            first_indices: Row in ``frames`` of the first image of each pair
+            second_indices: Row in ``frames`` of the second image of each pair
+
+        Returns:
+            List of prediction dicts (same order as the index tensors)
+        """
+        n = len(first_indices)
+        ocr_viz_tensor = self.ocr_viz_tensor.expand(n, -1, -1, -1)
+        spatial_tensor = self.spatial_tensor.expand(n, -1)
+        frame1_tensor = frames[first_indices].to(self.device)
+        frame2_tensor = frames[second_indices].to(self.device)
+
+        logits = self.model(
+            ocr_viz_tensor, frame1_tensor, frame2_tensor, spatial_tensor
+        )
+        probs = torch.softmax(logits, dim=1).cpu().numpy()
+        return [self._result_from_probs(prob_dist) for prob_dist in probs]
+
+    @staticmethod
+    def _log_progress(done: int, total: int, step: int) -> None:
+        """Log progress each time another 1000 pairs have been predicted."""
+        if done // 1000 > (done - step) // 1000:
+            console.print(f"  Processed {done}/{total} pairs")
+
+    def transform_frames(
+        self, frames: Sequence[PILImage.Image] | torch.Tensor
+    ) -> torch.Tensor:
+        """Transform frames into one preallocated tensor, once per frame.
+
+        A uint8 tensor of frames is transformed on its own device with the
+        tensor-native transforms (no host copies or PIL work); PIL images go
+        through the PIL transforms on the CPU.
+
+        Args:
+            frames: PIL Images (cropped), or a uint8 tensor of cropped frames
+                with shape (N, H, W, 3)
+
+        Returns:
+            Tensor of shape (N, 3, target_height, target_width)
+        """
+        if isinstance(frames, torch.Tensor):
+            resized = self.tensor_resize_transform(
+                frames.to(self.device), anchor_type=self.anchor_type
+            )
+            return self.tensor_normalize_transform(resized)
+
+        output = torch.empty(
+            (
+                len(frames),
+                3,
+                self.resize_transform.target_height,
+                self.resize_transform.target_width,
+            ),
+            dtype=torch.float32,
+        )
+        for i, frame in enumerate(frames):
+            output[i] = self._transform_image(frame)
+        return output
+
+    def predict_sequence(
+        self,
+        frames: Sequence[PILImage.Image] | torch.Tensor,
+        batch_size: int = 64,
+    ) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+        """Predict forward and backward results for consecutive frame pairs.
+
+        Each frame is transformed exactly once, in windows of about
+        ``batch_size`` images. Forward (i, i+1) and backward (i+1, i) pairs are
+        built by indexing the transformed frames, so this is much cheaper than
+        submitting both directions to ``predict_batch``.
+
+        Args:
+            frames: Ordered PIL Images (cropped), or a uint8 tensor of cropped
+                frames with shape (N, H, W, 3); pairs are (frames[i], frames[i+1])
+            batch_size: Maximum number of images per forward pass (each
+                consecutive pair contributes a forward and a backward image)
+
+        Returns:
+            List of (forward, backward) prediction dicts, one per consecutive pair
+        """
+        if len(frames) < 2:
+            return []
+
+        # Each window covers up to batch_size images (a forward and a backward
+        # image per pair) and starts at the previous window's last frame, which
+        # is carried over rather than transformed again
+        pairs_per_window = max(batch_size // 2, 1)
+        num_pairs = len(frames) - 1
+        results: list[tuple[dict[str, Any], dict[str, Any]]] = []
+        carried: torch.Tensor | None = None
+
+        for start in range(0, num_pairs, pairs_per_window):
+            end = min(start + pairs_per_window, num_pairs)
+            if carried is None:
+                window = self.transform_frames(frames[start : end + 1])
+            else:
+                window = torch.cat(
+                    [carried, self.transform_frames(frames[start + 1 : end + 1])]
+                )
+            carried = window[-1:].clone()
+
+            # Interleave forward/backward so each pair's two directions share a pass
+            starts = torch.arange(end - start, device=window.device)
+            first_indices = torch.stack([starts, starts + 1], dim=1).reshape(-1)
+            second_indices = torch.stack([starts + 1, starts], dim=1).reshape(-1)
+
+            predictions = self._predict_indexed(window, first_indices, second_indices)
+            results.extend(zip(predictions[0::2], predictions[1::2], strict=True))
+            self._log_progress(end, num_pairs, end - start)
+
+        return results
+
     def predict_batch(
         self,
         frame_pairs: list[tuple[PILImage.Image, PILImage.Image]],
@@ -228,6 +361,12 @@ class BatchCaptionFrameExtentsPredictor:
     ) -> list[dict[str, Any]]:
         """Predict caption frame extents for batch of frame pairs.
 
+        Pairs are transformed and predicted in windows of ``batch_size``, so
+        only one window of transformed frames is held at a time. Frames that
+        appear in several pairs of a window (e.g. forward and backward pairs
+        built from the same images) are transformed only once. Prefer
+        ``predict_sequence`` for consecutive frames.
+
         Args:
             frame_pairs: List of (frame1, frame2) PIL Image tuples
             batch_size: Batch size for inference
@@ -235,75 +374,34 @@ class BatchCaptionFrameExtentsPredictor:
         Returns:
             List of prediction dicts (same order as input)
         """
-        results = []
-
-        # Process in batches
-        for i in range(0, len(frame_pairs), batch_size):
-            batch = frame_pairs[i : i + batch_size]
-
-            # Prepare batch tensors
-            ocr_viz_batch = []
-            frame1_batch = []
-            frame2_batch = []
-            spatial_batch = []
-
-            for frame1_img, frame2_img in batch:
-                # Transform OCR viz
-                ocr_viz = self.resize_transform(
-                    self.ocr_viz_img, anchor_type=self.anchor_type
-                )
-                ocr_viz = self.normalize_transform(ocr_viz)
-                ocr_viz = torch.from_numpy(ocr_viz)
-                ocr_viz_batch.append(ocr_viz)
-
-                # Transform frame1
-                frame1 = self.resize_transform(frame1_img, anchor_type=self.anchor_type)
-                frame1 = self.normalize_transform(frame1)
-                frame1 = torch.from_numpy(frame1)
-                frame1_batch.append(frame1)
-
-                # Transform frame2
-                frame2 = self.resize_transform(frame2_img, anchor_type=self.anchor_type)
-                frame2 = self.normalize_transform(frame2)
-                frame2 = torch.from_numpy(frame2)
-                frame2_batch.append(frame2)
-
-                # Spatial features (same for all)
-                spatial = torch.tensor(self.spatial_features, dtype=torch.float32)
-                spatial_batch.append(spatial)
-
-            # Stack into batch tensors
-            ocr_viz_tensor = torch.stack(ocr_viz_batch).to(self.device)
-            frame1_tensor = torch.stack(frame1_batch).to(self.device)
-            frame2_tensor = torch.stack(frame2_batch).to(self.device)
-            spatial_tensor = torch.stack(spatial_batch).to(self.device)
-
-            # Forward pass
-            with torch.no_grad():
-                logits = self.model(
-                    ocr_viz_tensor, frame1_tensor, frame2_tensor, spatial_tensor
-                )
-                probs = torch.softmax(logits, dim=1).cpu().numpy()
-
-            # Extract predictions
-            for _j, prob_dist in enumerate(probs):
-                pred_idx = int(np.argmax(prob_dist))
-                predicted_label = self.labels[pred_idx]
-
-                result = {
-                    "predicted_label": predicted_label,
-                    "probabilities": {
-                        label: float(prob_dist[idx])
-                        for idx, label in enumerate(self.labels)
-                    },
-                    "confidence": float(prob_dist[pred_idx]),
-                }
-                results.append(result)
-
-            # Progress logging
-            if (i + batch_size) % 1000 == 0:
-                console.print(
-                    f"  Processed {min(i + batch_size, len(frame_pairs))}/{len(frame_pairs)} pairs"
+        if not frame_pairs:
+            return []
+
+        results: list[dict[str, Any]] = []
+        for start in range(0, len(frame_pairs), batch_size):
+            window = frame_pairs[start : start + batch_size]
+
+            # Deduplicate frames by identity so each image is transformed once
+            unique_frames: list[PILImage.Image] = []
+            frame_rows: dict[int, int] = {}
+            first_rows = []
+            second_rows = []
+            for frame1_img, frame2_img in window:
+                for img, rows in ((frame1_img, first_rows), (frame2_img, second_rows)):
+                    row = frame_rows.get(id(img))
+                    if row is None:
+                        row = len(unique_frames)
+                        frame_rows[id(img)] = row
+                        unique_frames.append(img)
+                    rows.append(row)
+
+            results.extend(
+                self._predict_indexed(
+                    self.transform_frames(unique_frames),
+                    torch.tensor(first_rows, dtype=torch.long),
+                    torch.tensor(second_rows, dtype=torch.long),
                 )
+            )
+            self._log_progress(start + len(window), len(frame_pairs), len(window))
 
         return results
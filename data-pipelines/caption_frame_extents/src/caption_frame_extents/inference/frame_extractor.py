@@ -3,9 +3,20 @@
 Ported from TypeScript web client (useCaptionFrameExtentsFrameLoader.ts).
 """
 
+import hashlib
+import json
 import os
+import queue
 import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import urlparse
 
 import cv2
 import httpx
@@ -14,6 +25,9 @@ from rich.console import Console
 
 console = Console(stderr=True)
 
+# Compact the chunk cache manifest once it holds this many records per entry
+MANIFEST_COMPACT_FACTOR = 4
+
 
 def get_frames_in_chunk(
     chunk_start_frame: int, modulo: int, frames_per_chunk: int = 32
@@ -112,12 +126,109 @@ def determine_modulo_for_frame(frame_index: int) -> int:
         return 1
 
 
+def chunk_storage_key(signed_url: str) -> str:
+    """Storage key of a chunk (signed URL path without the signature query)."""
+    return urlparse(signed_url).path.lstrip("/")
+
+
+def _stream_chunk(signed_url: str, f: BinaryIO, timeout: float) -> str | None:
+    """Stream a chunk download into an open file.
+
+    Returns:
+        ETag of the object, if the server sent one
+
+    Raises:
+        ValueError: If the download fails
+    """
+    try:
+        with httpx.stream("GET", signed_url, timeout=timeout) as response:
+            response.raise_for_status()
+            f.writelines(response.iter_bytes())
+            return response.headers.get("etag")
+    except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        raise ValueError(f"Failed to download chunk: {e}") from e
+
+
+def _remote_etag(signed_url: str, timeout: float) -> str | None:
+    """Get a chunk's current ETag without downloading it.
+
+    Signed URLs are only valid for GET, so this requests the first byte and
+    reads the response headers.
+
+    Returns:
+        ETag of the object, if the server sent one
+
+    Raises:
+        ValueError: If the request fails
+    """
+    try:
+        with httpx.stream(
+            "GET", signed_url, headers={"Range": "bytes=0-0"}, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            return response.headers.get("etag")
+    except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        raise ValueError(f"Failed to check chunk: {e}") from e
+
+
+def download_chunk_to_temp_file(signed_url: str, timeout: float = 60) -> str:
+    """Stream a chunk download straight to a temp file.
+
+    The response body is written as it arrives instead of being buffered in
+    memory first. The caller is responsible for deleting the file.
+
+    Args:
+        signed_url: Wasabi signed URL for chunk
+        timeout: Request timeout in seconds
+
+    Returns:
+        Path of the temp file holding the chunk
+
+    Raises:
+        ValueError: If the download fails
+    """
+    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
+        temp_path = f.name
+        try:
+            _stream_chunk(signed_url, f, timeout)
+        except ValueError:
+            f.close()
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    return temp_path
+
+
+@contextmanager
+def _open_chunk(
+    signed_url: str, timeout: float, cache: "ChunkCache | None"
+) -> Iterator[str]:
+    """Local path of a chunk: from the cache, or a temp download removed on exit."""
+    if cache is not None:
+        yield str(cache.fetch(signed_url, timeout=timeout))
+        return
+
+    temp_path = download_chunk_to_temp_file(signed_url, timeout=timeout)
+    try:
+        yield temp_path
+    finally:
+        # Clean up temp file
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
 def extract_frame_from_chunk(
     signed_url: str,
     frame_index: int,
     modulo: int | None = None,
     chunk_start_frame: int | None = None,
     fps: int = 10,
+    cache: "ChunkCache | None" = None,
 ) -> np.ndarray:
     """Extract single frame from VP9/WebM chunk.
 
@@ -127,6 +238,7 @@ def extract_frame_from_chunk(
         modulo: Modulo level (auto-detected if None)
         chunk_start_frame: First frame in the chunk (from filename). Required for modulo_4 and modulo_1.
         fps: Frames per second (default 10)
+        cache: Optional chunk cache (the chunk is downloaded at most once)
 
     Returns:
         Frame as numpy array (RGB, uint8)
@@ -137,52 +249,85 @@ def extract_frame_from_chunk(
     if modulo is None:
         modulo = determine_modulo_for_frame(frame_index)
 
-    # Download chunk to temp file
-    try:
-        response = httpx.get(signed_url, timeout=30)
-        response.raise_for_status()
-    except httpx.RequestError as e:
-        raise ValueError(f"Failed to download chunk: {e}") from e
-
-    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
-        f.write(response.content)
-        temp_path = f.name
-
-    try:
-        # Calculate frame position in chunk
-        frame_offset = calculate_frame_offset(frame_index, modulo, chunk_start_frame)
+    # Calculate frame position in chunk
+    frame_offset = calculate_frame_offset(frame_index, modulo, chunk_start_frame)
 
+    with _open_chunk(signed_url, 30, cache) as chunk_path:
         # Extract frame using OpenCV
-        cap = cv2.VideoCapture(temp_path)
+        cap = cv2.VideoCapture(chunk_path)
 
         if not cap.isOpened():
-            raise ValueError(f"Failed to open video file: {temp_path}")
+            raise ValueError(f"Failed to open video file: {chunk_path}")
+
+        # Decode forward to the frame (grab() skips color conversion); seeking
+        # in VP9/WebM re-decodes from the previous keyframe anyway
+        try:
+            for _ in range(frame_offset):
+                if not cap.grab():
+                    raise ValueError(f"Failed to read frame at offset {frame_offset}")
+            ret, frame = cap.read()
+        finally:
+            cap.release()
 
-        # Seek to frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_offset)
-        ret, frame = cap.read()
-        cap.release()
+    if not ret or frame is None:
+        raise ValueError(f"Failed to read frame at offset {frame_offset}")
 
-        if not ret or frame is None:
-            raise ValueError(f"Failed to read frame at offset {frame_offset}")
+    # Convert BGR to RGB
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return frame_rgb
 
-        return frame_rgb
 
-    finally:
-        # Clean up temp file
+def iter_frames_from_chunk(
+    signed_url: str,
+    chunk_start_frame: int,
+    modulo: int,
+    cache: "ChunkCache | None" = None,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield every frame of a VP9/WebM chunk, decoding it in one pass.
+
+    The chunk is streamed to a temp file and decoded sequentially, so each
+    frame is decoded exactly once (no per-frame seeks). The temp file is
+    removed when the generator finishes or is closed (cached chunks are kept).
+
+    Args:
+        signed_url: Wasabi signed URL for chunk
+        chunk_start_frame: First frame in the chunk (from filename)
+        modulo: Modulo level (16, 4, or 1)
+        cache: Optional chunk cache to read from / download into
+
+    Yields:
+        (frame_index, frame) tuples in chunk order (RGB numpy arrays)
+
+    Raises:
+        ValueError: If chunk download or extraction fails
+    """
+    # Get all frame indices in this chunk
+    frame_indices = get_frames_in_chunk(chunk_start_frame, modulo)
+
+    with _open_chunk(signed_url, 60, cache) as chunk_path:
+        # Open video
+        cap = cv2.VideoCapture(chunk_path)
+        if not cap.isOpened():
+            raise ValueError(f"Failed to open video file: {chunk_path}")
+
         try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
+            for frame_idx in frame_indices:
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    # Short chunk (end of video)
+                    break
+                # Convert BGR to RGB
+                yield frame_idx, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        finally:
+            cap.release()
 
 
 def extract_all_frames_from_chunk(
     signed_url: str,
     chunk_start_frame: int,
     modulo: int,
+    cache: "ChunkCache | None" = None,
 ) -> dict[int, np.ndarray]:
     """Extract ALL frames from a VP9/WebM chunk at once.
 
@@ -192,6 +337,7 @@ def extract_all_frames_from_chunk(
         signed_url: Wasabi signed URL for chunk
         chunk_start_frame: First frame in the chunk (from filename)
         modulo: Modulo level (16, 4, or 1)
+        cache: Optional chunk cache to read from / download into
 
     Returns:
         Dict mapping frame_index -> frame (RGB numpy array)
@@ -199,84 +345,135 @@ def extract_all_frames_from_chunk(
     Raises:
         ValueError: If chunk download or extraction fails
     """
-    # Download chunk to temp file
-    try:
-        response = httpx.get(signed_url, timeout=60)
-        response.raise_for_status()
-    except httpx.RequestError as e:
-        raise ValueError(f"Failed to download chunk: {e}") from e
+    return dict(iter_frames_from_chunk(signed_url, chunk_start_frame, modulo, cache))
 
-    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
-        f.write(response.content)
-        temp_path = f.name
 
-    try:
-        # Get all frame indices in this chunk
-        frame_indices = get_frames_in_chunk(chunk_start_frame, modulo)
+def iter_chunks_parallel(
+    chunk_infos: list[tuple[str, int, int]],  # (signed_url, chunk_start, modulo)
+    max_workers: int = 8,
+    max_buffered_frames: int = 256,
+    cache: "ChunkCache | None" = None,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Download and decode chunks in parallel, yielding frames as they are ready.
 
-        # Open video
-        cap = cv2.VideoCapture(temp_path)
-        if not cap.isOpened():
-            raise ValueError(f"Failed to open video file: {temp_path}")
+    Worker threads stream and decode chunks and hand frames over through a
+    bounded queue: when the consumer falls behind, workers block, so at most
+    ``max_buffered_frames`` decoded frames (plus one per worker) are held in
+    memory. Frames from different chunks may be interleaved. Failed chunks
+    are logged and skipped.
 
-        frames = {}
-        for position, frame_idx in enumerate(frame_indices):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
-            ret, frame = cap.read()
-            if ret and frame is not None:
-                # Convert BGR to RGB
-                frames[frame_idx] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    Args:
+        chunk_infos: List of (signed_url, chunk_start_frame, modulo) tuples
+        max_workers: Max parallel downloads
+        max_buffered_frames: Max decoded frames waiting for the consumer
+        cache: Optional chunk cache shared by the workers
 
-        cap.release()
-        return frames
+    Yields:
+        (frame_index, frame) tuples (RGB numpy arrays)
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(max_buffered_frames, 1))
+    stop = threading.Event()
+    done = object()
 
-    finally:
+    def put(item: object) -> bool:
+        """Put into the buffer, giving up if the consumer went away."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def process_chunk(info: tuple[str, int, int]) -> None:
+        signed_url, chunk_start, modulo = info
         try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
+            for item in iter_frames_from_chunk(signed_url, chunk_start, modulo, cache):
+                if not put(item):
+                    return
+        except Exception as e:
+            console.print(
+                f"[red]  Failed chunk {chunk_start} (modulo_{modulo}): {e}[/red]"
+            )
+        put(done)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for info in chunk_infos:
+            executor.submit(process_chunk, info)
+
+        completed = 0
+        frames_yielded = 0
+        while completed < len(chunk_infos):
+            item = buffer.get()
+            if item is done:
+                completed += 1
+                if completed % 50 == 0 or completed == len(chunk_infos):
+                    msg = f"  Processed {completed}/{len(chunk_infos)} chunks, {frames_yielded} frames"
+                    console.print(f"[cyan]{msg}[/cyan]")
+                continue
+            frames_yielded += 1
+            yield item
+    finally:
+        # Unblock workers if the consumer stopped early
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def download_and_extract_chunks_parallel(
     chunk_infos: list[tuple[str, int, int]],  # (signed_url, chunk_start, modulo)
     max_workers: int = 8,
+    max_buffered_frames: int = 256,
+    on_frame: Callable[[int, np.ndarray], None] | None = None,
+    cache: "ChunkCache | None" = None,
 ) -> dict[int, np.ndarray]:
     """Download and extract frames from multiple chunks in parallel.
 
+    When ``on_frame`` is given, each frame is passed to it as soon as it is
+    decoded and is not retained, so memory stays bounded by
+    ``max_buffered_frames`` regardless of video length.
+
     Args:
         chunk_infos: List of (signed_url, chunk_start_frame, modulo) tuples
         max_workers: Max parallel downloads
+        max_buffered_frames: Max decoded frames waiting to be consumed
+        on_frame: Optional callback receiving (frame_index, frame)
+        cache: Optional chunk cache shared by the workers
 
     Returns:
-        Dict mapping frame_index -> frame (RGB numpy array)
+        Dict mapping frame_index -> frame (RGB numpy array); empty when
+        ``on_frame`` is given
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
     all_frames: dict[int, np.ndarray] = {}
 
-    def process_chunk(info: tuple[str, int, int]) -> dict[int, np.ndarray]:
-        signed_url, chunk_start, modulo = info
-        return extract_all_frames_from_chunk(signed_url, chunk_start, modulo)
+    for frame_idx, frame in iter_chunks_parallel(
+        chunk_infos,
+        max_workers=max_workers,
+        max_buffered_frames=max_buffered_frames,
+        cache=cache,
+    ):
+        if on_frame is not None:
+            on_frame(frame_idx, frame)
+        else:
+            all_frames[frame_idx] = frame
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(process_chunk, info): info for info in chunk_infos}
+    return all_frames
 
-        completed = 0
-        for future in as_completed(futures):
-            info = futures[future]
-            try:
-                chunk_frames = future.result()
-                all_frames.update(chunk_frames)
-                completed += 1
-                if completed % 50 == 0 or completed == len(chunk_infos):
-                    msg = f"  Processed {completed}/{len(chunk_infos)} chunks, {len(all_frames)} frames"
-                    console.print(f"[cyan]{msg}[/cyan]")
-            except Exception as e:
-                console.print(
-                    f"[red]  Failed chunk {info[1]} (modulo_{info[2]}): {e}[/red]"
-                )
 
-    return all_frames
+@dataclass
+class ChunkCacheStats:
+    """Counters for ChunkCache lookups."""
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0  # Download bytes avoided by cache hits
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
 
 class ChunkCache:
@@ -294,84 +491,295 @@ class ChunkCache:
     - Multiple jobs for same video arrive within 5-min warm period
 
     Note: Chunks are video-specific, not model-specific. Once downloaded,
-    any model version can use them. Cache persists for Modal's 5-minute
-    container idle period.
+    any model version can use them. Without a manifest the cache persists for
+    Modal's 5-minute container idle period. With ``manifest_path`` set, an
+    append-only JSON-lines manifest records puts, accesses and evictions, so
+    a restarted container (or a local run) reopens chunks already on disk.
+    Reopened chunks are checked against the object's current ETag the first
+    time ``fetch`` serves them. The manifest is compacted to the live entries
+    whenever it grows to several times their number.
+
+    LRU updates, puts and evictions are O(1); the total size is kept as a
+    running counter. All operations are thread-safe.
     """
 
-    def __init__(self, max_size_mb: int = 1024):
+    def __init__(
+        self,
+        max_size_mb: int = 1024,
+        cache_dir: Path | None = None,
+        manifest_path: Path | None = None,
+    ):
         """Initialize chunk cache.
 
         Args:
             max_size_mb: Maximum cache size in megabytes
+            cache_dir: Directory for chunks downloaded by ``fetch`` (a temp
+                directory if None)
+            manifest_path: Optional JSON-lines manifest for persisting the
+                index across restarts (loaded if it exists)
         """
         self.max_size_bytes = max_size_mb * 1024 * 1024
-        self.cache: dict[str, Path] = {}  # storage_key -> local_path
+        self.cache: OrderedDict[str, Path] = (
+            OrderedDict()
+        )  # storage_key -> path (LRU first)
         self.sizes: dict[str, int] = {}  # storage_key -> file_size
-        self.access_order: list[str] = []  # LRU tracking
+        self.etags: dict[str, str | None] = {}  # storage_key -> ETag
+        self.total_bytes = 0
+        self.stats = ChunkCacheStats()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self._lock = threading.RLock()
+        self._manifest_records = 0  # Lines in the manifest file
+        self._unverified: set[str] = set()  # Reopened, ETag not yet checked
+
+        if self.manifest_path is not None:
+            self._load_manifest()
 
-    def get(self, storage_key: str) -> Path | None:
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, storage_key: str) -> bool:
+        return storage_key in self.cache
+
+    def get(self, storage_key: str, etag: str | None = None) -> Path | None:
         """Get cached chunk path.
 
         Args:
             storage_key: Wasabi storage key
+            etag: Expected ETag; a cached entry with a different ETag is
+                stale and is evicted
 
         Returns:
             Local path if cached, None otherwise
         """
-        if storage_key in self.cache:
+        with self._lock:
+            chunk_path = self.cache.get(storage_key)
+            if chunk_path is not None:
+                stale = etag is not None and self.etags.get(storage_key) not in (
+                    None,
+                    etag,
+                )
+                if stale or not chunk_path.exists():
+                    self._remove(storage_key, delete_file=True)
+                    chunk_path = None
+
+            if chunk_path is None:
+                self.stats.misses += 1
+                return None
+
             # Update access order (move to end = most recent)
-            self.access_order.remove(storage_key)
-            self.access_order.append(storage_key)
-            return self.cache[storage_key]
-        return None
+            self.cache.move_to_end(storage_key)
+            self.stats.hits += 1
+            self.stats.bytes_saved += self.sizes[storage_key]
+            self._append_manifest({"op": "touch", "key": storage_key})
+            return chunk_path
 
-    def put(self, storage_key: str, chunk_path: Path) -> None:
+    def put(self, storage_key: str, chunk_path: Path, etag: str | None = None) -> None:
         """Add chunk to cache.
 
         Args:
             storage_key: Wasabi storage key
             chunk_path: Local path to chunk file
+            etag: ETag of the stored object, if known
         """
         file_size = chunk_path.stat().st_size
 
-        # Evict if needed
-        while self._total_size() + file_size > self.max_size_bytes and self.cache:
-            self._evict_lru()
+        with self._lock:
+            if storage_key in self.cache:
+                old_path = self.cache[storage_key]
+                self._remove(storage_key, delete_file=old_path != chunk_path)
+
+            # Evict if needed
+            while self.total_bytes + file_size > self.max_size_bytes and self.cache:
+                self._evict_lru()
+
+            self.cache[storage_key] = chunk_path
+            self.sizes[storage_key] = file_size
+            self.etags[storage_key] = etag
+            self.total_bytes += file_size
+            self._append_manifest(
+                {
+                    "op": "put",
+                    "key": storage_key,
+                    "path": str(chunk_path),
+                    "size": file_size,
+                    "etag": etag,
+                }
+            )
+
+    def fetch(self, signed_url: str, timeout: float = 60) -> Path:
+        """Get a chunk from the cache, downloading it on a miss.
+
+        Args:
+            signed_url: Wasabi signed URL for chunk
+            timeout: Download timeout in seconds
 
-        self.cache[storage_key] = chunk_path
-        self.sizes[storage_key] = file_size
-        self.access_order.append(storage_key)
+        Returns:
+            Local path of the cached chunk
+
+        Raises:
+            ValueError: If the download fails
+        """
+        storage_key = chunk_storage_key(signed_url)
+        etag = None
+        with self._lock:
+            unverified = (
+                storage_key in self._unverified
+                and self.etags.get(storage_key) is not None
+            )
+        if unverified:
+            # The object may have been rewritten while the chunk sat on disk
+            etag = _remote_etag(signed_url, timeout)
+        chunk_path = self.get(storage_key, etag=etag)
+        if chunk_path is not None:
+            with self._lock:
+                self._unverified.discard(storage_key)
+            return chunk_path
+
+        if self.cache_dir is None:
+            self.cache_dir = Path(tempfile.mkdtemp(prefix="chunk_cache_"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256(storage_key.encode()).hexdigest()[:32]
+        chunk_path = self.cache_dir / f"{digest}.webm"
+
+        # Download under a unique name so concurrent fetches never share a file
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".part", delete=False
+        ) as f:
+            part_path = Path(f.name)
+            try:
+                etag = _stream_chunk(signed_url, f, timeout)
+            except ValueError:
+                f.close()
+                part_path.unlink(missing_ok=True)
+                raise
+        os.replace(part_path, chunk_path)
+
+        self.put(storage_key, chunk_path, etag=etag)
+        return chunk_path
 
     def _total_size(self) -> int:
         """Get total cache size in bytes."""
-        return sum(self.sizes.values())
+        return self.total_bytes
+
+    def _remove(self, storage_key: str, delete_file: bool) -> None:
+        """Drop an entry (caller holds the lock)."""
+        chunk_path = self.cache.pop(storage_key)
+        self.total_bytes -= self.sizes.pop(storage_key)
+        self.etags.pop(storage_key, None)
+        self._unverified.discard(storage_key)
+        self._append_manifest({"op": "remove", "key": storage_key})
+
+        if delete_file:
+            try:
+                chunk_path.unlink()
+            except OSError:
+                pass
 
     def _evict_lru(self) -> None:
         """Evict least recently used chunk."""
-        if not self.access_order:
+        if not self.cache:
             return
 
-        lru_key = self.access_order.pop(0)
-        chunk_path = self.cache.pop(lru_key)
-        self.sizes.pop(lru_key)
-
-        # Delete file
-        try:
-            chunk_path.unlink()
-        except OSError:
-            pass
+        lru_key = next(iter(self.cache))
+        self._remove(lru_key, delete_file=True)
+        self.stats.evictions += 1
 
     def clear(self) -> None:
         """Clear all cached chunks."""
-        for chunk_path in self.cache.values():
+        with self._lock:
+            for chunk_path in self.cache.values():
+                try:
+                    chunk_path.unlink()
+                except OSError:
+                    pass
+
+            self.cache.clear()
+            self.sizes.clear()
+            self.etags.clear()
+            self._unverified.clear()
+            self.total_bytes = 0
+
+            if self.manifest_path is not None:
+                self._write_manifest()
+
+    def _append_manifest(self, record: dict) -> None:
+        """Append one record to the manifest (caller holds the lock)."""
+        if self.manifest_path is None:
+            return
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self._manifest_records += 1
+        if self._manifest_records > MANIFEST_COMPACT_FACTOR * len(self.cache) + 64:
+            self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        """Rewrite the manifest with only the live entries, in LRU order."""
+        if self.manifest_path is None:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            for storage_key, chunk_path in self.cache.items():
+                record = {
+                    "op": "put",
+                    "key": storage_key,
+                    "path": str(chunk_path),
+                    "size": self.sizes[storage_key],
+                    "etag": self.etags.get(storage_key),
+                }
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_records = len(self.cache)
+
+    def _load_manifest(self) -> None:
+        """Replay the manifest, keeping entries whose files are still intact."""
+        assert self.manifest_path is not None
+        entries: OrderedDict[str, dict] = OrderedDict()
+
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final write
+                        continue
+                    key = record.get("key")
+                    op = record.get("op")
+                    if op == "put":
+                        entries.pop(key, None)
+                        entries[key] = record
+                    elif op == "touch" and key in entries:
+                        entries.move_to_end(key)
+                    elif op == "remove":
+                        entries.pop(key, None)
+
+        for storage_key, record in entries.items():
+            chunk_path = Path(record["path"])
             try:
-                chunk_path.unlink()
+                if chunk_path.stat().st_size != record["size"]:
+                    continue
             except OSError:
-                pass
+                continue
+            self.cache[storage_key] = chunk_path
+            self.sizes[storage_key] = record["size"]
+            self.etags[storage_key] = record.get("etag")
+            self._unverified.add(storage_key)
+            self.total_bytes += record["size"]
+
+        while self.total_bytes > self.max_size_bytes and self.cache:
+            self._evict_lru()
 
-        self.cache.clear()
-        self.sizes.clear()
-        self.access_order.clear()
+        # Compact the journal to the live entries
+        self._write_manifest()
+
+        if self.cache:
+            console.print(
+                f"[cyan]Chunk cache: reopened {len(self.cache)} chunks "
+                f"({self.total_bytes / 1024 / 1024:.1f} MB)[/cyan]"
+            )
 
 
 def batch_extract_frames(
@@ -421,7 +829,9 @@ def batch_extract_frames(
         # Extract all frames from this chunk
         for frame_idx in chunk_frames:
             try:
-                frame = extract_frame_from_chunk(signed_url, frame_idx, modulo)
+                frame = extract_frame_from_chunk(
+                    signed_url, frame_idx, modulo, cache=cache
+                )
                 results[frame_idx] = frame
             except ValueError as e:
                 console.print(f"[red]✗ Failed to extract frame {frame_idx}: {e}[/red]")
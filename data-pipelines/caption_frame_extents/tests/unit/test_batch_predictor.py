@@ -1,10 +1,12 @@
 """Unit tests for batch predictor."""
 
+import itertools
 import sqlite3
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 import torch
 from PIL import Image
@@ -509,6 +511,147 @@ class TestBatchCaptionFrameExtentsPredictorPrediction:
             assert len(result["probabilities"]) == 5
 
 
+class TestBatchCaptionFrameExtentsPredictorSequence:
+    """Tests for predict_sequence (consecutive pairs, one transform per frame)."""
+
+    @pytest.fixture
+    def predictor(self, tmp_path):
+        """Create a predictor whose mocked model depends on frame order."""
+        layout_db_path = create_mock_layout_db(tmp_path)
+        checkpoint_path = create_mock_checkpoint(tmp_path)
+
+        with patch(
+            "caption_frame_extents.inference.batch_predictor.create_model"
+        ) as mock_create:
+            mock_model = MagicMock()
+
+            def mock_forward(ocr_viz, frame1, frame2, spatial):
+                # Logits vary with both frames and their order
+                diff = (frame1 - frame2).mean(dim=(1, 2, 3))
+                logits = torch.zeros(ocr_viz.shape[0], 5)
+                logits[:, 0] = diff
+                logits[:, 1] = frame1.mean(dim=(1, 2, 3))
+                logits[:, 2] = spatial.sum(dim=1)
+                return logits
+
+            mock_model.side_effect = mock_forward
+            mock_create.return_value = mock_model
+
+            return BatchCaptionFrameExtentsPredictor(
+                checkpoint_path=checkpoint_path,
+                layout_db_path=layout_db_path,
+                device="cpu",
+            )
+
+    @staticmethod
+    def make_frames(count: int) -> list[Image.Image]:
+        """Create distinct frames of varying widths."""
+        return [
+            create_test_image(400 + 20 * i, 40, (20 * i % 256, 100, 200 - 10 * i))
+            for i in range(count)
+        ]
+
+    def test_matches_bidirectional_predict_batch(self, predictor):
+        """Should match submitting (f1, f2) and (f2, f1) to predict_batch."""
+        frames = self.make_frames(7)
+        pairs = []
+        for f1, f2 in itertools.pairwise(frames):
+            pairs.append((f1, f2))
+            pairs.append((f2, f1))
+
+        expected = predictor.predict_batch(pairs, batch_size=4)
+        results = predictor.predict_sequence(frames, batch_size=4)
+
+        assert len(results) == 6
+        for i, (forward, backward) in enumerate(results):
+            for actual, reference in (
+                (forward, expected[2 * i]),
+                (backward, expected[2 * i + 1]),
+            ):
+                assert actual["predicted_label"] == reference["predicted_label"]
+                for label, prob in reference["probabilities"].items():
+                    assert actual["probabilities"][label] == pytest.approx(prob)
+
+    def test_transforms_each_frame_once(self, predictor):
+        """Each frame should be resized once; the OCR viz not at all."""
+        frames = self.make_frames(10)
+
+        with patch.object(
+            predictor, "resize_transform", wraps=predictor.resize_transform
+        ) as resize:
+            predictor.predict_sequence(frames, batch_size=8)
+
+        assert resize.call_count == 10
+
+    def test_predict_batch_reuses_shared_frames(self, predictor):
+        """predict_batch should transform frames shared across pairs once."""
+        frames = self.make_frames(3)
+        pairs = [(frames[0], frames[1]), (frames[1], frames[0]), (frames[1], frames[2])]
+
+        with patch.object(
+            predictor, "resize_transform", wraps=predictor.resize_transform
+        ) as resize:
+            results = predictor.predict_batch(pairs)
+
+        assert len(results) == 3
+        assert resize.call_count == 3
+
+    def test_predict_batch_transforms_in_windows(self, predictor):
+        """predict_batch should hold at most one window of transformed frames."""
+        frames = self.make_frames(10)
+        pairs = list(itertools.pairwise(frames))
+
+        with patch.object(
+            predictor, "transform_frames", wraps=predictor.transform_frames
+        ) as transform:
+            results = predictor.predict_batch(pairs, batch_size=4)
+
+        # Consecutive pairs of 4 share 3 of their 8 frames
+        assert [len(c.args[0]) for c in transform.call_args_list] == [5, 5, 2]
+        expected = predictor.predict_batch(pairs, batch_size=32)
+        assert len(results) == len(expected) == 9
+        for actual, reference in zip(results, expected, strict=True):
+            for label, prob in reference["probabilities"].items():
+                assert actual["probabilities"][label] == pytest.approx(prob)
+
+    def test_sequence_windows_match_one_window(self, predictor):
+        """Windowed predict_sequence should match a single window."""
+        frames = self.make_frames(9)
+
+        with patch.object(
+            predictor, "transform_frames", wraps=predictor.transform_frames
+        ) as transform:
+            windowed = predictor.predict_sequence(frames, batch_size=4)
+
+        assert [len(c.args[0]) for c in transform.call_args_list] == [3, 2, 2, 2]
+        whole = predictor.predict_sequence(frames, batch_size=64)
+        assert len(windowed) == len(whole) == 8
+        for windowed_pair, whole_pair in zip(windowed, whole, strict=True):
+            for actual, reference in zip(windowed_pair, whole_pair, strict=True):
+                for label, prob in reference["probabilities"].items():
+                    assert actual["probabilities"][label] == pytest.approx(prob)
+
+    def test_tensor_frames_match_pil_frames(self, predictor):
+        """uint8 (N, H, W, 3) tensors should give the same results as PIL."""
+        frames = [create_test_image(600, 60, (10 * i, 80, 160)) for i in range(5)]
+        stacked = torch.stack([torch.from_numpy(np.array(f)) for f in frames])
+
+        from_pil = predictor.predict_sequence(frames)
+        from_tensor = predictor.predict_sequence(stacked)
+
+        assert len(from_tensor) == len(from_pil) == 4
+        for tensor_pair, pil_pair in zip(from_tensor, from_pil, strict=True):
+            for actual, reference in zip(tensor_pair, pil_pair, strict=True):
+                assert actual["predicted_label"] == reference["predicted_label"]
+                for label, prob in reference["probabilities"].items():
+                    assert actual["probabilities"][label] == pytest.approx(prob)
+
+    def test_short_sequences(self, predictor):
+        """Fewer than two frames produce no pairs."""
+        assert predictor.predict_sequence([]) == []
+        assert predictor.predict_sequence(self.make_frames(1)) == []
+
+
 class TestBatchCaptionFrameExtentsPredictorLabels:
     """Tests for label mapping."""
 
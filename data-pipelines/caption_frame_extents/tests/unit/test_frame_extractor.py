@@ -0,0 +1,238 @@
+"""Unit tests for chunk frame extraction."""
+
+import functools
+import http.server
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from caption_frame_extents.inference.frame_extractor import (
+    ChunkCache,
+    _stream_chunk,
+    download_and_extract_chunks_parallel,
+    extract_all_frames_from_chunk,
+    extract_frame_from_chunk,
+    iter_chunks_parallel,
+    iter_frames_from_chunk,
+)
+
+MODULE = "caption_frame_extents.inference.frame_extractor"
+
+
+def write_chunk(path: Path, num_frames: int, base: int) -> None:
+    """Write a small video whose frames have distinct solid colors."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 32))
+    for i in range(num_frames):
+        writer.write(np.full((32, 64, 3), (base + i * 7) % 256, dtype=np.uint8))
+    writer.release()
+
+
+@pytest.fixture
+def chunk_server(tmp_path):
+    """Serve chunk files over HTTP; yields a function mapping name -> URL."""
+    for k in range(4):
+        write_chunk(tmp_path / f"chunk_{k}.avi", 32, k * 40)
+
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(tmp_path)
+    )
+    handler.log_message = lambda *args: None  # type: ignore[method-assign]
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield lambda name: f"http://127.0.0.1:{server.server_port}/{name}"
+
+    server.shutdown()
+
+
+@pytest.mark.unit
+def test_iter_frames_decodes_all_frames_in_order(chunk_server):
+    """Should yield every frame of the chunk with its absolute index."""
+    frames = list(iter_frames_from_chunk(chunk_server("chunk_0.avi"), 0, 16))
+
+    assert [idx for idx, _ in frames] == list(range(0, 512, 16))
+    means = [frame.mean() for _, frame in frames]
+    assert means == sorted(means)
+
+
+@pytest.mark.unit
+def test_single_frame_matches_sequential_decode(chunk_server):
+    """extract_frame_from_chunk should return the same frame as the full decode."""
+    url = chunk_server("chunk_1.avi")
+    all_frames = extract_all_frames_from_chunk(url, 512, 16)
+
+    frame = extract_frame_from_chunk(
+        url, 512 + 16 * 5, modulo=16, chunk_start_frame=512
+    )
+
+    np.testing.assert_array_equal(frame, all_frames[512 + 16 * 5])
+
+
+@pytest.mark.unit
+def test_download_failure_raises_value_error(chunk_server):
+    """Missing chunks should raise ValueError."""
+    with pytest.raises(ValueError, match="Failed to download chunk"):
+        extract_all_frames_from_chunk(chunk_server("missing.avi"), 0, 16)
+
+
+@pytest.mark.unit
+def test_parallel_streams_frames_to_callback(chunk_server):
+    """With on_frame, frames are streamed to the callback and not retained."""
+    infos = [(chunk_server(f"chunk_{k}.avi"), k * 512, 16) for k in range(4)]
+    infos.append((chunk_server("missing.avi"), 4 * 512, 16))
+    seen: list[int] = []
+
+    result = download_and_extract_chunks_parallel(
+        infos,
+        max_workers=3,
+        max_buffered_frames=4,
+        on_frame=lambda idx, _frame: seen.append(idx),
+    )
+
+    assert result == {}
+    assert sorted(seen) == list(range(0, 4 * 512, 16))
+
+
+@pytest.mark.unit
+def test_parallel_returns_dict_without_callback(chunk_server):
+    """Without on_frame, all frames are returned keyed by index."""
+    infos = [(chunk_server(f"chunk_{k}.avi"), k * 512, 16) for k in range(2)]
+
+    result = download_and_extract_chunks_parallel(infos, max_workers=2)
+
+    assert sorted(result) == list(range(0, 2 * 512, 16))
+
+
+@pytest.mark.unit
+def test_parallel_stops_workers_when_consumer_closes(chunk_server):
+    """Closing the generator early should not leave workers blocked."""
+    infos = [(chunk_server(f"chunk_{k}.avi"), k * 512, 16) for k in range(4)]
+
+    frames = iter_chunks_parallel(infos, max_workers=2, max_buffered_frames=1)
+    next(frames)
+    frames.close()
+
+
+def write_file(path: Path, size: int) -> Path:
+    """Write a file of the given size."""
+    path.write_bytes(b"x" * size)
+    return path
+
+
+@pytest.mark.unit
+class TestChunkCache:
+    """Tests for ChunkCache LRU, stats and manifest persistence."""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Accessed entries survive; the LRU entry is evicted and deleted."""
+        cache = ChunkCache(max_size_mb=1)
+        a = write_file(tmp_path / "a", 400_000)
+        b = write_file(tmp_path / "b", 400_000)
+        c = write_file(tmp_path / "c", 400_000)
+
+        cache.put("a", a)
+        cache.put("b", b)
+        assert cache.get("a") == a
+        cache.put("c", c)
+
+        assert "b" not in cache
+        assert not b.exists()
+        assert list(cache.cache) == ["a", "c"]
+        assert cache.total_bytes == 800_000
+        assert cache.stats.evictions == 1
+
+    def test_stats(self, tmp_path):
+        """Hits, misses and bytes saved are counted."""
+        cache = ChunkCache()
+        cache.put("a", write_file(tmp_path / "a", 1000))
+
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        assert cache.stats.hits == 2
+        assert cache.stats.misses == 1
+        assert cache.stats.bytes_saved == 2000
+        assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_stale_etag_is_evicted(self, tmp_path):
+        """A different ETag invalidates the cached chunk."""
+        cache = ChunkCache()
+        cache.put("a", write_file(tmp_path / "a", 10), etag='"v1"')
+
+        assert cache.get("a", etag='"v1"') is not None
+        assert cache.get("a", etag='"v2"') is None
+        assert "a" not in cache
+
+    def test_manifest_reopens_entries(self, tmp_path):
+        """A new cache with the same manifest reopens chunks in LRU order."""
+        manifest = tmp_path / "manifest.jsonl"
+        cache = ChunkCache(manifest_path=manifest)
+        cache.put("a", write_file(tmp_path / "a", 10), etag='"1"')
+        cache.put("b", write_file(tmp_path / "b", 20))
+        cache.put("c", write_file(tmp_path / "c", 30))
+        cache.get("a")
+        cache._remove("b", delete_file=False)
+        (tmp_path / "c").unlink()
+
+        reopened = ChunkCache(manifest_path=manifest)
+
+        assert list(reopened.cache) == ["a"]
+        assert reopened.etags["a"] == '"1"'
+        assert reopened.total_bytes == 10
+        assert len(manifest.read_text().splitlines()) == 1
+
+    def test_manifest_is_compacted(self, tmp_path):
+        """Repeated hits don't grow the manifest without bound."""
+        manifest = tmp_path / "manifest.jsonl"
+        cache = ChunkCache(manifest_path=manifest)
+        cache.put("a", write_file(tmp_path / "a", 10))
+
+        for _ in range(1000):
+            cache.get("a")
+
+        assert len(manifest.read_text().splitlines()) < 100
+        assert list(ChunkCache(manifest_path=manifest).cache) == ["a"]
+
+    def test_fetch_revalidates_reopened_chunk(self, chunk_server, tmp_path):
+        """A reopened chunk whose object changed is downloaded again."""
+        manifest = tmp_path / "manifest.jsonl"
+        url = chunk_server("chunk_0.avi")
+        cache = ChunkCache(cache_dir=tmp_path / "cache", manifest_path=manifest)
+        with patch(
+            f"{MODULE}._stream_chunk",
+            side_effect=lambda *args: _stream_chunk(*args) or '"v1"',
+        ) as stream:
+            cache.fetch(url)
+
+            reopened = ChunkCache(cache_dir=tmp_path / "cache", manifest_path=manifest)
+            with patch(f"{MODULE}._remote_etag", return_value='"v1"') as head:
+                reopened.fetch(url)
+                reopened.fetch(url)
+            assert head.call_count == 1
+            assert stream.call_count == 1
+
+            reopened = ChunkCache(cache_dir=tmp_path / "cache", manifest_path=manifest)
+            with patch(f"{MODULE}._remote_etag", return_value='"v2"'):
+                reopened.fetch(url)
+            assert stream.call_count == 2
+
+    def test_fetch_downloads_once(self, chunk_server, tmp_path):
+        """fetch() downloads on a miss and serves later calls from disk."""
+        cache = ChunkCache(cache_dir=tmp_path / "cache")
+        url = chunk_server("chunk_0.avi") + "?X-Amz-Signature=abc"
+
+        first = cache.fetch(url)
+        second = cache.fetch(chunk_server("chunk_0.avi") + "?X-Amz-Signature=def")
+
+        assert first == second
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+        frames = extract_all_frames_from_chunk(url, 0, 16, cache=cache)
+        assert len(frames) == 32
+        assert first.exists()
@@ -0,0 +1,149 @@
+"""Parity tests for tensor-native transforms against the PIL implementation."""
+
+from typing import Literal, cast
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from caption_frame_extents.data.tensor_transforms import (
+    RESIZE_TOLERANCE,
+    TensorAnchorAwareResize,
+    TensorNormalizeImageNet,
+    lanczos_coefficients,
+    lanczos_matrix,
+)
+from caption_frame_extents.data.transforms import (
+    AnchorAwareResize,
+    NormalizeImageNet,
+    ResizeStrategy,
+)
+
+ANCHORS = ["left", "center", "right"]
+
+# (width, height): oversized, undersized, exact fit, upscaled height, odd sizes
+SIZES = [(1500, 90), (300, 72), (480, 48), (240, 24), (1001, 61), (97, 33)]
+
+
+def create_frames(width: int, height: int, count: int = 3, seed: int = 0) -> np.ndarray:
+    """Create uint8 frames with blocky noise (sharp edges stress the resampler)."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(
+        0, 256, size=(count, height // 4 + 1, width // 4 + 1, 3), dtype=np.uint8
+    )
+    return np.ascontiguousarray(
+        blocks.repeat(4, axis=1).repeat(4, axis=2)[:, :height, :width]
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("width,height", SIZES)
+@pytest.mark.parametrize("anchor", ANCHORS)
+@pytest.mark.parametrize(
+    "strategy",
+    [ResizeStrategy.CROP, ResizeStrategy.MIRROR_TILE, ResizeStrategy.ADAPTIVE],
+)
+def test_resize_matches_pil(width, height, anchor, strategy):
+    """Tensor resize should match AnchorAwareResize within RESIZE_TOLERANCE.
+
+    float32 sums only change Pillow's rounding at exact boundaries, so all
+    but a tiny fraction of pixels must match exactly.
+    """
+    anchor_type = cast(Literal["left", "center", "right"], anchor)
+    frames = create_frames(width, height)
+
+    pil_transform = AnchorAwareResize(
+        target_width=480, target_height=48, strategy=strategy
+    )
+    tensor_transform = TensorAnchorAwareResize(
+        target_width=480, target_height=48, strategy=strategy
+    )
+
+    result = tensor_transform(torch.from_numpy(frames), anchor_type=anchor_type)
+
+    assert result.shape == (len(frames), 3, 48, 480)
+    assert result.dtype == torch.uint8
+    for frame, actual in zip(frames, result, strict=True):
+        expected = np.asarray(
+            pil_transform(Image.fromarray(frame), anchor_type=anchor_type)
+        ).astype(np.int16)
+        diff = np.abs(actual.permute(1, 2, 0).numpy().astype(np.int16) - expected)
+        assert diff.max() <= RESIZE_TOLERANCE
+        assert np.count_nonzero(diff) <= diff.size // 1000
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("width,height", SIZES)
+def test_resize_and_normalize_match_pil(width, height):
+    """Full tensor preprocessing should match the PIL + NumPy path."""
+    frames = create_frames(width, height, seed=1)
+
+    pil_resize = AnchorAwareResize()
+    pil_normalize = NormalizeImageNet()
+    tensor_resize = TensorAnchorAwareResize()
+    tensor_normalize = TensorNormalizeImageNet()
+
+    result = tensor_normalize(
+        tensor_resize(torch.from_numpy(frames), anchor_type="center")
+    )
+
+    assert result.dtype == torch.float32
+    for frame, actual in zip(frames, result, strict=True):
+        expected = pil_normalize(
+            pil_resize(Image.fromarray(frame), anchor_type="center")
+        )
+        # RESIZE_TOLERANCE levels, scaled by the smallest ImageNet std
+        np.testing.assert_allclose(
+            actual.numpy(), expected, rtol=0, atol=RESIZE_TOLERANCE / 255 / 0.224 + 1e-6
+        )
+
+
+@pytest.mark.unit
+def test_lanczos_coefficients_are_normalized():
+    """Quantized weights of every output pixel should sum to ~2**22."""
+    for in_size, out_size in [(1500, 720), (240, 480), (61, 48)]:
+        indices, weights = lanczos_coefficients(in_size, out_size)
+
+        assert indices.shape == weights.shape
+        assert indices.min() >= 0
+        assert indices.max() < in_size
+        np.testing.assert_allclose(weights.sum(axis=1), 1 << 22, atol=weights.shape[1])
+
+
+@pytest.mark.unit
+def test_lanczos_matrix_matches_coefficients():
+    """Each matrix column should hold that output pixel's scaled weights."""
+    indices, weights = lanczos_coefficients(1001, 801)
+    matrix = lanczos_matrix(1001, 801)
+
+    assert matrix.shape == (1001, 801)
+    assert matrix.dtype == np.float32
+    for out in (0, 400, 800):
+        expected = np.zeros(1001)
+        np.add.at(expected, indices[out], weights[out] / (1 << 22))
+        np.testing.assert_allclose(matrix[:, out], expected, atol=1e-7)
+
+
+@pytest.mark.unit
+def test_rejects_channels_first_input():
+    """Frames must be (N, H, W, 3) like decoder output."""
+    with pytest.raises(ValueError, match="Expected frames of shape"):
+        TensorAnchorAwareResize()(
+            torch.zeros((2, 3, 48, 480), dtype=torch.uint8), anchor_type="left"
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")
+def test_cuda_matches_cpu():
+    """Device results should match CPU results."""
+    frames = torch.from_numpy(create_frames(1001, 61, seed=2))
+    transform = TensorAnchorAwareResize()
+
+    cpu = transform(frames, anchor_type="right")
+    cuda = transform(frames.cuda(), anchor_type="right")
+
+    assert cuda.device.type == "cuda"
+    diff = (cuda.cpu().to(torch.int16) - cpu.to(torch.int16)).abs()
+    assert diff.max() <= RESIZE_TOLERANCE
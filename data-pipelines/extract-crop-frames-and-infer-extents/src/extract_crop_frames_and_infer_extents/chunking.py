@@ -0,0 +1,99 @@
+"""Incremental tracking of which VP9 chunks have all their frames.
+
+Frames are split into mutually exclusive modulo levels (for [16, 4, 1]:
+every 16th frame, the remaining every 4th frame, then everything else), and
+each level is cut into fixed-size chunks in frame order. A frame's level,
+position within the level and chunk follow from its index alone, so readiness
+is a counter per (modulo, chunk index) and marking a frame costs O(levels)
+no matter how many frames have arrived or in what order.
+"""
+
+
+class ChunkReadinessIndex:
+    """Per-chunk frame counters for the modulo levels of a video.
+
+    Levels must be in descending order with each dividing the one before
+    (e.g. [16, 4, 1]); frames that fall in no level are ignored.
+    """
+
+    def __init__(self, frames_per_chunk: int = 32, modulo_levels: list[int] | None = None):
+        levels = list(modulo_levels or [16, 4, 1])
+        if frames_per_chunk < 1:
+            raise ValueError(f"frames_per_chunk must be positive, got {frames_per_chunk}")
+        if not levels or levels[-1] < 1:
+            raise ValueError(f"Invalid modulo levels: {levels}")
+        for parent, modulo in zip(levels, levels[1:]):
+            if parent <= modulo or parent % modulo != 0:
+                raise ValueError(f"Each modulo level must divide the one before it: {levels}")
+
+        self.frames_per_chunk = frames_per_chunk
+        self.modulo_levels = levels
+
+        # Frames seen per (modulo, chunk index); removed once the chunk is dispatched
+        self._counts: dict[tuple[int, int], int] = {}
+        self._frames: set[int] = set()
+
+    def _locate(self, frame_idx: int) -> tuple[int, int] | None:
+        """Return (modulo, position within that level) for a frame, or None."""
+        parent = None
+        for modulo in self.modulo_levels:
+            if frame_idx % modulo == 0 and (parent is None or frame_idx % parent != 0):
+                if parent is None:
+                    return modulo, frame_idx // modulo
+                per_parent = parent // modulo - 1
+                return modulo, (frame_idx // parent) * per_parent + (frame_idx % parent) // modulo - 1
+            parent = modulo
+        return None
+
+    def _frame_at(self, modulo: int, position: int) -> int:
+        """Inverse of _locate: the frame at a position within a modulo level."""
+        level = self.modulo_levels.index(modulo)
+        if level == 0:
+            return position * modulo
+        parent = self.modulo_levels[level - 1]
+        block, offset = divmod(position, parent // modulo - 1)
+        return block * parent + (offset + 1) * modulo
+
+    def chunk_frames(self, modulo: int, chunk_index: int) -> list[int]:
+        """Frame indices of a full chunk, in order."""
+        start = chunk_index * self.frames_per_chunk
+        return [self._frame_at(modulo, position) for position in range(start, start + self.frames_per_chunk)]
+
+    def add(self, frame_idx: int) -> tuple[int, list[int]] | None:
+        """Mark a frame as available.
+
+        Returns:
+            (modulo, chunk frame indices) if this frame completed its chunk,
+            otherwise None. Each chunk is returned at most once.
+        """
+        if frame_idx in self._frames:
+            return None
+        located = self._locate(frame_idx)
+        if located is None:
+            return None
+        self._frames.add(frame_idx)
+
+        modulo, position = located
+        key = (modulo, position // self.frames_per_chunk)
+        count = self._counts.get(key, 0) + 1
+        if count < self.frames_per_chunk:
+            self._counts[key] = count
+            return None
+
+        self._counts.pop(key, None)
+        return modulo, self.chunk_frames(*key)
+
+    def pending(self) -> list[tuple[int, list[int]]]:
+        """Take the chunks that never filled up (e.g. the tail of each level).
+
+        Returns:
+            (modulo, available frame indices) per incomplete chunk, ordered by
+            level then chunk. The chunks are not returned again.
+        """
+        incomplete = []
+        levels = {modulo: i for i, modulo in enumerate(self.modulo_levels)}
+        for modulo, chunk_index in sorted(self._counts, key=lambda key: (levels[key[0]], key[1])):
+            frames = [f for f in self.chunk_frames(modulo, chunk_index) if f in self._frames]
+            incomplete.append((modulo, frames))
+        self._counts.clear()
+        return incomplete
@@ -353,51 +353,38 @@ def crop_and_infer_caption_frame_extents_impl(
                 device="cuda" if torch.cuda.is_available() else "cpu",
             )
 
-            # Run inference in batches
+            # Run inference in windows of consecutive frames; each window
+            # overlaps the previous one by a frame so every pair is covered
             batch_size = 32
             pair_results = []
 
             for i in range(0, len(frame_pairs), batch_size):
-                batch = frame_pairs[i : i + batch_size]
-
-                # Prepare bidirectional pairs
-                bidirectional_pairs = []
-                for frame1_idx, frame2_idx in batch:
-                    if frame1_idx in all_frames and frame2_idx in all_frames:
-                        f1 = all_frames[frame1_idx]
-                        f2 = all_frames[frame2_idx]
-                        bidirectional_pairs.append((f1, f2))  # Forward
-                        bidirectional_pairs.append((f2, f1))  # Backward
-
-                # Run inference
-                if bidirectional_pairs:
-                    predictions = predictor.predict_batch(bidirectional_pairs, batch_size=batch_size)
-
-                    # Split into forward/backward and create results
-                    for j, (frame1_idx, frame2_idx) in enumerate(batch):
-                        forward_pred = predictions[j * 2]
-                        backward_pred = predictions[j * 2 + 1]
-
-                        pair_result = PairResult(
-                            frame1_index=frame1_idx,
-                            frame2_index=frame2_idx,
-                            forward_predicted_label=forward_pred["predicted_label"],
-                            forward_confidence=forward_pred["confidence"],
-                            forward_prob_same=forward_pred["probabilities"]["same"],
-                            forward_prob_different=forward_pred["probabilities"]["different"],
-                            forward_prob_empty_empty=forward_pred["probabilities"]["empty_empty"],
-                            forward_prob_empty_valid=forward_pred["probabilities"]["empty_valid"],
-                            forward_prob_valid_empty=forward_pred["probabilities"]["valid_empty"],
-                            backward_predicted_label=backward_pred["predicted_label"],
-                            backward_confidence=backward_pred["confidence"],
-                            backward_prob_same=backward_pred["probabilities"]["same"],
-                            backward_prob_different=backward_pred["probabilities"]["different"],
-                            backward_prob_empty_empty=backward_pred["probabilities"]["empty_empty"],
-                            backward_prob_empty_valid=backward_pred["probabilities"]["empty_valid"],
-                            backward_prob_valid_empty=backward_pred["probabilities"]["valid_empty"],
-                            processing_time_ms=None,
-                        )
-                        pair_results.append(pair_result)
+                window = [all_frames[k] for k in range(i, min(i + batch_size + 1, frame_count))]
+                predictions = predictor.predict_sequence(window, batch_size=batch_size * 2)
+
+                for j, (forward_pred, backward_pred) in enumerate(predictions):
+                    frame1_idx, frame2_idx = frame_pairs[i + j]
+
+                    pair_result = PairResult(
+                        frame1_index=frame1_idx,
+                        frame2_index=frame2_idx,
+                        forward_predicted_label=forward_pred["predicted_label"],
+                        forward_confidence=forward_pred["confidence"],
+                        forward_prob_same=forward_pred["probabilities"]["same"],
+                        forward_prob_different=forward_pred["probabilities"]["different"],
+                        forward_prob_empty_empty=forward_pred["probabilities"]["empty_empty"],
+                        forward_prob_empty_valid=forward_pred["probabilities"]["empty_valid"],
+                        forward_prob_valid_empty=forward_pred["probabilities"]["valid_empty"],
+                        backward_predicted_label=backward_pred["predicted_label"],
+                        backward_confidence=backward_pred["confidence"],
+                        backward_prob_same=backward_pred["probabilities"]["same"],
+                        backward_prob_different=backward_pred["probabilities"]["different"],
+                        backward_prob_empty_empty=backward_pred["probabilities"]["empty_empty"],
+                        backward_prob_empty_valid=backward_pred["probabilities"]["empty_valid"],
+                        backward_prob_valid_empty=backward_pred["probabilities"]["valid_empty"],
+                        processing_time_ms=None,
+                    )
+                    pair_results.append(pair_result)
 
                 if (i + batch_size) % 1000 == 0 or i + batch_size >= len(frame_pairs):
                     print(f"  Processed {min(i + batch_size, len(frame_pairs))}/{len(frame_pairs)} pairs")
@@ -86,6 +86,7 @@ from caption_frame_extents.inference.wasabi import WasabiClient
 from gpu_video_utils import GPUVideoDecoder
 from PIL import Image as PILImage
 
+from .chunking import ChunkReadinessIndex
 from .models import CropInferResult, CropRegion
 
 # Try to import monitoring libraries
@@ -151,6 +152,60 @@ class CropRegionHelper:
         self.crop_height = self.crop_bottom_px - self.crop_top_px
 
 
+# Optimized VP9 encoding settings shared by every chunk encode
+VP9_ENCODE_ARGS = [
+    "-c:v",
+    "libvpx-vp9",
+    "-crf",
+    "30",
+    "-b:v",
+    "0",
+    # Speed optimizations (2-3x faster)
+    "-cpu-used",
+    "2",  # Good speed/quality balance
+    "-threads",
+    "2",  # 2 threads per worker
+    "-row-mt",
+    "1",  # Row-based multithreading
+    "-tile-columns",
+    "1",  # 2 tile columns
+    "-frame-parallel",
+    "1",  # Frame parallelization
+    "-auto-alt-ref",
+    "1",  # Better compression
+    "-lag-in-frames",
+    "25",  # Look-ahead
+]
+
+
+def encode_vp9_chunk(chunk_frames: list[Path], chunk_output: Path, frame_rate: float) -> None:
+    """Encode JPEG frames into a VP9 WebM chunk, piping them to ffmpeg's stdin.
+
+    Streaming the images (image2pipe) instead of pointing ffmpeg at a concat
+    file list means no temp file per chunk; codec and container settings are
+    unchanged.
+    """
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-f",
+            "image2pipe",
+            "-c:v",
+            "mjpeg",
+            "-framerate",
+            str(frame_rate),
+            "-i",
+            "pipe:0",
+            *VP9_ENCODE_ARGS,
+            "-y",
+            str(chunk_output),
+        ],
+        input=b"".join(frame_file.read_bytes() for frame_file in chunk_frames),
+        capture_output=True,
+        check=True,
+    )
+
+
 class ParallelEncodingCoordinator:
     """Coordinates parallel VP9 encoding as frames become available.
 
@@ -176,9 +231,8 @@ class ParallelEncodingCoordinator:
         self.modulo_levels = modulo_levels or [16, 4, 1]
         self.upload_coordinator = upload_coordinator
 
-        # Track available frames and encoded chunks
-        self.available_frames = set()
-        self.encoded_chunks = set()  # (modulo, start_frame_idx)
+        # Per-chunk frame counters; chunks are submitted as their last frame lands
+        self.chunks = ChunkReadinessIndex(frames_per_chunk, self.modulo_levels)
         self.lock = threading.Lock()
 
         # Executor for parallel encoding
@@ -186,72 +240,25 @@ class ParallelEncodingCoordinator:
         self.futures = []
 
     def mark_frame_available(self, frame_idx: int):
-        """Mark a frame as available and check for ready chunks."""
+        """Mark a frame as available and submit its chunk if that completed it."""
         with self.lock:
-            self.available_frames.add(frame_idx)
-
-        # Check if any new chunks are ready to encode
-        self._check_and_encode_ready_chunks()
-
-    def _get_frames_for_modulo(self, available_frames: list, modulo: int) -> list:
-        """Get frames that belong to this specific modulo level (no overlap).
-
-        - modulo 16: every 16th frame (0, 16, 32, ...)
-        - modulo 4: every 4th frame excluding modulo 16 (4, 8, 12, 20, 24, ...)
-        - modulo 1: all other frames (1, 2, 3, 5, 6, 7, 9, ...)
-        """
-        if modulo == 16:
-            # Highest priority: every 16th frame
-            return [f for f in available_frames if f % 16 == 0]
-        elif modulo == 4:
-            # Middle priority: every 4th frame, excluding modulo 16
-            return [f for f in available_frames if f % 4 == 0 and f % 16 != 0]
-        elif modulo == 1:
-            # Lowest priority: all frames excluding modulo 16 and modulo 4
-            return [f for f in available_frames if f % 4 != 0]
-        else:
-            return []
-
-    def _check_and_encode_ready_chunks(self):
-        """Check for complete chunks and submit them for encoding."""
-        with self.lock:
-            available = sorted(self.available_frames)
-            if not available:
-                return
+            ready = self.chunks.add(frame_idx)
+            if ready is not None:
+                self._submit_chunk(*ready)
 
-            # Check each modulo level (with proper filtering for no overlap)
-            for modulo in self.modulo_levels:
-                # Get frames at this specific modulo level (no overlap)
-                modulo_frames = self._get_frames_for_modulo(available, modulo)
+    def _submit_chunk(self, modulo: int, chunk_frames: list[int]):
+        """Submit a chunk for encoding, named after its first frame (lock held)."""
+        future = self.executor.submit(self._encode_chunk, modulo, chunk_frames, chunk_frames[0])
+        self.futures.append(future)
 
-                if len(modulo_frames) < self.frames_per_chunk:
-                    continue
-
-                # Split into chunks
-                for chunk_start_idx in range(0, len(modulo_frames) - self.frames_per_chunk + 1, self.frames_per_chunk):
-                    chunk_frames = modulo_frames[chunk_start_idx : chunk_start_idx + self.frames_per_chunk]
-
-                    # Use first frame index as chunk identifier
-                    start_frame_idx = chunk_frames[0]
-                    chunk_id = (modulo, start_frame_idx)
-
-                    # Skip if already encoded or in progress
-                    if chunk_id in self.encoded_chunks:
-                        continue
-
-                    # Check if all frames in chunk are available
-                    if all(f in self.available_frames for f in chunk_frames):
-                        # Mark as being encoded
-                        self.encoded_chunks.add(chunk_id)
-
-                        # Submit encoding task
-                        future = self.executor.submit(self._encode_chunk, modulo, chunk_frames, start_frame_idx)
-                        self.futures.append(future)
+    def _submit_remaining_chunks(self):
+        """Submit the partial chunks left over once all frames have arrived."""
+        with self.lock:
+            for modulo, chunk_frames in self.chunks.pending():
+                self._submit_chunk(modulo, chunk_frames)
 
     def _encode_chunk(self, modulo: int, chunk_frame_indices: list, start_frame_idx: int) -> Path:
         """Encode a single chunk (called in worker thread)."""
-        import tempfile
-
         # Create modulo directory
         modulo_dir = self.chunks_dir / f"modulo_{modulo}"
         modulo_dir.mkdir(exist_ok=True, parents=True)
@@ -262,62 +269,18 @@ class ParallelEncodingCoordinator:
         # Output path
         chunk_output = modulo_dir / f"chunk_{start_frame_idx:010d}.webm"
 
-        # Create FFmpeg file list
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            for frame_file in chunk_frames:
-                f.write(f"file '{frame_file.absolute()}'\n")
-                f.write(f"duration {1.0 / self.frame_rate}\n")
-            filelist_path = f.name
+        encode_vp9_chunk(chunk_frames, chunk_output, self.frame_rate)
 
-        try:
-            # Encode with VP9
-            subprocess.run(
-                [
-                    "ffmpeg",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    filelist_path,
-                    "-c:v",
-                    "libvpx-vp9",
-                    "-crf",
-                    "30",
-                    "-b:v",
-                    "0",
-                    "-cpu-used",
-                    "2",
-                    "-threads",
-                    "2",
-                    "-row-mt",
-                    "1",
-                    "-tile-columns",
-                    "1",
-                    "-frame-parallel",
-                    "1",
-                    "-auto-alt-ref",
-                    "1",
-                    "-lag-in-frames",
-                    "25",
-                    "-y",
-                    str(chunk_output),
-                ],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+        # Trigger upload immediately if coordinator is available
+        if self.upload_coordinator:
+            self.upload_coordinator.upload_chunk(modulo, chunk_output)
 
-            # Trigger upload immediately if coordinator is available
-            if self.upload_coordinator:
-                self.upload_coordinator.upload_chunk(modulo, chunk_output)
-
-            return chunk_output
-        finally:
-            Path(filelist_path).unlink(missing_ok=True)
+        return chunk_output
 
     def wait_for_completion(self) -> list[tuple[int, Path]]:
         """Wait for all encoding tasks to complete and return chunk paths."""
+        self._submit_remaining_chunks()
+
         chunk_paths = []
         completed = 0
         total = len(self.futures)
@@ -487,55 +450,8 @@ class VP9EncoderPool:
         chunk_output: Path,
     ) -> Path:
         """Encode a single chunk with optimized VP9 settings."""
-        # Create FFmpeg file list
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            for frame_file in chunk_frames:
-                f.write(f"file '{frame_file.absolute()}'\n")
-                f.write(f"duration {1.0 / self.frame_rate}\n")
-            filelist_path = f.name
-
-        try:
-            # Optimized VP9 encoding
-            subprocess.run(
-                [
-                    "ffmpeg",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    filelist_path,
-                    "-c:v",
-                    "libvpx-vp9",
-                    "-crf",
-                    "30",
-                    "-b:v",
-                    "0",
-                    # Speed optimizations (2-3x faster)
-                    "-cpu-used",
-                    "2",  # Good speed/quality balance
-                    "-threads",
-                    "2",  # 2 threads per worker
-                    "-row-mt",
-                    "1",  # Row-based multithreading
-                    "-tile-columns",
-                    "1",  # 2 tile columns
-                    "-frame-parallel",
-                    "1",  # Frame parallelization
-                    "-auto-alt-ref",
-                    "1",  # Better compression
-                    "-lag-in-frames",
-                    "25",  # Look-ahead
-                    "-y",
-                    str(chunk_output),
-                ],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            return chunk_output
-        finally:
-            Path(filelist_path).unlink(missing_ok=True)
+        encode_vp9_chunk(chunk_frames, chunk_output, self.frame_rate)
+        return chunk_output
 
     def encode_all_chunks(
         self,
@@ -858,36 +774,18 @@ def crop_and_infer_caption_frame_extents_pipelined(
             prev_batch_last_frame_gpu = batch_frames_gpu[-1]
             prev_batch_last_frame_idx = batch_frame_indices[-1]
 
-            # Transfer batch to CPU and convert to PIL
-            batch_frames_pil = []
-            for frame_gpu in batch_frames_gpu:
-                frame_np = frame_gpu.cpu().numpy()
-                batch_frames_pil.append(PILImage.fromarray(frame_np))
-
-            # Create all consecutive pairs from batch
-            batch_inputs = []
-            batch_pair_info = []
-
-            for i in range(len(batch_frames_pil) - 1):
-                f1 = batch_frames_pil[i]
-                f2 = batch_frames_pil[i + 1]
-                idx1 = batch_frame_indices[i]
-                idx2 = batch_frame_indices[i + 1]
-
-                batch_inputs.append((f1, f2))  # Forward
-                batch_inputs.append((f2, f1))  # Backward
-                batch_pair_info.append((idx1, idx2))
-
-            # Run batched inference (much more efficient!)
-            predictions = predictor.predict_batch(
-                batch_inputs,
-                batch_size=len(batch_inputs),
+            # Run batched inference on all consecutive pairs. Frames stay on the
+            # GPU: resize/normalize run on device, each frame is transformed
+            # once, and forward/backward pairs are built by indexing
+            predictions = predictor.predict_sequence(
+                torch.stack(batch_frames_gpu),
+                batch_size=inference_batch_size,
             )
 
             # Process results for each pair
-            for i, (idx1, idx2) in enumerate(batch_pair_info):
-                forward_pred = predictions[i * 2]
-                backward_pred = predictions[i * 2 + 1]
+            for i, (forward_pred, backward_pred) in enumerate(predictions):
+                idx1 = batch_frame_indices[i]
+                idx2 = batch_frame_indices[i + 1]
 
                 pair_result = PairResult(
                     frame1_index=idx1,
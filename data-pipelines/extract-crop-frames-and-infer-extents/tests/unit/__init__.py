@@ -0,0 +1 @@
+"""Unit tests for pipeline helpers that run without a GPU."""
@@ -0,0 +1,120 @@
+"""Tests for incremental chunk readiness tracking."""
+
+import random
+import time
+
+import pytest
+from extract_crop_frames_and_infer_extents.chunking import ChunkReadinessIndex
+
+
+def level_frames(frames: list[int], modulo: int) -> list[int]:
+    """Frames of one level for [16, 4, 1], as the coordinator used to filter them."""
+    if modulo == 16:
+        return [f for f in frames if f % 16 == 0]
+    if modulo == 4:
+        return [f for f in frames if f % 4 == 0 and f % 16 != 0]
+    return [f for f in frames if f % 4 != 0]
+
+
+def full_chunks(num_frames: int, frames_per_chunk: int) -> list[tuple[int, list[int]]]:
+    """Every full chunk of a video, by slicing each level's frames in order."""
+    chunks = []
+    for modulo in (16, 4, 1):
+        frames = level_frames(list(range(num_frames)), modulo)
+        for start in range(0, len(frames) - frames_per_chunk + 1, frames_per_chunk):
+            chunks.append((modulo, frames[start : start + frames_per_chunk]))
+    return chunks
+
+
+def mark_all(index: ChunkReadinessIndex, frames: list[int]) -> list[tuple[int, list[int]]]:
+    ready = []
+    for frame_idx in frames:
+        chunk = index.add(frame_idx)
+        if chunk is not None:
+            ready.append(chunk)
+    return ready
+
+
+class TestChunkReadinessIndex:
+    """Test per-chunk counters against slicing each level's frames."""
+
+    def test_in_order_frames_match_level_slices(self):
+        """Chunks of in-order frames are the consecutive frames of each level."""
+        index = ChunkReadinessIndex(frames_per_chunk=8)
+
+        ready = mark_all(index, list(range(1000)))
+
+        assert sorted(ready) == sorted(full_chunks(1000, 8))
+
+    def test_chunk_is_ready_when_its_last_frame_lands(self):
+        """A chunk is returned by the add() that completes it, whatever the order."""
+        index = ChunkReadinessIndex(frames_per_chunk=4)
+        frames = [0, 16, 32, 48]
+
+        assert [index.add(f) for f in (48, 0, 32)] == [None, None, None]
+        assert index.add(16) == (16, frames)
+        assert index.add(16) is None
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_order_dispatches_every_chunk_once(self, seed):
+        """Out-of-order frames yield each full chunk exactly once."""
+        frames = list(range(3000))
+        random.Random(seed).shuffle(frames)
+        index = ChunkReadinessIndex(frames_per_chunk=32)
+
+        ready = mark_all(index, frames + frames[:100])
+
+        assert sorted(ready) == sorted(full_chunks(3000, 32))
+
+    def test_pending_returns_partial_chunks(self):
+        """Leftover frames of each level come back once, in level order."""
+        index = ChunkReadinessIndex(frames_per_chunk=32)
+        mark_all(index, list(range(100)))
+
+        frames = list(range(100))
+        assert index.pending() == [
+            (16, level_frames(frames, 16)),
+            (4, level_frames(frames, 4)),
+            (1, level_frames(frames, 1)[64:]),
+        ]
+        assert index.pending() == []
+
+    def test_pending_skips_missing_frames(self):
+        """A chunk with a gap only lists the frames that arrived."""
+        index = ChunkReadinessIndex(frames_per_chunk=4, modulo_levels=[1])
+        mark_all(index, [0, 1, 3])
+
+        assert index.pending() == [(1, [0, 1, 3])]
+
+    def test_other_levels(self):
+        """Any chain of levels where each divides the one before works."""
+        index = ChunkReadinessIndex(frames_per_chunk=2, modulo_levels=[6, 2])
+
+        ready = mark_all(index, list(range(24)))
+
+        assert ready == [(2, [2, 4]), (6, [0, 6]), (2, [8, 10]), (2, [14, 16]), (6, [12, 18]), (2, [20, 22])]
+        assert index.add(3) is None
+
+    @pytest.mark.parametrize("levels", [[4, 16, 1], [16, 6, 1], [16, 4, 0]])
+    def test_rejects_invalid_levels(self, levels):
+        with pytest.raises(ValueError):
+            ChunkReadinessIndex(modulo_levels=levels)
+
+
+@pytest.mark.slow
+def test_benchmark_200k_frames_random_order():
+    """Marking 200k shuffled frames stays linear: each chunk once, fast."""
+    num_frames = 200_000
+    frames = list(range(num_frames))
+    random.Random(0).shuffle(frames)
+    index = ChunkReadinessIndex(frames_per_chunk=32)
+
+    start = time.perf_counter()
+    ready = mark_all(index, frames)
+    pending = index.pending()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nmarked {num_frames:,} frames in {elapsed * 1000:.0f} ms ({num_frames / elapsed:,.0f} frames/s)")
+    assert sorted(ready) == sorted(full_chunks(num_frames, 32))
+    assert sum(len(chunk) for _, chunk in ready + pending) == num_frames
+    assert elapsed < 2.0
@@ -1,13 +1,19 @@
 """Database operations for full_frames pipeline.
 
 Writes OCR results directly to the full_frame_ocr table in the video's fullOCR.db.
+Builds the client-facing layout.db boxes table from the same OCR stream.
 Writes frame images to full_frames table for blob storage.
 """
 
+import gzip
+import shutil
 import sqlite3
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
 from pathlib import Path
+from typing import Self
 
+from ocr import OCRResult, bulk_write_connection, ocr_result_rows
 from PIL import Image
 
 
@@ -29,6 +35,232 @@ def get_database_path(output_dir: Path) -> Path:
 # Use ensure_ocr_table and write_ocr_result_to_database from ocr
 
 
+def create_layout_db(layout_db_path: Path, frame_width: int, frame_height: int) -> None:
+    """Create client-facing layout.db with empty boxes table.
+
+    Creates database_metadata, boxes, layout_config and preferences tables.
+    Boxes are filled afterwards by OCRDatabaseWriter.
+
+    Args:
+        layout_db_path: Path for new layout.db file
+        frame_width: Video frame width in pixels
+        frame_height: Video frame height in pixels
+    """
+    conn = sqlite3.connect(layout_db_path)
+    try:
+        # Create database_metadata table
+        conn.execute(
+            """
+            CREATE TABLE database_metadata (
+                id INTEGER PRIMARY KEY CHECK(id = 1),
+                schema_version INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO database_metadata (id, schema_version, created_at) "
+            "VALUES (1, 1, datetime('now'))"
+        )
+
+        # Create boxes table (transformed from full_frame_ocr)
+        # DEFAULT values required for CR-SQLite compatibility (v0.16.1+)
+        conn.execute(
+            """
+            CREATE TABLE boxes (
+                frame_index INTEGER NOT NULL,
+                box_index INTEGER NOT NULL,
+                bbox_left REAL NOT NULL DEFAULT 0.0,
+                bbox_top REAL NOT NULL DEFAULT 0.0,
+                bbox_right REAL NOT NULL DEFAULT 0.0,
+                bbox_bottom REAL NOT NULL DEFAULT 0.0,
+                text TEXT DEFAULT NULL,
+                label TEXT DEFAULT NULL,
+                label_updated_at TEXT DEFAULT NULL,
+                predicted_label TEXT DEFAULT NULL,
+                predicted_confidence REAL DEFAULT NULL,
+                PRIMARY KEY (frame_index, box_index)
+            ) WITHOUT ROWID
+            """
+        )
+
+        # Create layout_config table
+        # DEFAULT values required for CR-SQLite compatibility (v0.16.1+)
+        # Schema must match client expectations in database-queries.ts
+        conn.execute(
+            """
+            CREATE TABLE layout_config (
+                id INTEGER NOT NULL PRIMARY KEY CHECK(id = 1),
+                frame_width INTEGER NOT NULL DEFAULT 0,
+                frame_height INTEGER NOT NULL DEFAULT 0,
+                crop_left REAL NOT NULL DEFAULT 0,
+                crop_top REAL NOT NULL DEFAULT 0,
+                crop_right REAL NOT NULL DEFAULT 1,
+                crop_bottom REAL NOT NULL DEFAULT 1,
+                selection_left REAL DEFAULT NULL,
+                selection_top REAL DEFAULT NULL,
+                selection_right REAL DEFAULT NULL,
+                selection_bottom REAL DEFAULT NULL,
+                vertical_center REAL DEFAULT NULL,
+                vertical_std REAL DEFAULT NULL,
+                box_height INTEGER DEFAULT NULL,
+                box_height_std REAL DEFAULT NULL,
+                anchor_type TEXT DEFAULT NULL,
+                anchor_position REAL DEFAULT NULL,
+                top_edge_std REAL DEFAULT NULL,
+                bottom_edge_std REAL DEFAULT NULL,
+                horizontal_std_slope REAL DEFAULT NULL,
+                horizontal_std_intercept REAL DEFAULT NULL,
+                crop_region_version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+            """
+        )
+
+        # Initialize layout_config with frame dimensions
+        conn.execute(
+            """
+            INSERT INTO layout_config
+            (id, frame_width, frame_height, crop_left, crop_top, crop_right, crop_bottom)
+            VALUES (1, ?, ?, 0, 0, 1, 1)
+            """,
+            (frame_width, frame_height),
+        )
+
+        # Create preferences table
+        conn.execute(
+            """
+            CREATE TABLE preferences (
+                id INTEGER NOT NULL PRIMARY KEY CHECK(id = 1),
+                layout_approved INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("INSERT INTO preferences (id, layout_approved) VALUES (1, 0)")
+
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class OCRDatabaseWriter:
+    """Stream OCR results into fullOCR.db and, optionally, layout.db.
+
+    Each result is fanned out to both databases as it arrives. Rows are
+    buffered and inserted with executemany, one transaction per batch, so
+    memory is bounded by batch_size rather than the total box count.
+
+    Args:
+        ocr_db_path: Path to fullOCR.db (full_frame_ocr table must exist)
+        layout_db_path: Optional path to layout.db created by create_layout_db
+        table_name: OCR table name (default: 'full_frame_ocr')
+        batch_size: Rows per transaction
+
+    Example:
+        >>> with OCRDatabaseWriter(db_path, layout_db_path) as writer:
+        ...     process_frames_with_ocr(frames, backend, on_results=writer.write)
+        >>> print(writer.total_boxes)
+    """
+
+    def __init__(
+        self,
+        ocr_db_path: Path,
+        layout_db_path: Path | None = None,
+        table_name: str = "full_frame_ocr",
+        batch_size: int = 50_000,
+    ):
+        self.batch_size = batch_size
+        self.total_boxes = 0
+        self._ocr_sql = f"""
+            INSERT INTO {table_name}
+            (frame_index, box_index, text, confidence, x, y, width, height)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(frame_index, box_index) DO NOTHING
+        """
+        self._layout_sql = """
+            INSERT INTO boxes
+            (frame_index, box_index, bbox_left, bbox_top, bbox_right, bbox_bottom, text)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(frame_index, box_index) DO NOTHING
+        """
+        self._pending: list[tuple] = []
+
+        self._stack = ExitStack()
+        self._ocr_conn = self._stack.enter_context(bulk_write_connection(ocr_db_path))
+        self._layout_conn = (
+            self._stack.enter_context(bulk_write_connection(layout_db_path))
+            if layout_db_path is not None
+            else None
+        )
+
+    def write(self, ocr_results: Iterable[OCRResult]) -> None:
+        """Queue OCR results, flushing whenever a full batch is pending.
+
+        Args:
+            ocr_results: OCRResult objects (or ocrmac-style dictionaries)
+        """
+        for ocr_result in ocr_results:
+            self._pending.extend(ocr_result_rows(ocr_result))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Insert pending rows into both databases."""
+        if not self._pending:
+            return
+
+        changes_before = self._ocr_conn.total_changes
+        with self._ocr_conn:
+            self._ocr_conn.executemany(self._ocr_sql, self._pending)
+        self.total_boxes += self._ocr_conn.total_changes - changes_before
+
+        if self._layout_conn is not None:
+            # Transform coordinates: x,y,width,height → left,top,right,bottom
+            with self._layout_conn:
+                self._layout_conn.executemany(
+                    self._layout_sql,
+                    (
+                        (frame_index, box_index, x, y + height, x + width, y, text)
+                        for frame_index, box_index, text, _, x, y, width, height in (
+                            self._pending
+                        )
+                    ),
+                )
+
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Flush remaining rows and close both connections."""
+        try:
+            self.flush()
+        finally:
+            self._stack.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def gzip_file(
+    src_path: Path, dst_path: Path, chunk_size: int = 1024 * 1024
+) -> tuple[int, int]:
+    """Gzip a file in fixed-size chunks.
+
+    Args:
+        src_path: File to compress
+        dst_path: Output .gz path
+        chunk_size: Bytes read per chunk (default: 1 MiB)
+
+    Returns:
+        Tuple of (original_size, compressed_size) in bytes
+    """
+    with open(src_path, "rb") as f_in, gzip.open(dst_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, chunk_size)
+    return src_path.stat().st_size, dst_path.stat().st_size
+
+
 def load_ocr_annotations_from_database(db_path: Path) -> list[dict]:
     """Load OCR annotations from full_frame_ocr table.
 
@@ -248,29 +248,32 @@ def extract_frames_and_ocr_impl(
         upload_thread = threading.Thread(target=upload_frames_background, daemon=False)
         upload_thread.start()
 
-        # Step 4: Process OCR in main thread
+        # Step 4: Process OCR in main thread, streaming results into both databases
         print("[4/7] Processing frames with OCR...")
         db_path = tmp_path / "fullOCR.db"
+        layout_db_path = tmp_path / "layout.db"
 
+        from extract_full_frames_and_ocr.database import create_layout_db, gzip_file
         from extract_full_frames_and_ocr.pipeline import process_frames_with_ocr_only
 
+        create_layout_db(layout_db_path, video_info["width"], video_info["height"])
+
         ocr_start = time.time()
         total_boxes, failed_ocr_count = process_frames_with_ocr_only(
             jpeg_frames=jpeg_frames,
             db_path=db_path,
             rate_hz=rate_hz,
             language=language,
+            layout_db_path=layout_db_path,
         )
         print(f"  OCR processing complete in {time.time() - ocr_start:.2f}s")
         print(f"  Detected {total_boxes} OCR boxes ({failed_ocr_count} failed)\n")
 
-        # Step 5: Create layout.db with boxes table (client-facing)
-        print("[5/7] Creating layout.db for client...")
-        layout_db_path = tmp_path / "layout.db"
-
+        # Step 5: layout.db (client-facing) was filled alongside fullOCR.db
+        print("[5/7] Finalizing layout.db for client...")
         import sqlite3
 
-        # Get frame count from OCR database
+        # Get frame count from OCR database (index-only scan)
         ocr_conn_temp = sqlite3.connect(str(db_path))
         cursor = ocr_conn_temp.execute(
             "SELECT COUNT(DISTINCT frame_index) FROM full_frame_ocr"
@@ -278,150 +281,15 @@ def extract_frames_and_ocr_impl(
         frame_count = cursor.fetchone()[0]
         ocr_conn_temp.close()
 
-        layout_conn = sqlite3.connect(str(layout_db_path))
-        try:
-            # Create database_metadata table
-            layout_conn.execute(
-                """
-                CREATE TABLE database_metadata (
-                    id INTEGER PRIMARY KEY CHECK(id = 1),
-                    schema_version INTEGER NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-                """
-            )
-            layout_conn.execute(
-                "INSERT INTO database_metadata (id, schema_version, created_at) VALUES (1, 1, datetime('now'))"
-            )
-
-            # Create boxes table (transformed from full_frame_ocr)
-            # DEFAULT values required for CR-SQLite compatibility (v0.16.1+)
-            layout_conn.execute(
-                """
-                CREATE TABLE boxes (
-                    frame_index INTEGER NOT NULL,
-                    box_index INTEGER NOT NULL,
-                    bbox_left REAL NOT NULL DEFAULT 0.0,
-                    bbox_top REAL NOT NULL DEFAULT 0.0,
-                    bbox_right REAL NOT NULL DEFAULT 0.0,
-                    bbox_bottom REAL NOT NULL DEFAULT 0.0,
-                    text TEXT DEFAULT NULL,
-                    label TEXT DEFAULT NULL,
-                    label_updated_at TEXT DEFAULT NULL,
-                    predicted_label TEXT DEFAULT NULL,
-                    predicted_confidence REAL DEFAULT NULL,
-                    PRIMARY KEY (frame_index, box_index)
-                ) WITHOUT ROWID
-                """
-            )
-
-            # Populate boxes table from fullOCR.db
-            ocr_conn = sqlite3.connect(str(db_path))
-            ocr_cursor = ocr_conn.execute(
-                "SELECT frame_index, box_index, text, x, y, width, height FROM full_frame_ocr ORDER BY frame_index, box_index"
-            )
-
-            for row in ocr_cursor:
-                frame_index, box_index, text, x, y, width, height = row
-                # Transform coordinates: x,y,width,height → left,top,right,bottom
-                bbox_left = x
-                bbox_bottom = y
-                bbox_right = x + width
-                bbox_top = y + height
-
-                layout_conn.execute(
-                    """
-                    INSERT INTO boxes (frame_index, box_index, bbox_left, bbox_top, bbox_right, bbox_bottom, text)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        frame_index,
-                        box_index,
-                        bbox_left,
-                        bbox_top,
-                        bbox_right,
-                        bbox_bottom,
-                        text,
-                    ),
-                )
-
-            ocr_conn.close()
-
-            # Create layout_config table
-            # DEFAULT values required for CR-SQLite compatibility (v0.16.1+)
-            # Schema must match client expectations in database-queries.ts
-            layout_conn.execute(
-                """
-                CREATE TABLE layout_config (
-                    id INTEGER NOT NULL PRIMARY KEY CHECK(id = 1),
-                    frame_width INTEGER NOT NULL DEFAULT 0,
-                    frame_height INTEGER NOT NULL DEFAULT 0,
-                    crop_left REAL NOT NULL DEFAULT 0,
-                    crop_top REAL NOT NULL DEFAULT 0,
-                    crop_right REAL NOT NULL DEFAULT 1,
-                    crop_bottom REAL NOT NULL DEFAULT 1,
-                    selection_left REAL DEFAULT NULL,
-                    selection_top REAL DEFAULT NULL,
-                    selection_right REAL DEFAULT NULL,
-                    selection_bottom REAL DEFAULT NULL,
-                    vertical_center REAL DEFAULT NULL,
-                    vertical_std REAL DEFAULT NULL,
-                    box_height INTEGER DEFAULT NULL,
-                    box_height_std REAL DEFAULT NULL,
-                    anchor_type TEXT DEFAULT NULL,
-                    anchor_position REAL DEFAULT NULL,
-                    top_edge_std REAL DEFAULT NULL,
-                    bottom_edge_std REAL DEFAULT NULL,
-                    horizontal_std_slope REAL DEFAULT NULL,
-                    horizontal_std_intercept REAL DEFAULT NULL,
-                    crop_region_version INTEGER NOT NULL DEFAULT 0,
-                    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
-                )
-                """
-            )
-
-            # Initialize layout_config with frame dimensions
-            layout_conn.execute(
-                """
-                INSERT INTO layout_config (id, frame_width, frame_height, crop_left, crop_top, crop_right, crop_bottom)
-                VALUES (1, ?, ?, 0, 0, 1, 1)
-                """,
-                (video_info["width"], video_info["height"]),
-            )
-
-            # Create preferences table
-            layout_conn.execute(
-                """
-                CREATE TABLE preferences (
-                    id INTEGER NOT NULL PRIMARY KEY CHECK(id = 1),
-                    layout_approved INTEGER NOT NULL DEFAULT 0
-                )
-                """
-            )
-            layout_conn.execute(
-                "INSERT INTO preferences (id, layout_approved) VALUES (1, 0)"
-            )
-
-            layout_conn.commit()
-        finally:
-            layout_conn.close()
-
         print(f"  Created layout.db with {total_boxes} boxes\n")
 
         # Step 6: Compress and upload raw-ocr.db.gz to Wasabi (server-only)
         print("[6/7] Compressing and uploading raw-ocr.db.gz to Wasabi (server)...")
         ocr_upload_start = time.time()
 
-        # Compress the database
-        import gzip
-
+        # Compress the database in fixed-size chunks
         ocr_db_gz_path = tmp_path / "raw-ocr.db.gz"
-        with open(db_path, "rb") as f_in:
-            with gzip.open(ocr_db_gz_path, "wb") as f_out:
-                f_out.writelines(f_in)
-
-        ocr_original_size = db_path.stat().st_size
-        ocr_compressed_size = ocr_db_gz_path.stat().st_size
+        ocr_original_size, ocr_compressed_size = gzip_file(db_path, ocr_db_gz_path)
         ocr_ratio = (1 - ocr_compressed_size / ocr_original_size) * 100
         print(
             f"  Compressed {ocr_original_size:,} -> {ocr_compressed_size:,} bytes ({ocr_ratio:.1f}% reduction)"
@@ -441,16 +309,9 @@ def extract_frames_and_ocr_impl(
         print("[7/7] Compressing and uploading layout.db.gz to Wasabi (client)...")
         layout_upload_start = time.time()
 
-        # Compress the database
-        import gzip
-
+        # Compress the database in fixed-size chunks
         layout_db_gz_path = tmp_path / "layout.db.gz"
-        with open(layout_db_path, "rb") as f_in:
-            with gzip.open(layout_db_gz_path, "wb") as f_out:
-                f_out.writelines(f_in)
-
-        original_size = layout_db_path.stat().st_size
-        compressed_size = layout_db_gz_path.stat().st_size
+        original_size, compressed_size = gzip_file(layout_db_path, layout_db_gz_path)
         ratio = (1 - compressed_size / original_size) * 100
         print(
             f"  Compressed {original_size:,} -> {compressed_size:,} bytes ({ratio:.1f}% reduction)"
@@ -13,9 +13,11 @@ from ocr import (
     ensure_ocr_table,
     get_backend,
     process_frames_with_ocr,
-    write_ocr_result_to_database,
+    write_ocr_results_bulk,
 )
 
+from .database import OCRDatabaseWriter
+
 
 def process_video_with_gpu_and_ocr(
     video_path: Path,
@@ -130,55 +132,17 @@ def process_video_with_gpu_and_ocr(
     print("\n[DB] Ensuring OCR table exists...")
     ensure_ocr_table(db_path, table_name="full_frame_ocr")
 
-    # Step 6: Convert OCRResults to database format and write
+    # Step 6: Write OCRResults to database in bulk (one connection, batched transactions)
     print("[DB] Writing OCR results to database...")
-    total_boxes = 0
-
-    # Derive framework name from backend class (e.g., GoogleVisionBackend -> google_vision)
-    backend_name = backend.__class__.__name__
-    framework_name = backend_name.replace("Backend", "").lower()
-    if framework_name == "livetext":
-        framework_name = "livetext"
-    elif framework_name == "googlevision":
-        framework_name = "google_vision"
-
-    for ocr_result in ocr_results:
-        # Convert OCRResult to database format
-        # Frame ID format: "frame_0000000100" -> extract the numeric index
-        frame_index = int(ocr_result.id.split("_")[1])
-
-        # Build annotations list: [[text, confidence, [x, y, width, height]], ...]
-        annotations = []
-        for char in ocr_result.characters:
-            annotations.append(
-                [
-                    char.text,
-                    1.0,  # Confidence placeholder
-                    [
-                        char.bbox.x,
-                        char.bbox.y,
-                        char.bbox.width,
-                        char.bbox.height,
-                    ],
-                ]
-            )
-
-        # Create database record format
-        db_record = {
-            "image_path": f"frames/{ocr_result.id}.jpg",
-            "framework": framework_name,
-            "annotations": annotations,
-        }
-
-        # Write to database
-        boxes_inserted = write_ocr_result_to_database(
-            ocr_result=db_record,
-            db_path=db_path,
-            table_name="full_frame_ocr",
-        )
-        total_boxes += boxes_inserted
+    write_stats = write_ocr_results_bulk(
+        ocr_results, db_path=db_path, table_name="full_frame_ocr"
+    )
+    total_boxes = write_stats.rows
 
-    print(f"[DB] Wrote {total_boxes} total OCR boxes to database")
+    print(
+        f"[DB] Wrote {total_boxes} total OCR boxes to database "
+        f"in {write_stats.seconds:.2f}s ({write_stats.rows_per_sec:,.0f} rows/sec)"
+    )
     print(
         f"\n[Pipeline] Complete! Processed {len(frames)} frames with {total_boxes} text boxes ({failed_ocr_count} failed)"
     )
@@ -191,17 +155,23 @@ def process_frames_with_ocr_only(
     db_path: Path,
     rate_hz: float = 0.1,
     language: str = "zh-Hans",
+    layout_db_path: Path | None = None,
 ) -> tuple[int, int]:
     """Process already-extracted frames with OCR only.
 
     Use this when frames have already been extracted and you only need OCR processing.
     This is useful for parallel processing where frames are uploaded while OCR runs.
 
+    OCR results are written as each montage batch completes, so results are
+    never accumulated in memory.
+
     Args:
         jpeg_frames: List of JPEG byte arrays
         db_path: Path for output database
         rate_hz: Frame extraction rate used (for frame index calculation)
         language: OCR language hint (default: "zh-Hans")
+        layout_db_path: Optional layout.db (created with create_layout_db) whose
+            boxes table is filled from the same OCR results
 
     Returns:
         Tuple of (total_ocr_boxes, failed_ocr_count)
@@ -218,52 +188,20 @@ def process_frames_with_ocr_only(
         frame_id = f"frame_{frame_index:010d}"
         frames.append((frame_id, jpeg_bytes))
 
-    # Process frames with OCR
-    ocr_results, failed_ocr_count = process_frames_with_ocr(
-        frames=frames,
-        backend=backend,
-        language=language,
-    )
-    print(f"[OCR] Received {len(ocr_results)} OCR results ({failed_ocr_count} failed)")
-
     # Ensure database table exists
     ensure_ocr_table(db_path, table_name="full_frame_ocr")
 
-    # Derive framework name from backend class
-    backend_name = backend.__class__.__name__
-    framework_name = backend_name.replace("Backend", "").lower()
-    if framework_name == "livetext":
-        framework_name = "livetext"
-    elif framework_name == "googlevision":
-        framework_name = "google_vision"
-
-    # Write OCR results to database
-    total_boxes = 0
-    for ocr_result in ocr_results:
-        frame_index = int(ocr_result.id.split("_")[1])
-
-        annotations = []
-        for char in ocr_result.characters:
-            annotations.append(
-                [
-                    char.text,
-                    1.0,
-                    [char.bbox.x, char.bbox.y, char.bbox.width, char.bbox.height],
-                ]
-            )
-
-        db_record = {
-            "image_path": f"frames/{ocr_result.id}.jpg",
-            "framework": framework_name,
-            "annotations": annotations,
-        }
-
-        boxes_inserted = write_ocr_result_to_database(
-            ocr_result=db_record,
-            db_path=db_path,
-            table_name="full_frame_ocr",
+    # Process frames with OCR, streaming each batch of results to the databases
+    with OCRDatabaseWriter(db_path, layout_db_path=layout_db_path) as writer:
+        _, failed_ocr_count = process_frames_with_ocr(
+            frames=frames,
+            backend=backend,
+            language=language,
+            on_results=writer.write,
         )
-        total_boxes += boxes_inserted
+    total_boxes = writer.total_boxes
 
-    print(f"[OCR] Wrote {total_boxes} total OCR boxes to database")
+    print(
+        f"[OCR] Wrote {total_boxes} total OCR boxes to database ({failed_ocr_count} failed)"
+    )
     return total_boxes, failed_ocr_count
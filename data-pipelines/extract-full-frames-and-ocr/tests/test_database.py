@@ -0,0 +1,98 @@
+"""Tests for streaming OCR writes into fullOCR.db and layout.db."""
+
+import gzip
+import sqlite3
+
+import pytest
+from ocr import BoundingBox, CharacterResult, OCRResult, ensure_ocr_table
+
+from extract_full_frames_and_ocr.database import (
+    OCRDatabaseWriter,
+    create_layout_db,
+    gzip_file,
+)
+
+
+def make_result(frame_index: int, num_boxes: int) -> OCRResult:
+    """OCR result with num_boxes characters in a row."""
+    characters = [
+        CharacterResult(text="字", bbox=BoundingBox(x=10 * i, y=5, width=8, height=12))
+        for i in range(num_boxes)
+    ]
+    return OCRResult(
+        id=f"frame_{frame_index:010d}",
+        characters=characters,
+        text="字" * num_boxes,
+        char_count=num_boxes,
+    )
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Empty fullOCR.db and layout.db."""
+    db_path = tmp_path / "fullOCR.db"
+    layout_db_path = tmp_path / "layout.db"
+    ensure_ocr_table(db_path, table_name="full_frame_ocr")
+    create_layout_db(layout_db_path, frame_width=1920, frame_height=1080)
+    return db_path, layout_db_path
+
+
+@pytest.mark.unit
+class TestOCRDatabaseWriter:
+    """Test fan-out of OCR results to both databases."""
+
+    def test_writes_both_databases(self, databases):
+        """Boxes land in both databases with layout coordinates transformed."""
+        db_path, layout_db_path = databases
+
+        with OCRDatabaseWriter(db_path, layout_db_path, batch_size=7) as writer:
+            writer.write([make_result(0, 3), make_result(100, 0)])
+            writer.write([make_result(200, 5)])
+
+        assert writer.total_boxes == 8
+        ocr_rows = sqlite3.connect(db_path).execute(
+            "SELECT frame_index, box_index, text, x, y, width, height "
+            "FROM full_frame_ocr ORDER BY frame_index, box_index"
+        )
+        layout_rows = sqlite3.connect(layout_db_path).execute(
+            "SELECT frame_index, box_index, text, bbox_left, bbox_bottom, "
+            "bbox_right - bbox_left, bbox_top - bbox_bottom "
+            "FROM boxes ORDER BY frame_index, box_index"
+        )
+        assert ocr_rows.fetchall() == layout_rows.fetchall()
+
+    def test_duplicates_are_not_counted(self, databases):
+        """Re-writing a frame leaves existing boxes alone."""
+        db_path, layout_db_path = databases
+
+        with OCRDatabaseWriter(db_path, layout_db_path) as writer:
+            writer.write([make_result(0, 4)])
+            writer.write([make_result(0, 4)])
+
+        assert writer.total_boxes == 4
+
+    def test_journal_mode_restored(self, databases):
+        """Shipped databases keep their rollback journal mode."""
+        db_path, layout_db_path = databases
+
+        with OCRDatabaseWriter(db_path, layout_db_path) as writer:
+            writer.write([make_result(0, 2)])
+
+        for path in databases:
+            mode = sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()
+            assert mode[0] == "delete"
+            assert not path.with_name(path.name + "-wal").exists()
+
+
+@pytest.mark.unit
+def test_gzip_file_round_trip(tmp_path):
+    """gzip_file compresses in chunks and reports sizes."""
+    src = tmp_path / "data.bin"
+    src.write_bytes(b"caption " * 100_000)
+    dst = tmp_path / "data.bin.gz"
+
+    original_size, compressed_size = gzip_file(src, dst, chunk_size=4096)
+
+    assert original_size == 800_000
+    assert compressed_size == dst.stat().st_size < original_size
+    assert gzip.decompress(dst.read_bytes()) == src.read_bytes()
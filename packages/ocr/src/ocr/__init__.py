@@ -22,7 +22,7 @@ Environment variables:
 
 import os
 
-from .backends import OCRBackend
+from .backends import OCRBackend, OCRThrottledError
 from .batch import calculate_even_batch_size, calculate_max_batch_size
 
 # Optional backend imports - these may not be available in all environments
@@ -82,12 +82,19 @@ def get_backend(backend_name: str | None = None) -> OCRBackend:
         raise ValueError(
             f"Unknown backend: {backend_name}. Available: 'livetext', 'google_vision'"
         )
+
+
 from .database import (
+    BulkWriteStats,
+    bulk_write_connection,
     ensure_ocr_table,
     load_ocr_for_frame,
     load_ocr_for_frame_range,
+    ocr_result_rows,
     write_ocr_result_to_database,
+    write_ocr_results_bulk,
 )
+from .executor import MontageOCRStats, PipelinedMontageOCR
 from .models import BoundingBox, CharacterResult, OCRResult
 from .montage import create_vertical_montage, distribute_results_to_images
 from .processing import process_frames_with_ocr
@@ -100,11 +107,14 @@ __all__ = [
     "CharacterResult",
     # Backends
     "OCRBackend",
+    "OCRThrottledError",
     "GoogleVisionBackend",
     "LiveTextBackend",
     "get_backend",
     # Processing
     "process_frames_with_ocr",
+    "PipelinedMontageOCR",
+    "MontageOCRStats",
     "calculate_max_batch_size",
     "calculate_even_batch_size",
     # Montage
@@ -113,6 +123,10 @@ __all__ = [
     # Database
     "ensure_ocr_table",
     "write_ocr_result_to_database",
+    "write_ocr_results_bulk",
+    "ocr_result_rows",
+    "BulkWriteStats",
+    "bulk_write_connection",
     "load_ocr_for_frame",
     "load_ocr_for_frame_range",
     # Visualization
@@ -1,5 +1,5 @@
 """OCR backend implementations."""
 
-from .base import OCRBackend
+from .base import OCRBackend, OCRThrottledError
 
-__all__ = ["OCRBackend"]
+__all__ = ["OCRBackend", "OCRThrottledError"]
@@ -5,6 +5,10 @@ from abc import ABC, abstractmethod
 from ..models import OCRResult
 
 
+class OCRThrottledError(RuntimeError):
+    """Raised by backends when the service asks the client to slow down (e.g. HTTP 429)."""
+
+
 class OCRBackend(ABC):
     """Abstract base class for OCR backends. Backends process SINGLE images only."""
 
@@ -12,7 +16,8 @@ class OCRBackend(ABC):
     def get_constraints(self) -> dict:
         """Return backend constraints for batch size calculation.
 
-        Returns dict with keys like: max_image_height, max_image_width, max_file_size_bytes
+        Returns dict with keys like: max_image_height, max_image_width, max_file_size_bytes,
+        and optionally max_concurrent_requests (default 1)
         """
         ...
 
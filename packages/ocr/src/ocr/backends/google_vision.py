@@ -3,11 +3,15 @@
 import json
 import os
 
+from google.api_core import exceptions as google_exceptions
 from google.cloud import vision
 from google.oauth2 import service_account
 
 from ..models import BoundingBox, CharacterResult, OCRResult
-from .base import OCRBackend
+from .base import OCRBackend, OCRThrottledError
+
+# google.rpc.Code for quota and rate limit errors
+RESOURCE_EXHAUSTED = 8
 
 
 class GoogleVisionBackend(OCRBackend):
@@ -28,6 +32,7 @@ class GoogleVisionBackend(OCRBackend):
             "max_image_height": 50000,  # HEIGHT_LIMIT_PX
             "max_total_pixels": 50000000,  # PIXEL_LIMIT
             "max_file_size_bytes": 15 * 1024 * 1024,  # FILE_SIZE_LIMIT_MB
+            "max_concurrent_requests": 8,  # gRPC client is thread-safe
         }
 
     def process_single(self, image_bytes: bytes, language: str) -> OCRResult:
@@ -45,12 +50,22 @@ class GoogleVisionBackend(OCRBackend):
 
         # Call Google Vision API with language hints
         image_context = {"language_hints": [language]}
-        response = self.client.document_text_detection(
-            image=image, image_context=image_context
-        )
+        try:
+            response = self.client.document_text_detection(
+                image=image, image_context=image_context
+            )
+        except (
+            google_exceptions.ResourceExhausted,
+            google_exceptions.TooManyRequests,
+        ) as e:
+            raise OCRThrottledError(f"Google Vision API throttled: {e}") from e
 
         # Check for errors
         if response.error.message:
+            if response.error.code == RESOURCE_EXHAUSTED:
+                raise OCRThrottledError(
+                    f"Google Vision API throttled: {response.error.message}"
+                )
             raise RuntimeError(f"Google Vision API error: {response.error.message}")
 
         # Parse symbols (characters) from response
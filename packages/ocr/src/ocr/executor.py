@@ -0,0 +1,252 @@
+"""Pipelined montage OCR with an adaptive number of requests in flight.
+
+Montage OCR used to be strictly sequential: build a montage, wait for the
+backend, distribute the results, then build the next montage. The executor
+below builds montage N+1 while N (and up to a window of others) is being
+recognized, so wall time approaches the time spent building montages.
+
+The window follows AIMD: it grows by one after a window's worth of
+successful requests and halves when the backend throttles (at most once per
+round trip). Throttled montages are retried with exponential backoff.
+Results are handed back in batch order regardless of completion order.
+"""
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from .backends.base import OCRBackend, OCRThrottledError
+from .models import OCRResult
+from .montage import (
+    MONTAGE_FORMAT,
+    MONTAGE_QUALITY,
+    create_vertical_montage,
+    distribute_results_to_images,
+)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Check whether a backend error means "slow down" (HTTP 429 or equivalent)."""
+    if isinstance(error, OCRThrottledError):
+        return True
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return status == 429
+
+
+@dataclass
+class _Montage:
+    """A batch of frames and its montage, kept for retries."""
+
+    index: int
+    frames: list[tuple[str, bytes]]
+    montage_bytes: bytes
+    metadata: list[dict]
+    attempt: int = 0
+    submitted_at: float = 0.0
+
+
+@dataclass
+class MontageOCRStats:
+    """Counters from one executor run."""
+
+    requests: int = 0
+    throttled: int = 0
+    failed_frames: int = 0
+    peak_in_flight: int = 0
+    window_history: list[int] = field(default_factory=list)
+
+
+class PipelinedMontageOCR:
+    """Run montage OCR with several backend requests outstanding.
+
+    Example:
+        >>> executor = PipelinedMontageOCR(backend, max_in_flight=8)
+        >>> failed = executor.run(batches, on_results=writer.write)
+    """
+
+    def __init__(
+        self,
+        backend: OCRBackend,
+        language: str = "zh-Hans",
+        max_in_flight: int = 4,
+        min_in_flight: int = 1,
+        max_throttle_retries: int = 5,
+        throttle_backoff_seconds: float = 1.0,
+        montage_format: str = MONTAGE_FORMAT,
+        montage_quality: int = MONTAGE_QUALITY,
+    ):
+        """
+        Args:
+            backend: OCR backend; process_single must be safe to call from
+                several threads when max_in_flight > 1
+            language: Language hint for OCR
+            max_in_flight: Upper bound (and starting size) of the request window
+            min_in_flight: Lower bound the window shrinks to when throttled
+            max_throttle_retries: Retries per montage before its frames fail
+            throttle_backoff_seconds: Delay before the first retry; doubles
+                with each further retry of the same montage
+            montage_format: Image format montages are encoded as
+            montage_quality: Encoder quality for lossy montage formats
+        """
+        if not 1 <= min_in_flight <= max_in_flight:
+            raise ValueError(
+                f"Need 1 <= min_in_flight <= max_in_flight, "
+                f"got {min_in_flight} and {max_in_flight}"
+            )
+        self.backend = backend
+        self.language = language
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.max_throttle_retries = max_throttle_retries
+        self.throttle_backoff_seconds = throttle_backoff_seconds
+        self.montage_format = montage_format
+        self.montage_quality = montage_quality
+        # Bounds results held back while an earlier batch is still in flight
+        self.max_reordered = 4 * max_in_flight
+        self.stats = MontageOCRStats()
+
+    def _recognize(self, montage: _Montage) -> list[OCRResult]:
+        """Send one montage to the backend (called in a worker thread)."""
+        result = self.backend.process_single(montage.montage_bytes, self.language)
+        return distribute_results_to_images(result, montage.metadata)
+
+    def run(
+        self,
+        batches: Iterable[list[tuple[str, bytes]]],
+        on_results: Callable[[list[OCRResult]], None],
+    ) -> int:
+        """OCR every batch, passing each batch's results to on_results in order.
+
+        Args:
+            batches: Batches of (frame_id, image_bytes), one montage each
+            on_results: Receives each batch's results, in batch order
+
+        Returns:
+            Number of frames that failed OCR (they get empty results)
+        """
+        self.stats = MontageOCRStats()
+        pending_batches: Iterator[tuple[int, list[tuple[str, bytes]]]] = iter(
+            enumerate(batches)
+        )
+        exhausted = False
+        # Throttled montages waiting for their backoff, as (retry_at, seq, montage)
+        retries: list[tuple[float, int, _Montage]] = []
+        retry_seq = itertools.count()
+        in_flight: dict[Future, _Montage] = {}
+        finished: dict[int, list[OCRResult]] = {}
+        next_to_emit = 0
+
+        window = self.max_in_flight
+        successes_at_window = 0
+        last_decrease = 0.0
+
+        def fail(frames: list[tuple[str, bytes]]) -> list[OCRResult]:
+            self.stats.failed_frames += len(frames)
+            return [
+                OCRResult(id=frame_id, characters=[], text="", char_count=0)
+                for frame_id, _ in frames
+            ]
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="ocr-montage"
+        ) as pool:
+            while True:
+                # Fill the window: due retries first, then build the next montage
+                # (unless too many finished batches are waiting on an earlier one)
+                while len(in_flight) < window:
+                    if retries and retries[0][0] <= time.monotonic():
+                        montage = heapq.heappop(retries)[2]
+                    elif not exhausted and len(finished) < self.max_reordered:
+                        try:
+                            index, frames = next(pending_batches)
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                        try:
+                            montage_bytes, metadata = create_vertical_montage(
+                                frames,
+                                image_format=self.montage_format,
+                                quality=self.montage_quality,
+                            )
+                        except (OSError, ValueError) as e:
+                            print(
+                                f"[OCR] Failed to build montage for batch {index}: {e}"
+                            )
+                            finished[index] = fail(frames)
+                            continue
+                        montage = _Montage(index, frames, montage_bytes, metadata)
+                    else:
+                        break
+
+                    montage.submitted_at = time.monotonic()
+                    in_flight[pool.submit(self._recognize, montage)] = montage
+                    self.stats.requests += 1
+                    self.stats.peak_in_flight = max(
+                        self.stats.peak_in_flight, len(in_flight)
+                    )
+
+                # Hand back every batch that is next in order
+                while next_to_emit in finished:
+                    on_results(finished.pop(next_to_emit))
+                    next_to_emit += 1
+
+                if not in_flight:
+                    if retries:
+                        time.sleep(max(0.0, retries[0][0] - time.monotonic()))
+                        continue
+                    if exhausted:
+                        break
+                    continue
+
+                timeout = None
+                if retries:
+                    timeout = max(0.0, retries[0][0] - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    montage = in_flight.pop(future)
+                    error = future.exception()
+
+                    if error is None:
+                        finished[montage.index] = future.result()
+                        successes_at_window += 1
+                        if successes_at_window >= window:
+                            window = min(self.max_in_flight, window + 1)
+                            successes_at_window = 0
+                            self.stats.window_history.append(window)
+                        continue
+
+                    if not is_throttling_error(error):
+                        print(f"[OCR] Failed to process batch {montage.index}: {error}")
+                        finished[montage.index] = fail(montage.frames)
+                        continue
+
+                    self.stats.throttled += 1
+                    # Halve once per round trip, not once per throttled request
+                    if montage.submitted_at >= last_decrease:
+                        window = max(self.min_in_flight, window // 2)
+                        successes_at_window = 0
+                        last_decrease = time.monotonic()
+                        self.stats.window_history.append(window)
+
+                    if montage.attempt >= self.max_throttle_retries:
+                        print(
+                            f"[OCR] Giving up on batch {montage.index} after "
+                            f"{montage.attempt + 1} throttled attempts: {error}"
+                        )
+                        finished[montage.index] = fail(montage.frames)
+                        continue
+                    retry_at = time.monotonic() + (
+                        self.throttle_backoff_seconds * 2**montage.attempt
+                    )
+                    montage.attempt += 1
+                    heapq.heappush(retries, (retry_at, next(retry_seq), montage))
+
+        while next_to_emit in finished:
+            on_results(finished.pop(next_to_emit))
+            next_to_emit += 1
+
+        return self.stats.failed_frames
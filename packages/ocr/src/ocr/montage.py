@@ -1,23 +1,44 @@
-"""Montage creation and OCR result distribution for batch processing."""
+"""Montage creation and OCR result distribution for batch processing.
+
+Frames are written into one preallocated array, and the montage layout is a
+sorted array of frame start offsets, so characters found in the montage are
+assigned to frames with a binary search instead of testing every frame.
+"""
 
 from io import BytesIO
 
+import numpy as np
 from PIL import Image
 
 from .models import BoundingBox, CharacterResult, OCRResult
 
 SEPARATOR_PX = 2
+SEPARATOR_COLOR = (220, 220, 220)
+MONTAGE_FORMAT = "JPEG"
+MONTAGE_QUALITY = 95
+
+
+def montage_offsets(
+    count: int, height: int, separator_px: int = SEPARATOR_PX
+) -> np.ndarray:
+    """Y offset of each frame in a vertical montage of equally sized frames."""
+    return np.arange(count, dtype=np.int64) * (height + separator_px)
 
 
 def create_vertical_montage(
     images: list[tuple[str, bytes]],
     separator_px: int = SEPARATOR_PX,
+    image_format: str = MONTAGE_FORMAT,
+    quality: int = MONTAGE_QUALITY,
 ) -> tuple[bytes, list[dict]]:
     """Create vertical montage from list of images.
 
     Args:
         images: List of (id, image_bytes) tuples
         separator_px: Pixels between images
+        image_format: Pillow format the montage is encoded as (e.g. "JPEG",
+            "PNG", "WEBP")
+        quality: Encoder quality for lossy formats (ignored by lossless ones)
 
     Returns:
         (montage_bytes, metadata_list)
@@ -34,16 +55,16 @@ def create_vertical_montage(
     width = first_img.width
     height = first_img.height
 
-    # Calculate total height
-    total_height = sum(height for _ in images) + (len(images) - 1) * separator_px
+    offsets = montage_offsets(len(images), height, separator_px)
+    total_height = int(offsets[-1]) + height
 
-    # Create montage with gray separator color
-    montage = Image.new("RGB", (width, total_height), (220, 220, 220))
+    # Preallocate the montage filled with the separator color
+    montage = np.empty((total_height, width, 3), dtype=np.uint8)
+    montage[:] = SEPARATOR_COLOR
 
     metadata: list[dict] = []
-    y_offset = 0
 
-    for img_id, img_data in images:
+    for (img_id, img_data), y_offset in zip(images, offsets.tolist(), strict=True):
         img = Image.open(BytesIO(img_data))
 
         # Verify dimensions match
@@ -53,8 +74,8 @@ def create_vertical_montage(
                 f"don't match expected {width}x{height}"
             )
 
-        # Paste image
-        montage.paste(img, (0, y_offset))
+        # Decode straight into the frame's rows
+        montage[y_offset : y_offset + height] = np.asarray(img.convert("RGB"))
 
         # Store metadata
         metadata.append(
@@ -67,11 +88,9 @@ def create_vertical_montage(
             }
         )
 
-        y_offset += height + separator_px
-
     # Save to bytes
     buffer = BytesIO()
-    montage.save(buffer, format="JPEG", quality=95)
+    Image.fromarray(montage).save(buffer, format=image_format, quality=quality)
 
     return buffer.getvalue(), metadata
 
@@ -83,7 +102,9 @@ def distribute_results_to_images(
     """Distribute OCR results from montage back to individual images.
 
     Takes OCR results from a montage and splits them back to individual
-    images based on character positions and image metadata.
+    images based on character positions and image metadata. Each character
+    goes to the image containing its center; characters centered on a
+    separator are dropped.
 
     Args:
         ocr_result: OCR result from processing the montage
@@ -92,43 +113,58 @@ def distribute_results_to_images(
     Returns:
         List of OCRResult, one per original image
     """
-    results: list[OCRResult] = []
-
-    for img_meta in metadata:
-        img_id = img_meta["id"]
-        img_x = img_meta["x"]
-        img_y = img_meta["y"]
-        img_h = img_meta["height"]
-
-        # Find characters that fall within this image's bounds
-        img_chars: list[CharacterResult] = []
-
-        for char in ocr_result.characters:
-            bbox = char.bbox
-
-            # Check if character center is within image bounds
-            char_center_y = bbox.y + bbox.height / 2
-
-            if img_y <= char_center_y < img_y + img_h:
-                # Transform coordinates to image-relative
-                relative_bbox = BoundingBox(
-                    x=bbox.x - img_x,
-                    y=bbox.y - img_y,
-                    width=bbox.width,
-                    height=bbox.height,
+    image_chars: list[list[CharacterResult]] = [[] for _ in metadata]
+    characters = ocr_result.characters
+
+    if characters and metadata:
+        # Montage layout, sorted by start offset
+        starts = np.array([m["y"] for m in metadata], dtype=np.int64)
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        ends = starts + np.array([metadata[i]["height"] for i in order.tolist()])
+        lefts = np.array([metadata[i]["x"] for i in order.tolist()], dtype=np.int64)
+
+        boxes = np.array(
+            [(c.bbox.x, c.bbox.y, c.bbox.width, c.bbox.height) for c in characters],
+            dtype=np.int64,
+        )
+        centers = boxes[:, 1] + boxes[:, 3] / 2
+
+        # Last image starting at or above each center, if the center is inside it
+        slots = np.searchsorted(starts, centers, side="right") - 1
+        inside = slots >= 0
+        inside[inside] = centers[inside] < ends[slots[inside]]
+
+        # Transform coordinates to image-relative
+        char_idx = np.flatnonzero(inside)
+        slots = slots[char_idx]
+        rel_x = boxes[char_idx, 0] - lefts[slots]
+        rel_y = boxes[char_idx, 1] - starts[slots]
+
+        for i, image_idx, x, y in zip(
+            char_idx.tolist(),
+            order[slots].tolist(),
+            rel_x.tolist(),
+            rel_y.tolist(),
+            strict=True,
+        ):
+            char = characters[i]
+            image_chars[image_idx].append(
+                CharacterResult(
+                    text=char.text,
+                    bbox=BoundingBox(
+                        x=x, y=y, width=char.bbox.width, height=char.bbox.height
+                    ),
                 )
-
-                img_chars.append(CharacterResult(text=char.text, bbox=relative_bbox))
-
-        # Create result for this image
-        text = "".join(c.text for c in img_chars)
-        results.append(
-            OCRResult(
-                id=img_id,
-                characters=img_chars,
-                text=text,
-                char_count=len(img_chars),
             )
-        )
 
-    return results
+    # Create result for each image
+    return [
+        OCRResult(
+            id=img_meta["id"],
+            characters=img_chars,
+            text="".join(c.text for c in img_chars),
+            char_count=len(img_chars),
+        )
+        for img_meta, img_chars in zip(metadata, image_chars, strict=True)
+    ]
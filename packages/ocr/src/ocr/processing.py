@@ -1,39 +1,56 @@
 """High-level OCR processing with automatic batching via montage."""
 
+from collections.abc import Callable
 from io import BytesIO
 
 from PIL import Image
 
 from .backends.base import OCRBackend
 from .batch import calculate_even_batch_size, calculate_max_batch_size
+from .executor import PipelinedMontageOCR
 from .models import OCRResult
-from .montage import create_vertical_montage, distribute_results_to_images
+from .montage import MONTAGE_FORMAT, MONTAGE_QUALITY
 
 
 def process_frames_with_ocr(
     frames: list[tuple[str, bytes]],
     backend: OCRBackend,
     language: str = "zh-Hans",
+    on_results: Callable[[list[OCRResult]], None] | None = None,
+    max_in_flight: int | None = None,
+    montage_format: str = MONTAGE_FORMAT,
+    montage_quality: int = MONTAGE_QUALITY,
 ) -> tuple[list[OCRResult], int]:
     """Process frames with OCR using automatic montage batching.
 
     High-level processing flow:
     1. Calculate max batch size using backend constraints
     2. Calculate even batch size to distribute frames evenly
-    3. For each batch:
+    3. For each batch (pipelined by PipelinedMontageOCR, so the next montage
+       is built while earlier ones are being recognized):
        a. Create montage using create_vertical_montage()
        b. Process montage as single image via backend.process_single()
        c. Distribute results using distribute_results_to_images()
-    4. Return all OCR results
+    4. Return all OCR results, in input order
 
     Args:
         frames: List of (frame_id, image_bytes) tuples
         backend: OCR backend instance (GoogleVisionBackend or LiveTextBackend)
         language: Language hint for OCR (default: "zh-Hans")
+        on_results: Optional callback receiving each batch of results as soon
+            as it is ready. When provided, results are streamed to the
+            callback instead of being accumulated, and the returned list is
+            empty.
+        max_in_flight: Montage requests outstanding at once (default: the
+            backend's max_concurrent_requests constraint, or 1). The window
+            shrinks automatically when the backend throttles.
+        montage_format: Image format montages are encoded as (default: "JPEG")
+        montage_quality: Encoder quality for lossy montage formats (default: 95)
 
     Returns:
         Tuple of (results, failed_count) where:
         - results: List of OCRResult, one per input frame, in same order as input
+          (empty when on_results is provided)
         - failed_count: Number of frames that failed OCR processing
 
     Raises:
@@ -49,25 +66,32 @@ def process_frames_with_ocr(
         try:
             result = backend.process_single(image_bytes, language)
             # Return result with the correct frame ID
-            return [
+            results = [
                 OCRResult(
                     id=frame_id,
                     characters=result.characters,
                     text=result.text,
                     char_count=result.char_count,
                 )
-            ], 0
+            ]
+            failed_count = 0
         except Exception as e:
             print(f"[OCR] Failed to process frame {frame_id}: {e}")
             # Return empty result for failed frame
-            return [
+            results = [
                 OCRResult(
                     id=frame_id,
                     characters=[],
                     text="",
                     char_count=0,
                 )
-            ], 1
+            ]
+            failed_count = 1
+
+        if on_results is not None:
+            on_results(results)
+            return [], failed_count
+        return results, failed_count
 
     # Get frame dimensions from first frame
     first_image = Image.open(BytesIO(frames[0][1]))
@@ -78,37 +102,24 @@ def process_frames_with_ocr(
     max_batch_size = calculate_max_batch_size(frame_width, frame_height, backend)
     even_batch_size = calculate_even_batch_size(len(frames), max_batch_size)
 
-    # Process frames in batches
-    all_results: list[OCRResult] = []
-    failed_count = 0
-
-    for batch_start in range(0, len(frames), even_batch_size):
-        batch_end = min(batch_start + even_batch_size, len(frames))
-        batch_frames = frames[batch_start:batch_end]
-
-        try:
-            # Create montage for this batch
-            montage_bytes, metadata = create_vertical_montage(batch_frames)
-
-            # Process montage with backend
-            montage_result = backend.process_single(montage_bytes, language)
-
-            # Distribute results back to individual images
-            batch_results = distribute_results_to_images(montage_result, metadata)
+    # Process frames in batches, several montages in flight at once
+    if max_in_flight is None:
+        max_in_flight = backend.get_constraints().get("max_concurrent_requests", 1)
+    batches = (
+        frames[batch_start : batch_start + even_batch_size]
+        for batch_start in range(0, len(frames), even_batch_size)
+    )
 
-            all_results.extend(batch_results)
-        except Exception as e:
-            print(f"[OCR] Failed to process batch {batch_start}-{batch_end}: {e}")
-            # Create empty results for all frames in failed batch
-            for frame_id, _ in batch_frames:
-                all_results.append(
-                    OCRResult(
-                        id=frame_id,
-                        characters=[],
-                        text="",
-                        char_count=0,
-                    )
-                )
-            failed_count += len(batch_frames)
+    all_results: list[OCRResult] = []
+    executor = PipelinedMontageOCR(
+        backend,
+        language,
+        max_in_flight=max_in_flight,
+        montage_format=montage_format,
+        montage_quality=montage_quality,
+    )
+    failed_count = executor.run(
+        batches, on_results if on_results is not None else all_results.extend
+    )
 
     return all_results, failed_count
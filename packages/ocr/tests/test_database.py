@@ -0,0 +1,119 @@
+"""Tests for the bulk OCR database writer."""
+
+import sqlite3
+from pathlib import Path
+
+from ocr import (
+    BoundingBox,
+    CharacterResult,
+    OCRResult,
+    bulk_write_connection,
+    ensure_ocr_table,
+    load_ocr_for_frame,
+    write_ocr_results_bulk,
+)
+
+TABLE = "full_frame_ocr"
+
+
+def make_result(frame_index: int, texts: str) -> OCRResult:
+    characters = [
+        CharacterResult(
+            text=text,
+            bbox=BoundingBox(x=10 * i, y=frame_index, width=8, height=12),
+        )
+        for i, text in enumerate(texts)
+    ]
+    return OCRResult(
+        id=f"frame_{frame_index:010d}",
+        characters=characters,
+        text=texts,
+        char_count=len(characters),
+    )
+
+
+def journal_mode(db_path: Path) -> str:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_bulk_write_round_trip(tmp_path):
+    db_path = tmp_path / "captions.db"
+    ensure_ocr_table(db_path, TABLE)
+
+    dict_result = {
+        "image_path": "frames/frame_0000000002.jpg",
+        "annotations": [["z", 0.5, [1, 2, 3, 4]]],
+    }
+    stats = write_ocr_results_bulk(
+        (r for r in [make_result(0, "ab"), make_result(1, "cde"), dict_result]),
+        db_path,
+        TABLE,
+    )
+
+    assert stats.frames == 3
+    assert stats.rows == 6
+    assert load_ocr_for_frame(db_path, 0, TABLE) == [
+        ["a", 1.0, [0, 0, 8, 12]],
+        ["b", 1.0, [10, 0, 8, 12]],
+    ]
+    assert [a[0] for a in load_ocr_for_frame(db_path, 1, TABLE)] == ["c", "d", "e"]
+    assert load_ocr_for_frame(db_path, 2, TABLE) == [["z", 0.5, [1, 2, 3, 4]]]
+
+
+def test_bulk_write_skips_existing_rows(tmp_path):
+    db_path = tmp_path / "captions.db"
+    ensure_ocr_table(db_path, TABLE)
+    write_ocr_results_bulk([make_result(0, "ab")], db_path, TABLE)
+
+    stats = write_ocr_results_bulk(
+        [make_result(0, "ab"), make_result(1, "c")], db_path, TABLE
+    )
+
+    assert stats.frames == 2
+    assert stats.rows == 1
+    assert len(load_ocr_for_frame(db_path, 0, TABLE)) == 2
+
+
+def test_bulk_write_commits_in_batches(tmp_path):
+    db_path = tmp_path / "captions.db"
+    ensure_ocr_table(db_path, TABLE)
+    results = [make_result(i, "abc") for i in range(10)]
+
+    stats = write_ocr_results_bulk(results, db_path, TABLE, batch_size=4)
+
+    assert stats.rows == 30
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0] == 30
+    finally:
+        conn.close()
+
+
+def test_bulk_write_restores_journal_mode(tmp_path):
+    db_path = tmp_path / "captions.db"
+    ensure_ocr_table(db_path, TABLE)
+    assert journal_mode(db_path) == "delete"
+
+    with bulk_write_connection(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert journal_mode(db_path) == "delete"
+
+    write_ocr_results_bulk([make_result(0, "ab")], db_path, TABLE)
+    assert journal_mode(db_path) == "delete"
+    assert not (tmp_path / "captions.db-wal").exists()
+
+
+def test_bulk_write_keeps_wal_databases_in_wal(tmp_path):
+    db_path = tmp_path / "captions.db"
+    ensure_ocr_table(db_path, TABLE)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+
+    write_ocr_results_bulk([make_result(0, "ab")], db_path, TABLE)
+
+    assert journal_mode(db_path) == "wal"
@@ -0,0 +1,212 @@
+"""Tests for pipelined montage OCR against a local fake backend."""
+
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from ocr import (
+    BoundingBox,
+    CharacterResult,
+    OCRBackend,
+    OCRResult,
+    OCRThrottledError,
+    PipelinedMontageOCR,
+    process_frames_with_ocr,
+)
+from ocr.montage import SEPARATOR_PX
+
+FRAME_WIDTH = 16
+FRAME_HEIGHT = 8
+
+
+def make_frame(i: int) -> tuple[str, bytes]:
+    """A solid gray frame whose shade identifies it (i % 26)."""
+    image = Image.new("RGB", (FRAME_WIDTH, FRAME_HEIGHT), ((i % 26) * 10,) * 3)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return f"frame-{i}", buffer.getvalue()
+
+
+def expected_text(i: int) -> str:
+    return str(i % 26)
+
+
+class FakeBackend(OCRBackend):
+    """Reads one "character" per frame from its shade, with latency and throttling.
+
+    Requests beyond ``quota`` concurrent ones get OCRThrottledError, like a
+    service answering 429; ``fail_calls`` lists call numbers that raise a
+    plain error.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        quota: int | None = None,
+        fail_calls: set[int] | None = None,
+        max_concurrent_requests: int = 1,
+    ):
+        self.latency = latency
+        self.quota = quota
+        self.fail_calls = fail_calls or set()
+        self.max_concurrent_requests = max_concurrent_requests
+        self.calls = 0
+        self.active = 0
+        self.peak_active = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def get_constraints(self) -> dict:
+        return {
+            "max_image_height": 50000,
+            "max_concurrent_requests": self.max_concurrent_requests,
+        }
+
+    def process_single(self, image_bytes: bytes, language: str) -> OCRResult:
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            over_quota = self.quota is not None and self.active > self.quota
+            if over_quota:
+                self.throttled += 1
+        try:
+            time.sleep(self.latency)
+            if over_quota:
+                raise OCRThrottledError("429 Too Many Requests")
+            if call in self.fail_calls:
+                raise RuntimeError("backend unavailable")
+
+            montage = Image.open(BytesIO(image_bytes)).convert("L")
+            characters = []
+            for y in range(0, montage.height, FRAME_HEIGHT + SEPARATOR_PX):
+                shade = montage.getpixel((FRAME_WIDTH // 2, y + FRAME_HEIGHT // 2))
+                characters.append(
+                    CharacterResult(
+                        text=str(round(shade / 10)),
+                        bbox=BoundingBox(x=2, y=y + 2, width=4, height=4),
+                    )
+                )
+            return OCRResult(
+                id="montage",
+                characters=characters,
+                text="".join(c.text for c in characters),
+                char_count=len(characters),
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_batches(num_frames: int, batch_size: int) -> list[list[tuple[str, bytes]]]:
+    frames = [make_frame(i) for i in range(num_frames)]
+    return [frames[i : i + batch_size] for i in range(0, num_frames, batch_size)]
+
+
+def run(executor: PipelinedMontageOCR, batches) -> tuple[list[OCRResult], int]:
+    results: list[OCRResult] = []
+    failed = executor.run(batches, results.extend)
+    return results, failed
+
+
+class TestPipelinedMontageOCR:
+    """Test ordering, overlap and throttling of the executor."""
+
+    def test_results_are_in_batch_order(self):
+        """Batches finishing out of order are still handed back in order."""
+        backend = FakeBackend(latency=0.01)
+        latencies = iter([0.08, 0.0, 0.04, 0.0, 0.02, 0.0] * 5)
+
+        def uneven_process(image_bytes, language):
+            time.sleep(next(latencies))
+            return FakeBackend.process_single(backend, image_bytes, language)
+
+        backend.process_single = uneven_process
+        results, failed = run(
+            PipelinedMontageOCR(backend, max_in_flight=4), make_batches(60, 2)
+        )
+
+        assert failed == 0
+        assert [r.id for r in results] == [f"frame-{i}" for i in range(60)]
+        assert [r.text for r in results] == [expected_text(i) for i in range(60)]
+
+    def test_round_trips_overlap(self):
+        """With a window of 4, wall time is about a quarter of the round trips."""
+        backend = FakeBackend(latency=0.05)
+        executor = PipelinedMontageOCR(backend, max_in_flight=4)
+
+        start = time.perf_counter()
+        results, _ = run(executor, make_batches(48, 4))
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 48
+        assert backend.peak_active == 4
+        assert elapsed < 12 * 0.05 / 2
+
+    def test_throttling_shrinks_window_and_retries(self):
+        """429s halve the window; throttled montages are retried, none fail."""
+        backend = FakeBackend(latency=0.02, quota=2)
+        executor = PipelinedMontageOCR(
+            backend, max_in_flight=8, throttle_backoff_seconds=0.01
+        )
+
+        results, failed = run(executor, make_batches(80, 4))
+
+        assert failed == 0
+        assert [r.text for r in results] == [expected_text(i) for i in range(80)]
+        assert executor.stats.throttled == backend.throttled > 0
+        assert min(executor.stats.window_history) <= 2
+        assert executor.stats.requests == 20 + executor.stats.throttled
+
+    def test_persistent_throttling_fails_batch(self):
+        backend = FakeBackend(quota=0)
+        executor = PipelinedMontageOCR(
+            backend, max_throttle_retries=2, throttle_backoff_seconds=0.001
+        )
+
+        results, failed = run(executor, make_batches(6, 3))
+
+        assert failed == 6
+        assert backend.calls == 2 * 3
+        assert [r.id for r in results] == [f"frame-{i}" for i in range(6)]
+        assert all(r.char_count == 0 for r in results)
+
+    def test_other_errors_fail_only_that_batch(self):
+        backend = FakeBackend(fail_calls={2})
+        results, failed = run(PipelinedMontageOCR(backend), make_batches(9, 3))
+
+        assert failed == 3
+        assert [r.char_count for r in results] == [1, 1, 1, 0, 0, 0, 1, 1, 1]
+
+    def test_unreadable_frames_fail_only_that_batch(self):
+        backend = FakeBackend()
+        batches = make_batches(6, 3)
+        batches[0][1] = ("frame-1", b"not an image")
+
+        results, failed = run(PipelinedMontageOCR(backend), batches)
+
+        assert failed == 3
+        assert backend.calls == 1
+        assert [r.char_count for r in results] == [0, 0, 0, 1, 1, 1]
+
+    def test_rejects_invalid_window(self):
+        with pytest.raises(ValueError):
+            PipelinedMontageOCR(FakeBackend(), max_in_flight=2, min_in_flight=3)
+
+
+def test_process_frames_uses_backend_concurrency():
+    """process_frames_with_ocr keeps max_concurrent_requests montages in flight."""
+    backend = FakeBackend(latency=0.02, max_concurrent_requests=3)
+    frames = [make_frame(i) for i in range(30)]
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("ocr.processing.calculate_max_batch_size", lambda *args: 3)
+        results, failed = process_frames_with_ocr(frames, backend)
+
+    assert failed == 0
+    assert [r.text for r in results] == [expected_text(i) for i in range(30)]
+    assert backend.peak_active == 3
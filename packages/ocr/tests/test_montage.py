@@ -0,0 +1,205 @@
+"""Tests for array-based montage assembly and bisect-based result distribution."""
+
+import random
+import time
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ocr import (
+    BoundingBox,
+    CharacterResult,
+    OCRResult,
+    create_vertical_montage,
+    distribute_results_to_images,
+)
+from ocr.montage import SEPARATOR_COLOR, SEPARATOR_PX, montage_offsets
+
+
+def make_frames(count: int, size: tuple[int, int] = (24, 10), fmt: str = "PNG"):
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+        buffer = BytesIO()
+        Image.fromarray(pixels).save(buffer, format=fmt)
+        frames.append((f"frame-{i}", buffer.getvalue()))
+    return frames
+
+
+def paste_montage(images, separator_px: int = SEPARATOR_PX) -> np.ndarray:
+    """The montage as built by pasting each frame into a PIL canvas."""
+    first = Image.open(BytesIO(images[0][1]))
+    total = len(images) * first.height + (len(images) - 1) * separator_px
+    canvas = Image.new("RGB", (first.width, total), SEPARATOR_COLOR)
+    for i, (_, data) in enumerate(images):
+        canvas.paste(Image.open(BytesIO(data)), (0, i * (first.height + separator_px)))
+    return np.asarray(canvas)
+
+
+def scan_distribute(ocr_result: OCRResult, metadata: list[dict]) -> list[OCRResult]:
+    """Reference distribution: test every character against every image."""
+    results = []
+    for meta in metadata:
+        chars = [
+            CharacterResult(
+                text=c.text,
+                bbox=BoundingBox(
+                    x=c.bbox.x - meta["x"],
+                    y=c.bbox.y - meta["y"],
+                    width=c.bbox.width,
+                    height=c.bbox.height,
+                ),
+            )
+            for c in ocr_result.characters
+            if meta["y"] <= c.bbox.y + c.bbox.height / 2 < meta["y"] + meta["height"]
+        ]
+        results.append(
+            OCRResult(
+                id=meta["id"],
+                characters=chars,
+                text="".join(c.text for c in chars),
+                char_count=len(chars),
+            )
+        )
+    return results
+
+
+def random_result(total_height: int, count: int, seed: int = 0) -> OCRResult:
+    rng = random.Random(seed)
+    chars = [
+        CharacterResult(
+            text=chr(0x4E00 + rng.randrange(500)),
+            bbox=BoundingBox(
+                x=rng.randrange(400),
+                y=rng.randrange(-5, total_height),
+                width=rng.randrange(1, 30),
+                height=rng.randrange(1, 30),
+            ),
+        )
+        for _ in range(count)
+    ]
+    return OCRResult(
+        id="montage",
+        characters=chars,
+        text="".join(c.text for c in chars),
+        char_count=len(chars),
+    )
+
+
+class TestCreateVerticalMontage:
+    """Test montage assembly into a preallocated array."""
+
+    def test_pixels_match_pasted_montage(self):
+        frames = make_frames(5)
+
+        montage_bytes, metadata = create_vertical_montage(frames, image_format="PNG")
+
+        montage = np.asarray(Image.open(BytesIO(montage_bytes)))
+        np.testing.assert_array_equal(montage, paste_montage(frames))
+        assert [m["y"] for m in metadata] == montage_offsets(5, 10).tolist()
+        assert metadata[1] == {
+            "id": "frame-1",
+            "x": 0,
+            "y": 12,
+            "width": 24,
+            "height": 10,
+        }
+
+    def test_grayscale_frames_are_converted(self):
+        buffer = BytesIO()
+        Image.new("L", (8, 4), 77).save(buffer, format="PNG")
+        frames = [("a", buffer.getvalue()), ("b", buffer.getvalue())]
+
+        montage_bytes, _ = create_vertical_montage(frames, image_format="PNG")
+
+        np.testing.assert_array_equal(
+            np.asarray(Image.open(BytesIO(montage_bytes))), paste_montage(frames)
+        )
+
+    def test_quality_and_format_are_configurable(self):
+        frames = make_frames(4, fmt="JPEG")
+
+        high, _ = create_vertical_montage(frames)
+        low, _ = create_vertical_montage(frames, quality=40)
+        webp, _ = create_vertical_montage(frames, image_format="WEBP")
+
+        assert Image.open(BytesIO(high)).format == "JPEG"
+        assert len(low) < len(high)
+        assert Image.open(BytesIO(webp)).format == "WEBP"
+
+    def test_mismatched_dimensions_raise(self):
+        frames = make_frames(2) + make_frames(1, size=(24, 11))
+        with pytest.raises(ValueError, match="don't match"):
+            create_vertical_montage(frames)
+
+
+class TestDistributeResultsToImages:
+    """Test searchsorted assignment against the per-image scan."""
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_scanning_every_image(self, seed):
+        metadata = create_vertical_montage(make_frames(30))[1]
+        result = random_result(30 * 12, 300, seed)
+
+        assert distribute_results_to_images(result, metadata) == scan_distribute(
+            result, metadata
+        )
+
+    def test_boundaries_and_separators(self):
+        """Centers on a frame's first row count; centers on separators are dropped."""
+        metadata = [
+            {"id": f"f{i}", "x": 0, "y": i * 12, "width": 24, "height": 10}
+            for i in range(2)
+        ]
+        chars = [
+            CharacterResult(text=text, bbox=BoundingBox(x=3, y=y, width=4, height=2))
+            for text, y in [("a", -1), ("b", 9), ("c", 11), ("d", 21)]
+        ]
+        result = OCRResult(id="m", characters=chars, text="abcd", char_count=4)
+
+        first, second = distribute_results_to_images(result, metadata)
+
+        assert first.text == "a"
+        assert first.characters[0].bbox == BoundingBox(x=3, y=-1, width=4, height=2)
+        assert second.text == "c"
+        assert second.characters[0].bbox.y == -1
+
+    def test_empty_result(self):
+        metadata = create_vertical_montage(make_frames(3))[1]
+        empty = OCRResult(id="m", characters=[], text="", char_count=0)
+
+        results = distribute_results_to_images(empty, metadata)
+
+        assert [(r.id, r.char_count) for r in results] == [
+            ("frame-0", 0),
+            ("frame-1", 0),
+            ("frame-2", 0),
+        ]
+
+
+def test_benchmark_950_frame_montage():
+    """Distributing a 950-frame montage's characters costs little next to OCR."""
+    frames = 950
+    metadata = [
+        {"id": f"frame-{i}", "x": 0, "y": y, "width": 400, "height": 48}
+        for i, y in enumerate(montage_offsets(frames, 48).tolist())
+    ]
+    result = random_result(frames * 50, frames * 10)
+
+    start = time.perf_counter()
+    distributed = distribute_results_to_images(result, metadata)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = scan_distribute(result, metadata[:50])
+    scan_elapsed = (time.perf_counter() - start) * frames / 50
+
+    print(
+        f"\n{frames} frames, {len(result.characters)} chars: searchsorted "
+        f"{elapsed * 1000:.0f} ms, per-image scan ~{scan_elapsed * 1000:.0f} ms"
+    )
+    assert distributed[:50] == expected
+    assert elapsed < scan_elapsed / 10
@@ -5,10 +5,15 @@ OCR bounding boxes as caption text ("in") or noise ("out").
 
 Main Functions:
     extract_features: Extract 26 features from a box
+    extract_features_matrix: Extract an (N, 26) feature matrix for many boxes
     predict_box_label: Predict label using Bayesian model or heuristics
     predict_bayesian: Predict using trained model
+    compile_model: Build a vectorized predictor once per video
     train_model: Train model from user annotations (requires layout_conn + model_conn)
     initialize_seed_model: Initialize with bootstrap parameters (model_conn only)
+    update_annotation: Apply one annotation change to the model incrementally
+    update_annotations: Apply a batch of annotation changes in one transaction
+    sync_annotations: Re-read changed boxes' annotations and apply them incrementally
 
 Types:
     BoxBounds: Box coordinates in top-referenced system
@@ -22,10 +27,16 @@ Database:
     run_all_migrations: Run schema migrations
 """
 
+from ocr_box_model.batch_features import (
+    extract_features_matrix,
+    extract_video_features_matrix,
+    load_user_annotation_labels,
+)
 from ocr_box_model.charset import detect_character_sets
 from ocr_box_model.config import FEATURE_NAMES, NUM_FEATURES
 from ocr_box_model.db import (
     get_box_text_and_timestamp,
+    get_box_timestamps,
     get_video_duration,
     load_all_boxes,
     load_boxes_for_frame,
@@ -35,12 +46,22 @@ from ocr_box_model.db import (
     run_layout_migrations,
     run_model_migrations,
     save_model,
+    write_model,
 )
 from ocr_box_model.features import (
     extract_features,
     extract_features_batch,
     extract_features_from_layout,
 )
+from ocr_box_model.incremental import (
+    AnnotationChange,
+    SufficientStats,
+    load_sample_labels,
+    load_sufficient_stats,
+    model_from_stats,
+    update_annotation,
+    update_annotations,
+)
 from ocr_box_model.predict import (
     get_confident_predictions,
     get_uncertain_predictions,
@@ -50,10 +71,14 @@ from ocr_box_model.predict import (
     predict_from_features,
     predict_with_heuristics,
 )
+from ocr_box_model.predictor import CompiledPredictor, compile_model
+from ocr_box_model.spatial_index import MahalanobisIndex
 from ocr_box_model.train import (
     get_training_samples,
     initialize_seed_model,
+    sync_annotations,
     train_model,
+    verify_incremental_state,
 )
 from ocr_box_model.types import (
     AdaptiveRecalcResult,
@@ -84,6 +109,9 @@ __all__ = [
     "extract_features",
     "extract_features_batch",
     "extract_features_from_layout",
+    "extract_features_matrix",
+    "extract_video_features_matrix",
+    "load_user_annotation_labels",
     # Prediction
     "predict_box_label",
     "predict_bayesian",
@@ -92,13 +120,27 @@ __all__ = [
     "predict_batch",
     "get_confident_predictions",
     "get_uncertain_predictions",
+    "CompiledPredictor",
+    "compile_model",
+    # Streaming
+    "MahalanobisIndex",
     # Training
     "train_model",
     "initialize_seed_model",
     "get_training_samples",
+    "update_annotation",
+    "update_annotations",
+    "sync_annotations",
+    "model_from_stats",
+    "load_sufficient_stats",
+    "load_sample_labels",
+    "verify_incremental_state",
+    "SufficientStats",
+    "AnnotationChange",
     # Database
     "load_model",
     "save_model",
+    "write_model",
     "run_all_migrations",
     "run_model_migrations",
     "run_layout_migrations",
@@ -107,6 +149,7 @@ __all__ = [
     "load_boxes_for_frame",
     "get_video_duration",
     "get_box_text_and_timestamp",
+    "get_box_timestamps",
     # Character detection
     "detect_character_sets",
     # Types
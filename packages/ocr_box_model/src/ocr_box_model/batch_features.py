@@ -0,0 +1,306 @@
+"""Vectorized feature extraction for OCR box classification.
+
+Batched equivalent of ``features.extract_features``: computes the 26-feature
+vectors for many boxes at once and returns an (N, 26) matrix.
+
+The k-nearest-neighbor features use dense distance matrices per frame and
+``argpartition``-style selection instead of sorting every neighbor list in
+Python. Ties at the k-th distance are broken by original box order, exactly
+like the stable sort in ``knn``, so results match the scalar path.
+
+User annotation indicators (features 8-9) come from a single label query
+instead of one query per box.
+"""
+
+import sqlite3
+from collections.abc import Sequence
+
+import numpy as np
+
+from ocr_box_model.charset import detect_character_sets
+from ocr_box_model.config import NUM_FEATURES
+from ocr_box_model.knn import get_k_for_boxes
+from ocr_box_model.types import BoxBounds
+
+# Weights used by compute_horizontal_clustering_score
+VERTICAL_WEIGHT = 0.7
+HORIZONTAL_WEIGHT = 0.3
+
+AnnotationLabels = dict[tuple[int, int], str]
+
+
+def box_coordinates(boxes: Sequence[BoxBounds]) -> np.ndarray:
+    """Convert boxes to an (N, 4) float64 array of (left, top, right, bottom)."""
+    if not boxes:
+        return np.empty((0, 4), dtype=np.float64)
+    return np.array([(b.left, b.top, b.right, b.bottom) for b in boxes], dtype=np.float64)
+
+
+def load_user_annotation_labels(conn: sqlite3.Connection | None) -> AnnotationLabels:
+    """Load all full-frame user annotation labels in a single query.
+
+    Args:
+        conn: SQLite database connection (or None)
+
+    Returns:
+        Mapping of (frame_index, box_index) to label ("in" or "out")
+    """
+    if conn is None:
+        return {}
+
+    try:
+        rows = conn.execute(
+            """
+            SELECT frame_index, box_index, label
+            FROM full_frame_box_labels
+            WHERE annotation_source = 'full_frame'
+              AND label_source = 'user'
+            """
+        ).fetchall()
+    except Exception:
+        return {}
+
+    return {(frame_index, box_index): label for frame_index, box_index, label in rows}
+
+
+def _select_k_nearest(distances: np.ndarray, valid: np.ndarray, k: int) -> np.ndarray:
+    """Select the k nearest valid neighbors for each row.
+
+    Equivalent to a stable sort by distance followed by taking the first
+    ``min(k, n_valid)`` entries: neighbors strictly closer than the k-th
+    distance are always selected, and ties at the k-th distance are filled
+    in original column order.
+
+    Args:
+        distances: (Q, M) distance matrix
+        valid: (Q, M) mask of neighbors that may be selected
+        k: Number of neighbors to select
+
+    Returns:
+        (Q, M) boolean selection mask
+    """
+    n_cols = distances.shape[1]
+    if k >= n_cols:
+        return valid.copy()
+
+    masked = np.where(valid, distances, np.inf)
+    kth = np.partition(masked, k - 1, axis=1)[:, k - 1 : k]
+
+    closer = valid & (masked < kth)
+    tied = valid & (masked == kth)
+    remaining = k - closer.sum(axis=1, keepdims=True)
+    return closer | (tied & (np.cumsum(tied, axis=1) <= remaining))
+
+
+def _deviation_score(selected: np.ndarray, values: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """Score |current - mean| / std over the selected neighbor values.
+
+    Rows with one or fewer selected neighbors, or zero spread, score 0.0.
+
+    Args:
+        selected: (Q, M) neighbor selection mask
+        values: (M,) neighbor values
+        current: (Q,) value of each query box
+
+    Returns:
+        (Q,) deviation scores in standard deviation units
+    """
+    counts = selected.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+    weights = selected.astype(np.float64)
+
+    mean = (weights @ values) / safe_counts
+    deviations = np.where(selected, values[np.newaxis, :] - mean[:, np.newaxis], 0.0)
+    std = np.sqrt((deviations**2).sum(axis=1) / safe_counts)
+
+    scores = np.zeros(len(current), dtype=np.float64)
+    scorable = (counts > 1) & (std > 0)
+    scores[scorable] = np.abs(current[scorable] - mean[scorable]) / std[scorable]
+    return scores
+
+
+def compute_knn_features(query: np.ndarray, neighbors: np.ndarray) -> np.ndarray:
+    """Compute the four k-nearest-neighbor spatial features (features 1-4).
+
+    Vectorized equivalent of calling ``compute_knn_alignment_score`` (top,
+    bottom, height) and ``compute_horizontal_clustering_score`` for each
+    query box against the neighbor boxes, excluding neighbors with identical
+    coordinates as ``filter_current_box`` does.
+
+    Args:
+        query: (Q, 4) coordinates of the boxes to score
+        neighbors: (M, 4) coordinates of all boxes in the frame
+
+    Returns:
+        (Q, 4) array of top alignment, bottom alignment, height similarity
+        and horizontal clustering scores
+    """
+    n_query = len(query)
+    result = np.zeros((n_query, 4), dtype=np.float64)
+    if n_query == 0 or len(neighbors) == 0:
+        return result
+
+    k = get_k_for_boxes(len(neighbors))
+    valid = ~np.all(query[:, np.newaxis, :] == neighbors[np.newaxis, :, :], axis=2)
+
+    q_left, q_top, q_right, q_bottom = query.T
+    n_left, n_top, n_right, n_bottom = neighbors.T
+    q_center_x = (q_left + q_right) / 2
+    n_center_x = (n_left + n_right) / 2
+
+    top_dist = np.abs(n_top[np.newaxis, :] - q_top[:, np.newaxis])
+    bottom_dist = np.abs(n_bottom[np.newaxis, :] - q_bottom[:, np.newaxis])
+    combined_dist = VERTICAL_WEIGHT * bottom_dist + HORIZONTAL_WEIGHT * np.abs(
+        n_center_x[np.newaxis, :] - q_center_x[:, np.newaxis]
+    )
+
+    top_nearest = _select_k_nearest(top_dist, valid, k)
+    bottom_nearest = _select_k_nearest(bottom_dist, valid, k)
+    cluster_nearest = _select_k_nearest(combined_dist, valid, k)
+
+    result[:, 0] = _deviation_score(top_nearest, n_top, q_top)
+    result[:, 1] = _deviation_score(bottom_nearest, n_bottom, q_bottom)
+    result[:, 2] = _deviation_score(bottom_nearest, n_bottom - n_top, q_bottom - q_top)
+    result[:, 3] = _deviation_score(cluster_nearest, n_center_x, q_center_x)
+    return result
+
+
+def extract_features_matrix(
+    boxes: Sequence[BoxBounds],
+    frame_width: int,
+    frame_height: int,
+    all_boxes: Sequence[BoxBounds],
+    timestamps_seconds: float | Sequence[float] | np.ndarray,
+    duration_seconds: float,
+    conn: sqlite3.Connection | None = None,
+    annotation_labels: AnnotationLabels | None = None,
+) -> np.ndarray:
+    """Extract 26 features for boxes that share one k-nn neighborhood.
+
+    Batched equivalent of ``extract_features`` for every box in ``boxes``
+    with the same ``all_boxes`` (normally all boxes of one frame).
+
+    Args:
+        boxes: Boxes to extract features for
+        frame_width: Frame width in pixels
+        frame_height: Frame height in pixels
+        all_boxes: All boxes for k-nn comparison
+        timestamps_seconds: Timestamp in seconds (scalar or one per box)
+        duration_seconds: Video duration in seconds
+        conn: SQLite database connection (optional, used if annotation_labels is None)
+        annotation_labels: Preloaded labels from load_user_annotation_labels (optional)
+
+    Returns:
+        (N, 26) feature matrix
+    """
+    n_boxes = len(boxes)
+    features = np.zeros((n_boxes, NUM_FEATURES), dtype=np.float64)
+    if n_boxes == 0:
+        return features
+
+    if annotation_labels is None:
+        annotation_labels = load_user_annotation_labels(conn)
+
+    coords = box_coordinates(boxes)
+    left, top, right, bottom = coords.T
+    width = right - left
+    height = bottom - top
+
+    # Features 1-4: k-nearest-neighbor spatial scores
+    features[:, 0:4] = compute_knn_features(coords, box_coordinates(all_boxes))
+
+    # Features 5-7: Simple spatial features
+    features[:, 4] = np.divide(width, height, out=np.zeros(n_boxes), where=height > 0)
+    if frame_height > 0:
+        features[:, 5] = (top + bottom) / 2 / frame_height
+    frame_area = frame_width * frame_height
+    if frame_area > 0:
+        features[:, 6] = width * height / frame_area
+
+    # Features 8-9: User annotations
+    for i, box in enumerate(boxes):
+        label = annotation_labels.get((box.frame_index, box.box_index))
+        if label is not None:
+            features[i, 7 if label == "in" else 8] = 1.0
+
+    # Features 10-13: Edge positions
+    if frame_width > 0:
+        features[:, 9] = left / frame_width
+        features[:, 11] = right / frame_width
+    if frame_height > 0:
+        features[:, 10] = top / frame_height
+        features[:, 12] = bottom / frame_height
+
+    # Features 14-24: Character sets
+    for i, box in enumerate(boxes):
+        char_sets = detect_character_sets(box.text)
+        features[i, 13:24] = (
+            char_sets.is_roman,
+            char_sets.is_hanzi,
+            char_sets.is_arabic,
+            char_sets.is_korean,
+            char_sets.is_hiragana,
+            char_sets.is_katakana,
+            char_sets.is_cyrillic,
+            char_sets.is_devanagari,
+            char_sets.is_thai,
+            char_sets.is_digits,
+            char_sets.is_punctuation,
+        )
+
+    # Features 25-26: Temporal
+    timestamps = np.broadcast_to(np.asarray(timestamps_seconds, dtype=np.float64), (n_boxes,))
+    features[:, 24] = timestamps
+    features[:, 25] = duration_seconds - timestamps
+
+    return features
+
+
+def extract_video_features_matrix(
+    boxes: Sequence[BoxBounds],
+    frame_width: int,
+    frame_height: int,
+    frame_timestamps: dict[int, float],
+    duration_seconds: float,
+    conn: sqlite3.Connection | None = None,
+    annotation_labels: AnnotationLabels | None = None,
+) -> np.ndarray:
+    """Extract 26 features for every box of a video.
+
+    Boxes are grouped by frame_index and each frame's boxes form the k-nn
+    neighborhood for that frame. Rows are returned in input order.
+
+    Args:
+        boxes: All boxes of the video (any order)
+        frame_width: Frame width in pixels
+        frame_height: Frame height in pixels
+        frame_timestamps: Timestamp in seconds per frame_index (missing frames use 0.0)
+        duration_seconds: Video duration in seconds
+        conn: SQLite database connection (optional, used if annotation_labels is None)
+        annotation_labels: Preloaded labels from load_user_annotation_labels (optional)
+
+    Returns:
+        (N, 26) feature matrix
+    """
+    features = np.zeros((len(boxes), NUM_FEATURES), dtype=np.float64)
+
+    if annotation_labels is None:
+        annotation_labels = load_user_annotation_labels(conn)
+
+    rows_by_frame: dict[int, list[int]] = {}
+    for i, box in enumerate(boxes):
+        rows_by_frame.setdefault(box.frame_index, []).append(i)
+
+    for frame_index, rows in rows_by_frame.items():
+        frame_boxes = [boxes[i] for i in rows]
+        features[rows] = extract_features_matrix(
+            boxes=frame_boxes,
+            frame_width=frame_width,
+            frame_height=frame_height,
+            all_boxes=frame_boxes,
+            timestamps_seconds=frame_timestamps.get(frame_index, 0.0),
+            duration_seconds=duration_seconds,
+            annotation_labels=annotation_labels,
+        )
+
+    return features
@@ -186,6 +186,34 @@ def migrate_streaming_prediction_schema(conn: sqlite3.Connection) -> None:
         raise
 
 
+def migrate_incremental_training_schema(conn: sqlite3.Connection) -> None:
+    """Add tables for incremental (sufficient-statistics) training if needed."""
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS box_classification_stats (
+                label TEXT PRIMARY KEY CHECK (label IN ('in', 'out')),
+                n_samples INTEGER NOT NULL DEFAULT 0,
+                feature_means TEXT NOT NULL,
+                comoments TEXT NOT NULL,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS box_classification_samples (
+                frame_index INTEGER NOT NULL,
+                box_index INTEGER NOT NULL,
+                label TEXT NOT NULL CHECK (label IN ('in', 'out')),
+                features TEXT NOT NULL,
+                PRIMARY KEY (frame_index, box_index)
+            );
+            """
+        )
+    except Exception as e:
+        if is_readonly_error(e):
+            return
+        logger.error(f"Incremental training migration failed: {e}")
+        raise
+
+
 def migrate_video_preferences_schema(conn: sqlite3.Connection) -> None:
     """Add index_framerate_hz to video_preferences if needed."""
     cursor = conn.cursor()
@@ -256,6 +284,7 @@ def run_model_migrations(conn: sqlite3.Connection) -> None:
     """Run schema migrations for layout-server.db (model database)."""
     migrate_model_schema(conn)
     migrate_streaming_prediction_schema(conn)
+    migrate_incremental_training_schema(conn)
 
 
 def run_layout_migrations(conn: sqlite3.Connection) -> None:
@@ -417,7 +446,20 @@ def save_model(conn: sqlite3.Connection, model: ModelParams) -> None:
         model: Model parameters to save
     """
     run_model_migrations(conn)
+    write_model(conn, model)
+    conn.commit()
+
+
+def write_model(conn: sqlite3.Connection, model: ModelParams) -> None:
+    """Write model parameters without migrating or committing.
+
+    For callers that already ran ``run_model_migrations`` on this connection
+    and write the model as part of a larger transaction.
 
+    Args:
+        conn: SQLite database connection (layout-server.db)
+        model: Model parameters to save
+    """
     # Build the INSERT/REPLACE statement
     in_flat = []
     out_flat = []
@@ -534,7 +576,6 @@ def save_model(conn: sqlite3.Connection, model: ModelParams) -> None:
             inv_json,
         ),
     )
-    conn.commit()
 
 
 # =============================================================================
@@ -742,3 +783,35 @@ def get_box_text_and_timestamp(conn: sqlite3.Connection, frame_index: int, box_i
     if result:
         return (result[0] or "", result[1] or 0.0)
     return ("", 0.0)
+
+
+def get_box_timestamps(
+    conn: sqlite3.Connection,
+    boxes: list[BoxBounds],
+) -> dict[tuple[int, int], float]:
+    """Get timestamps for many boxes with a single query.
+
+    Args:
+        conn: SQLite database connection
+        boxes: Boxes to look up (by frame_index and box_index)
+
+    Returns:
+        Mapping of (frame_index, box_index) to timestamp_seconds
+    """
+    if not boxes:
+        return {}
+
+    frame_indices = [box.frame_index for box in boxes]
+    wanted = {(box.frame_index, box.box_index) for box in boxes}
+
+    cursor = conn.cursor()
+    rows = cursor.execute(
+        """
+        SELECT frame_index, box_index, timestamp_seconds
+        FROM full_frame_ocr
+        WHERE frame_index BETWEEN ? AND ?
+        """,
+        (min(frame_indices), max(frame_indices)),
+    ).fetchall()
+
+    return {(fi, bi): ts or 0.0 for fi, bi, ts in rows if (fi, bi) in wanted}
@@ -13,6 +13,7 @@ Feature categories:
 
 import sqlite3
 
+from ocr_box_model.batch_features import extract_features_matrix
 from ocr_box_model.charset import detect_character_sets
 from ocr_box_model.config import NUM_FEATURES
 from ocr_box_model.knn import (
@@ -232,6 +233,9 @@ def extract_features_batch(
 ) -> list[list[float]]:
     """Extract features from multiple OCR boxes.
 
+    Uses the vectorized engine in ``batch_features``, which gives the same
+    results as calling ``extract_features`` per box with one label query.
+
     Args:
         boxes: List of bounding boxes
         frame_width: Frame width in pixels
@@ -244,18 +248,15 @@ def extract_features_batch(
     Returns:
         List of feature vectors, one per box
     """
-    return [
-        extract_features(
-            box=box,
-            frame_width=frame_width,
-            frame_height=frame_height,
-            all_boxes=all_boxes,
-            timestamp_seconds=timestamp_seconds,
-            duration_seconds=duration_seconds,
-            conn=conn,
-        )
-        for box in boxes
-    ]
+    return extract_features_matrix(
+        boxes=boxes,
+        frame_width=frame_width,
+        frame_height=frame_height,
+        all_boxes=all_boxes,
+        timestamps_seconds=timestamp_seconds,
+        duration_seconds=duration_seconds,
+        conn=conn,
+    ).tolist()
 
 
 def validate_features(features: list[float]) -> bool:
@@ -0,0 +1,334 @@
+"""Incremental sufficient-statistics training for the box classifier.
+
+Keeps per-class running statistics (count, mean and the co-moment matrix
+Σ(x - mean)(x - mean)ᵀ) in layout-server.db so that adding, changing or
+removing a single annotation updates the model without re-extracting
+features for every annotation. The statistics are updated with Welford's
+algorithm (and its inverse for removals) rather than raw sums, so variances
+are not computed as differences of large, nearly equal numbers.
+
+The feature vector contributed by each annotated box is stored alongside the
+statistics so it can be subtracted exactly when the annotation changes or is
+removed. ``train.train_model`` rebuilds this state from scratch, and
+``train.verify_incremental_state`` checks it against a from-scratch fit.
+"""
+
+import json
+import logging
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Literal
+
+import numpy as np
+
+from ocr_box_model.config import MIN_ANNOTATIONS_FOR_RETRAIN, MIN_STD, NUM_FEATURES
+from ocr_box_model.db import write_model
+from ocr_box_model.feature_importance import (
+    calculate_feature_importance,
+    invert_covariance_matrix,
+    should_calculate_feature_importance,
+)
+from ocr_box_model.types import GaussianParams, ModelParams
+
+logger = logging.getLogger(__name__)
+
+CLASS_LABELS: tuple[Literal["in"], Literal["out"]] = ("in", "out")
+
+# (frame_index, box_index, label or None to remove, features when labelled)
+AnnotationChange = tuple[int, int, Literal["in", "out"] | None, list[float] | None]
+
+
+@dataclass
+class SufficientStats:
+    """Running mean and co-moment matrix for one class."""
+
+    n: int = 0
+    mean: np.ndarray = field(default_factory=lambda: np.zeros(NUM_FEATURES))
+    comoments: np.ndarray = field(default_factory=lambda: np.zeros((NUM_FEATURES, NUM_FEATURES)))
+
+    @classmethod
+    def from_samples(cls, features: list[list[float]]) -> "SufficientStats":
+        """Build statistics from a list of feature vectors (two-pass, centred)."""
+        stats = cls()
+        if features:
+            x = np.asarray(features, dtype=np.float64)
+            stats.n = len(x)
+            stats.mean = x.mean(axis=0)
+            centred = x - stats.mean
+            stats.comoments = centred.T @ centred
+        return stats
+
+    def add(self, features: list[float]) -> None:
+        """Add one feature vector (Welford update)."""
+        x = np.asarray(features, dtype=np.float64)
+        self.n += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.n
+        self.comoments += np.outer(delta, x - self.mean)
+
+    def remove(self, features: list[float]) -> None:
+        """Remove a previously added feature vector (inverse Welford update)."""
+        if self.n <= 1:
+            self.n = 0
+            self.mean = np.zeros(NUM_FEATURES)
+            self.comoments = np.zeros((NUM_FEATURES, NUM_FEATURES))
+            return
+
+        x = np.asarray(features, dtype=np.float64)
+        previous_mean = self.mean - (x - self.mean) / (self.n - 1)
+        self.comoments -= np.outer(x - previous_mean, x - self.mean)
+        self.mean = previous_mean
+        self.n -= 1
+
+    def gaussian_params(self) -> list[GaussianParams]:
+        """Per-feature mean and population std (as calculate_gaussian_params)."""
+        if self.n == 0:
+            return [GaussianParams(mean=0.0, std=MIN_STD) for _ in range(NUM_FEATURES)]
+
+        variance = np.maximum(np.diag(self.comoments) / self.n, 0.0)
+        std = np.maximum(np.sqrt(variance), MIN_STD)
+        return [GaussianParams(mean=m, std=s) for m, s in zip(self.mean.tolist(), std.tolist())]
+
+    def covariance(self) -> np.ndarray:
+        """Unbiased covariance matrix (as compute_class_covariance)."""
+        if self.n < 2:
+            return np.eye(NUM_FEATURES)
+
+        return self.comoments / (self.n - 1)
+
+
+def load_sufficient_stats(conn: sqlite3.Connection) -> dict[str, SufficientStats]:
+    """Load running statistics for both classes from layout-server.db.
+
+    Args:
+        conn: SQLite database connection (layout-server.db)
+
+    Returns:
+        Mapping of class label to statistics (empty statistics if not stored)
+    """
+    stats = {label: SufficientStats() for label in CLASS_LABELS}
+    rows = conn.execute("SELECT label, n_samples, feature_means, comoments FROM box_classification_stats").fetchall()
+
+    for label, n_samples, means, comoments in rows:
+        if label not in stats:
+            continue
+        stats[label] = SufficientStats(
+            n=n_samples,
+            mean=np.array(json.loads(means), dtype=np.float64),
+            comoments=np.array(json.loads(comoments), dtype=np.float64).reshape(NUM_FEATURES, NUM_FEATURES),
+        )
+
+    return stats
+
+
+def save_sufficient_stats(conn: sqlite3.Connection, stats: dict[str, SufficientStats]) -> None:
+    """Write running statistics for both classes (does not commit).
+
+    Args:
+        conn: SQLite database connection (layout-server.db)
+        stats: Mapping of class label to statistics
+    """
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO box_classification_stats (
+            label, n_samples, feature_means, comoments, updated_at
+        ) VALUES (?, ?, ?, ?, datetime('now'))
+        """,
+        [
+            (label, s.n, json.dumps(s.mean.tolist()), json.dumps(s.comoments.ravel().tolist()))
+            for label, s in stats.items()
+        ],
+    )
+
+
+def load_sample_labels(conn: sqlite3.Connection) -> dict[tuple[int, int], str]:
+    """Load the label of every annotation in the incremental training state.
+
+    Args:
+        conn: SQLite database connection (layout-server.db)
+
+    Returns:
+        Mapping of (frame_index, box_index) to label ("in" or "out")
+    """
+    rows = conn.execute("SELECT frame_index, box_index, label FROM box_classification_samples").fetchall()
+    return {(frame_index, box_index): label for frame_index, box_index, label in rows}
+
+
+def replace_training_samples(
+    conn: sqlite3.Connection,
+    samples: list[tuple[int, int, Literal["in", "out"], list[float]]],
+) -> dict[str, SufficientStats]:
+    """Replace all stored samples and running statistics (full rebuild).
+
+    Args:
+        conn: SQLite database connection (layout-server.db)
+        samples: (frame_index, box_index, label, features) per annotation
+
+    Returns:
+        Rebuilt statistics per class
+    """
+    conn.execute("DELETE FROM box_classification_samples")
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO box_classification_samples (frame_index, box_index, label, features)
+        VALUES (?, ?, ?, ?)
+        """,
+        [(fi, bi, label, json.dumps(features)) for fi, bi, label, features in samples],
+    )
+
+    stats = {
+        label: SufficientStats.from_samples([features for _, _, lbl, features in samples if lbl == label])
+        for label in CLASS_LABELS
+    }
+    save_sufficient_stats(conn, stats)
+    conn.commit()
+    return stats
+
+
+def model_from_stats(in_stats: SufficientStats, out_stats: SufficientStats) -> ModelParams | None:
+    """Build model parameters from running statistics.
+
+    Mirrors the parameter computation in ``train.train_model``.
+
+    Args:
+        in_stats: Statistics for the "in" class
+        out_stats: Statistics for the "out" class
+
+    Returns:
+        ModelParams or None if there are too few samples
+    """
+    total = in_stats.n + out_stats.n
+    if total < MIN_ANNOTATIONS_FOR_RETRAIN or in_stats.n < 2 or out_stats.n < 2:
+        return None
+
+    in_params = in_stats.gaussian_params()
+    out_params = out_stats.gaussian_params()
+
+    feature_importance = None
+    if should_calculate_feature_importance(total):
+        feature_importance = calculate_feature_importance(in_params, out_params)
+
+    pooled = (in_stats.n * in_stats.covariance() + out_stats.n * out_stats.covariance()) / total
+    covariance_matrix = pooled.ravel().tolist()
+    covariance_inverse = invert_covariance_matrix(covariance_matrix)
+
+    return ModelParams(
+        model_version="naive_bayes_v2",
+        n_training_samples=total,
+        prior_in=in_stats.n / total,
+        prior_out=out_stats.n / total,
+        in_features=in_params,
+        out_features=out_params,
+        feature_importance=feature_importance,
+        covariance_matrix=covariance_matrix,
+        covariance_inverse=covariance_inverse,
+    )
+
+
+def update_annotations(model_conn: sqlite3.Connection, changes: Iterable[AnnotationChange]) -> int | None:
+    """Apply annotation changes to the model in O(1) feature work per change.
+
+    For each change, removes the box's previous contribution (if any) and
+    adds the new one (if a label is given); then refreshes the stored model
+    from the running statistics. The load, modify and save steps run in one
+    BEGIN IMMEDIATE transaction, so concurrent writers are serialized instead
+    of overwriting each other's statistics.
+
+    The caller runs ``run_model_migrations`` once when it opens model_conn.
+
+    Args:
+        model_conn: SQLite connection to layout-server.db
+        changes: (frame_index, box_index, label, features) per annotation;
+            label None removes the annotation, otherwise features must be the
+            box's 26-feature vector
+
+    Returns:
+        Number of training samples in the refreshed model, or None if
+        there is not enough data for a trained model
+    """
+    changes = list(changes)
+    for frame_index, box_index, label, features in changes:
+        if label is not None and (features is None or len(features) != NUM_FEATURES):
+            raise ValueError(f"Expected {NUM_FEATURES} features for label {label!r} of box {frame_index}/{box_index}")
+
+    # BEGIN IMMEDIATE needs no transaction to be open on this connection
+    if model_conn.in_transaction:
+        model_conn.commit()
+
+    model_conn.execute("BEGIN IMMEDIATE")
+    try:
+        n_training_samples = _apply_annotation_changes(model_conn, changes)
+        model_conn.commit()
+    except BaseException:
+        model_conn.rollback()
+        raise
+    return n_training_samples
+
+
+def update_annotation(
+    model_conn: sqlite3.Connection,
+    frame_index: int,
+    box_index: int,
+    label: Literal["in", "out"] | None,
+    features: list[float] | None = None,
+) -> int | None:
+    """Apply a single annotation change to the model (see update_annotations).
+
+    Args:
+        model_conn: SQLite connection to layout-server.db
+        frame_index: Frame index of the annotated box
+        box_index: Box index of the annotated box
+        label: New label, or None to remove the annotation
+        features: 26-feature vector of the box (required when label is given)
+
+    Returns:
+        Number of training samples in the refreshed model, or None if
+        there is not enough data for a trained model
+    """
+    return update_annotations(model_conn, [(frame_index, box_index, label, features)])
+
+
+def _apply_annotation_changes(model_conn: sqlite3.Connection, changes: list[AnnotationChange]) -> int | None:
+    """Update samples, statistics and model inside the caller's transaction."""
+    stats = load_sufficient_stats(model_conn)
+
+    for frame_index, box_index, label, features in changes:
+        previous = model_conn.execute(
+            "SELECT label, features FROM box_classification_samples WHERE frame_index = ? AND box_index = ?",
+            (frame_index, box_index),
+        ).fetchone()
+        if previous:
+            stats[previous[0]].remove(json.loads(previous[1]))
+            model_conn.execute(
+                "DELETE FROM box_classification_samples WHERE frame_index = ? AND box_index = ?",
+                (frame_index, box_index),
+            )
+
+        if label is not None and features is not None:
+            stats[label].add(features)
+            model_conn.execute(
+                """
+                INSERT INTO box_classification_samples (frame_index, box_index, label, features)
+                VALUES (?, ?, ?, ?)
+                """,
+                (frame_index, box_index, label, json.dumps(list(features))),
+            )
+
+    save_sufficient_stats(model_conn, stats)
+
+    model = model_from_stats(stats["in"], stats["out"])
+    if model is None:
+        total = stats["in"].n + stats["out"].n
+        if total < MIN_ANNOTATIONS_FOR_RETRAIN:
+            # Same reset rule as train_model: drop a trained model back to seed
+            result = model_conn.execute(
+                "SELECT n_training_samples FROM box_classification_model WHERE id = 1"
+            ).fetchone()
+            if result and result[0] is not None and result[0] >= MIN_ANNOTATIONS_FOR_RETRAIN:
+                logger.info("Resetting to seed model (annotations cleared)")
+                model_conn.execute("DELETE FROM box_classification_model WHERE id = 1")
+        return None
+
+    write_model(model_conn, model)
+    return model.n_training_samples
@@ -9,10 +9,12 @@ import logging
 import math
 import sqlite3
 
+from ocr_box_model.batch_features import extract_features_matrix, load_user_annotation_labels
 from ocr_box_model.config import NUM_FEATURES, PDF_FLOOR
-from ocr_box_model.db import get_box_text_and_timestamp, get_video_duration, load_model
+from ocr_box_model.db import get_box_text_and_timestamp, get_box_timestamps, get_video_duration, load_model
 from ocr_box_model.features import extract_features
 from ocr_box_model.math_utils import gaussian_pdf
+from ocr_box_model.predictor import CompiledPredictor
 from ocr_box_model.types import BoxBounds, ModelParams, Prediction, VideoLayoutConfig
 
 logger = logging.getLogger(__name__)
@@ -207,6 +209,9 @@ def predict_batch(
 ) -> list[Prediction]:
     """Predict labels for multiple boxes.
 
+    Loads the model, video duration, timestamps and user labels once, then
+    scores all boxes with a CompiledPredictor.
+
     Args:
         boxes: List of boxes to predict
         layout: Video layout configuration
@@ -216,7 +221,30 @@ def predict_batch(
     Returns:
         List of predictions, one per box
     """
-    return [predict_box_label(box, layout, all_boxes, conn) for box in boxes]
+    if conn and boxes:
+        try:
+            model = load_model(conn)
+            if model:
+                predictor = CompiledPredictor(model)
+                duration_seconds = get_video_duration(conn)
+                box_timestamps = get_box_timestamps(conn, boxes)
+
+                features = extract_features_matrix(
+                    boxes=boxes,
+                    frame_width=layout.frame_width,
+                    frame_height=layout.frame_height,
+                    all_boxes=all_boxes,
+                    timestamps_seconds=[box_timestamps.get((b.frame_index, b.box_index), 0.0) for b in boxes],
+                    duration_seconds=duration_seconds,
+                    annotation_labels=load_user_annotation_labels(conn),
+                )
+
+                return predictor.predict(features)
+        except Exception as e:
+            logger.error(f"Error using Bayesian model: {e}")
+
+    # Fall back to heuristics
+    return [predict_with_heuristics(box, layout) for box in boxes]
 
 
 def get_confident_predictions(
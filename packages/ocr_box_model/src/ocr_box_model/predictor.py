@@ -0,0 +1,183 @@
+"""Compiled Gaussian Naive Bayes predictor.
+
+Vectorized equivalent of ``predict.predict_bayesian``. The model parameters
+are converted once into mean / log-std / log-prior arrays, and an (N, 26)
+feature matrix is scored in a single log-likelihood pass.
+
+Build one predictor per video (or per model refresh) and reuse it for every
+box instead of reloading the model from the database per box.
+"""
+
+import math
+import sqlite3
+from collections.abc import Sequence
+
+import numpy as np
+
+from ocr_box_model.batch_features import AnnotationLabels, extract_video_features_matrix
+from ocr_box_model.config import EPSILON, NUM_FEATURES, PDF_FLOOR
+from ocr_box_model.types import BoxBounds, ModelParams, Prediction, VideoLayoutConfig
+
+LOG_PDF_FLOOR = math.log(PDF_FLOOR)
+LOG_SQRT_2PI = 0.5 * math.log(2 * math.pi)
+
+# Log-density used by gaussian_pdf for degenerate (std <= 0) features
+DEGENERATE_LOG_PDF_MATCH = 0.0
+DEGENERATE_LOG_PDF_MISS = math.log(1e-10)
+
+# Class order of the compiled arrays
+LABELS = np.array(["in", "out"])
+
+
+class CompiledPredictor:
+    """Gaussian Naive Bayes model compiled to NumPy arrays.
+
+    Attributes:
+        model_version: Version string of the source model
+        means: (2, 26) feature means, rows ordered ("in", "out")
+        stds: (2, 26) feature standard deviations
+        log_stds: (2, 26) log of stds (0 where std <= 0)
+        log_priors: (2,) log class priors
+    """
+
+    def __init__(self, model: ModelParams):
+        if len(model.in_features) != NUM_FEATURES or len(model.out_features) != NUM_FEATURES:
+            raise ValueError(
+                f"Expected {NUM_FEATURES} features, got in={len(model.in_features)}, out={len(model.out_features)}"
+            )
+
+        self.model_version = model.model_version
+        self.means = np.array(
+            [[p.mean for p in model.in_features], [p.mean for p in model.out_features]],
+            dtype=np.float64,
+        )
+        self.stds = np.array(
+            [[p.std for p in model.in_features], [p.std for p in model.out_features]],
+            dtype=np.float64,
+        )
+        self._degenerate = self.stds <= 0
+        safe_stds = np.where(self._degenerate, 1.0, self.stds)
+        self.log_stds = np.log(safe_stds)
+        self._inv_stds = 1.0 / safe_stds
+
+        # predict_bayesian fails on log(0) too, so callers fall back to heuristics
+        if not (model.prior_in > 0 and model.prior_out > 0):
+            raise ValueError(f"Class priors must be positive, got in={model.prior_in}, out={model.prior_out}")
+        self.log_priors = np.log(np.array([model.prior_in, model.prior_out], dtype=np.float64))
+
+    def log_posteriors(self, features: np.ndarray) -> np.ndarray:
+        """Compute unnormalized log-posteriors for each class.
+
+        Args:
+            features: (N, 26) feature matrix
+
+        Returns:
+            (N, 2) log-posteriors, columns ordered ("in", "out")
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != NUM_FEATURES:
+            raise ValueError(f"Expected (N, {NUM_FEATURES}) features, got {features.shape}")
+
+        # (N, 2, 26) standardized deviations for both classes at once
+        z = (features[:, np.newaxis, :] - self.means) * self._inv_stds
+        log_pdf = -0.5 * z**2 - self.log_stds - LOG_SQRT_2PI
+
+        if self._degenerate.any():
+            matches = np.abs(features[:, np.newaxis, :] - self.means) < EPSILON
+            degenerate_log_pdf = np.where(matches, DEGENERATE_LOG_PDF_MATCH, DEGENERATE_LOG_PDF_MISS)
+            log_pdf = np.where(self._degenerate, degenerate_log_pdf, log_pdf)
+
+        np.maximum(log_pdf, LOG_PDF_FLOOR, out=log_pdf)
+        return log_pdf.sum(axis=2) + self.log_priors
+
+    def predict_matrix(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Predict labels and confidences for a feature matrix.
+
+        Args:
+            features: (N, 26) feature matrix
+
+        Returns:
+            Tuple of (labels, confidences): (N,) arrays of "in"/"out" strings
+            and the probability of the predicted label
+        """
+        log_post = self.log_posteriors(features)
+
+        with np.errstate(invalid="ignore", over="ignore"):
+            shifted = np.exp(log_post - log_post.max(axis=1, keepdims=True))
+            total = shifted.sum(axis=1)
+            prob_in = shifted[:, 0] / total
+            prob_out = shifted[:, 1] / total
+
+        is_in = prob_in > prob_out
+        labels = np.where(is_in, LABELS[0], LABELS[1])
+        confidences = np.where(is_in, prob_in, prob_out)
+
+        # Degenerate case (matches predict_bayesian)
+        degenerate = ~np.isfinite(total) | (total == 0)
+        labels[degenerate] = "in"
+        confidences[degenerate] = 0.5
+
+        return labels, confidences
+
+    def predict(self, features: np.ndarray | Sequence[Sequence[float]]) -> list[Prediction]:
+        """Predict labels for a feature matrix as Prediction objects.
+
+        Args:
+            features: (N, 26) feature matrix or list of feature vectors
+
+        Returns:
+            List of predictions, one per row
+        """
+        labels, confidences = self.predict_matrix(np.asarray(features, dtype=np.float64).reshape(-1, NUM_FEATURES))
+        return [
+            Prediction(label=label, confidence=confidence)
+            for label, confidence in zip(labels.tolist(), confidences.tolist())
+        ]
+
+    def predict_video(
+        self,
+        boxes: Sequence[BoxBounds],
+        layout: VideoLayoutConfig,
+        frame_timestamps: dict[int, float],
+        duration_seconds: float,
+        conn: sqlite3.Connection | None = None,
+        annotation_labels: AnnotationLabels | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Predict labels and confidences for every box of a video.
+
+        Features are extracted with ``extract_video_features_matrix`` (each
+        frame's boxes form the k-nn neighborhood), then scored in one pass.
+
+        Args:
+            boxes: All boxes of the video
+            layout: Video layout configuration
+            frame_timestamps: Timestamp in seconds per frame_index
+            duration_seconds: Video duration in seconds
+            conn: SQLite database connection for user labels (optional)
+            annotation_labels: Preloaded user labels (optional)
+
+        Returns:
+            Tuple of (labels, confidences), aligned with ``boxes``
+        """
+        features = extract_video_features_matrix(
+            boxes=boxes,
+            frame_width=layout.frame_width,
+            frame_height=layout.frame_height,
+            frame_timestamps=frame_timestamps,
+            duration_seconds=duration_seconds,
+            conn=conn,
+            annotation_labels=annotation_labels,
+        )
+        return self.predict_matrix(features)
+
+
+def compile_model(model: ModelParams) -> CompiledPredictor:
+    """Compile model parameters into a vectorized predictor.
+
+    Args:
+        model: Trained (or seed) model parameters
+
+    Returns:
+        CompiledPredictor for scoring feature matrices
+    """
+    return CompiledPredictor(model)
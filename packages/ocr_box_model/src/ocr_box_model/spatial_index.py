@@ -0,0 +1,185 @@
+"""Spatial index for Mahalanobis-radius queries over box features.
+
+Features are whitened once with the Cholesky factor L of the inverse pooled
+covariance (Σ⁻¹ = L Lᵀ), so Mahalanobis distance becomes Euclidean distance
+between whitened rows:
+
+    D_M(x, y)² = (x - y)ᵀ Σ⁻¹ (x - y) = ||(x - y) L||²
+
+Whitened rows are bucketed on a grid over the few most spread-out whitened
+dimensions, with a cell size equal to the query radius. Distance in a subset
+of dimensions is a lower bound on the full distance, so a radius query only
+needs the 3^d cells around the query point and an exact check on their rows.
+"""
+
+import itertools
+import logging
+
+import numpy as np
+
+from ocr_box_model.config import MAX_MAHALANOBIS_DISTANCE, NUM_FEATURES
+
+logger = logging.getLogger(__name__)
+
+# Number of whitened dimensions used for bucketing (3^d cells per query)
+DEFAULT_BUCKET_DIMS = 4
+
+
+def whitening_matrix(covariance_inverse: list[float] | np.ndarray) -> np.ndarray:
+    """Compute W such that ||(x - y) W|| is the Mahalanobis distance.
+
+    Uses the Cholesky factor of the inverse covariance, falling back to an
+    eigen-decomposition (with negative eigenvalues clipped) when the matrix
+    is not positive definite.
+
+    Args:
+        covariance_inverse: Inverse covariance matrix (676 values or 26x26)
+
+    Returns:
+        (26, 26) whitening matrix
+    """
+    inverse = np.asarray(covariance_inverse, dtype=np.float64).reshape(NUM_FEATURES, NUM_FEATURES)
+    inverse = (inverse + inverse.T) / 2
+
+    try:
+        return np.linalg.cholesky(inverse)
+    except np.linalg.LinAlgError:
+        logger.warning("Cholesky of inverse covariance failed, using eigen-decomposition")
+        eigenvalues, eigenvectors = np.linalg.eigh(inverse)
+        return eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+
+
+class MahalanobisIndex:
+    """Bucketed index of whitened feature vectors for radius queries.
+
+    Rows are addressed by their position in the feature matrix, which is
+    expected to line up with the caller's list of boxes.
+    """
+
+    def __init__(
+        self,
+        features: np.ndarray | list[list[float]],
+        covariance_inverse: list[float] | np.ndarray,
+        radius: float = MAX_MAHALANOBIS_DISTANCE,
+        bucket_dims: int = DEFAULT_BUCKET_DIMS,
+    ):
+        self.features = np.array(features, dtype=np.float64).reshape(-1, NUM_FEATURES)
+        self.radius = radius
+        self.bucket_dims = min(bucket_dims, NUM_FEATURES)
+        self._covariance_inverse = np.asarray(covariance_inverse, dtype=np.float64).ravel().copy()
+        self._whitening = whitening_matrix(self._covariance_inverse)
+        self.whitened = self.features @ self._whitening
+        self._rebuild_buckets()
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def _rebuild_buckets(self) -> None:
+        """Choose bucket dimensions and regroup all rows into grid cells."""
+        if len(self.whitened) > 1:
+            spread = self.whitened.std(axis=0)
+            self._dims = np.sort(np.argsort(-spread)[: self.bucket_dims])
+        else:
+            self._dims = np.arange(self.bucket_dims)
+
+        self._cells = self._cell_keys(self.whitened)
+        self._buckets: dict[tuple[int, ...], list[int]] = {}
+        if len(self._cells) == 0:
+            return
+
+        unique, inverse = np.unique(self._cells, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind="stable")
+        boundaries = np.searchsorted(inverse.ravel()[order], np.arange(len(unique) + 1))
+        for i, key in enumerate(map(tuple, unique.tolist())):
+            self._buckets[key] = order[boundaries[i] : boundaries[i + 1]].tolist()
+
+    def _cell_keys(self, whitened: np.ndarray) -> np.ndarray:
+        """Grid cell coordinates of whitened rows."""
+        return np.floor(whitened[:, self._dims] / self.radius).astype(np.int64)
+
+    def refresh_covariance(self, covariance_inverse: list[float] | np.ndarray, rtol: float = 1e-9) -> bool:
+        """Re-whiten all rows for a refreshed covariance.
+
+        Skips the work when the inverse covariance is unchanged. Features are
+        kept, so no data is reloaded; the rows are re-whitened with one
+        matrix product and regrouped.
+
+        Args:
+            covariance_inverse: New inverse covariance matrix
+            rtol: Relative tolerance for treating the matrix as unchanged
+
+        Returns:
+            True if the index was re-whitened
+        """
+        new_inverse = np.asarray(covariance_inverse, dtype=np.float64).ravel()
+        if np.allclose(new_inverse, self._covariance_inverse, rtol=rtol, atol=0.0):
+            return False
+
+        self._covariance_inverse = new_inverse.copy()
+        self._whitening = whitening_matrix(new_inverse)
+        self.whitened = self.features @ self._whitening
+        self._rebuild_buckets()
+        return True
+
+    def update_rows(self, rows: list[int], features: np.ndarray | list[list[float]]) -> None:
+        """Replace feature vectors for some rows and move them between cells.
+
+        Args:
+            rows: Row positions to update
+            features: New feature vectors, one per row
+        """
+        if not rows:
+            return
+
+        new_features = np.asarray(features, dtype=np.float64).reshape(-1, NUM_FEATURES)
+        new_whitened = new_features @ self._whitening
+        new_cells = self._cell_keys(new_whitened)
+
+        for row, cell in zip(rows, new_cells):
+            old_key = tuple(self._cells[row].tolist())
+            new_key = tuple(cell.tolist())
+            if old_key != new_key:
+                self._buckets[old_key].remove(row)
+                if not self._buckets[old_key]:
+                    del self._buckets[old_key]
+                self._buckets.setdefault(new_key, []).append(row)
+
+        self.features[rows] = new_features
+        self.whitened[rows] = new_whitened
+        self._cells[rows] = new_cells
+
+    def query_radius(
+        self,
+        features: list[float] | np.ndarray,
+        radius: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find rows within a Mahalanobis radius of a feature vector.
+
+        Args:
+            features: 26-feature query vector
+            radius: Query radius (defaults to the index radius; larger radii
+                fall back to a full scan)
+
+        Returns:
+            Tuple of (rows, distances), sorted by row position
+        """
+        radius = self.radius if radius is None else radius
+        query = np.asarray(features, dtype=np.float64).reshape(NUM_FEATURES) @ self._whitening
+
+        if radius > self.radius:
+            candidates = np.arange(len(self.whitened))
+        else:
+            center = np.floor(query[self._dims] / self.radius).astype(np.int64)
+            rows: list[int] = []
+            for offset in itertools.product((-1, 0, 1), repeat=len(self._dims)):
+                bucket = self._buckets.get(tuple((center + offset).tolist()))
+                if bucket:
+                    rows.extend(bucket)
+            candidates = np.array(sorted(rows), dtype=np.int64)
+
+        if len(candidates) == 0:
+            return candidates, np.empty(0, dtype=np.float64)
+
+        distances = np.sqrt(((self.whitened[candidates] - query) ** 2).sum(axis=1))
+        within = distances <= radius
+        return candidates[within], distances[within]
@@ -21,6 +21,7 @@ from ocr_box_model.config import (
     UNCERTAINTY_WEIGHT,
 )
 from ocr_box_model.feature_importance import compute_mahalanobis_distance
+from ocr_box_model.spatial_index import MahalanobisIndex
 from ocr_box_model.types import (
     AdaptiveRecalcResult,
     Annotation,
@@ -48,22 +49,12 @@ def chunk(array: list[T], size: int) -> list[list[T]]:
     return chunks
 
 
-def estimate_prediction_change_prob(
-    box: BoxWithPrediction,
-    new_annotation: Annotation,
-    covariance_inverse: list[float],
-) -> float:
-    """Estimate probability that a box's prediction will change after model update.
-
-    Combines three factors:
-    1. Current prediction uncertainty (low confidence -> high change probability)
-    2. Feature similarity to new annotation (weighted by Mahalanobis distance)
-    3. Distance to decision boundary (near boundary -> high change probability)
+def change_prob_from_distance(box: BoxWithPrediction, mahalanobis_distance: float) -> float:
+    """Combine prediction uncertainty and feature distance into a change probability.
 
     Args:
-        box: Box with current prediction and features
-        new_annotation: Newly annotated box
-        covariance_inverse: Inverse pooled covariance matrix (676 values)
+        box: Box with current prediction
+        mahalanobis_distance: Mahalanobis distance from the box to the new annotation
 
     Returns:
         Probability in [0, 1] that prediction will flip
@@ -71,14 +62,7 @@ def estimate_prediction_change_prob(
     # Factor 1: Uncertainty (inverse of confidence)
     uncertainty_factor = 1.0 - box.current_prediction.confidence
 
-    # Factor 2: Weighted feature similarity using Mahalanobis distance
-    mahalanobis_distance = compute_mahalanobis_distance(
-        box.features,
-        new_annotation.features,
-        covariance_inverse,
-    )
-
-    # Convert distance to similarity [0-1] using exponential decay
+    # Factor 2: Convert distance to similarity [0-1] using exponential decay
     sigma = MAX_MAHALANOBIS_DISTANCE
     similarity_factor = math.exp(-(mahalanobis_distance**2) / (2 * sigma**2))
 
@@ -97,6 +81,34 @@ def estimate_prediction_change_prob(
     return min(1.0, max(0.0, change_prob))
 
 
+def estimate_prediction_change_prob(
+    box: BoxWithPrediction,
+    new_annotation: Annotation,
+    covariance_inverse: list[float],
+) -> float:
+    """Estimate probability that a box's prediction will change after model update.
+
+    Combines three factors:
+    1. Current prediction uncertainty (low confidence -> high change probability)
+    2. Feature similarity to new annotation (weighted by Mahalanobis distance)
+    3. Distance to decision boundary (near boundary -> high change probability)
+
+    Args:
+        box: Box with current prediction and features
+        new_annotation: Newly annotated box
+        covariance_inverse: Inverse pooled covariance matrix (676 values)
+
+    Returns:
+        Probability in [0, 1] that prediction will flip
+    """
+    mahalanobis_distance = compute_mahalanobis_distance(
+        box.features,
+        new_annotation.features,
+        covariance_inverse,
+    )
+    return change_prob_from_distance(box, mahalanobis_distance)
+
+
 def identify_affected_boxes(
     new_annotation: Annotation,
     all_boxes: list[BoxWithPrediction],
@@ -127,6 +139,42 @@ def identify_affected_boxes(
     return boxes_with_prob
 
 
+def identify_affected_boxes_indexed(
+    new_annotation: Annotation,
+    all_boxes: list[BoxWithPrediction],
+    index: MahalanobisIndex,
+) -> list[tuple[BoxWithPrediction, float]]:
+    """Identify boxes to recalculate using a precomputed Mahalanobis index.
+
+    Only boxes within the index radius (MAX_MAHALANOBIS_DISTANCE by default)
+    of the new annotation are considered, so the cost depends on the size of
+    that neighborhood rather than on the number of boxes in the video.
+    Boxes outside the radius are the ones whose change probability comes
+    from uncertainty alone; use identify_affected_boxes for a full scan.
+
+    Args:
+        new_annotation: Newly annotated box
+        all_boxes: All boxes in video, aligned with the index rows
+        index: Index built from the same boxes' features
+
+    Returns:
+        List of (box, change_prob) tuples with change_prob >= MIN_CHANGE_PROBABILITY,
+        sorted by change probability (highest first)
+    """
+    rows, distances = index.query_radius(new_annotation.features)
+
+    boxes_with_prob: list[tuple[BoxWithPrediction, float]] = []
+    for row, distance in zip(rows.tolist(), distances.tolist()):
+        box = all_boxes[row]
+        change_prob = change_prob_from_distance(box, distance)
+        if change_prob >= MIN_CHANGE_PROBABILITY:
+            boxes_with_prob.append((box, change_prob))
+
+    boxes_with_prob.sort(key=lambda x: -x[1])
+
+    return boxes_with_prob
+
+
 async def adaptive_recalculation(
     candidates: list[tuple[BoxWithPrediction, float]],
     predict_and_update: Callable[
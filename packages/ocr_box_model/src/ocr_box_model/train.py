@@ -4,10 +4,13 @@ Trains Gaussian Naive Bayes model using user annotations.
 """
 
 import logging
+import math
 import sqlite3
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Literal
 
+from ocr_box_model.batch_features import extract_features_matrix, load_user_annotation_labels
 from ocr_box_model.config import MIN_ANNOTATIONS_FOR_RETRAIN, MIN_STD, NUM_FEATURES
 from ocr_box_model.db import (
     get_video_duration,
@@ -15,7 +18,12 @@ from ocr_box_model.db import (
     run_model_migrations,
     save_model,
 )
-from ocr_box_model.features import extract_features
+from ocr_box_model.incremental import (
+    AnnotationChange,
+    load_sufficient_stats,
+    replace_training_samples,
+    update_annotations,
+)
 from ocr_box_model.types import (
     SEED_IN_PARAMS,
     SEED_OUT_PARAMS,
@@ -28,6 +36,9 @@ from ocr_box_model.types import (
 
 logger = logging.getLogger(__name__)
 
+# Frame indices per query when fetching annotations of selected boxes
+MAX_QUERY_FRAMES = 500
+
 
 @dataclass
 class AnnotationRow:
@@ -51,18 +62,20 @@ class FrameDataCache:
     timestamp_cache: dict[int, float]
 
 
-def fetch_user_annotations(conn: sqlite3.Connection) -> list[AnnotationRow]:
+def fetch_user_annotations(
+    conn: sqlite3.Connection,
+    boxes: Iterable[tuple[int, int]] | None = None,
+) -> list[AnnotationRow]:
     """Fetch user annotations from database.
 
     Args:
         conn: SQLite database connection
+        boxes: Only fetch these (frame_index, box_index) boxes (default: all)
 
     Returns:
         List of annotation rows
     """
-    cursor = conn.cursor()
-    rows = cursor.execute(
-        """
+    query = """
         SELECT
             label,
             box_left,
@@ -73,9 +86,25 @@ def fetch_user_annotations(conn: sqlite3.Connection) -> list[AnnotationRow]:
             box_index
         FROM full_frame_box_labels
         WHERE label_source = 'user'
-        ORDER BY frame_index
-        """
-    ).fetchall()
+    """
+
+    cursor = conn.cursor()
+    if boxes is None:
+        rows = cursor.execute(query + " ORDER BY frame_index").fetchall()
+    else:
+        wanted = set(boxes)
+        frame_indices = sorted({frame_index for frame_index, _ in wanted})
+        rows = []
+        for start in range(0, len(frame_indices), MAX_QUERY_FRAMES):
+            chunk = frame_indices[start : start + MAX_QUERY_FRAMES]
+            placeholders = ", ".join("?" * len(chunk))
+            rows.extend(
+                row
+                for row in cursor.execute(
+                    query + f" AND frame_index IN ({placeholders}) ORDER BY frame_index", chunk
+                ).fetchall()
+                if (row[5], row[6]) in wanted
+            )
 
     return [
         AnnotationRow(
@@ -154,66 +183,111 @@ def build_frame_data_cache(
         cache.timestamp_cache[frame_index] = rows[0][2] or 0.0
 
 
-def extract_all_features(
+def extract_annotation_features(
     conn: sqlite3.Connection,
     annotations: list[AnnotationRow],
     layout: VideoLayoutConfig,
     duration_seconds: float,
-) -> tuple[list[list[float]], list[list[float]]]:
-    """Extract features for all annotations and separate by class.
+    annotation_labels: dict[tuple[int, int], str] | None = None,
+) -> list[list[float]]:
+    """Extract features for all annotations.
+
+    Annotations are processed one frame at a time with the vectorized
+    feature engine, and user labels are loaded with a single query.
 
     Args:
         conn: SQLite database connection
         annotations: List of annotations
         layout: Video layout configuration
         duration_seconds: Video duration in seconds
+        annotation_labels: User labels of (at least) the annotated boxes
+            (loaded from the database if not provided)
 
     Returns:
-        Tuple of (in_features, out_features)
+        Feature vectors aligned with annotations
     """
     cache = FrameDataCache(
         boxes_cache={},
         text_cache={},
         timestamp_cache={},
     )
+    if annotation_labels is None:
+        annotation_labels = load_user_annotation_labels(conn)
 
-    in_features: list[list[float]] = []
-    out_features: list[list[float]] = []
-
-    for ann in annotations:
-        build_frame_data_cache(conn, ann.frame_index, layout, cache)
-
-        all_boxes = cache.boxes_cache.get(ann.frame_index, [])
-        box_bounds = BoxBounds(
-            left=ann.box_left,
-            top=ann.box_top,
-            right=ann.box_right,
-            bottom=ann.box_bottom,
-            frame_index=ann.frame_index,
-            box_index=ann.box_index,
-            text=cache.text_cache.get(f"{ann.frame_index}-{ann.box_index}", ""),
-        )
+    rows_by_frame: dict[int, list[int]] = {}
+    for i, ann in enumerate(annotations):
+        rows_by_frame.setdefault(ann.frame_index, []).append(i)
 
-        timestamp_seconds = cache.timestamp_cache.get(ann.frame_index, 0.0)
+    features: list[list[float]] = [[] for _ in annotations]
+
+    for frame_index, rows in rows_by_frame.items():
+        build_frame_data_cache(conn, frame_index, layout, cache)
+
+        boxes = [
+            BoxBounds(
+                left=ann.box_left,
+                top=ann.box_top,
+                right=ann.box_right,
+                bottom=ann.box_bottom,
+                frame_index=ann.frame_index,
+                box_index=ann.box_index,
+                text=cache.text_cache.get(f"{ann.frame_index}-{ann.box_index}", ""),
+            )
+            for ann in (annotations[i] for i in rows)
+        ]
 
-        features = extract_features(
-            box=box_bounds,
+        frame_features = extract_features_matrix(
+            boxes=boxes,
             frame_width=layout.frame_width,
             frame_height=layout.frame_height,
-            all_boxes=all_boxes,
-            timestamp_seconds=timestamp_seconds,
+            all_boxes=cache.boxes_cache.get(frame_index, []),
+            timestamps_seconds=cache.timestamp_cache.get(frame_index, 0.0),
             duration_seconds=duration_seconds,
-            conn=conn,
+            annotation_labels=annotation_labels,
         )
 
-        if ann.label == "in":
-            in_features.append(features)
-        else:
-            out_features.append(features)
+        for i, row in zip(rows, frame_features.tolist()):
+            features[i] = row
+
+    return features
+
+
+def extract_all_features(
+    conn: sqlite3.Connection,
+    annotations: list[AnnotationRow],
+    layout: VideoLayoutConfig,
+    duration_seconds: float,
+) -> tuple[list[list[float]], list[list[float]]]:
+    """Extract features for all annotations and separate by class.
+
+    Args:
+        conn: SQLite database connection
+        annotations: List of annotations
+        layout: Video layout configuration
+        duration_seconds: Video duration in seconds
+
+    Returns:
+        Tuple of (in_features, out_features)
+    """
+    features = extract_annotation_features(conn, annotations, layout, duration_seconds)
+
+    in_features = [f for ann, f in zip(annotations, features) if ann.label == "in"]
+    out_features = [f for ann, f in zip(annotations, features) if ann.label != "in"]
 
     return in_features, out_features
 
 
+def _training_samples(
+    annotations: list[AnnotationRow],
+    features: list[list[float]],
+) -> list[tuple[int, int, Literal["in", "out"], list[float]]]:
+    """Pair annotations with features for the incremental training state."""
+    return [
+        (ann.frame_index, ann.box_index, "in" if ann.label == "in" else "out", f)
+        for ann, f in zip(annotations, features)
+    ]
+
+
 def calculate_gaussian_params(
     in_features: list[list[float]],
     out_features: list[list[float]],
@@ -256,7 +330,8 @@ def train_model(
     """Train Bayesian model using user annotations.
 
     Fetches all user-labeled boxes, extracts features, calculates Gaussian
-    parameters, and stores in database.
+    parameters, and stores in database. Also rebuilds the incremental
+    training state (see ``incremental.update_annotation``) from scratch.
 
     Args:
         layout_conn: SQLite connection to layout.db (annotations, OCR data)
@@ -278,9 +353,16 @@ def train_model(
     # Fetch annotations
     annotations = fetch_user_annotations(layout_conn)
 
+    # Get video duration
+    duration_seconds = get_video_duration(layout_conn)
+
     if len(annotations) < MIN_ANNOTATIONS_FOR_RETRAIN:
         logger.info(f"Insufficient training data: {len(annotations)} samples (need {MIN_ANNOTATIONS_FOR_RETRAIN}+)")
 
+        # Keep the incremental state in sync with the (few) annotations
+        features = extract_annotation_features(layout_conn, annotations, layout, duration_seconds)
+        replace_training_samples(model_conn, _training_samples(annotations, features))
+
         # Check if we need to reset to seed model
         cursor = model_conn.cursor()
         result = cursor.execute("SELECT n_training_samples FROM box_classification_model WHERE id = 1").fetchone()
@@ -294,11 +376,13 @@ def train_model(
 
     logger.info(f"Training with {len(annotations)} user annotations")
 
-    # Get video duration
-    duration_seconds = get_video_duration(layout_conn)
-
     # Extract features
-    in_features, out_features = extract_all_features(layout_conn, annotations, layout, duration_seconds)
+    features = extract_annotation_features(layout_conn, annotations, layout, duration_seconds)
+    in_features = [f for ann, f in zip(annotations, features) if ann.label == "in"]
+    out_features = [f for ann, f in zip(annotations, features) if ann.label != "in"]
+
+    # Rebuild the incremental training state from scratch
+    replace_training_samples(model_conn, _training_samples(annotations, features))
 
     # Need at least 2 samples per class
     if len(in_features) < 2 or len(out_features) < 2:
@@ -367,6 +451,56 @@ def train_model(
     return total
 
 
+def sync_annotations(
+    layout_conn: sqlite3.Connection,
+    model_conn: sqlite3.Connection,
+    boxes: Iterable[tuple[int, int]],
+    layout: VideoLayoutConfig | None = None,
+) -> int | None:
+    """Apply the current user annotations of some boxes to the model incrementally.
+
+    Re-reads the given boxes' annotations from layout.db, extracts their
+    features exactly as ``train_model`` does and applies them with
+    ``incremental.update_annotations``; boxes without a user annotation are
+    removed from the training state. Work is proportional to the number of
+    boxes, not to the number of annotations.
+
+    The caller runs ``run_model_migrations`` once when it opens model_conn.
+
+    Args:
+        layout_conn: SQLite connection to layout.db (annotations, OCR data)
+        model_conn: SQLite connection to layout-server.db (model storage)
+        boxes: (frame_index, box_index) of every box whose label changed
+        layout: Video layout configuration (loaded from DB if not provided)
+
+    Returns:
+        Number of training samples in the refreshed model, or None if
+        there is not enough data for a trained model
+    """
+    wanted = set(boxes)
+    if not wanted:
+        return None
+
+    if layout is None:
+        layout = load_layout_config(layout_conn)
+        if layout is None:
+            logger.error("No layout configuration found")
+            return None
+
+    annotations = fetch_user_annotations(layout_conn, wanted)
+    # Features 8-9 depend only on the box's own label
+    annotation_labels = {(ann.frame_index, ann.box_index): ann.label for ann in annotations}
+    features = extract_annotation_features(
+        layout_conn, annotations, layout, get_video_duration(layout_conn), annotation_labels
+    )
+
+    changes: list[AnnotationChange] = [
+        (frame_index, box_index, None, None) for frame_index, box_index in sorted(wanted - annotation_labels.keys())
+    ]
+    changes.extend(_training_samples(annotations, features))
+    return update_annotations(model_conn, changes)
+
+
 def initialize_seed_model(conn: sqlite3.Connection) -> None:
     """Initialize seed model with typical caption layout parameters.
 
@@ -429,3 +563,62 @@ def get_training_samples(
         ClassSamples(n=len(in_features), features=in_features),
         ClassSamples(n=len(out_features), features=out_features),
     )
+
+
+def verify_incremental_state(
+    layout_conn: sqlite3.Connection,
+    model_conn: sqlite3.Connection,
+    layout: VideoLayoutConfig | None = None,
+    rel_tol: float = 1e-6,
+    abs_tol: float = 1e-9,
+) -> bool:
+    """Check the incremental training state against a from-scratch fit.
+
+    Re-extracts features for all user annotations, fits Gaussian parameters
+    with ``calculate_gaussian_params`` and compares them with the parameters
+    derived from the running statistics in layout-server.db.
+
+    Args:
+        layout_conn: SQLite connection to layout.db (annotations, OCR data)
+        model_conn: SQLite connection to layout-server.db (model storage)
+        layout: Video layout configuration (loaded from DB if not provided)
+        rel_tol: Relative tolerance for parameter comparison
+        abs_tol: Absolute tolerance for parameter comparison
+
+    Returns:
+        True if the incremental state matches the from-scratch fit
+    """
+    run_model_migrations(model_conn)
+
+    if layout is None:
+        layout = load_layout_config(layout_conn)
+        if layout is None:
+            logger.error("No layout configuration found")
+            return False
+
+    annotations = fetch_user_annotations(layout_conn)
+    duration_seconds = get_video_duration(layout_conn)
+    in_features, out_features = extract_all_features(layout_conn, annotations, layout, duration_seconds)
+
+    stats = load_sufficient_stats(model_conn)
+    if stats["in"].n != len(in_features) or stats["out"].n != len(out_features):
+        logger.warning(
+            f"Incremental state sample counts differ: in={stats['in'].n}/{len(in_features)}, "
+            f"out={stats['out'].n}/{len(out_features)}"
+        )
+        return False
+
+    expected_in, expected_out = calculate_gaussian_params(in_features, out_features)
+    for label, expected in (("in", expected_in), ("out", expected_out)):
+        for idx, (actual, fresh) in enumerate(zip(stats[label].gaussian_params(), expected)):
+            if not (
+                math.isclose(actual.mean, fresh.mean, rel_tol=rel_tol, abs_tol=abs_tol)
+                and math.isclose(actual.std, fresh.std, rel_tol=rel_tol, abs_tol=abs_tol)
+            ):
+                logger.warning(
+                    f"Incremental state differs for {label} feature {idx}: "
+                    f"mean {actual.mean} vs {fresh.mean}, std {actual.std} vs {fresh.std}"
+                )
+                return False
+
+    return True
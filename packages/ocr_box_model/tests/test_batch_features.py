@@ -0,0 +1,181 @@
+"""Tests for the vectorized feature extraction engine."""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+from ocr_box_model import (
+    NUM_FEATURES,
+    BoxBounds,
+    extract_features,
+    extract_features_batch,
+    extract_features_matrix,
+    extract_video_features_matrix,
+    load_user_annotation_labels,
+)
+from ocr_box_model.batch_features import box_coordinates, compute_knn_features
+
+FRAME_WIDTH = 1920
+FRAME_HEIGHT = 1080
+
+
+def make_frame_boxes(n: int, frame_index: int = 0, seed: int = 0) -> list[BoxBounds]:
+    """Create random boxes with coarse coordinates so distance ties are common."""
+    rng = random.Random(seed)
+    texts = ["Hello", "你好", "123", "안녕", "!?", ""]
+    boxes = []
+    for box_index in range(n):
+        left = rng.randrange(0, 1800, 10)
+        top = rng.choice([800, 810, 820, 900, 950]) if rng.random() < 0.6 else rng.randrange(0, 1000, 5)
+        boxes.append(
+            BoxBounds(
+                left=left,
+                top=top,
+                right=left + rng.randrange(10, 120, 5),
+                bottom=top + rng.choice([30, 40, 45, 50]),
+                frame_index=frame_index,
+                box_index=box_index,
+                text=rng.choice(texts),
+            )
+        )
+    return boxes
+
+
+def make_label_db(labels: list[tuple[int, int, str]]) -> sqlite3.Connection:
+    """Create an in-memory database with full_frame_box_labels rows."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE full_frame_box_labels (
+            annotation_source TEXT,
+            frame_index INTEGER,
+            box_index INTEGER,
+            label TEXT,
+            label_source TEXT
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO full_frame_box_labels VALUES ('full_frame', ?, ?, ?, 'user')",
+        labels,
+    )
+    return conn
+
+
+def scalar_features(boxes: list[BoxBounds], conn: sqlite3.Connection | None = None) -> np.ndarray:
+    """Reference features computed one box at a time."""
+    return np.array(
+        [
+            extract_features(
+                box=box,
+                frame_width=FRAME_WIDTH,
+                frame_height=FRAME_HEIGHT,
+                all_boxes=boxes,
+                timestamp_seconds=12.5,
+                duration_seconds=600.0,
+                conn=conn,
+            )
+            for box in boxes
+        ]
+    )
+
+
+class TestBatchFeatureParity:
+    """Vectorized features must match the scalar path."""
+
+    @pytest.mark.parametrize("n_boxes", [0, 1, 2, 4, 5, 6, 25, 60])
+    def test_matches_scalar_path(self, n_boxes):
+        """Test parity across small and large frames (k clamps and ties)."""
+        boxes = make_frame_boxes(n_boxes, seed=n_boxes)
+        expected = scalar_features(boxes)
+
+        result = extract_features_matrix(boxes, FRAME_WIDTH, FRAME_HEIGHT, boxes, 12.5, 600.0)
+
+        assert result.shape == (n_boxes, NUM_FEATURES)
+        np.testing.assert_allclose(result, expected.reshape(n_boxes, NUM_FEATURES), rtol=1e-12, atol=1e-12)
+
+    def test_duplicate_coordinates_excluded(self):
+        """Test that boxes with identical coordinates are not neighbors."""
+        boxes = make_frame_boxes(20, seed=7)
+        boxes.append(BoxBounds(left=boxes[0].left, top=boxes[0].top, right=boxes[0].right, bottom=boxes[0].bottom))
+        expected = scalar_features(boxes)
+
+        result = extract_features_matrix(boxes, FRAME_WIDTH, FRAME_HEIGHT, boxes, 12.5, 600.0)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+    def test_query_boxes_not_in_neighborhood(self):
+        """Test scoring boxes against a different neighbor set (training path)."""
+        frame_boxes = make_frame_boxes(30, seed=3)
+        query = make_frame_boxes(5, seed=99)
+
+        expected = np.array([extract_features(box, FRAME_WIDTH, FRAME_HEIGHT, frame_boxes, 1.0, 10.0) for box in query])
+        result = extract_features_matrix(query, FRAME_WIDTH, FRAME_HEIGHT, frame_boxes, 1.0, 10.0)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+    def test_user_annotations_single_lookup(self):
+        """Test that annotation features match per-box queries."""
+        boxes = make_frame_boxes(10, seed=1)
+        conn = make_label_db([(0, 2, "in"), (0, 5, "out"), (1, 2, "in")])
+
+        expected = scalar_features(boxes, conn)
+        result = extract_features_matrix(boxes, FRAME_WIDTH, FRAME_HEIGHT, boxes, 12.5, 600.0, conn=conn)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+        assert result[2, 7] == 1.0
+        assert result[5, 8] == 1.0
+
+    def test_load_user_annotation_labels_without_table(self):
+        """Test that a missing labels table behaves like no annotations."""
+        assert load_user_annotation_labels(sqlite3.connect(":memory:")) == {}
+        assert load_user_annotation_labels(None) == {}
+
+    def test_extract_features_batch_uses_engine(self):
+        """Test that extract_features_batch still returns lists of 26 floats."""
+        boxes = make_frame_boxes(12, seed=5)
+        result = extract_features_batch(boxes, FRAME_WIDTH, FRAME_HEIGHT, boxes, 12.5, 600.0)
+
+        assert len(result) == 12
+        np.testing.assert_allclose(np.array(result), scalar_features(boxes), rtol=1e-12, atol=1e-12)
+
+    def test_video_matrix_groups_by_frame(self):
+        """Test that whole-video extraction uses each frame as the neighborhood."""
+        frame_a = make_frame_boxes(15, frame_index=0, seed=11)
+        frame_b = make_frame_boxes(8, frame_index=1, seed=12)
+        interleaved = [box for pair in zip(frame_a, frame_b) for box in pair] + frame_a[len(frame_b) :]
+        timestamps = {0: 0.0, 1: 0.1}
+
+        result = extract_video_features_matrix(interleaved, FRAME_WIDTH, FRAME_HEIGHT, timestamps, 600.0)
+
+        frames = {0: frame_a, 1: frame_b}
+        for row, box in zip(result, interleaved):
+            expected = extract_features(
+                box, FRAME_WIDTH, FRAME_HEIGHT, frames[box.frame_index], timestamps[box.frame_index], 600.0
+            )
+            np.testing.assert_allclose(row, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.slow
+class TestBatchFeaturePerformance:
+    """Vectorized feature extraction on large frames."""
+
+    @pytest.mark.parametrize("n_boxes", [50, 200, 500])
+    def test_large_frame_matches_scalar(self, n_boxes):
+        """Full-frame features for 50-500 boxes match the scalar path."""
+        boxes = make_frame_boxes(n_boxes, seed=n_boxes)
+
+        expected = scalar_features(boxes)
+        result = extract_features_matrix(boxes, FRAME_WIDTH, FRAME_HEIGHT, boxes, 12.5, 600.0)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+    def test_knn_features_large_frame(self):
+        """k-nn features alone for a 500-box frame."""
+        coords = box_coordinates(make_frame_boxes(500, seed=42))
+
+        result = compute_knn_features(coords, coords)
+
+        assert result.shape == (500, 4)
+        assert np.isfinite(result).all()
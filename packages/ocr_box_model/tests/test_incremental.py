@@ -0,0 +1,297 @@
+"""Tests for incremental sufficient-statistics training."""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+from ocr_box_model import (
+    SufficientStats,
+    load_layout_config,
+    load_model,
+    load_sample_labels,
+    load_sufficient_stats,
+    model_from_stats,
+    sync_annotations,
+    train_model,
+    update_annotation,
+    update_annotations,
+    verify_incremental_state,
+)
+from ocr_box_model.train import extract_annotation_features, fetch_user_annotations
+
+FRAME_WIDTH = 1000
+FRAME_HEIGHT = 500
+
+
+def make_layout_db(n_frames: int, boxes_per_frame: int, seed: int = 0) -> sqlite3.Connection:
+    """Create an in-memory layout.db with OCR boxes and no labels."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE layout_config (
+            id INTEGER PRIMARY KEY, frame_width INTEGER, frame_height INTEGER,
+            crop_left INTEGER, crop_top INTEGER, crop_right INTEGER, crop_bottom INTEGER,
+            vertical_center INTEGER, anchor_type TEXT, anchor_position INTEGER
+        );
+        CREATE TABLE video_metadata (id INTEGER PRIMARY KEY, duration_seconds REAL);
+        CREATE TABLE full_frame_ocr (
+            frame_index INTEGER, box_index INTEGER, text TEXT, timestamp_seconds REAL,
+            x REAL, y REAL, width REAL, height REAL
+        );
+        CREATE TABLE full_frame_box_labels (
+            annotation_source TEXT DEFAULT 'full_frame', frame_index INTEGER, box_index INTEGER,
+            label TEXT, label_source TEXT DEFAULT 'user',
+            box_left INTEGER, box_top INTEGER, box_right INTEGER, box_bottom INTEGER
+        );
+        """
+    )
+    conn.execute(f"INSERT INTO layout_config (id, frame_width, frame_height) VALUES (1, {FRAME_WIDTH}, {FRAME_HEIGHT})")
+    conn.execute("INSERT INTO video_metadata VALUES (1, 100.0)")
+
+    rows = []
+    for frame_index in range(n_frames):
+        for box_index in range(boxes_per_frame):
+            rows.append(
+                (
+                    frame_index,
+                    box_index,
+                    rng.choice(["Hello", "你好", "42"]),
+                    frame_index / 10,
+                    rng.randrange(0, 90) / 100,
+                    rng.randrange(10, 90) / 100,
+                    rng.randrange(2, 10) / 100,
+                    rng.randrange(4, 10) / 100,
+                )
+            )
+    conn.executemany("INSERT INTO full_frame_ocr VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return conn
+
+
+def make_model_db() -> sqlite3.Connection:
+    """Create an in-memory layout-server.db."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE box_classification_model (id INTEGER PRIMARY KEY, model_version TEXT, trained_at TEXT)")
+    return conn
+
+
+def box_pixels(layout_conn: sqlite3.Connection, frame_index: int, box_index: int) -> tuple[int, int, int, int]:
+    """Pixel bounds of an OCR box (same conversion as training)."""
+    x, y, width, height = layout_conn.execute(
+        "SELECT x, y, width, height FROM full_frame_ocr WHERE frame_index = ? AND box_index = ?",
+        (frame_index, box_index),
+    ).fetchone()
+    left = int(x * FRAME_WIDTH)
+    bottom = int((1 - y) * FRAME_HEIGHT)
+    return left, bottom - int(height * FRAME_HEIGHT), left + int(width * FRAME_WIDTH), bottom
+
+
+def annotate(layout_conn: sqlite3.Connection, frame_index: int, box_index: int, label: str) -> None:
+    """Insert or replace a user label in layout.db."""
+    layout_conn.execute(
+        "DELETE FROM full_frame_box_labels WHERE frame_index = ? AND box_index = ?", (frame_index, box_index)
+    )
+    layout_conn.execute(
+        """
+        INSERT INTO full_frame_box_labels (frame_index, box_index, label, box_left, box_top, box_right, box_bottom)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (frame_index, box_index, label, *box_pixels(layout_conn, frame_index, box_index)),
+    )
+
+
+def box_features(layout_conn: sqlite3.Connection, frame_index: int, box_index: int) -> list[float]:
+    """Features of one annotated box, as the annotation handler would compute them."""
+    ann = next(
+        a for a in fetch_user_annotations(layout_conn) if (a.frame_index, a.box_index) == (frame_index, box_index)
+    )
+    layout = load_layout_config(layout_conn)
+    assert layout is not None
+    return extract_annotation_features(layout_conn, [ann], layout, 100.0)[0]
+
+
+def assert_models_close(a, b):
+    """Assert two ModelParams have matching parameters."""
+    assert a.n_training_samples == b.n_training_samples
+    assert a.prior_in == pytest.approx(b.prior_in)
+    for pa, pb in zip(a.in_features + a.out_features, b.in_features + b.out_features):
+        assert pa.mean == pytest.approx(pb.mean, rel=1e-6, abs=1e-9)
+        assert pa.std == pytest.approx(pb.std, rel=1e-6, abs=1e-9)
+    assert a.covariance_matrix == pytest.approx(b.covariance_matrix, rel=1e-6, abs=1e-9)
+
+
+@pytest.fixture
+def trained():
+    """Layout and model databases with 40 annotations and a trained model."""
+    layout_conn = make_layout_db(n_frames=20, boxes_per_frame=6)
+    for frame_index in range(20):
+        annotate(layout_conn, frame_index, 0, "in")
+        annotate(layout_conn, frame_index, 1, "out")
+    model_conn = make_model_db()
+    assert train_model(layout_conn, model_conn) == 40
+    return layout_conn, model_conn
+
+
+class TestIncrementalTraining:
+    """Incremental updates must match a from-scratch fit."""
+
+    def test_train_model_rebuilds_state(self, trained):
+        """Test that a full train leaves consistent running sums."""
+        layout_conn, model_conn = trained
+        stats = load_sufficient_stats(model_conn)
+
+        assert stats["in"].n == 20
+        assert stats["out"].n == 20
+        assert verify_incremental_state(layout_conn, model_conn)
+        assert_models_close(model_from_stats(stats["in"], stats["out"]), load_model(model_conn))
+
+    def test_add_change_remove(self, trained):
+        """Test add, relabel and remove against a full retrain."""
+        layout_conn, model_conn = trained
+
+        annotate(layout_conn, 5, 3, "in")
+        assert update_annotation(model_conn, 5, 3, "in", box_features(layout_conn, 5, 3)) == 41
+        assert verify_incremental_state(layout_conn, model_conn)
+
+        annotate(layout_conn, 5, 3, "out")
+        assert update_annotation(model_conn, 5, 3, "out", box_features(layout_conn, 5, 3)) == 41
+        assert verify_incremental_state(layout_conn, model_conn)
+
+        layout_conn.execute("DELETE FROM full_frame_box_labels WHERE frame_index = 7 AND box_index = 0")
+        assert update_annotation(model_conn, 7, 0, None) == 40
+        assert verify_incremental_state(layout_conn, model_conn)
+
+        incremental = load_model(model_conn)
+        scratch_conn = make_model_db()
+        train_model(layout_conn, scratch_conn)
+        assert_models_close(incremental, load_model(scratch_conn))
+
+    def test_detects_stale_state(self, trained):
+        """Test that verification fails when annotations change without an update."""
+        layout_conn, model_conn = trained
+        annotate(layout_conn, 2, 4, "in")
+
+        assert not verify_incremental_state(layout_conn, model_conn)
+
+    def test_reset_below_minimum(self, trained):
+        """Test that dropping below the minimum resets to the seed model."""
+        layout_conn, model_conn = trained
+        removals = [(frame_index, 0) for frame_index in range(11)] + [(frame_index, 1) for frame_index in range(10)]
+        results = [update_annotation(model_conn, fi, bi, None) for fi, bi in removals]
+
+        assert results[-2] == 20
+        assert results[-1] is None
+        assert load_model(model_conn) is None
+        assert load_sufficient_stats(model_conn)["in"].n == 9
+
+    def test_batch_update_matches_retrain(self, trained):
+        """Test that several changes applied together match a full retrain."""
+        layout_conn, model_conn = trained
+        annotate(layout_conn, 3, 2, "in")
+        annotate(layout_conn, 4, 2, "out")
+        annotate(layout_conn, 6, 0, "out")
+        layout_conn.execute("DELETE FROM full_frame_box_labels WHERE frame_index = 8 AND box_index = 1")
+
+        changes = [
+            (fi, bi, label, box_features(layout_conn, fi, bi))
+            for fi, bi, label in [(3, 2, "in"), (4, 2, "out"), (6, 0, "out")]
+        ]
+        assert update_annotations(model_conn, [*changes, (8, 1, None, None)]) == 41
+        assert verify_incremental_state(layout_conn, model_conn)
+        assert load_sample_labels(model_conn)[(6, 0)] == "out"
+
+    def test_sync_annotations_matches_retrain(self, trained):
+        """Test that syncing only the changed boxes from layout.db matches a full retrain."""
+        layout_conn, model_conn = trained
+        annotate(layout_conn, 3, 2, "in")
+        annotate(layout_conn, 6, 0, "out")
+        layout_conn.execute("DELETE FROM full_frame_box_labels WHERE frame_index = 8 AND box_index = 1")
+
+        assert sync_annotations(layout_conn, model_conn, [(3, 2), (6, 0), (8, 1), (9, 5)]) == 40
+        assert verify_incremental_state(layout_conn, model_conn)
+        assert load_sample_labels(model_conn)[(6, 0)] == "out"
+        assert (8, 1) not in load_sample_labels(model_conn)
+
+        scratch_conn = make_model_db()
+        train_model(layout_conn, scratch_conn)
+        assert_models_close(load_model(model_conn), load_model(scratch_conn))
+
+    def test_failed_batch_rolls_back(self, trained):
+        """Test that an error part-way through a batch leaves the state unchanged."""
+        layout_conn, model_conn = trained
+        annotate(layout_conn, 5, 3, "in")
+        features = box_features(layout_conn, 5, 3)
+
+        with pytest.raises(KeyError):
+            update_annotations(model_conn, [(5, 3, "in", features), (5, 4, "unknown", features)])
+
+        assert (5, 3) not in load_sample_labels(model_conn)
+        assert load_sufficient_stats(model_conn)["in"].n == 20
+        assert not model_conn.in_transaction
+
+    def test_requires_features_for_label(self, trained):
+        """Test that a label without a feature vector is rejected."""
+        _, model_conn = trained
+        with pytest.raises(ValueError):
+            update_annotation(model_conn, 0, 5, "in")
+
+
+class TestSufficientStats:
+    """Running statistics must stay accurate for features with large offsets."""
+
+    def test_variance_with_large_offset(self):
+        """Test add/remove against numpy when the mean dwarfs the spread."""
+        rng = np.random.default_rng(0)
+        samples = 1e9 + rng.normal(0.0, 1.0, size=(200, 26))
+        stats = SufficientStats()
+        for x in samples:
+            stats.add(x.tolist())
+        for x in samples[150:]:
+            stats.remove(x.tolist())
+
+        kept = samples[:150]
+        assert stats.n == 150
+        assert [p.mean for p in stats.gaussian_params()] == pytest.approx(kept.mean(axis=0).tolist(), rel=1e-12)
+        assert [p.std for p in stats.gaussian_params()] == pytest.approx(kept.std(axis=0).tolist(), rel=1e-4)
+        assert stats.covariance() == pytest.approx(np.cov(kept, rowvar=False), rel=1e-3, abs=1e-12)
+
+    def test_matches_from_samples(self):
+        """Test that incremental updates agree with the two-pass construction."""
+        rng = np.random.default_rng(1)
+        samples = rng.normal(5.0, 2.0, size=(50, 26)).tolist()
+        stats = SufficientStats()
+        for x in samples:
+            stats.add(x)
+
+        expected = SufficientStats.from_samples(samples)
+        assert stats.mean == pytest.approx(expected.mean)
+        assert stats.comoments == pytest.approx(expected.comoments)
+
+    def test_remove_last_sample(self):
+        """Test that removing every sample returns to empty statistics."""
+        stats = SufficientStats.from_samples([[1.0] * 26])
+        stats.remove([1.0] * 26)
+
+        assert stats.n == 0
+        assert not stats.comoments.any()
+
+
+@pytest.mark.slow
+class TestIncrementalPerformance:
+    """Incremental updates on a large video."""
+
+    def test_update_matches_retrain(self):
+        """One annotation update on a video with 2000 labels."""
+        layout_conn = make_layout_db(n_frames=500, boxes_per_frame=10, seed=1)
+        rng = random.Random(2)
+        for frame_index in range(500):
+            for box_index in range(4):
+                annotate(layout_conn, frame_index, box_index, rng.choice(["in", "out"]))
+        model_conn = make_model_db()
+        train_model(layout_conn, model_conn)
+
+        annotate(layout_conn, 250, 8, "in")
+        update_annotation(model_conn, 250, 8, "in", box_features(layout_conn, 250, 8))
+
+        assert verify_incremental_state(layout_conn, model_conn)
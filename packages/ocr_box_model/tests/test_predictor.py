@@ -0,0 +1,187 @@
+"""Tests for the compiled Gaussian Naive Bayes predictor."""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+from ocr_box_model import (
+    NUM_FEATURES,
+    BoxBounds,
+    CompiledPredictor,
+    GaussianParams,
+    ModelParams,
+    VideoLayoutConfig,
+    compile_model,
+    predict_batch,
+    predict_bayesian,
+    predict_box_label,
+    predict_with_heuristics,
+    save_model,
+)
+from ocr_box_model.types import SEED_IN_PARAMS, SEED_OUT_PARAMS
+
+
+def make_model(seed: int = 0, prior_in: float = 0.3) -> ModelParams:
+    """Create a model with random Gaussian parameters."""
+    rng = random.Random(seed)
+    return ModelParams(
+        model_version="test",
+        n_training_samples=100,
+        prior_in=prior_in,
+        prior_out=1 - prior_in,
+        in_features=[GaussianParams(mean=rng.uniform(-1, 1), std=rng.uniform(0.05, 2)) for _ in range(NUM_FEATURES)],
+        out_features=[GaussianParams(mean=rng.uniform(-1, 1), std=rng.uniform(0.05, 2)) for _ in range(NUM_FEATURES)],
+    )
+
+
+def make_model_db(model: ModelParams) -> sqlite3.Connection:
+    """Create an in-memory layout database holding a saved model and OCR rows."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE box_classification_model (id INTEGER PRIMARY KEY, model_version TEXT, trained_at TEXT)")
+    conn.execute("CREATE TABLE video_metadata (id INTEGER PRIMARY KEY, duration_seconds REAL)")
+    conn.execute("INSERT INTO video_metadata VALUES (1, 120.0)")
+    conn.execute(
+        "CREATE TABLE full_frame_ocr (frame_index INTEGER, box_index INTEGER, text TEXT, timestamp_seconds REAL)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE full_frame_box_labels (
+            annotation_source TEXT, frame_index INTEGER, box_index INTEGER, label TEXT, label_source TEXT
+        )
+        """
+    )
+    save_model(conn, model)
+    return conn
+
+
+class TestCompiledPredictorParity:
+    """Compiled predictions must match predict_bayesian."""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_predict_bayesian(self, seed):
+        """Test labels and confidences against the scalar predictor."""
+        model = make_model(seed)
+        rng = np.random.default_rng(seed)
+        features = rng.normal(0, 3, size=(200, NUM_FEATURES))
+
+        labels, confidences = compile_model(model).predict_matrix(features)
+
+        for row, label, confidence in zip(features, labels, confidences):
+            expected = predict_bayesian(row.tolist(), model)
+            assert label == expected.label
+            assert confidence == pytest.approx(expected.confidence, rel=1e-9, abs=1e-12)
+
+    def test_extreme_features_hit_pdf_floor(self):
+        """Test that far-out features are floored like the scalar path."""
+        model = make_model(4)
+        features = np.full((3, NUM_FEATURES), 1e6)
+        features[1] = -1e6
+
+        predictions = compile_model(model).predict(features)
+
+        for row, prediction in zip(features, predictions):
+            expected = predict_bayesian(row.tolist(), model)
+            assert prediction.label == expected.label
+            assert prediction.confidence == pytest.approx(expected.confidence)
+
+    def test_degenerate_std(self):
+        """Test features with zero std use the degenerate density."""
+        model = make_model(5)
+        model.in_features[3] = GaussianParams(mean=1.0, std=0.0)
+        features = np.zeros((2, NUM_FEATURES))
+        features[0, 3] = 1.0
+
+        predictions = CompiledPredictor(model).predict(features)
+
+        for row, prediction in zip(features, predictions):
+            expected = predict_bayesian(row.tolist(), model)
+            assert prediction.label == expected.label
+            assert prediction.confidence == pytest.approx(expected.confidence)
+
+    def test_seed_model(self):
+        """Test compiling the seed model."""
+        model = ModelParams(
+            model_version="seed_v2",
+            n_training_samples=0,
+            prior_in=0.5,
+            prior_out=0.5,
+            in_features=SEED_IN_PARAMS,
+            out_features=SEED_OUT_PARAMS,
+        )
+        features = [[0.5] * NUM_FEATURES]
+
+        prediction = compile_model(model).predict(features)[0]
+
+        expected = predict_bayesian(features[0], model)
+        assert prediction.label == expected.label
+        assert prediction.confidence == pytest.approx(expected.confidence)
+
+    def test_wrong_feature_count(self):
+        """Test that mismatched feature matrices are rejected."""
+        with pytest.raises(ValueError):
+            compile_model(make_model()).log_posteriors(np.zeros((2, 5)))
+
+    def test_predict_batch_matches_per_box(self):
+        """Test predict_batch against predict_box_label with a real model table."""
+        model = make_model(6)
+        conn = make_model_db(model)
+        layout = VideoLayoutConfig(frame_width=1920, frame_height=1080)
+        boxes = [
+            BoxBounds(left=100 * i, top=900, right=100 * i + 80, bottom=940, frame_index=3, box_index=i, text="Hi")
+            for i in range(12)
+        ]
+        conn.executemany(
+            "INSERT INTO full_frame_ocr VALUES (3, ?, 'Hi', 0.3)",
+            [(i,) for i in range(12)],
+        )
+        conn.execute("INSERT INTO full_frame_box_labels VALUES ('full_frame', 3, 4, 'in', 'user')")
+
+        batch = predict_batch(boxes, layout, boxes, conn)
+
+        for box, prediction in zip(boxes, batch):
+            expected = predict_box_label(box, layout, boxes, conn)
+            assert prediction.label == expected.label
+            assert prediction.confidence == pytest.approx(expected.confidence)
+
+    @pytest.mark.parametrize("prior_in", [0.0, 1.0])
+    def test_zero_prior_falls_back_to_heuristics(self, prior_in):
+        """Test that a class with prior 0 falls back to heuristics like the scalar path."""
+        model = make_model(8, prior_in=prior_in)
+        with pytest.raises(ValueError):
+            compile_model(model)
+
+        conn = make_model_db(model)
+        layout = VideoLayoutConfig(frame_width=1920, frame_height=1080)
+        boxes = [
+            BoxBounds(
+                left=100 * i, top=200 + 80 * i, right=100 * i + 80, bottom=240 + 80 * i, frame_index=0, box_index=i
+            )
+            for i in range(10)
+        ]
+        conn.executemany("INSERT INTO full_frame_ocr VALUES (0, ?, 'Hi', 0.0)", [(i,) for i in range(10)])
+
+        batch = predict_batch(boxes, layout, boxes, conn)
+
+        assert batch == [predict_box_label(box, layout, boxes, conn) for box in boxes]
+        assert batch == [predict_with_heuristics(box, layout) for box in boxes]
+
+
+@pytest.mark.slow
+class TestCompiledPredictorPerformance:
+    """Compiled prediction at video scale."""
+
+    def test_video_scale_scoring(self):
+        """Score 200k boxes in one pass and spot-check against the scalar path."""
+        model = make_model(7)
+        predictor = compile_model(model)
+        features = np.random.default_rng(0).normal(0, 2, size=(200_000, NUM_FEATURES))
+
+        labels, confidences = predictor.predict_matrix(features)
+
+        assert labels.shape == (200_000,)
+        assert np.all((confidences >= 0.5) & (confidences <= 1.0))
+        for i in range(0, 200_000, 20_000):
+            expected = predict_bayesian(features[i].tolist(), model)
+            assert labels[i] == expected.label
+            assert confidences[i] == pytest.approx(expected.confidence, rel=1e-9, abs=1e-12)
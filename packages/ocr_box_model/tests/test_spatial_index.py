@@ -0,0 +1,159 @@
+"""Tests for the Mahalanobis spatial index and indexed affected-box detection."""
+
+import numpy as np
+import pytest
+from ocr_box_model import NUM_FEATURES, MahalanobisIndex, Prediction
+from ocr_box_model.config import MAX_MAHALANOBIS_DISTANCE, MIN_CHANGE_PROBABILITY
+from ocr_box_model.feature_importance import compute_mahalanobis_distance
+from ocr_box_model.spatial_index import whitening_matrix
+from ocr_box_model.streaming import (
+    estimate_prediction_change_prob,
+    identify_affected_boxes_indexed,
+)
+from ocr_box_model.types import Annotation, BoxWithPrediction
+
+
+def make_covariance_inverse(seed: int = 0) -> np.ndarray:
+    """Random symmetric positive definite inverse covariance (flattened)."""
+    rng = np.random.default_rng(seed)
+    a = rng.normal(0, 0.3, size=(NUM_FEATURES, NUM_FEATURES))
+    return (a @ a.T + np.eye(NUM_FEATURES)).ravel()
+
+
+def make_clustered_features(n: int, n_clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Features grouped in tight clusters spread over a wide range (like real boxes)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-40, 40, size=(n_clusters, NUM_FEATURES))
+    return centers[rng.integers(0, n_clusters, size=n)] + rng.normal(0, 0.3, size=(n, NUM_FEATURES))
+
+
+def make_boxes(features: np.ndarray, seed: int = 0) -> list[BoxWithPrediction]:
+    """Wrap feature rows as boxes with random predictions."""
+    rng = np.random.default_rng(seed)
+    return [
+        BoxWithPrediction(
+            frame_index=i,
+            box_index=0,
+            features=row.tolist(),
+            current_prediction=Prediction(label="in", confidence=float(rng.uniform(0.5, 1.0))),
+        )
+        for i, row in enumerate(features)
+    ]
+
+
+def brute_force_within(features: np.ndarray, query: np.ndarray, inverse: np.ndarray, radius: float) -> np.ndarray:
+    """Rows within radius using the reference Mahalanobis distance."""
+    inv = inverse.tolist()
+    return np.array(
+        [
+            i
+            for i, row in enumerate(features)
+            if compute_mahalanobis_distance(row.tolist(), query.tolist(), inv) <= radius
+        ]
+    )
+
+
+class TestMahalanobisIndex:
+    """Index queries must match brute-force Mahalanobis distances."""
+
+    def test_whitening_preserves_distance(self):
+        """Test that whitened Euclidean distance equals Mahalanobis distance."""
+        inverse = make_covariance_inverse(1)
+        rng = np.random.default_rng(1)
+        x, y = rng.normal(size=(2, NUM_FEATURES))
+
+        w = whitening_matrix(inverse)
+
+        expected = compute_mahalanobis_distance(x.tolist(), y.tolist(), inverse.tolist())
+        assert np.linalg.norm((x - y) @ w) == pytest.approx(expected, rel=1e-9)
+
+    def test_whitening_non_positive_definite(self):
+        """Test the eigen-decomposition fallback for a semi-definite matrix."""
+        inverse = np.eye(NUM_FEATURES)
+        inverse[3, 3] = 0.0
+
+        w = whitening_matrix(inverse.ravel())
+
+        assert np.allclose(w @ w.T, inverse)
+
+    def test_query_matches_brute_force(self):
+        """Test radius query against the reference distance for every row."""
+        inverse = make_covariance_inverse(2)
+        features = make_clustered_features(1500, n_clusters=30, seed=2)
+        index = MahalanobisIndex(features, inverse, radius=6.0)
+
+        for query in features[:10]:
+            rows, distances = index.query_radius(query)
+            expected = brute_force_within(features, query, inverse, 6.0)
+            assert rows.tolist() == expected.tolist()
+            for row, distance in zip(rows, distances):
+                ref = compute_mahalanobis_distance(features[row].tolist(), query.tolist(), inverse.tolist())
+                assert distance == pytest.approx(ref, rel=1e-9, abs=1e-9)
+
+    def test_refresh_covariance(self):
+        """Test that a covariance refresh re-whitens and unchanged refreshes are skipped."""
+        features = make_clustered_features(500, n_clusters=20, seed=3)
+        index = MahalanobisIndex(features, make_covariance_inverse(3), radius=5.0)
+        new_inverse = make_covariance_inverse(4)
+
+        assert not index.refresh_covariance(make_covariance_inverse(3))
+        assert index.refresh_covariance(new_inverse)
+
+        rows, _ = index.query_radius(features[0])
+        assert rows.tolist() == brute_force_within(features, features[0], new_inverse, 5.0).tolist()
+
+    def test_update_rows(self):
+        """Test moving rows to new feature vectors."""
+        inverse = make_covariance_inverse(5)
+        features = make_clustered_features(400, n_clusters=20, seed=5)
+        index = MahalanobisIndex(features, inverse, radius=5.0)
+
+        features[[3, 7]] = features[100] + 0.01
+        index.update_rows([3, 7], features[[3, 7]])
+
+        rows, _ = index.query_radius(features[100])
+        assert {3, 7, 100} <= set(rows.tolist())
+        assert rows.tolist() == brute_force_within(features, features[100], inverse, 5.0).tolist()
+
+
+class TestIndexedAffectedBoxes:
+    """Indexed detection must agree with the full scan inside the radius."""
+
+    def test_matches_full_scan_within_radius(self):
+        """Test change probabilities and ordering for boxes in the radius."""
+        inverse = make_covariance_inverse(6)
+        features = make_clustered_features(800, n_clusters=15, seed=6)
+        boxes = make_boxes(features, seed=6)
+        index = MahalanobisIndex(features, inverse)
+        annotation = Annotation(frame_index=0, box_index=0, label="in", features=features[0].tolist())
+
+        result = identify_affected_boxes_indexed(annotation, boxes, index)
+
+        within = set(brute_force_within(features, features[0], inverse, MAX_MAHALANOBIS_DISTANCE).tolist())
+        expected = [
+            (box, estimate_prediction_change_prob(box, annotation, inverse.tolist()))
+            for i, box in enumerate(boxes)
+            if i in within
+        ]
+        expected = [(box, prob) for box, prob in expected if prob >= MIN_CHANGE_PROBABILITY]
+        expected.sort(key=lambda x: -x[1])
+
+        assert [box.frame_index for box, _ in result] == [box.frame_index for box, _ in expected]
+        assert [prob for _, prob in result] == pytest.approx([prob for _, prob in expected])
+
+
+@pytest.mark.slow
+class TestSpatialIndexPerformance:
+    """Indexed detection over a large feature set."""
+
+    def test_query_200k_boxes_matches_full_scan(self):
+        """Radius queries over 200k boxes return what a full scan finds."""
+        inverse = make_covariance_inverse(7)
+        features = make_clustered_features(200_000, n_clusters=2000, seed=7)
+        index = MahalanobisIndex(features, inverse)
+
+        for query in features[:3]:
+            rows, _ = index.query_radius(query)
+            diff = features - query
+            distances = np.sqrt(np.einsum("ij,jk,ik->i", diff, inverse.reshape(NUM_FEATURES, NUM_FEATURES), diff))
+            assert rows.tolist() == np.flatnonzero(distances <= MAX_MAHALANOBIS_DISTANCE).tolist()
@@ -1,10 +1,14 @@
 """Shared OCR processing utilities using OCR service or macOS LiveText fallback."""
 
 from ocr_utils.database import (
+    BulkWriteStats,
+    bulk_write_connection,
     ensure_ocr_table,
     load_ocr_for_frame,
     load_ocr_for_frame_range,
+    ocr_result_rows,
     write_ocr_result_to_database,
+    write_ocr_results_bulk,
 )
 from ocr_utils.ocr_service_client import OCRServiceAdapter, OCRServiceError
 from ocr_utils.processing import (
@@ -33,6 +37,10 @@ __all__ = [
     "create_ocr_visualization",
     "ensure_ocr_table",
     "write_ocr_result_to_database",
+    "write_ocr_results_bulk",
+    "ocr_result_rows",
+    "BulkWriteStats",
+    "bulk_write_connection",
     "load_ocr_for_frame",
     "load_ocr_for_frame_range",
 ]
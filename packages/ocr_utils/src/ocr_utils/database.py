@@ -5,7 +5,12 @@ Currently used with full_frame_ocr table.
 """
 
 import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 
 def ensure_ocr_table(db_path: Path, table_name: str) -> None:
@@ -112,6 +117,137 @@ def write_ocr_result_to_database(
         conn.close()
 
 
+@dataclass
+class BulkWriteStats:
+    """Summary of a bulk OCR write."""
+
+    frames: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Inserted rows per second of wall time."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _frame_index_from_id(frame_id: str) -> int:
+    """Parse a frame index from "frame_0000000100" or "frames/frame_0000000100.jpg"."""
+    return int(Path(frame_id).name.split("_")[1].split(".")[0])
+
+
+def ocr_result_rows(ocr_result: Any) -> Iterator[tuple]:
+    """Yield table rows for one OCRResult or ocrmac-style result dictionary.
+
+    Args:
+        ocr_result: OCRResult object or ocrmac-style dictionary (see
+            write_ocr_result_to_database)
+
+    Returns:
+        Iterator of (frame_index, box_index, text, confidence, x, y, width,
+        height) tuples
+    """
+    if isinstance(ocr_result, dict):
+        frame_index = _frame_index_from_id(ocr_result["image_path"])
+        for box_index, (text, confidence, bbox) in enumerate(ocr_result.get("annotations", [])):
+            x, y, width, height = bbox
+            yield (frame_index, box_index, text, confidence, x, y, width, height)
+    else:
+        frame_index = _frame_index_from_id(ocr_result.id)
+        for box_index, char in enumerate(ocr_result.characters):
+            bbox = char.bbox
+            # OCRResult carries no per-character confidence
+            yield (frame_index, box_index, char.text, 1.0, bbox.x, bbox.y, bbox.width, bbox.height)
+
+
+@contextmanager
+def bulk_write_connection(db_path: Path, build_once: bool = True) -> Iterator[sqlite3.Connection]:
+    """Open a connection tuned for bulk inserts.
+
+    The database runs in WAL mode for the duration of the write and is
+    switched back to its previous journal mode on close, so files that are
+    shipped elsewhere (e.g. layout.db to the browser) keep their header.
+
+    Args:
+        db_path: Path to database file
+        build_once: Database is being built from scratch and can be rebuilt
+            if the process dies, so skip fsyncs (synchronous=OFF)
+
+    Yields:
+        Open sqlite3 connection
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={'OFF' if build_once else 'NORMAL'}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        yield conn
+        conn.commit()
+        if journal_mode.lower() != "wal":
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    finally:
+        conn.close()
+
+
+def write_ocr_results_bulk(
+    ocr_results: Iterable[Any],
+    db_path: Path,
+    table_name: str,
+    batch_size: int = 50_000,
+    build_once: bool = True,
+) -> BulkWriteStats:
+    """Write many OCR results over a single connection.
+
+    Rows are inserted with executemany, committing once per batch_size rows,
+    instead of opening a connection and committing per frame. Existing
+    (frame_index, box_index) rows are left untouched, as in
+    write_ocr_result_to_database.
+
+    Args:
+        ocr_results: OCRResult objects or ocrmac-style dictionaries (see
+            write_ocr_result_to_database); may be a generator
+        db_path: Path to captions.db file
+        table_name: Table name (e.g., 'full_frame_ocr')
+        batch_size: Rows per transaction
+        build_once: Database is being built from scratch and can be rebuilt
+            if the process dies, so skip fsyncs (synchronous=OFF)
+
+    Returns:
+        BulkWriteStats with frames, inserted rows and rows_per_sec
+    """
+    sql = f"""
+        INSERT INTO {table_name}
+        (frame_index, box_index, text, confidence, x, y, width, height)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(frame_index, box_index) DO NOTHING
+    """
+    stats = BulkWriteStats()
+    start = time.perf_counter()
+
+    with bulk_write_connection(db_path, build_once=build_once) as conn:
+        changes_before = conn.total_changes
+
+        batch: list[tuple] = []
+        for ocr_result in ocr_results:
+            stats.frames += 1
+            batch.extend(ocr_result_rows(ocr_result))
+            if len(batch) >= batch_size:
+                with conn:
+                    conn.executemany(sql, batch)
+                batch.clear()
+
+        if batch:
+            with conn:
+                conn.executemany(sql, batch)
+
+        # ON CONFLICT DO NOTHING rows are not counted as changes
+        stats.rows = conn.total_changes - changes_before
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
 def load_ocr_for_frame(
     db_path: Path,
     frame_index: int,
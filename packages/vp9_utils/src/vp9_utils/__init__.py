@@ -3,8 +3,10 @@
 from .encoder import (
     EncodingResult,
     FrameType,
+    PipedVP9Encoder,
     encode_video_chunks,
     get_frames_from_db,
+    iter_modulo_chunks,
     organize_frames_by_modulo,
 )
 from .wasabi_client import (
@@ -22,7 +24,9 @@ __all__ = [
     # Encoding functions
     "encode_video_chunks",
     "get_frames_from_db",
+    "iter_modulo_chunks",
     "organize_frames_by_modulo",
+    "PipedVP9Encoder",
     # Upload functions
     "upload_chunks_to_wasabi",
     "test_wasabi_connection",
@@ -1,13 +1,46 @@
 """VP9 video encoding utilities for frame chunks."""
 
+import os
 import sqlite3
 import subprocess
 import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable, Literal, TypedDict
 
 FrameType = Literal["cropped", "full"]
 
+# Input frame rate: 10 fps (100ms per frame)
+FRAME_RATE = 10
+
+
+def vp9_output_args(crf: int = 30) -> list[str]:
+    """ffmpeg output options shared by every chunk encode."""
+    # VP9 encoding parameters:
+    # -c:v libvpx-vp9: VP9 codec
+    # -crf 30: Constant quality (0-63, lower = better quality)
+    # -b:v 0: Use constant quality mode
+    # -row-mt 1: Enable row-based multithreading
+    # -g 32: Keyframe interval (match chunk size)
+    # -pix_fmt yuv420p: Pixel format for compatibility
+    return ["-c:v", "libvpx-vp9", "-crf", str(crf), "-b:v", "0", "-row-mt", "1", "-g", "32", "-pix_fmt", "yuv420p"]
+
+
+def default_encode_workers() -> int:
+    """Concurrent encodes for this machine: one per two CPUs available to the process.
+
+    libvpx with row-mt keeps about two cores busy per encode, so this fills the
+    CPUs without oversubscribing them. Uses the scheduler affinity where
+    available so container CPU limits are respected.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, cpus // 2)
+
 
 class EncodingResult(TypedDict):
     """Result from encoding operation."""
@@ -22,6 +55,8 @@ class EncodingResult(TypedDict):
 def get_frames_from_db(db_path: Path, frame_type: FrameType = "cropped") -> list[tuple[int, bytes, int, int]]:
     """Extract frames from database.
 
+    Loads every frame into memory; use iter_modulo_chunks to stream them.
+
     Args:
         db_path: Path to SQLite database
         frame_type: Type of frames to extract ("cropped" or "full")
@@ -92,6 +127,85 @@ def organize_frames_by_modulo(
     return organized
 
 
+def _modulo_condition(modulo: int, modulo_levels: list[int]) -> str:
+    """SQL condition selecting a level's frames, as organize_frames_by_modulo assigns them."""
+    conditions = [f"frame_index % {int(modulo)} = 0"]
+    conditions.extend(f"frame_index % {int(higher)} != 0" for higher in modulo_levels if higher > modulo)
+    return " AND ".join(conditions)
+
+
+def count_modulo_frames(db_path: Path, frame_type: FrameType, modulo_levels: list[int]) -> dict[int, int]:
+    """Count the frames in each modulo level without reading any image data.
+
+    Args:
+        db_path: Path to SQLite database
+        frame_type: Type of frames to count ("cropped" or "full")
+        modulo_levels: Modulo levels to count
+
+    Returns:
+        Dict mapping modulo level to frame count
+    """
+    table_name = f"{frame_type}_frames"
+    sums = ", ".join(f"SUM({_modulo_condition(modulo, modulo_levels)})" for modulo in modulo_levels)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = conn.execute(f"SELECT {sums} FROM {table_name}").fetchone()
+    finally:
+        conn.close()
+
+    return {modulo: count or 0 for modulo, count in zip(modulo_levels, counts)}
+
+
+def iter_modulo_chunks(
+    db_path: Path,
+    frame_type: FrameType = "cropped",
+    modulo_levels: list[int] | None = None,
+    chunk_size: int = 32,
+) -> Iterator[tuple[int, list[tuple[int, bytes, int, int]]]]:
+    """Stream frames from the database one chunk at a time.
+
+    Levels are read in the order given (coarsest first for [16, 4, 1]), each
+    as a series of frame_index range queries, so only one chunk of images is
+    held at a time however long the video is. Chunks contain the same frames
+    as slicing organize_frames_by_modulo's output.
+
+    Args:
+        db_path: Path to SQLite database
+        frame_type: Type of frames to read ("cropped" or "full")
+        modulo_levels: Modulo levels to read (default: [16, 4, 1])
+        chunk_size: Frames per chunk
+
+    Yields:
+        (modulo, frames) with frames as (frame_index, image_data, width, height)
+    """
+    if modulo_levels is None:
+        modulo_levels = [16, 4, 1]
+    table_name = f"{frame_type}_frames"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for modulo in modulo_levels:
+            query = f"""
+                SELECT frame_index, image_data, width, height
+                FROM {table_name}
+                WHERE frame_index > ? AND {_modulo_condition(modulo, modulo_levels)}
+                ORDER BY frame_index
+                LIMIT ?
+            """
+            last_frame_index = -1
+            while True:
+                chunk_frames = conn.execute(query, (last_frame_index, chunk_size)).fetchall()
+                if not chunk_frames:
+                    break
+                yield modulo, chunk_frames
+                if len(chunk_frames) < chunk_size:
+                    break
+                last_frame_index = chunk_frames[-1][0]
+    finally:
+        conn.close()
+
+
 def write_frames_to_temp_dir(frames: list[tuple[int, bytes, int, int]], temp_dir: Path) -> tuple[int, int]:
     """Write frames as JPEG files to temporary directory.
 
@@ -131,34 +245,15 @@ def encode_chunk(input_dir: Path, output_path: Path, width: int, height: int, cr
         height: Frame height
         crf: Constant quality (0-63, lower = better quality)
     """
-    # VP9 encoding parameters:
-    # -c:v libvpx-vp9: VP9 codec
-    # -crf 30: Constant quality (0-63, lower = better quality)
-    # -b:v 0: Use constant quality mode
-    # -row-mt 1: Enable row-based multithreading
-    # -g 32: Keyframe interval (match chunk size)
-    # -pix_fmt yuv420p: Pixel format for compatibility
-
     cmd = [
         "ffmpeg",
         "-framerate",
-        "10",  # 10 fps (100ms per frame)
+        str(FRAME_RATE),
         "-pattern_type",
         "glob",
         "-i",
         str(input_dir / "frame_*.jpg"),
-        "-c:v",
-        "libvpx-vp9",
-        "-crf",
-        str(crf),
-        "-b:v",
-        "0",
-        "-row-mt",
-        "1",
-        "-g",
-        "32",
-        "-pix_fmt",
-        "yuv420p",
+        *vp9_output_args(crf),
         "-y",  # Overwrite output file
         str(output_path),
     ]
@@ -166,6 +261,146 @@ def encode_chunk(input_dir: Path, output_path: Path, width: int, height: int, cr
     subprocess.run(cmd, check=True, capture_output=True)
 
 
+def encode_chunk_piped(
+    frames: Iterable[bytes],
+    output_path: Path,
+    crf: int = 30,
+    raw_size: tuple[int, int] | None = None,
+) -> None:
+    """Encode frames into a VP9 WebM chunk by streaming them to ffmpeg's stdin.
+
+    Produces the same container and codec settings as encode_chunk without
+    writing any temporary files.
+
+    Args:
+        frames: JPEG images, or raw RGB24 frames if raw_size is given
+        output_path: Output .webm file path
+        crf: Constant quality (0-63, lower = better quality)
+        raw_size: (width, height) of raw RGB24 frames
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    if raw_size is None:
+        input_args = ["-f", "image2pipe", "-c:v", "mjpeg"]
+    else:
+        width, height = raw_size
+        input_args = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}"]
+
+    cmd = [
+        "ffmpeg",
+        "-nostats",
+        "-loglevel",
+        "error",
+        *input_args,
+        "-framerate",
+        str(FRAME_RATE),
+        "-i",
+        "pipe:0",
+        *vp9_output_args(crf),
+        "-y",  # Overwrite output file
+        str(output_path),
+    ]
+
+    # stderr goes to a file: an unread pipe could fill up and stall ffmpeg
+    # while it still has frames to read from us
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        assert process.stdin is not None  # For type checker
+        try:
+            for frame in frames:
+                process.stdin.write(frame)
+        except BrokenPipeError:
+            # ffmpeg exited early; its exit code and stderr explain why
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        process.communicate()
+        if process.returncode != 0:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr_file.read())
+
+
+def _progress_reporter(progress_callback: Callable[[int, int], None] | None, total: int) -> Callable[[Future], None]:
+    """Done-callback that reports (completed, total) as encodes finish."""
+    completed = 0
+    lock = threading.Lock()
+
+    def on_done(_: Future) -> None:
+        nonlocal completed
+        with lock:
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total)
+
+    return on_done
+
+
+class PipedVP9Encoder:
+    """Runs several piped ffmpeg encodes at once, with a bounded backlog.
+
+    Each encode is its own ffmpeg process, fed from a worker thread.
+    submit() blocks once max_pending chunks are waiting, so producers can't
+    run arbitrarily far ahead of the encoders and hold every frame in memory.
+
+    Example:
+        >>> with PipedVP9Encoder() as encoder:
+        ...     future = encoder.submit(jpeg_frames, Path("chunk_0000000000.webm"))
+        >>> future.result()
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int | None = None, crf: int = 30):
+        """
+        Args:
+            max_workers: Concurrent ffmpeg processes (default: default_encode_workers())
+            max_pending: Chunks queued beyond the running ones (default: max_workers)
+            crf: VP9 quality setting
+        """
+        self.max_workers = max_workers or default_encode_workers()
+        self.max_pending = self.max_workers if max_pending is None else max_pending
+        self.crf = crf
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vp9-encode")
+
+    def submit(
+        self, frames: Iterable[bytes], output_path: Path, raw_size: tuple[int, int] | None = None
+    ) -> "Future[Path]":
+        """Queue a chunk for encoding, blocking while the backlog is full.
+
+        Args:
+            frames: JPEG images, or raw RGB24 frames if raw_size is given
+            output_path: Output .webm file path
+            raw_size: (width, height) of raw RGB24 frames
+
+        Returns:
+            Future resolving to output_path once the chunk is encoded
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._encode, frames, output_path, raw_size)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _encode(self, frames: Iterable[bytes], output_path: Path, raw_size: tuple[int, int] | None) -> Path:
+        encode_chunk_piped(frames, output_path, self.crf, raw_size)
+        return output_path
+
+    def close(self) -> None:
+        """Wait for queued encodes and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "PipedVP9Encoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 def encode_modulo_chunks(
     modulo: int,
     frames: list[tuple[int, bytes, int, int]],
@@ -173,52 +408,55 @@ def encode_modulo_chunks(
     chunk_size: int = 32,
     crf: int = 30,
     progress_callback: Callable[[int, int], None] | None = None,
+    encoder: PipedVP9Encoder | None = None,
 ) -> list[Path]:
     """Encode all chunks for a modulo level.
 
+    Chunks are piped to ffmpeg and encoded concurrently.
+
     Args:
         modulo: Modulo level (16, 4, or 1)
         frames: List of frames for this modulo
         output_dir: Directory to write chunks
         chunk_size: Frames per chunk
-        crf: VP9 quality setting
-        progress_callback: Optional callback(current_chunk, total_chunks)
+        crf: VP9 quality setting (ignored if encoder is given)
+        progress_callback: Optional callback(completed_chunks, total_chunks)
+        encoder: Encoder to share across levels (default: a new one for this level)
 
     Returns:
-        List of encoded chunk file paths
+        List of encoded chunk file paths, in frame order
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    chunk_paths = []
 
     # Split frames into chunks
     num_chunks = (len(frames) + chunk_size - 1) // chunk_size
 
-    for chunk_idx in range(num_chunks):
-        start_idx = chunk_idx * chunk_size
-        end_idx = min(start_idx + chunk_size, len(frames))
-        chunk_frames = frames[start_idx:end_idx]
-
-        # Get start frame index for chunk filename
-        start_frame_index = chunk_frames[0][0]
+    own_encoder = encoder is None
+    if encoder is None:
+        encoder = PipedVP9Encoder(crf=crf)
 
-        chunk_filename = f"chunk_{start_frame_index:010d}.webm"
-        chunk_path = output_dir / chunk_filename
+    on_done = _progress_reporter(progress_callback, num_chunks)
+    futures = []
+    try:
+        for chunk_idx in range(num_chunks):
+            start_idx = chunk_idx * chunk_size
+            end_idx = min(start_idx + chunk_size, len(frames))
+            chunk_frames = frames[start_idx:end_idx]
 
-        # Write frames to temp directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            width, height = write_frames_to_temp_dir(chunk_frames, temp_path)
+            # Get start frame index for chunk filename
+            start_frame_index = chunk_frames[0][0]
 
-            # Encode chunk
-            encode_chunk(temp_path, chunk_path, width, height, crf)
+            chunk_filename = f"chunk_{start_frame_index:010d}.webm"
+            chunk_path = output_dir / chunk_filename
 
-        chunk_paths.append(chunk_path)
+            future = encoder.submit([image_data for _, image_data, _, _ in chunk_frames], chunk_path)
+            future.add_done_callback(on_done)
+            futures.append(future)
 
-        # Call progress callback
-        if progress_callback:
-            progress_callback(chunk_idx + 1, num_chunks)
-
-    return chunk_paths
+        return [future.result() for future in futures]
+    finally:
+        if own_encoder:
+            encoder.close()
 
 
 def encode_video_chunks(
@@ -230,9 +468,15 @@ def encode_video_chunks(
     frames_per_chunk: int = 32,
     crf: int = 30,
     progress_callback: Callable[[int, int], None] | None = None,
+    max_workers: int | None = None,
+    read_ahead_chunks: int | None = None,
 ) -> EncodingResult:
     """Encode frames to VP9 WebM chunks.
 
+    Frames are streamed from the database a chunk at a time and encoded
+    concurrently, so peak memory is about max_workers + read_ahead_chunks
+    chunks of images regardless of video length.
+
     Args:
         db_path: Path to SQLite database
         video_id: Video ID for namespace
@@ -242,7 +486,9 @@ def encode_video_chunks(
                        Defaults: cropped=[16,4,1], full=[1]
         frames_per_chunk: Number of frames per chunk
         crf: VP9 quality setting (0-63, lower = better)
-        progress_callback: Optional callback(current, total)
+        progress_callback: Optional callback(completed_chunks, total_chunks)
+        max_workers: Concurrent ffmpeg encodes (default: one per two CPUs)
+        read_ahead_chunks: Chunks read ahead of the running encodes (default: max_workers)
 
     Returns:
         EncodingResult with metrics and file paths
@@ -251,39 +497,34 @@ def encode_video_chunks(
     if modulo_levels is None:
         modulo_levels = [16, 4, 1] if frame_type == "cropped" else [1]
 
-    # Get frames from database
-    frames = get_frames_from_db(db_path, frame_type)
-    if not frames:
+    # Count frames per level up front (no image data is read)
+    frame_counts = count_modulo_frames(db_path, frame_type, modulo_levels)
+    total_frames = sum(frame_counts.values())
+    if not total_frames:
         raise ValueError(f"No {frame_type} frames found in database")
 
-    # Organize by modulo
-    modulo_frames = organize_frames_by_modulo(frames, modulo_levels)
-
     # Set up output directories
     output_base = output_dir / video_id / f"{frame_type}_frames"
-    output_base.mkdir(parents=True, exist_ok=True)
+    for modulo in modulo_levels:
+        (output_base / f"modulo_{modulo}").mkdir(parents=True, exist_ok=True)
 
-    # Encode chunks for each modulo level
-    all_chunk_files = []
-    total_chunks_encoded = 0
+    total_chunks = sum((count + frames_per_chunk - 1) // frames_per_chunk for count in frame_counts.values())
+    on_done = _progress_reporter(progress_callback, total_chunks)
 
-    for modulo in modulo_levels:
-        modulo_output_dir = output_base / f"modulo_{modulo}"
-        chunk_paths = encode_modulo_chunks(
-            modulo,
-            modulo_frames[modulo],
-            modulo_output_dir,
-            chunk_size=frames_per_chunk,
-            crf=crf,
-            progress_callback=progress_callback,
-        )
-
-        all_chunk_files.extend(chunk_paths)
-        total_chunks_encoded += len(chunk_paths)
+    # Encode chunks as they are read; submit() blocks while the read-ahead is full
+    futures = []
+    with PipedVP9Encoder(max_workers=max_workers, max_pending=read_ahead_chunks, crf=crf) as encoder:
+        for modulo, chunk_frames in iter_modulo_chunks(db_path, frame_type, modulo_levels, frames_per_chunk):
+            chunk_path = output_base / f"modulo_{modulo}" / f"chunk_{chunk_frames[0][0]:010d}.webm"
+            future = encoder.submit([image_data for _, image_data, _, _ in chunk_frames], chunk_path)
+            future.add_done_callback(on_done)
+            futures.append(future)
+
+    all_chunk_files = [future.result() for future in futures]
 
     return {
-        "chunks_encoded": total_chunks_encoded,
-        "total_frames": len(frames),
+        "chunks_encoded": len(all_chunk_files),
+        "total_frames": total_frames,
         "output_dir": output_base,
         "chunk_files": all_chunk_files,
         "modulo_levels": modulo_levels,
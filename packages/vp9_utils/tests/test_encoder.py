@@ -0,0 +1,339 @@
+"""Tests for piped, concurrent VP9 chunk encoding."""
+
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+from vp9_utils import PipedVP9Encoder
+from vp9_utils import encoder as encoder_module
+from vp9_utils.encoder import (
+    count_modulo_frames,
+    encode_chunk,
+    encode_chunk_piped,
+    encode_modulo_chunks,
+    encode_video_chunks,
+    get_frames_from_db,
+    iter_modulo_chunks,
+    organize_frames_by_modulo,
+    vp9_output_args,
+    write_frames_to_temp_dir,
+)
+
+HAS_FFMPEG = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+class FakePopen:
+    """Collects what would be written to ffmpeg's stdin."""
+
+    instances: list["FakePopen"] = []
+
+    def __init__(self, cmd, **kwargs):
+        self.cmd = cmd
+        self.stdin = BytesIO()
+        self.stderr_file = kwargs["stderr"]
+        self.returncode = 0
+        FakePopen.instances.append(self)
+
+    def communicate(self):
+        return b"", b""
+
+
+class TestEncodeChunkPiped:
+    """Test the stdin-fed ffmpeg invocation."""
+
+    def test_matches_temp_file_output_settings(self, tmp_path: Path):
+        """Both paths end with the same codec and container options."""
+        FakePopen.instances = []
+        with patch("vp9_utils.encoder.subprocess.Popen", FakePopen):
+            encode_chunk_piped([b"jpeg-1", b"jpeg-2"], tmp_path / "chunk.webm")
+        with patch("vp9_utils.encoder.subprocess.run") as run:
+            encode_chunk(tmp_path, tmp_path / "chunk.webm", 8, 8)
+
+        piped_cmd = FakePopen.instances[0].cmd
+        temp_file_cmd = run.call_args.args[0]
+        tail = [*vp9_output_args(30), "-y", str(tmp_path / "chunk.webm")]
+        assert piped_cmd[-len(tail) :] == temp_file_cmd[-len(tail) :] == tail
+        assert piped_cmd[piped_cmd.index("-i") + 1] == "pipe:0"
+        assert FakePopen.instances[0].stdin.getvalue() == b"jpeg-1jpeg-2"
+
+    def test_raw_frames_declare_size(self, tmp_path: Path):
+        FakePopen.instances = []
+        with patch("vp9_utils.encoder.subprocess.Popen", FakePopen):
+            encode_chunk_piped([bytes(8 * 4 * 3)], tmp_path / "chunk.webm", raw_size=(8, 4))
+
+        cmd = FakePopen.instances[0].cmd
+        assert cmd[cmd.index("-f") + 1] == "rawvideo"
+        assert cmd[cmd.index("-s") + 1] == "8x4"
+
+    def test_failure_raises(self, tmp_path: Path):
+        class FailingPopen(FakePopen):
+            def communicate(self):
+                self.returncode = 1
+                self.stderr_file.write(b"Invalid data found when processing input")
+                return None, None
+
+        with patch("vp9_utils.encoder.subprocess.Popen", FailingPopen):
+            with pytest.raises(subprocess.CalledProcessError) as exc_info:
+                encode_chunk_piped([b"not a jpeg"], tmp_path / "chunk.webm")
+        assert b"Invalid data" in exc_info.value.stderr
+
+    def test_chatty_stderr_does_not_block_stdin(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """ffmpeg writing lots of stderr before reading stdin doesn't deadlock."""
+        fake_ffmpeg = tmp_path / "bin" / "ffmpeg"
+        fake_ffmpeg.parent.mkdir()
+        fake_ffmpeg.write_text(
+            "#!/bin/sh\nhead -c 1000000 /dev/zero | tr '\\0' e >&2\ncat > /dev/null\necho done >&2\nexit 1\n"
+        )
+        fake_ffmpeg.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{fake_ffmpeg.parent}:{os.environ['PATH']}")
+        result: list[BaseException] = []
+
+        def encode():
+            try:
+                encode_chunk_piped([bytes(100_000)] * 10, tmp_path / "chunk.webm")
+            except subprocess.CalledProcessError as e:
+                result.append(e)
+
+        thread = threading.Thread(target=encode, daemon=True)
+        thread.start()
+        thread.join(10)
+
+        assert not thread.is_alive()
+        assert result[0].stderr.endswith(b"done\n")
+
+
+class TestPipedVP9Encoder:
+    """Test concurrency and backpressure with a stubbed encode."""
+
+    def test_submit_blocks_when_backlog_is_full(self, tmp_path: Path):
+        """With 1 worker and 1 pending slot, a third submit waits for the first encode."""
+        release = threading.Event()
+
+        def slow_encode(frames, output_path, crf, raw_size):
+            release.wait(5)
+
+        with patch("vp9_utils.encoder.encode_chunk_piped", side_effect=slow_encode):
+            with PipedVP9Encoder(max_workers=1, max_pending=1) as encoder:
+                encoder.submit([b""], tmp_path / "a.webm")
+                encoder.submit([b""], tmp_path / "b.webm")
+
+                third_submitted = threading.Event()
+
+                def submit_third():
+                    encoder.submit([b""], tmp_path / "c.webm")
+                    third_submitted.set()
+
+                thread = threading.Thread(target=submit_third)
+                thread.start()
+                assert not third_submitted.wait(0.2)
+
+                release.set()
+                assert third_submitted.wait(5)
+                thread.join()
+
+    def test_encodes_run_concurrently(self, tmp_path: Path):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def encode(frames, output_path, crf, raw_size):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        with patch("vp9_utils.encoder.encode_chunk_piped", side_effect=encode):
+            with PipedVP9Encoder(max_workers=3) as encoder:
+                futures = [encoder.submit([b""], tmp_path / f"{i}.webm") for i in range(9)]
+        assert [f.result() for f in futures] == [tmp_path / f"{i}.webm" for i in range(9)]
+        assert peak == 3
+
+    def test_modulo_chunks_keep_frame_order(self, tmp_path: Path):
+        """Chunks come back in frame order and every completion is reported."""
+        frames = [(i * 16, f"frame-{i}".encode(), 8, 8) for i in range(70)]
+        encoded: dict[Path, list[bytes]] = {}
+        progress = []
+
+        def encode(frames, output_path, crf, raw_size):
+            encoded[output_path] = list(frames)
+
+        with patch("vp9_utils.encoder.encode_chunk_piped", side_effect=encode):
+            paths = encode_modulo_chunks(
+                16, frames, tmp_path, chunk_size=32, progress_callback=lambda done, total: progress.append(total)
+            )
+
+        assert [p.name for p in paths] == [
+            "chunk_0000000000.webm",
+            "chunk_0000000512.webm",
+            "chunk_0000001024.webm",
+        ]
+        assert [len(encoded[p]) for p in paths] == [32, 32, 6]
+        assert progress == [3, 3, 3]
+
+
+@pytest.fixture
+def frames_db(tmp_path: Path) -> Path:
+    """captions.db with 1000 small cropped frames."""
+    db_path = tmp_path / "captions.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE cropped_frames (
+            frame_index INTEGER PRIMARY KEY,
+            image_data BLOB NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO cropped_frames VALUES (?, ?, 480, 48)",
+        ((i, f"frame-{i}".encode()) for i in range(1000)),
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+class TestStreamingFrames:
+    """Test reading frames from the database one chunk at a time."""
+
+    @pytest.mark.parametrize("modulo_levels", [[16, 4, 1], [1]])
+    def test_chunks_match_organized_frames(self, frames_db: Path, modulo_levels: list[int]):
+        """Streamed chunks are the slices of organize_frames_by_modulo's output."""
+        organized = organize_frames_by_modulo(get_frames_from_db(frames_db), modulo_levels)
+        expected = [
+            (modulo, frames[i : i + 32])
+            for modulo in modulo_levels
+            for frames in [organized[modulo]]
+            for i in range(0, len(frames), 32)
+        ]
+
+        assert list(iter_modulo_chunks(frames_db, "cropped", modulo_levels, 32)) == expected
+        assert count_modulo_frames(frames_db, "cropped", modulo_levels) == {
+            modulo: len(organized[modulo]) for modulo in modulo_levels
+        }
+
+    def test_encode_video_chunks_holds_a_few_chunks(self, frames_db: Path, tmp_path: Path):
+        """Chunks read but not yet encoded stay within workers + read-ahead."""
+        outstanding = 0
+        peak = 0
+        lock = threading.Lock()
+        stream = iter_modulo_chunks
+
+        def counting_stream(*args, **kwargs):
+            nonlocal outstanding, peak
+            for chunk in stream(*args, **kwargs):
+                with lock:
+                    outstanding += 1
+                    peak = max(peak, outstanding)
+                yield chunk
+
+        def encode(frames, output_path, crf, raw_size):
+            nonlocal outstanding
+            time.sleep(0.005)
+            with lock:
+                outstanding -= 1
+
+        progress = []
+        with (
+            patch.object(encoder_module, "iter_modulo_chunks", counting_stream),
+            patch.object(encoder_module, "encode_chunk_piped", side_effect=encode),
+        ):
+            result = encode_video_chunks(
+                frames_db,
+                "video-1",
+                "cropped",
+                tmp_path / "out",
+                progress_callback=lambda done, total: progress.append((done, total)),
+                max_workers=2,
+                read_ahead_chunks=1,
+            )
+
+        # 63 + 188 + 750 frames -> 2 + 6 + 24 chunks
+        assert result["chunks_encoded"] == 32
+        assert result["total_frames"] == 1000
+        assert result["chunk_files"][0] == tmp_path / "out/video-1/cropped_frames/modulo_16/chunk_0000000000.webm"
+        assert progress[-1] == (32, 32)
+        assert peak <= 2 + 1 + 1
+
+    def test_empty_table_raises(self, frames_db: Path, tmp_path: Path):
+        conn = sqlite3.connect(frames_db)
+        conn.execute("DELETE FROM cropped_frames")
+        conn.commit()
+        conn.close()
+
+        with pytest.raises(ValueError, match="No cropped frames"):
+            encode_video_chunks(frames_db, "video-1", "cropped", tmp_path / "out")
+
+
+def make_clip(num_frames: int, size: tuple[int, int] = (480, 48)) -> list[bytes]:
+    """A locally generated clip of moving gradient frames, as JPEG bytes."""
+    width, height = size
+    frames = []
+    for i in range(num_frames):
+        image = Image.linear_gradient("L").resize(size).rotate(i * 7).convert("RGB")
+        image.paste((255, 255, 255), (i * 5 % width, height // 3, i * 5 % width + 40, 2 * height // 3))
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=95)
+        frames.append(buffer.getvalue())
+    return frames
+
+
+def probe(path: Path) -> dict:
+    output = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-count_frames", "-of", "json", str(path)],
+        capture_output=True,
+        check=True,
+    ).stdout
+    info = json.loads(output)
+    stream = info["streams"][0]
+    return {
+        "format": info["format"]["format_name"],
+        "codec": stream["codec_name"],
+        "pix_fmt": stream["pix_fmt"],
+        "size": (stream["width"], stream["height"]),
+        "frames": int(stream["nb_read_frames"]),
+    }
+
+
+@pytest.mark.skipif(not HAS_FFMPEG, reason="ffmpeg not installed")
+def test_benchmark_piped_vs_temp_files(tmp_path: Path):
+    """Piped concurrent encoding matches the temp-file output settings and is faster."""
+    chunk_size = 32
+    clip = make_clip(chunk_size * 12)
+    chunks = [clip[i : i + chunk_size] for i in range(0, len(clip), chunk_size)]
+    (tmp_path / "temp_file").mkdir()
+    (tmp_path / "piped").mkdir()
+
+    start = time.perf_counter()
+    for i, chunk in enumerate(chunks):
+        frame_dir = tmp_path / f"frames_{i}"
+        frame_dir.mkdir()
+        width, height = write_frames_to_temp_dir([(j, data, 480, 48) for j, data in enumerate(chunk)], frame_dir)
+        encode_chunk(frame_dir, tmp_path / "temp_file" / f"{i}.webm", width, height)
+    temp_file_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with PipedVP9Encoder() as encoder:
+        futures = [encoder.submit(chunk, tmp_path / "piped" / f"{i}.webm") for i, chunk in enumerate(chunks)]
+    piped = [f.result() for f in futures]
+    piped_seconds = time.perf_counter() - start
+
+    for i, path in enumerate(piped):
+        assert probe(path) == probe(tmp_path / "temp_file" / f"{i}.webm")
+    assert probe(piped[0])["codec"] == "vp9"
+    if encoder.max_workers > 1:
+        assert piped_seconds < temp_file_seconds
@@ -21,45 +21,21 @@ Usage:
 import argparse
 import json
 import os
-import sqlite3
-import subprocess
-import tempfile
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 import boto3
 from dotenv import load_dotenv
+from vp9_utils import PipedVP9Encoder, iter_modulo_chunks
+from vp9_utils.encoder import count_modulo_frames
 
 load_dotenv()
 
+MODULO_LEVELS = [16, 4, 1]
 
-def get_frames_from_db(db_path: Path) -> List[Tuple[int, bytes, int, int]]:
-    """Extract all cropped frames from database.
 
-    Returns:
-        List of (frame_index, image_data, width, height) tuples
-    """
-    print(f"📖 Reading frames from {db_path}")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT frame_index, image_data, width, height
-        FROM cropped_frames
-        ORDER BY frame_index
-    """)
-
-    frames = cursor.fetchall()
-    conn.close()
-
-    print(f"   Found {len(frames)} frames")
-    return frames
-
-
-def organize_frames_by_modulo(
-    frames: List[Tuple[int, bytes, int, int]],
-) -> Dict[int, List[Tuple[int, bytes, int, int]]]:
-    """Organize frames into modulo levels [16, 4, 1] without duplication.
+def print_frame_distribution(db_path: Path) -> Dict[int, int]:
+    """Count frames per modulo level [16, 4, 1] without reading image data.
 
     Non-duplicating strategy:
     - modulo_16: frames where index % 16 == 0
@@ -67,152 +43,55 @@ def organize_frames_by_modulo(
     - modulo_1: frames where index % 4 != 0 (i.e., NOT in modulo_4 or modulo_16)
 
     Returns:
-        Dict mapping modulo level to list of frames
+        Dict mapping modulo level to frame count
     """
-    organized = {16: [], 4: [], 1: []}
-
-    for frame in frames:
-        frame_index = frame[0]
-
-        # modulo_16 gets frames divisible by 16
-        if frame_index % 16 == 0:
-            organized[16].append(frame)
-
-        # modulo_4 gets frames divisible by 4 (but not by 16)
-        elif frame_index % 4 == 0:
-            organized[4].append(frame)
-
-        # modulo_1 gets frames NOT divisible by 4
-        else:
-            organized[1].append(frame)
+    print(f"📖 Reading frames from {db_path}")
+    counts = count_modulo_frames(db_path, "cropped", MODULO_LEVELS)
+    print(f"   Found {sum(counts.values())} frames")
 
     print("\n📊 Frame distribution:")
-    print(f"   modulo_16: {len(organized[16])} frames")
-    print(f"   modulo_4:  {len(organized[4])} frames")
-    print(f"   modulo_1:  {len(organized[1])} frames")
+    print(f"   modulo_16: {counts[16]} frames")
+    print(f"   modulo_4:  {counts[4]} frames")
+    print(f"   modulo_1:  {counts[1]} frames")
 
-    return organized
+    return counts
 
 
-def write_frames_to_temp_dir(frames: List[Tuple[int, bytes, int, int]], temp_dir: Path) -> Tuple[int, int]:
-    """Write frames as JPEG files to temporary directory.
-
-    Returns:
-        (width, height) of first frame
-
-    Raises:
-        ValueError: If frames list is empty
-    """
-    if not frames:
-        raise ValueError("Cannot write frames: frames list is empty")
+def encode_all_chunks(db_path: Path, output_base: Path, chunk_size: int = 32) -> Tuple[Dict[int, List[Path]], int]:
+    """Stream frames from the database a chunk at a time and encode them concurrently.
 
-    width, height = None, None
-
-    for i, (frame_index, image_data, w, h) in enumerate(frames):
-        if width is None:
-            width, height = w, h
-
-        frame_path = temp_dir / f"frame_{i:06d}.jpg"
-        frame_path.write_bytes(image_data)
-
-    assert width is not None and height is not None  # For type checker
-    return width, height
-
-
-def encode_chunk(input_dir: Path, output_path: Path, width: int, height: int) -> None:
-    """Encode frames into VP9 WebM chunk using ffmpeg.
+    Only a few chunks of images are in memory at once, however long the video.
 
     Args:
-        input_dir: Directory containing frame_*.jpg files
-        output_path: Output .webm file path
-        width: Frame width
-        height: Frame height
-    """
-    # VP9 encoding parameters:
-    # -c:v libvpx-vp9: VP9 codec
-    # -crf 30: Constant quality (0-63, lower = better quality)
-    # -b:v 0: Use constant quality mode
-    # -row-mt 1: Enable row-based multithreading
-    # -g 32: Keyframe interval (match chunk size)
-    # -pix_fmt yuv420p: Pixel format for compatibility
-
-    cmd = [
-        "ffmpeg",
-        "-framerate",
-        "10",  # 10 fps (100ms per frame)
-        "-pattern_type",
-        "glob",
-        "-i",
-        str(input_dir / "frame_*.jpg"),
-        "-c:v",
-        "libvpx-vp9",
-        "-crf",
-        "30",
-        "-b:v",
-        "0",
-        "-row-mt",
-        "1",
-        "-g",
-        "32",
-        "-pix_fmt",
-        "yuv420p",
-        "-y",  # Overwrite output file
-        str(output_path),
-    ]
-
-    subprocess.run(cmd, check=True, capture_output=True)
-
-
-def encode_modulo_chunks(
-    modulo: int,
-    frames: List[Tuple[int, bytes, int, int]],
-    output_dir: Path,
-    chunk_size: int = 32,
-) -> List[Path]:
-    """Encode all chunks for a modulo level.
-
-    Args:
-        modulo: Modulo level (16, 4, or 1)
-        frames: List of frames for this modulo
-        output_dir: Directory to write chunks
+        db_path: Path to cropping database
+        output_base: Directory to write modulo_*/chunk_*.webm files
         chunk_size: Frames per chunk
 
     Returns:
-        List of encoded chunk file paths
+        (chunk paths per modulo level in frame order, total image bytes read)
     """
-    print(f"\n🎬 Encoding modulo_{modulo} chunks ({len(frames)} frames, {chunk_size} frames/chunk)")
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-    chunk_paths = []
+    for modulo in MODULO_LEVELS:
+        (output_base / f"modulo_{modulo}").mkdir(parents=True, exist_ok=True)
 
-    # Split frames into chunks
-    num_chunks = (len(frames) + chunk_size - 1) // chunk_size
+    futures: Dict[int, list] = {modulo: [] for modulo in MODULO_LEVELS}
+    image_bytes = 0
 
-    for chunk_idx in range(num_chunks):
-        start_idx = chunk_idx * chunk_size
-        end_idx = min(start_idx + chunk_size, len(frames))
-        chunk_frames = frames[start_idx:end_idx]
+    with PipedVP9Encoder() as encoder:
+        print(f"\n🎬 Encoding chunks ({chunk_size} frames/chunk, {encoder.max_workers} encoders)")
+        for modulo, chunk_frames in iter_modulo_chunks(db_path, "cropped", MODULO_LEVELS, chunk_size):
+            chunk_path = output_base / f"modulo_{modulo}" / f"chunk_{chunk_frames[0][0]:010d}.webm"
+            images = [image_data for _, image_data, _, _ in chunk_frames]
+            image_bytes += sum(len(image) for image in images)
+            futures[modulo].append(encoder.submit(images, chunk_path))
 
-        # Get start frame index for chunk filename
-        start_frame_index = chunk_frames[0][0]
+    chunk_paths = {}
+    for modulo in MODULO_LEVELS:
+        chunk_paths[modulo] = [future.result() for future in futures[modulo]]
+        for chunk_path in chunk_paths[modulo]:
+            file_size_kb = chunk_path.stat().st_size / 1024
+            print(f"   ✅ modulo_{modulo}/{chunk_path.name} ({file_size_kb:.1f} KB)")
 
-        chunk_filename = f"chunk_{start_frame_index:010d}.webm"
-        chunk_path = output_dir / chunk_filename
-
-        # Write frames to temp directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            width, height = write_frames_to_temp_dir(chunk_frames, temp_path)
-
-            # Encode chunk
-            encode_chunk(temp_path, chunk_path, width, height)
-
-        chunk_paths.append(chunk_path)
-
-        file_size_kb = chunk_path.stat().st_size / 1024
-        print(f"   ✅ {chunk_filename} ({len(chunk_frames)} frames, {file_size_kb:.1f} KB)")
-
-    return chunk_paths
+    return chunk_paths, image_bytes
 
 
 def upload_to_wasabi(local_path: Path, s3_key: str) -> str:
@@ -513,25 +392,23 @@ def main():
         print(f"❌ Database not found: {db_path}")
         return 1
 
-    # Get frames from database
-    frames = get_frames_from_db(db_path)
-    if not frames:
+    # Count frames per level (no image data is loaded)
+    frame_counts = print_frame_distribution(db_path)
+    if not sum(frame_counts.values()):
         print("❌ No frames found in database")
         return 1
 
-    # Organize by modulo
-    modulo_frames = organize_frames_by_modulo(frames)
-
     # Set up output directories
     output_base = Path(args.output_dir) / video_id
     output_base.mkdir(parents=True, exist_ok=True)
 
-    # Encode chunks for each modulo level
+    # Stream and encode chunks for every modulo level
+    chunk_paths_by_modulo, image_bytes = encode_all_chunks(db_path, output_base)
+
     modulo_chunks = {}
 
-    for modulo in [16, 4, 1]:
-        modulo_output_dir = output_base / f"modulo_{modulo}"
-        chunk_paths = encode_modulo_chunks(modulo, modulo_frames[modulo], modulo_output_dir)
+    for modulo in MODULO_LEVELS:
+        chunk_paths = chunk_paths_by_modulo[modulo]
 
         if args.upload:
             print(f"\n☁️  Uploading modulo_{modulo} chunks to Wasabi...")
@@ -547,13 +424,13 @@ def main():
             modulo_chunks[modulo] = [str(p.relative_to(output_base.parent)) for p in chunk_paths]
 
     # Calculate total size
-    total_size_mb = sum(sum(p.stat().st_size for p in output_base.glob(f"modulo_{m}/*.webm")) for m in [16, 4, 1]) / (
-        1024 * 1024
-    )
+    total_size_mb = sum(
+        sum(p.stat().st_size for p in output_base.glob(f"modulo_{m}/*.webm")) for m in MODULO_LEVELS
+    ) / (1024 * 1024)
 
     print("\n📊 Summary:")
     print(f"   Total size: {total_size_mb:.1f} MB")
-    print(f"   Duplication ratio: {total_size_mb / (sum(len(f[1]) for f in frames) / 1024 / 1024):.2f}x")
+    print(f"   Duplication ratio: {total_size_mb / (image_bytes / 1024 / 1024):.2f}x")
 
     # Generate test page
     test_page_path = output_base / "test.html"
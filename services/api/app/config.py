@@ -1,6 +1,7 @@
 """Application configuration using pydantic-settings."""
 
 from functools import lru_cache
+from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -43,12 +44,29 @@ class Settings(BaseSettings):
     # SQLite Cache (legacy - used by database_manager.py)
     sqlite_cache_dir: str = "/tmp/captionacc-sqlite-cache"
     sqlite_cache_max_size_mb: int = 500  # Max cache size in MB
+    sqlite_cache_revalidate_seconds: int = 30  # Trust cached ETags this long
+    sqlite_write_back: bool = False  # Defer uploads of writable databases
+    sqlite_write_back_debounce_seconds: float = 2.0  # Upload after edits go quiet
+    sqlite_write_back_max_delay_seconds: float = 30.0  # Upload at least this often
+    sqlite_write_back_max_pending_changes: int = 1000  # Upload early after N rows
+    database_manifest_path: str = ""  # Defaults to beside working_copy_dir
+    database_manifest_max_age_seconds: int = 300  # Re-list the bucket after this
 
     # CR-SQLite Sync
     crsqlite_extension_path: str = ""  # Path to crsqlite.so/.dylib
+    crsqlite_change_batch_size: int = 1000  # Max changes per streamed batch
+    crsqlite_change_batch_max_bytes: int = 1_000_000  # Approx max batch size
+    sync_state_flush_interval_seconds: float = 1.0  # Batch sync state writes
+    sync_broadcast_window_ms: int = 30  # Merge outbound server changes this long
+    sync_broadcast_max_message_bytes: int = 256 * 1024  # Cap per server_update
     working_copy_dir: str = "/var/data/captionacc/working"
     wasabi_upload_idle_minutes: int = 5
     wasabi_upload_checkpoint_minutes: int = 15
+    wasabi_upload_concurrency: int = 4  # Parallel working copy uploads
+    wasabi_upload_max_attempts: int = 3  # Tries per upload before giving up
+    wasabi_upload_retry_base_seconds: float = 2.0  # Exponential backoff base
+    wasabi_multipart_threshold_mb: int = 16  # Use multipart upload above this
+    wasabi_multipart_chunk_mb: int = 8  # Multipart part size
     lock_expiry_minutes: int = 30  # Auto-release stale locks after this
 
     # Supabase (service role for video_database_state)
@@ -114,6 +132,13 @@ class Settings(BaseSettings):
             return self.api_internal_url
         return f"http://localhost:{self.api_port}"
 
+    @property
+    def effective_database_manifest_path(self) -> str:
+        """Get the database manifest path (on the working copy volume by default)."""
+        if self.database_manifest_path:
+            return self.database_manifest_path
+        return str(Path(self.working_copy_dir).parent / "database-manifest.db")
+
     @property
     def effective_wasabi_access_key(self) -> str:
         """Get Wasabi access key."""
@@ -21,6 +21,11 @@ from app.routers import (
     websocket_sync,
 )
 from app.services.background_tasks import get_upload_worker
+from app.services.database_manager import (
+    flush_all_database_managers,
+    recover_dirty_databases,
+)
+from app.services.database_manifest import get_manifest_reconciler
 from app.services.realtime_subscriber import get_realtime_subscriber
 
 # Configure logging
@@ -58,6 +63,12 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to check for unsaved changes: {e}")
         # Continue startup even if this check fails
 
+    # Upload edits a crashed worker left in the shared database cache
+    try:
+        await recover_dirty_databases()
+    except Exception:
+        logger.exception("Failed to recover dirty databases")
+
     # Start background Wasabi upload worker
     upload_worker = get_upload_worker()
     try:
@@ -66,6 +77,10 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to start upload worker: {e}")
         # Continue startup even if upload worker fails
 
+    # Keep the admin database listing in step with the bucket
+    manifest_reconciler = get_manifest_reconciler()
+    await manifest_reconciler.start()
+
     # Start Prefect worker to execute flows
     worker_manager = get_worker_manager()
     try:
@@ -88,7 +103,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down API service")
     await realtime_subscriber.stop()
     await worker_manager.stop()
+    await manifest_reconciler.stop()
     await upload_worker.stop()
+    await flush_all_database_managers()
 
 
 def create_app() -> FastAPI:
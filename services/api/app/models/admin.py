@@ -54,6 +54,14 @@ class DatabaseRepairResponse(BaseModel):
     errors: list[str]
 
 
+class DatabaseReconcileResponse(BaseModel):
+    """Response for database manifest reconcile endpoint."""
+
+    success: bool
+    tenantId: str | None = None  # None = whole bucket
+    databases: int
+
+
 class SecurityEventSeverity(str, Enum):
     """Security event severity levels."""
 
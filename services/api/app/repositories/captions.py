@@ -1,6 +1,8 @@
 """Repository for caption CRUD operations on captions.db."""
 
 import sqlite3
+from dataclasses import dataclass, field
+from operator import attrgetter
 
 from app.models.captions import (
     Caption,
@@ -13,6 +15,67 @@ from app.models.captions import (
 )
 
 
+# Stats counters kept in captions.db and maintained by triggers, so reading
+# stats doesn't scan the captions table. Each expression is one caption's
+# contribution; {row} is new/old in triggers or captions when aggregating.
+STATS_TABLE = "caption_stats"
+
+_STATS_COUNTERS = {
+    "annotation_count": "1",
+    "covered_frames": (
+        "CASE WHEN {row}.caption_frame_extents_state != 'gap' "
+        "THEN {row}.end_frame_index - {row}.start_frame_index + 1 ELSE 0 END"
+    ),
+    "needs_text_count": (
+        "({row}.text_pending = 1 OR "
+        "({row}.text IS NULL AND {row}.caption_frame_extents_state != 'gap'))"
+    ),
+    "predicted_count": "({row}.caption_frame_extents_state = 'predicted')",
+    "confirmed_count": "({row}.caption_frame_extents_state = 'confirmed')",
+    "gap_count": "({row}.caption_frame_extents_state = 'gap')",
+}
+
+_AGGREGATE_STATS = "SELECT {} FROM captions".format(
+    ", ".join(
+        f"COALESCE(SUM({expr.format(row='captions')}), 0) AS {name}"
+        for name, expr in _STATS_COUNTERS.items()
+    )
+)
+
+
+def _stats_trigger(event: str, *terms: tuple[str, str]) -> str:
+    """Trigger adding (sign, row) contributions of a captions change."""
+    assignments = ", ".join(
+        f"{name} = {name}"
+        + "".join(f" {sign} ({expr.format(row=row)})" for sign, row in terms)
+        for name, expr in _STATS_COUNTERS.items()
+    )
+    return f"""
+    CREATE TRIGGER {STATS_TABLE}_{event.lower()} AFTER {event} ON captions BEGIN
+        UPDATE {STATS_TABLE}
+        SET {assignments}
+        WHERE id = 1;
+    END
+    """
+
+
+STATS_SCHEMA = (
+    f"""
+    CREATE TABLE {STATS_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        {", ".join(f"{name} INTEGER NOT NULL" for name in _STATS_COUNTERS)}
+    )
+    """,
+    _stats_trigger("INSERT", ("+", "new")),
+    _stats_trigger("DELETE", ("-", "old")),
+    _stats_trigger("UPDATE", ("+", "new"), ("-", "old")),
+    f"""
+    INSERT INTO {STATS_TABLE} (id, {", ".join(_STATS_COUNTERS)})
+    SELECT 1, * FROM ({_AGGREGATE_STATS})
+    """,
+)
+
+
 def _row_to_caption_row(row: sqlite3.Row) -> CaptionRow:
     """Convert sqlite3.Row to CaptionRow."""
     return CaptionRow(
@@ -144,69 +207,68 @@ class CaptionRepository:
         - Trimming overlapping captions
         - Splitting captions when new range is in the middle
         - Creating gap captions for uncovered ranges when shrinking
+
+        Affected captions are read in one query, resolved in memory and written
+        in a single transaction, so the cost doesn't grow with round trips per
+        overlapped caption.
         """
-        # Get original caption
-        original = self._get_caption_row(caption_id)
+        start_frame = input.startFrameIndex
+        end_frame = input.endFrameIndex
+
+        # One read for everything the change can touch, then plan in memory
+        window = self._load_overlap_window(caption_id, start_frame, end_frame)
+        original = next((row for row in window if row.id == caption_id), None)
         if original is None:
             raise ValueError(f"Caption {caption_id} not found")
-
-        # Detect overlapping captions (excluding self)
-        overlapping = self._detect_overlaps(
-            input.startFrameIndex, input.endFrameIndex, exclude_id=caption_id
-        )
-
-        # Resolve overlaps
-        deleted_ids: list[int] = []
-        modified_captions: list[Caption] = []
-
-        for overlap in overlapping:
-            result = self._resolve_overlap(
-                overlap, input.startFrameIndex, input.endFrameIndex
-            )
-            deleted_ids.extend(result["deleted"])
-            modified_captions.extend(result["modified"])
-
-        # Create gap captions for uncovered ranges when shrinking
-        created_gaps = self._create_gap_captions(
-            original, input.startFrameIndex, input.endFrameIndex
-        )
+        plan = _plan_overlap_resolution(window, original, start_frame, end_frame)
 
         # Check if caption frame extents changed
         caption_frame_extents_changed = (
-            input.startFrameIndex != original.start_frame_index
-            or input.endFrameIndex != original.end_frame_index
+            start_frame != original.start_frame_index
+            or end_frame != original.end_frame_index
         )
 
-        # Update the caption
-        self.conn.execute(
-            """
-            UPDATE captions
-            SET start_frame_index = ?,
-                end_frame_index = ?,
-                caption_frame_extents_state = ?,
-                caption_frame_extents_pending = 0,
-                image_needs_regen = ?,
-                caption_frame_extents_updated_at = datetime('now')
-            WHERE id = ?
-            """,
-            (
-                input.startFrameIndex,
-                input.endFrameIndex,
-                input.captionFrameExtentsState.value,
-                1 if caption_frame_extents_changed else 0,
-                caption_id,
-            ),
-        )
+        try:
+            split_ids, gap_ids = self._apply_overlap_plan(plan)
+
+            # Update the caption
+            self.conn.execute(
+                """
+                UPDATE captions
+                SET start_frame_index = ?,
+                    end_frame_index = ?,
+                    caption_frame_extents_state = ?,
+                    caption_frame_extents_pending = 0,
+                    image_needs_regen = ?,
+                    caption_frame_extents_updated_at = datetime('now')
+                WHERE id = ?
+                """,
+                (
+                    start_frame,
+                    end_frame,
+                    input.captionFrameExtentsState.value,
+                    1 if caption_frame_extents_changed else 0,
+                    caption_id,
+                ),
+            )
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
         self.conn.commit()
 
-        # Get updated caption
-        updated = self.get_caption(caption_id)
+        # Read back every caption in the response at once
+        modified_ids = [row.id for row in plan.trimmed] + split_ids
+        captions = self._get_captions([caption_id, *modified_ids, *gap_ids])
+        modified_captions = sorted(
+            (captions[i] for i in modified_ids if i in captions),
+            key=lambda caption: caption.startFrameIndex,
+        )
 
         return OverlapResolutionResponse(
-            caption=updated,  # type: ignore
-            deletedCaptions=deleted_ids,
+            caption=captions[caption_id],
+            deletedCaptions=plan.deleted,
             modifiedCaptions=modified_captions,
-            createdGaps=created_gaps,
+            createdGaps=[captions[i] for i in gap_ids if i in captions],
         )
 
     def update_caption_text(
@@ -293,79 +355,129 @@ class CaptionRepository:
         self.conn.commit()
         return cursor.rowcount
 
+    def has_stats_counters(self) -> bool:
+        """Check whether the stats counters table exists."""
+        cursor = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (STATS_TABLE,),
+        )
+        return cursor.fetchone() is not None
+
+    def ensure_stats_counters(self) -> bool:
+        """
+        Create the stats counters if the database doesn't have them yet.
+
+        Counters are seeded from the current captions; triggers keep them
+        up to date as captions change.
+
+        Returns:
+            True if the counters are available, False if the database is
+            read-only
+        """
+        if self.has_stats_counters():
+            return True
+
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another connection may have created them while we waited
+                if not self.has_stats_counters():
+                    for statement in STATS_SCHEMA:
+                        self.conn.execute(statement)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def get_stats(self) -> dict:
+        """
+        Get caption statistics for the video.
+
+        Reads the stored counters when present, otherwise aggregates them in
+        SQL. Either way the captions are never loaded into Python.
+        """
+        if self.has_stats_counters():
+            query = f"SELECT {', '.join(_STATS_COUNTERS)} FROM {STATS_TABLE}"
+        else:
+            query = _AGGREGATE_STATS
+        row = self.conn.execute(query).fetchone()
+        return dict(zip(row.keys(), row, strict=True))
+
     # =========================================================================
     # Private helper methods
     # =========================================================================
 
-    def _get_caption_row(self, caption_id: int) -> CaptionRow | None:
-        """Get raw caption row."""
-        cursor = self.conn.execute("SELECT * FROM captions WHERE id = ?", (caption_id,))
-        row = cursor.fetchone()
-        if row is None:
-            return None
-        return _row_to_caption_row(row)
+    def _get_captions(self, caption_ids: list[int]) -> dict[int, Caption]:
+        """Get captions by ID in a single query."""
+        placeholders = ", ".join("?" * len(caption_ids))
+        cursor = self.conn.execute(
+            f"SELECT * FROM captions WHERE id IN ({placeholders})", caption_ids
+        )
+        return {
+            row["id"]: Caption.from_row(_row_to_caption_row(row))
+            for row in cursor.fetchall()
+        }
 
-    def _detect_overlaps(
-        self, start_frame: int, end_frame: int, exclude_id: int | None = None
+    def _load_overlap_window(
+        self, caption_id: int, start_frame: int, end_frame: int
     ) -> list[CaptionRow]:
-        """Find captions overlapping a frame range."""
-        if exclude_id is not None:
-            cursor = self.conn.execute(
-                """
-                SELECT * FROM captions
-                WHERE id != ?
-                AND NOT (end_frame_index < ? OR start_frame_index > ?)
-                """,
-                (exclude_id, start_frame, end_frame),
-            )
-        else:
-            cursor = self.conn.execute(
-                """
-                SELECT * FROM captions
-                WHERE NOT (end_frame_index < ? OR start_frame_index > ?)
-                """,
-                (start_frame, end_frame),
+        """
+        Load a caption and every caption moving it to a new range can affect.
+
+        That is all captions overlapping the old or new range, plus the
+        captions directly next to it (candidates for gap merging). Returns an
+        empty list if the caption doesn't exist.
+        """
+        cursor = self.conn.execute(
+            """
+            WITH target AS (
+                SELECT
+                    MIN(start_frame_index, ?) - 1 AS window_start,
+                    MAX(end_frame_index, ?) + 1 AS window_end
+                FROM captions
+                WHERE id = ?
             )
+            SELECT captions.* FROM captions, target
+            WHERE captions.start_frame_index <= target.window_end
+            AND captions.end_frame_index >= target.window_start
+            """,
+            (start_frame, end_frame, caption_id),
+        )
         return [_row_to_caption_row(row) for row in cursor.fetchall()]
 
-    def _resolve_overlap(
-        self, overlap: CaptionRow, start_frame: int, end_frame: int
-    ) -> dict:
+    def _apply_overlap_plan(self, plan: "_OverlapPlan") -> tuple[list[int], list[int]]:
         """
-        Resolve a single overlap.
+        Write a planned overlap resolution without committing.
 
-        Returns dict with 'deleted' (list of IDs) and 'modified' (list of Captions).
-        """
-        deleted: list[int] = []
-        modified: list[Caption] = []
+        Inserts happen in the same order as row-by-row resolution did, so new
+        captions get the same IDs.
 
-        if (
-            overlap.start_frame_index >= start_frame
-            and overlap.end_frame_index <= end_frame
-        ):
-            # Completely contained - delete it
-            self.conn.execute("DELETE FROM captions WHERE id = ?", (overlap.id,))
-            deleted.append(overlap.id)
-
-        elif (
-            overlap.start_frame_index < start_frame
-            and overlap.end_frame_index > end_frame
-        ):
-            # New caption is contained within existing - split
-            # Keep left part
-            self.conn.execute(
-                """
-                UPDATE captions
-                SET end_frame_index = ?, caption_frame_extents_pending = 1
-                WHERE id = ?
-                """,
-                (start_frame - 1, overlap.id),
-            )
-            left_cap = self.get_caption(overlap.id)
-            if left_cap:
-                modified.append(left_cap)
+        Returns:
+            IDs of the created split parts and of the created gap captions
+        """
+        self.conn.executemany(
+            "DELETE FROM captions WHERE id = ?",
+            [(row_id,) for row_id in plan.deleted + plan.merged_gaps],
+        )
+        self.conn.executemany(
+            """
+            UPDATE captions
+            SET start_frame_index = ?,
+                end_frame_index = ?,
+                caption_frame_extents_pending = 1
+            WHERE id = ?
+            """,
+            [
+                (row.start_frame_index, row.end_frame_index, row.id)
+                for row in plan.trimmed
+            ],
+        )
 
-            # Create right part
+        split_ids: list[int] = []
+        for split_start, split_end, state, text in plan.split_parts:
             cursor = self.conn.execute(
                 """
                 INSERT INTO captions (
@@ -374,114 +486,157 @@ class CaptionRepository:
                 )
                 VALUES (?, ?, ?, 1, ?)
                 """,
-                (
-                    end_frame + 1,
-                    overlap.end_frame_index,
-                    overlap.caption_frame_extents_state.value,
-                    overlap.text,
-                ),
+                (split_start, split_end, state.value, text),
             )
-            if cursor.lastrowid:
-                right_cap = self.get_caption(cursor.lastrowid)
-                if right_cap:
-                    modified.append(right_cap)
+            split_ids.append(cursor.lastrowid)  # type: ignore[arg-type]
 
-        elif overlap.start_frame_index < start_frame:
-            # Overlaps on left - trim right side
-            self.conn.execute(
+        gap_ids: list[int] = []
+        for gap_start, gap_end in plan.gaps:
+            cursor = self.conn.execute(
                 """
-                UPDATE captions
-                SET end_frame_index = ?, caption_frame_extents_pending = 1
-                WHERE id = ?
+                INSERT INTO captions (
+                    start_frame_index, end_frame_index, caption_frame_extents_state, caption_frame_extents_pending
+                )
+                VALUES (?, ?, 'gap', 0)
                 """,
-                (start_frame - 1, overlap.id),
+                (gap_start, gap_end),
             )
-            cap = self.get_caption(overlap.id)
-            if cap:
-                modified.append(cap)
+            gap_ids.append(cursor.lastrowid)  # type: ignore[arg-type]
 
+        return split_ids, gap_ids
+
+
+_frame_order = attrgetter("start_frame_index", "end_frame_index", "id")
+
+
+@dataclass
+class _OverlapPlan:
+    """
+    Changes needed to move one caption to a new frame range.
+
+    Attributes:
+        deleted: IDs of captions completely contained in the new range
+        trimmed: Overlapping captions with their trimmed frame ranges
+        split_parts: (start, end, state, text) of right parts of split captions
+        merged_gaps: IDs of gap captions absorbed into a created gap
+        gaps: (start, end) of gap captions to create, merged with adjacent gaps
+    """
+
+    deleted: list[int] = field(default_factory=list)
+    trimmed: list[CaptionRow] = field(default_factory=list)
+    split_parts: list[tuple[int, int, CaptionFrameExtentsState, str | None]] = field(
+        default_factory=list
+    )
+    merged_gaps: list[int] = field(default_factory=list)
+    gaps: list[tuple[int, int]] = field(default_factory=list)
+
+
+def _plan_overlap_resolution(
+    window: list[CaptionRow], original: CaptionRow, start_frame: int, end_frame: int
+) -> _OverlapPlan:
+    """
+    Resolve overlaps for a caption's new frame range in memory.
+
+    - Captions completely contained in the new range are deleted
+    - A caption containing the new range is split in two
+    - Other overlapping captions are trimmed
+    - Ranges the caption no longer covers become gaps, merged with adjacent gaps
+
+    Args:
+        window: Captions loaded by _load_overlap_window (including original)
+        original: The caption being updated, as currently stored
+        start_frame: New start frame index
+        end_frame: New end frame index
+    """
+    plan = _OverlapPlan()
+    # Captions as stored once overlaps are resolved, for gap adjacency
+    resolved = {row.id: row for row in window}
+
+    overlapping = sorted(
+        (
+            row
+            for row in window
+            if row.id != original.id
+            and row.end_frame_index >= start_frame
+            and row.start_frame_index <= end_frame
+        ),
+        key=_frame_order,
+    )
+    for row in overlapping:
+        if row.start_frame_index >= start_frame and row.end_frame_index <= end_frame:
+            # Completely contained - delete it
+            plan.deleted.append(row.id)
+            del resolved[row.id]
+            continue
+
+        if row.start_frame_index < start_frame:
+            # Overlaps on left (or contains the new range) - keep left part
+            trimmed = row.model_copy(
+                update={
+                    "end_frame_index": start_frame - 1,
+                    "caption_frame_extents_pending": 1,
+                }
+            )
+            if row.end_frame_index > end_frame:
+                plan.split_parts.append(
+                    (
+                        end_frame + 1,
+                        row.end_frame_index,
+                        row.caption_frame_extents_state,
+                        row.text,
+                    )
+                )
         else:
             # Overlaps on right - trim left side
-            self.conn.execute(
-                """
-                UPDATE captions
-                SET start_frame_index = ?, caption_frame_extents_pending = 1
-                WHERE id = ?
-                """,
-                (end_frame + 1, overlap.id),
+            trimmed = row.model_copy(
+                update={
+                    "start_frame_index": end_frame + 1,
+                    "caption_frame_extents_pending": 1,
+                }
             )
-            cap = self.get_caption(overlap.id)
-            if cap:
-                modified.append(cap)
+        plan.trimmed.append(trimmed)
+        resolved[row.id] = trimmed
 
-        return {"deleted": deleted, "modified": modified}
+    # Left gap
+    if start_frame > original.start_frame_index:
+        plan.gaps.append(
+            _merge_gap(resolved, plan, original.start_frame_index, start_frame - 1)
+        )
 
-    def _create_gap_captions(
-        self, original: CaptionRow, new_start: int, new_end: int
-    ) -> list[Caption]:
-        """Create gap captions for uncovered ranges when shrinking."""
-        gaps: list[Caption] = []
-
-        # Left gap
-        if new_start > original.start_frame_index:
-            gap = self._create_or_merge_gap(original.start_frame_index, new_start - 1)
-            if gap:
-                gaps.append(gap)
-
-        # Right gap
-        if new_end < original.end_frame_index:
-            gap = self._create_or_merge_gap(new_end + 1, original.end_frame_index)
-            if gap:
-                gaps.append(gap)
-
-        return gaps
-
-    def _create_or_merge_gap(self, gap_start: int, gap_end: int) -> Caption | None:
-        """Create a gap caption, merging with adjacent gaps if present."""
-        # Find adjacent gaps
-        cursor = self.conn.execute(
-            """
-            SELECT * FROM captions
-            WHERE caption_frame_extents_state = 'gap'
-            AND (
-                end_frame_index = ? - 1
-                OR start_frame_index = ? + 1
-            )
-            ORDER BY start_frame_index
-            """,
-            (gap_start, gap_end),
+    # Right gap
+    if end_frame < original.end_frame_index:
+        plan.gaps.append(
+            _merge_gap(resolved, plan, end_frame + 1, original.end_frame_index)
         )
-        adjacent_gaps = [_row_to_caption_row(row) for row in cursor.fetchall()]
-
-        # Calculate merged range
-        merged_start = gap_start
-        merged_end = gap_end
-        gap_ids_to_delete: list[int] = []
-
-        for gap in adjacent_gaps:
-            if gap.end_frame_index == gap_start - 1:
-                merged_start = gap.start_frame_index
-                gap_ids_to_delete.append(gap.id)
-            elif gap.start_frame_index == gap_end + 1:
-                merged_end = gap.end_frame_index
-                gap_ids_to_delete.append(gap.id)
-
-        # Delete adjacent gaps
-        for gap_id in gap_ids_to_delete:
-            self.conn.execute("DELETE FROM captions WHERE id = ?", (gap_id,))
-
-        # Create merged gap
-        cursor = self.conn.execute(
-            """
-            INSERT INTO captions (
-                start_frame_index, end_frame_index, caption_frame_extents_state, caption_frame_extents_pending
+
+    return plan
+
+
+def _merge_gap(
+    resolved: dict[int, CaptionRow], plan: _OverlapPlan, gap_start: int, gap_end: int
+) -> tuple[int, int]:
+    """Extend a new gap over adjacent gap captions, which are removed."""
+    adjacent_gaps = sorted(
+        (
+            row
+            for row in resolved.values()
+            if row.caption_frame_extents_state == CaptionFrameExtentsState.GAP
+            and (
+                row.end_frame_index == gap_start - 1
+                or row.start_frame_index == gap_end + 1
             )
-            VALUES (?, ?, 'gap', 0)
-            """,
-            (merged_start, merged_end),
-        )
-        self.conn.commit()
+        ),
+        key=_frame_order,
+    )
+
+    merged_start = gap_start
+    merged_end = gap_end
+    for gap in adjacent_gaps:
+        if gap.end_frame_index == gap_start - 1:
+            merged_start = gap.start_frame_index
+        else:
+            merged_end = gap.end_frame_index
+        plan.merged_gaps.append(gap.id)
+        del resolved[gap.id]
 
-        if cursor.lastrowid:
-            return self.get_caption(cursor.lastrowid)
-        return None
+    return merged_start, merged_end
@@ -1,12 +1,59 @@
 """Repository for OCR read operations on fullOCR.db."""
 
 import sqlite3
+from itertools import groupby
 
 from app.models.ocr import (
     FrameOcrResult,
     FullFrameOcrRow,
     OcrDetection,
 )
+from app.repositories.versions import database_file, file_version
+
+# Trigram full-text index over OCR text (external content, kept in sync by
+# triggers). Trigrams match substrings in any script, including CJK.
+FTS_TABLE = "full_frame_ocr_fts"
+
+_FTS_SCHEMA = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        text, content='full_frame_ocr', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON full_frame_ocr BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON full_frame_ocr BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF text ON full_frame_ocr BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+# Trigram queries need at least this many characters
+_MIN_FTS_QUERY_LENGTH = 3
+
+
+# fullOCR.db is written by the pipeline and rarely changes afterwards, so
+# stats are cached per database file until the file is written.
+_STATS_CACHE_SIZE = 256
+_stats_cache: dict[str, tuple[str, dict]] = {}
+
+
+def _fts_phrase(query_text: str) -> str:
+    """Quote text as a single FTS5 phrase (substring match with trigrams)."""
+    return '"' + query_text.replace('"', '""') + '"'
 
 
 def _row_to_ocr_row(row: sqlite3.Row) -> FullFrameOcrRow:
@@ -65,9 +112,11 @@ class OcrRepository:
         query += " ORDER BY frame_index, box_index"
 
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            params.append(limit)
             if offset:
-                query += f" OFFSET {offset}"
+                query += " OFFSET ?"
+                params.append(offset)
 
         cursor = self.conn.execute(query, params)
         rows = cursor.fetchall()
@@ -130,7 +179,8 @@ class OcrRepository:
         query += " ORDER BY frame_index"
 
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            params.append(limit)
 
         cursor = self.conn.execute(query, params)
         frame_indices = [row["frame_index"] for row in cursor.fetchall()]
@@ -162,14 +212,52 @@ class OcrRepository:
             SELECT * FROM full_frame_ocr
             WHERE frame_index >= ? AND frame_index <= ?
             ORDER BY frame_index, box_index
+            LIMIT ?
         """
-        if limit:
-            query += f" LIMIT {limit}"
-
-        cursor = self.conn.execute(query, (start_frame, end_frame))
+        cursor = self.conn.execute(query, (start_frame, end_frame, limit or -1))
         rows = cursor.fetchall()
         return [OcrDetection.from_row(_row_to_ocr_row(row)) for row in rows]
 
+    def has_search_index(self) -> bool:
+        """Check whether the full-text index exists."""
+        cursor = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (FTS_TABLE,),
+        )
+        return cursor.fetchone() is not None
+
+    def ensure_search_index(self) -> bool:
+        """
+        Build the full-text index if the database doesn't have one yet.
+
+        Existing databases are indexed lazily on first search; triggers keep
+        the index in sync with later writes.
+
+        Returns:
+            True if the index is available, False if this SQLite build lacks
+            FTS5 trigram support or the database is read-only
+        """
+        if self.has_search_index():
+            return True
+
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another connection may have built it while we waited
+                if not self.has_search_index():
+                    for statement in _FTS_SCHEMA:
+                        self.conn.execute(statement)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _use_search_index(self, query_text: str) -> bool:
+        return len(query_text) >= _MIN_FTS_QUERY_LENGTH and self.ensure_search_index()
+
     def search_text(
         self,
         query_text: str,
@@ -178,44 +266,138 @@ class OcrRepository:
         """
         Search for OCR detections containing specific text.
 
+        Uses the trigram full-text index, best matches first. Queries shorter
+        than three characters fall back to a LIKE scan in frame order.
+
         Args:
-            query_text: Text to search for (case-insensitive LIKE search)
+            query_text: Text to search for (case-insensitive substring match)
             limit: Maximum number of detections to return
         """
-        query = """
-            SELECT * FROM full_frame_ocr
-            WHERE text LIKE ?
-            ORDER BY frame_index, box_index
-        """
-        if limit:
-            query += f" LIMIT {limit}"
+        if self._use_search_index(query_text):
+            query = f"""
+                SELECT o.* FROM {FTS_TABLE} f
+                JOIN full_frame_ocr o ON o.id = f.rowid
+                WHERE {FTS_TABLE} MATCH ?
+                ORDER BY f.rank, o.frame_index, o.box_index
+                LIMIT ?
+            """
+            params: tuple = (_fts_phrase(query_text), limit or -1)
+        else:
+            query = """
+                SELECT * FROM full_frame_ocr
+                WHERE text LIKE ?
+                ORDER BY frame_index, box_index
+                LIMIT ?
+            """
+            params = (f"%{query_text}%", limit or -1)
 
-        cursor = self.conn.execute(query, (f"%{query_text}%",))
+        cursor = self.conn.execute(query, params)
         rows = cursor.fetchall()
         return [OcrDetection.from_row(_row_to_ocr_row(row)) for row in rows]
 
+    def search_frames(
+        self,
+        query_text: str,
+        limit: int | None = None,
+    ) -> list[FrameOcrResult]:
+        """
+        Search for frames whose OCR text contains specific text.
+
+        Frames are ranked by their best matching detection; each result holds
+        only the matching detections of that frame.
+
+        Args:
+            query_text: Text to search for (case-insensitive substring match)
+            limit: Maximum number of frames to return
+        """
+        if self._use_search_index(query_text):
+            query = f"""
+                WITH hits AS (
+                    SELECT rowid AS id, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?
+                ),
+                frames AS (
+                    SELECT o.frame_index, MIN(h.rank) AS best
+                    FROM hits h JOIN full_frame_ocr o ON o.id = h.id
+                    GROUP BY o.frame_index
+                    ORDER BY best, o.frame_index
+                    LIMIT ?
+                )
+                SELECT o.* FROM hits h
+                JOIN full_frame_ocr o ON o.id = h.id
+                JOIN frames fr ON fr.frame_index = o.frame_index
+                ORDER BY fr.best, o.frame_index, o.box_index
+            """
+            params: tuple = (_fts_phrase(query_text), limit or -1)
+        else:
+            query = """
+                WITH frames AS (
+                    SELECT DISTINCT frame_index FROM full_frame_ocr
+                    WHERE text LIKE ?1
+                    ORDER BY frame_index
+                    LIMIT ?2
+                )
+                SELECT o.* FROM full_frame_ocr o
+                JOIN frames fr ON fr.frame_index = o.frame_index
+                WHERE o.text LIKE ?1
+                ORDER BY o.frame_index, o.box_index
+            """
+            params = (f"%{query_text}%", limit or -1)
+
+        cursor = self.conn.execute(query, params)
+        detections = [
+            OcrDetection.from_row(_row_to_ocr_row(row)) for row in cursor.fetchall()
+        ]
+        results: list[FrameOcrResult] = []
+        for frame_index, group in groupby(detections, key=lambda d: d.frameIndex):
+            frame_detections = list(group)
+            results.append(
+                FrameOcrResult(
+                    frameIndex=frame_index,
+                    detections=frame_detections,
+                    totalDetections=len(frame_detections),
+                )
+            )
+        return results
+
     def get_stats(self) -> dict:
-        """Get OCR statistics for the video."""
-        # Total detections
-        cursor = self.conn.execute("SELECT COUNT(*) as count FROM full_frame_ocr")
-        total_detections = cursor.fetchone()["count"]
+        """
+        Get OCR statistics for the video.
 
-        # Frames with OCR
+        Results are cached per database file until the file is written.
+        """
+        path = database_file(self.conn)
+        version = file_version(path)
+        cached = _stats_cache.get(path)
+        if version is not None and cached is not None and cached[0] == version:
+            return dict(cached[1])
+
+        # Total detections and frames with OCR in one pass
         cursor = self.conn.execute(
-            "SELECT COUNT(DISTINCT frame_index) as count FROM full_frame_ocr"
+            """
+            SELECT COUNT(*) AS total_detections,
+                COUNT(DISTINCT frame_index) AS frames_with_ocr
+            FROM full_frame_ocr
+            """
         )
-        frames_with_ocr = cursor.fetchone()["count"]
+        row = cursor.fetchone()
+        total_detections = row["total_detections"]
+        frames_with_ocr = row["frames_with_ocr"]
 
         # Average detections per frame
         avg_per_frame = (
             total_detections / frames_with_ocr if frames_with_ocr > 0 else 0.0
         )
 
-        return {
+        stats = {
             "total_detections": total_detections,
             "frames_with_ocr": frames_with_ocr,
             "avg_detections_per_frame": round(avg_per_frame, 2),
         }
+        if version is not None:
+            if path not in _stats_cache and len(_stats_cache) >= _STATS_CACHE_SIZE:
+                del _stats_cache[next(iter(_stats_cache))]
+            _stats_cache[path] = (version, dict(stats))
+        return stats
 
     def get_frame_indices(self) -> list[int]:
         """Get all frame indices that have OCR data."""
@@ -0,0 +1,29 @@
+"""Version tokens for SQLite database files."""
+
+import os
+import sqlite3
+
+
+def database_file(conn: sqlite3.Connection) -> str:
+    """Path of a connection's main database file ("" if in-memory)."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def file_version(path: str) -> str | None:
+    """
+    Version of a database file that changes with every committed write.
+
+    Built from the SQLite header change counter and the file's mtime, so
+    reading it doesn't touch any table. None for in-memory databases.
+    """
+    if not path:
+        return None
+    with open(path, "rb") as f:
+        f.seek(24)
+        counter = int.from_bytes(f.read(4), "big")
+    return f"{counter}-{os.stat(path).st_mtime_ns}"
+
+
+def database_version(conn: sqlite3.Connection) -> str | None:
+    """Version of a connection's database file, see file_version()."""
+    return file_version(database_file(conn))
@@ -24,6 +24,7 @@ from app.models.actions import (
 from app.models.layout import BoxLabel, BoxLabelCreate, LabelSource
 from app.repositories.layout import LayoutRepository
 from app.repositories.ocr import OcrRepository
+from app.services.box_model_updates import update_box_model
 from app.services.database_manager import (
     get_layout_database_manager,
     get_layout_server_database_manager,
@@ -56,6 +57,7 @@ async def bulk_annotate(video_id: str, body: BulkAnnotateRequest, auth: Auth):
 
     boxes_modified = 0
     frames_affected = set()
+    changed_boxes: list[tuple[int, int]] = []
 
     try:
         # Get OCR data to find boxes within rectangle
@@ -110,6 +112,7 @@ async def bulk_annotate(video_id: str, body: BulkAnnotateRequest, auth: Auth):
                     )
                     if existing:
                         layout_repo.delete_box_label(existing.id)
+                        changed_boxes.append((frame_idx, box_idx))
                         boxes_modified += 1
                         frames_affected.add(frame_idx)
                 else:
@@ -127,9 +130,12 @@ async def bulk_annotate(video_id: str, body: BulkAnnotateRequest, auth: Auth):
                             labelSource=LabelSource.USER,
                         )
                     )
+                    changed_boxes.append((frame_idx, box_idx))
                     boxes_modified += 1
                     frames_affected.add(frame_idx)
 
+        await update_box_model(auth.tenant_id, video_id, changed_boxes)
+
         return BulkAnnotateResponse(
             success=True,
             boxesModified=boxes_modified,
@@ -201,7 +207,7 @@ async def analyze_layout(video_id: str, auth: Auth):
                 f"vertical_position={layout_params.vertical_position}"
             )
 
-        # Database automatically uploaded to Wasabi on exit (writable=True)
+        # Changes are uploaded to Wasabi by the write-back flush (writable=True)
 
         elapsed_ms = int((time.time() - start_time) * 1000)
 
@@ -1,17 +1,19 @@
 """Admin endpoints: database management and security audit."""
 
 import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 
 import boto3
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, status
 
 from app.config import get_settings
 from app.dependencies import Admin
 from app.models.admin import (
     DatabaseInfo,
     DatabaseListResponse,
+    DatabaseReconcileResponse,
     DatabaseRepairRequest,
     DatabaseRepairResponse,
     DatabaseStatus,
@@ -22,6 +24,9 @@ from app.models.admin import (
     StaleLocksCleanedResponse,
 )
 from app.models.sync import DatabaseName
+from app.services.database_manifest import get_database_manifest
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -31,150 +36,117 @@ router = APIRouter()
 # =============================================================================
 
 
+# Target schema versions for each database type
+TARGET_VERSIONS = {
+    "captions.db": 2,
+    "layout.db": 1,
+    "fullOCR.db": 1,
+}
+
+
+def _s3_client():
+    """Create an S3 client for Wasabi."""
+    settings = get_settings()
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.wasabi_endpoint_url,
+        aws_access_key_id=settings.effective_wasabi_access_key,
+        aws_secret_access_key=settings.effective_wasabi_secret_key,
+        region_name=settings.wasabi_region,
+    )
+
+
 @router.get("/databases", response_model=DatabaseListResponse)
 async def list_databases(
     admin: Admin,
     status_filter: DatabaseStatus | None = Query(None, alias="status"),
     search: str | None = Query(None, description="Video ID search"),
+    limit: int = Query(500, ge=1, le=5000, description="Page size"),
+    offset: int = Query(0, ge=0, description="Entries to skip"),
 ):
     """
     List databases with status and version info.
 
     Returns information about all video databases including schema version,
-    status, and size.
+    status, and size. Reads the database manifest, which API uploads keep
+    current and a background job reconciles from the bucket to pick up
+    pipeline outputs; this endpoint never lists the bucket itself.
+    ``total`` counts all matching databases, not just this page.
     """
-    settings = get_settings()
+    manifest = get_database_manifest()
 
-    # Create S3 client for Wasabi
-    s3_client = boto3.client(
-        "s3",
-        endpoint_url=settings.wasabi_endpoint_url,
-        aws_access_key_id=settings.effective_wasabi_access_key,
-        aws_secret_access_key=settings.effective_wasabi_secret_key,
-        region_name=settings.wasabi_region,
+    # Only presence is known without downloading a database
+    if status_filter in (DatabaseStatus.OUTDATED, DatabaseStatus.INCOMPLETE):
+        return DatabaseListResponse(
+            databases=[], total=0, current=0, outdated=0, incomplete=0
+        )
+    present = None if status_filter is None else status_filter == DatabaseStatus.CURRENT
+
+    page = await asyncio.to_thread(
+        manifest.list_databases, search, present, limit, offset
     )
 
     databases: list[DatabaseInfo] = []
-    db_names = ["captions.db", "layout.db", "fullOCR.db"]
-
-    # Target schema versions for each database type
-    target_versions = {
-        "captions.db": 2,
-        "layout.db": 1,
-        "fullOCR.db": 1,
-    }
-
-    def list_video_databases():
-        """List all databases from S3."""
-        found_dbs = []
-        paginator = s3_client.get_paginator("list_objects_v2")
-
-        try:
-            for page in paginator.paginate(
-                Bucket=settings.wasabi_bucket, Delimiter="/"
-            ):
-                # Get tenant prefixes
-                for prefix in page.get("CommonPrefixes", []):
-                    tenant_id = prefix["Prefix"].rstrip("/")
-
-                    # List videos for this tenant
-                    for video_page in paginator.paginate(
-                        Bucket=settings.wasabi_bucket,
-                        Prefix=f"{tenant_id}/videos/",
-                        Delimiter="/",
-                    ):
-                        for video_prefix in video_page.get("CommonPrefixes", []):
-                            video_path = video_prefix["Prefix"]
-                            video_id = video_path.split("/")[-2]
-
-                            # Check each database type
-                            for db_name in db_names:
-                                db_key = f"{video_path}{db_name}"
-                                try:
-                                    response = s3_client.head_object(
-                                        Bucket=settings.wasabi_bucket, Key=db_key
-                                    )
-                                    found_dbs.append(
-                                        {
-                                            "tenant_id": tenant_id,
-                                            "video_id": video_id,
-                                            "db_name": db_name,
-                                            "size": response.get("ContentLength", 0),
-                                            "last_modified": response.get(
-                                                "LastModified"
-                                            ),
-                                        }
-                                    )
-                                except ClientError as e:
-                                    if e.response["Error"]["Code"] == "404":
-                                        # Database doesn't exist
-                                        found_dbs.append(
-                                            {
-                                                "tenant_id": tenant_id,
-                                                "video_id": video_id,
-                                                "db_name": db_name,
-                                                "size": None,
-                                                "last_modified": None,
-                                                "missing": True,
-                                            }
-                                        )
-        except ClientError:
-            pass
-
-        return found_dbs
-
-    found = await asyncio.to_thread(list_video_databases)
-
-    # Process results
-    for db_info in found:
-        if search and search.lower() not in db_info["video_id"].lower():
-            continue
-
-        if db_info.get("missing"):
-            db_status = DatabaseStatus.MISSING
-            schema_version = None
-        else:
+    for entry in page.entries:
+        if entry.present:
             # For now, assume current version - actual version check would require
             # downloading and inspecting the database
             db_status = DatabaseStatus.CURRENT
-            schema_version = target_versions.get(db_info["db_name"])
-
-        if status_filter and db_status != status_filter:
-            continue
-
-        last_modified_str = None
-        if db_info["last_modified"]:
-            last_modified_str = db_info["last_modified"].isoformat()
+            schema_version = TARGET_VERSIONS.get(entry.database)
+        else:
+            db_status = DatabaseStatus.MISSING
+            schema_version = None
 
         databases.append(
             DatabaseInfo(
-                videoId=db_info["video_id"],
-                tenantId=db_info["tenant_id"],
-                database=db_info["db_name"],
+                videoId=entry.video_id,
+                tenantId=entry.tenant_id,
+                database=entry.database,
                 status=db_status,
                 schemaVersion=schema_version,
-                targetVersion=target_versions.get(db_info["db_name"]),
-                sizeBytes=db_info["size"],
-                lastModified=last_modified_str,
+                targetVersion=TARGET_VERSIONS.get(entry.database),
+                sizeBytes=entry.size_bytes,
+                lastModified=entry.last_modified,
             )
         )
 
-    # Count statuses
-    current_count = sum(1 for d in databases if d.status == DatabaseStatus.CURRENT)
-    outdated_count = sum(1 for d in databases if d.status == DatabaseStatus.OUTDATED)
-    incomplete_count = sum(
-        1 for d in databases if d.status == DatabaseStatus.INCOMPLETE
-    )
-
     return DatabaseListResponse(
         databases=databases,
-        total=len(databases),
-        current=current_count,
-        outdated=outdated_count,
-        incomplete=incomplete_count,
+        total=page.total,
+        current=page.present,
+        outdated=0,
+        incomplete=0,
     )
 
 
+@router.post("/databases/reconcile", response_model=DatabaseReconcileResponse)
+async def reconcile_databases(
+    admin: Admin,
+    tenant_id: str | None = Query(None, alias="tenantId"),
+):
+    """
+    Rebuild the database manifest from storage.
+
+    Lists the video folders of the bucket (or of one tenant) and records
+    every database's size and timestamp from the listings. Picks up databases
+    written outside the API, e.g. by pipelines.
+    """
+    try:
+        count = await asyncio.to_thread(
+            get_database_manifest().reconcile,
+            _s3_client(),
+            get_settings().wasabi_bucket,
+            tenant_id,
+        )
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to list storage: {e}",
+        )
+
+    return DatabaseReconcileResponse(success=True, tenantId=tenant_id, databases=count)
+
+
 @router.post("/databases/repair", response_model=DatabaseRepairResponse)
 async def repair_databases(body: DatabaseRepairRequest, admin: Admin):
     """
@@ -13,6 +13,7 @@ from app.models.boxes import (
 from app.models.layout import BoxLabel, BoxLabelCreate, LabelSource
 from app.repositories.layout import LayoutRepository
 from app.repositories.ocr import OcrRepository
+from app.services.box_model_updates import update_box_model
 from app.services.database_manager import (
     get_layout_database_manager,
     get_ocr_database_manager,
@@ -131,6 +132,12 @@ async def update_boxes(
             detail=str(e),
         )
 
+    await update_box_model(
+        auth.tenant_id,
+        video_id,
+        [(frame, annotation.boxIndex) for annotation in body.annotations],
+    )
+
     # Return updated frame data
     return await _get_updated_frame(auth, video_id, frame, len(body.annotations))
 
@@ -1,11 +1,14 @@
 """Video stats endpoint."""
 
-from fastapi import APIRouter
+import hashlib
+
+from fastapi import APIRouter, Request, Response, status
 
 from app.dependencies import Auth
 from app.models.stats import StatsResponse, VideoStats
 from app.repositories.captions import CaptionRepository
 from app.repositories.ocr import OcrRepository
+from app.repositories.versions import database_version
 from app.services.database_manager import (
     get_database_manager,
     get_ocr_database_manager,
@@ -14,12 +17,25 @@ from app.services.database_manager import (
 router = APIRouter()
 
 
+def _etag(*versions: str | None) -> str:
+    """Weak ETag from the versions of the databases the stats are read from."""
+    key = "|".join(version or "-" for version in versions)
+    digest = hashlib.md5(key.encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
 @router.get("/{video_id}/stats", response_model=StatsResponse)
-async def get_stats(video_id: str, auth: Auth):
+async def get_stats(video_id: str, auth: Auth, request: Request, response: Response):
     """
     Get video statistics and progress.
 
     Returns frame counts, annotation progress, and processing status.
+
+    Caption stats come from counters stored in captions.db (kept current by
+    triggers, aggregated in SQL for databases that don't have them yet) and
+    OCR stats are cached until fullOCR.db changes, so polling doesn't rescan
+    either database. Responses carry an ETag built from both
+    databases' versions; a matching If-None-Match gets 304 Not Modified.
     """
     caption_db_manager = get_database_manager()
     ocr_db_manager = get_ocr_database_manager()
@@ -29,10 +45,13 @@ async def get_stats(video_id: str, auth: Auth):
     annotation_count = 0
     needs_text_count = 0
     processing_status = "unknown"
+    ocr_version = None
+    caption_version = None
 
     # Get OCR stats for total frames
     try:
         async with ocr_db_manager.get_database(auth.tenant_id, video_id) as ocr_conn:
+            ocr_version = database_version(ocr_conn)
             ocr_repo = OcrRepository(ocr_conn)
             ocr_stats = ocr_repo.get_stats()
             total_frames = ocr_stats["frames_with_ocr"]
@@ -45,35 +64,29 @@ async def get_stats(video_id: str, auth: Auth):
         async with caption_db_manager.get_database(
             auth.tenant_id, video_id
         ) as caption_conn:
-            caption_repo = CaptionRepository(caption_conn)
-            # Get all captions to calculate stats
-            captions = caption_repo.list_captions(0, 999999999)
-            annotation_count = len(captions)
-
-            # Calculate covered frames (non-gap captions)
-            for caption in captions:
-                if caption.captionFrameExtentsState.value != "gap":
-                    covered_frames += (
-                        caption.endFrameIndex - caption.startFrameIndex + 1
-                    )
-
-                # Count captions needing text
-                if caption.textPending or (
-                    caption.text is None
-                    and caption.captionFrameExtentsState.value != "gap"
-                ):
-                    needs_text_count += 1
+            caption_version = database_version(caption_conn)
+            caption_stats = CaptionRepository(caption_conn).get_stats()
+
+        annotation_count = caption_stats["annotation_count"]
+        covered_frames = caption_stats["covered_frames"]
+        needs_text_count = caption_stats["needs_text_count"]
 
     except FileNotFoundError:
         # No captions database yet
         pass
 
+    etag = _etag(ocr_version, caption_version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     # Calculate progress
     progress_percent = 0.0
     if total_frames > 0:
         progress_percent = round((covered_frames / total_frames) * 100, 1)
 
-    return StatsResponse(
+    stats = StatsResponse(
         stats=VideoStats(
             totalFrames=total_frames,
             coveredFrames=covered_frames,
@@ -83,3 +96,6 @@ async def get_stats(video_id: str, auth: Auth):
             processingStatus=processing_status,
         )
     )
+
+    response.headers.update(headers)
+    return stats
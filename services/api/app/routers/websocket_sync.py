@@ -13,8 +13,10 @@ from jose import JWTError, jwt
 from app.config import get_settings
 from app.dependencies import AuthContext
 from app.models.sync import DatabaseName
+from app.services.change_broadcaster import ChangeBroadcaster
 from app.services.crsqlite_manager import get_crsqlite_manager
 from app.services.supabase_client import DatabaseStateRepository
+from app.services.sync_state_cache import SyncStateCache
 from app.services.websocket_manager import get_websocket_manager
 
 logger = logging.getLogger(__name__)
@@ -84,6 +86,7 @@ async def websocket_sync(
     Query params:
         token: JWT for authentication
     """
+    settings = get_settings()
     ws_manager = get_websocket_manager()
     cr_manager = get_crsqlite_manager()
     state_repo = DatabaseStateRepository()
@@ -128,6 +131,28 @@ async def websocket_sync(
         user_id=auth.user_id,
     )
 
+    # Lock checks and version bookkeeping are served from this cache and
+    # written back to the state store in batches
+    sync_state = SyncStateCache(
+        state_repo,
+        video_id=video_id,
+        db_name=db.value,
+        connection_id=connection_id,
+        state=state,
+        flush_interval_seconds=settings.sync_state_flush_interval_seconds,
+    )
+    sync_state.start()
+
+    # Server changes are merged over a short window and pushed in batches
+    broadcaster = ChangeBroadcaster(
+        ws_manager,
+        cr_manager,
+        session,
+        window_seconds=settings.sync_broadcast_window_ms / 1000,
+        max_message_bytes=settings.sync_broadcast_max_message_bytes,
+    )
+    broadcaster.start()
+
     try:
         # Main message loop
         while True:
@@ -149,7 +174,8 @@ async def websocket_sync(
                     message=message,
                     ws_manager=ws_manager,
                     cr_manager=cr_manager,
-                    state_repo=state_repo,
+                    sync_state=sync_state,
+                    broadcaster=broadcaster,
                 )
             elif msg_type == "ping":
                 # Heartbeat - just update activity
@@ -165,6 +191,8 @@ async def websocket_sync(
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        await broadcaster.close()
+        await sync_state.close()
         await ws_manager.disconnect(connection_id)
 
 
@@ -173,7 +201,8 @@ async def handle_sync_message(
     message: dict,
     ws_manager,
     cr_manager,
-    state_repo: DatabaseStateRepository,
+    sync_state: SyncStateCache,
+    broadcaster: ChangeBroadcaster,
 ):
     """Handle incoming sync message from client.
 
@@ -182,33 +211,23 @@ async def handle_sync_message(
         message: Parsed sync message
         ws_manager: WebSocket manager
         cr_manager: CR-SQLite manager
-        state_repo: Database state repository
+        sync_state: Cached sync state for this session
+        broadcaster: Outbound change broadcaster for this session
     """
     connection_id = session.connection_id
     video_id = session.video_id
     db_name = session.db_name
     tenant_id = session.tenant_id
 
-    # Verify this connection is still active writer
-    state = await state_repo.get_state(video_id, db_name)
-
-    if not state:
-        await ws_manager.send_error(
-            connection_id, "DB_NOT_FOUND", "Database state not found"
-        )
-        return
-
-    if state.get("active_connection_id") != connection_id:
-        await ws_manager.send_error(
-            connection_id, "SESSION_TRANSFERRED", "Editing moved to another window"
-        )
+    # Verify this connection is still active writer (lock moves are detected
+    # when the cached state is written back)
+    error = sync_state.check()
+    if error:
+        await ws_manager.send_error(connection_id, *error)
         return
 
-    if state.get("lock_type") != "client":
-        await ws_manager.send_error(
-            connection_id, "WORKFLOW_LOCKED", "Server is processing"
-        )
-        return
+    # The message's "version" is the client's own local db_version, not a
+    # server version it has received, so it never moves the broadcaster on
 
     # Extract changes
     changes = message.get("changes", [])
@@ -234,41 +253,20 @@ async def handle_sync_message(
                 changes=changes,
             )
 
-            # Update state
-            await state_repo.increment_server_version(video_id, db_name)
-            await state_repo.update_activity(video_id, db_name)
+            # Update state (written back to the state store in the background)
+            sync_state.next_version()
             ws_manager.update_activity(connection_id)
 
-            # Check for server-generated changes to push back
-            # (e.g., model predictions triggered by client edits)
-            server_changes = await cr_manager.get_changes_since(
-                tenant_id=tenant_id,
-                video_id=video_id,
-                db_name=db_name,
-                since_version=new_version - 1,  # Get changes from this batch
-                exclude_site_id=client_site_id,  # Exclude client's own changes
-            )
-
-            # Send ack with any server changes
+            # Ack right away; server changes follow from the broadcaster
             await ws_manager.send_ack(
                 connection_id=connection_id,
                 server_version=new_version,
                 applied_count=len(changes),
             )
 
-            # If there are server-generated changes, push them to client
-            if server_changes:
-                await ws_manager.send_message(
-                    connection_id,
-                    {
-                        "type": "server_update",
-                        "changes": server_changes,
-                        "version": new_version,
-                    },
-                )
-                logger.debug(
-                    f"Pushed {len(server_changes)} server changes to {connection_id}"
-                )
+            # Queue server-generated changes (e.g., model predictions triggered
+            # by client edits); the broadcaster merges them into one push
+            broadcaster.notify(new_version, exclude_site_id=client_site_id)
 
             logger.debug(
                 f"Applied {len(changes)} changes to {video_id}/{db_name}, version={new_version}"
@@ -281,9 +279,8 @@ async def handle_sync_message(
             )
     else:
         # No changes - just ack
-        current_version = state.get("server_version", 0)
         await ws_manager.send_ack(
             connection_id=connection_id,
-            server_version=current_version,
+            server_version=sync_state.server_version,
             applied_count=0,
         )
@@ -4,18 +4,45 @@ Handles:
 - Idle timeout uploads (no activity for N minutes)
 - Checkpoint uploads (periodic backup)
 - Graceful shutdown uploads (SIGTERM)
+
+Uploads run concurrently through a bounded pool with per-file retry, so one
+large database doesn't hold up every other video.
 """
 
 import asyncio
 import logging
+import random
+import time
+from dataclasses import dataclass
 
 from app.config import get_settings
-from app.services.crsqlite_manager import get_crsqlite_manager
-from app.services.supabase_client import DatabaseStateRepository
+from app.services.crsqlite_manager import CRSqliteManager, get_crsqlite_manager
+from app.services.supabase_client import DatabaseStateRepository, StateDict
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class UploadMetrics:
+    """Counters for working copy uploads."""
+
+    queue_depth: int = 0
+    in_flight: int = 0
+    uploaded: int = 0
+    failed: int = 0
+    retries: int = 0
+    bytes_original: int = 0
+    bytes_uploaded: int = 0
+    upload_seconds: float = 0.0
+
+    @property
+    def throughput_mb_per_sec(self) -> float:
+        """Compressed MB uploaded per second of upload time."""
+        if self.upload_seconds == 0:
+            return 0.0
+        return self.bytes_uploaded / 1024 / 1024 / self.upload_seconds
+
+
 class WasabiUploadWorker:
     """Background worker for periodic Wasabi uploads.
 
@@ -24,12 +51,16 @@ class WasabiUploadWorker:
     - Checkpoint: No upload for `wasabi_upload_checkpoint_minutes`
 
     Also handles graceful shutdown by uploading all pending changes.
+    Up to `wasabi_upload_concurrency` uploads run at once.
     """
 
     def __init__(self):
         self._running = False
         self._task: asyncio.Task | None = None
         self._settings = get_settings()
+        self._semaphore = asyncio.Semaphore(self._settings.wasabi_upload_concurrency)
+        self._in_flight: set[str] = set()
+        self.metrics = UploadMetrics()
 
     async def start(self) -> None:
         """Start background worker."""
@@ -102,30 +133,7 @@ class WasabiUploadWorker:
             return
 
         logger.info(f"Found {len(pending)} databases needing upload")
-
-        for state in pending:
-            video_id = state.get("video_id")
-            db_name = state.get("database_name")
-            tenant_id = state.get("tenant_id")
-            server_version = state.get("server_version", 0)
-
-            if not video_id or not db_name or not tenant_id:
-                continue
-
-            # Check if working copy exists
-            if not cr_manager.has_working_copy(tenant_id, video_id, db_name):
-                logger.warning(
-                    f"No working copy for {video_id}/{db_name}, skipping upload"
-                )
-                continue
-
-            try:
-                logger.info(f"Uploading {video_id}/{db_name} to Wasabi")
-                await cr_manager.upload_to_wasabi(tenant_id, video_id, db_name)
-                await repo.update_wasabi_version(video_id, db_name, server_version)
-                logger.info(f"Uploaded {video_id}/{db_name} version {server_version}")
-            except Exception as e:
-                logger.error(f"Failed to upload {video_id}/{db_name}: {e}")
+        await self._upload_states(pending, repo, cr_manager)
 
     async def _upload_all_pending(self) -> None:
         """Upload all databases with unsaved changes (for shutdown)."""
@@ -139,28 +147,130 @@ class WasabiUploadWorker:
             return
 
         logger.info(f"Uploading {len(pending)} databases on shutdown")
+        await self._upload_states(pending, repo, cr_manager)
 
-        for state in pending:
+        # Close all connections
+        cr_manager.close_all_connections()
+
+    async def _upload_states(
+        self,
+        states: list[StateDict],
+        repo: DatabaseStateRepository,
+        cr_manager: CRSqliteManager,
+    ) -> None:
+        """Upload the working copies for the given states concurrently."""
+        jobs = []
+        for state in states:
             video_id = state.get("video_id")
             db_name = state.get("database_name")
             tenant_id = state.get("tenant_id")
-            server_version = state.get("server_version", 0)
 
             if not video_id or not db_name or not tenant_id:
                 continue
 
+            # Check if working copy exists
             if not cr_manager.has_working_copy(tenant_id, video_id, db_name):
+                logger.warning(
+                    f"No working copy for {video_id}/{db_name}, skipping upload"
+                )
                 continue
 
+            key = f"{tenant_id}/{video_id}/{db_name}"
+            if key in self._in_flight:
+                continue
+            self._in_flight.add(key)
+            jobs.append(self._upload_one(state, repo, cr_manager))
+
+        if not jobs:
+            return
+
+        start = time.monotonic()
+        bytes_before = self.metrics.bytes_uploaded
+        self.metrics.queue_depth += len(jobs)
+        results = await asyncio.gather(*jobs)
+
+        elapsed = time.monotonic() - start
+        uploaded_mb = (self.metrics.bytes_uploaded - bytes_before) / 1024 / 1024
+        logger.info(
+            f"Uploaded {sum(results)}/{len(jobs)} databases "
+            f"({uploaded_mb:.1f} MB) in {elapsed:.1f}s; "
+            f"{self.metrics.failed} failed and {self.metrics.retries} retries total"
+        )
+
+    async def _upload_one(
+        self,
+        state: StateDict,
+        repo: DatabaseStateRepository,
+        cr_manager: CRSqliteManager,
+    ) -> bool:
+        """Wait for a pool slot, then upload one working copy."""
+        key = f"{state['tenant_id']}/{state['video_id']}/{state['database_name']}"
+        queued = True
+        try:
+            async with self._semaphore:
+                self.metrics.queue_depth -= 1
+                queued = False
+                self.metrics.in_flight += 1
+                try:
+                    return await self._upload_with_retry(state, repo, cr_manager)
+                finally:
+                    self.metrics.in_flight -= 1
+        finally:
+            if queued:
+                self.metrics.queue_depth -= 1
+            self._in_flight.discard(key)
+
+    async def _upload_with_retry(
+        self,
+        state: StateDict,
+        repo: DatabaseStateRepository,
+        cr_manager: CRSqliteManager,
+    ) -> bool:
+        """Upload a working copy, retrying with exponential backoff and jitter."""
+        video_id = state["video_id"]
+        db_name = state["database_name"]
+        tenant_id = state["tenant_id"]
+        server_version = state.get("server_version", 0)
+        max_attempts = self._settings.wasabi_upload_max_attempts
+
+        for attempt in range(1, max_attempts + 1):
             try:
-                logger.info(f"Shutdown upload: {video_id}/{db_name}")
-                await cr_manager.upload_to_wasabi(tenant_id, video_id, db_name)
+                logger.info(f"Uploading {video_id}/{db_name} to Wasabi")
+                start = time.monotonic()
+                original, compressed = await cr_manager.upload_to_wasabi(
+                    tenant_id, video_id, db_name
+                )
+                self.metrics.upload_seconds += time.monotonic() - start
                 await repo.update_wasabi_version(video_id, db_name, server_version)
             except Exception as e:
-                logger.error(f"Shutdown upload failed for {video_id}/{db_name}: {e}")
+                if attempt == max_attempts:
+                    logger.error(
+                        f"Failed to upload {video_id}/{db_name} "
+                        f"after {attempt} attempts: {e}"
+                    )
+                    break
 
-        # Close all connections
-        cr_manager.close_all_connections()
+                delay = (
+                    self._settings.wasabi_upload_retry_base_seconds
+                    * 2 ** (attempt - 1)
+                    * random.uniform(0.5, 1.5)
+                )
+                logger.warning(
+                    f"Upload of {video_id}/{db_name} failed "
+                    f"(attempt {attempt}/{max_attempts}), retrying in {delay:.1f}s: {e}"
+                )
+                self.metrics.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.metrics.uploaded += 1
+            self.metrics.bytes_original += original
+            self.metrics.bytes_uploaded += compressed
+            logger.info(f"Uploaded {video_id}/{db_name} version {server_version}")
+            return True
+
+        self.metrics.failed += 1
+        return False
 
 
 # Singleton instance
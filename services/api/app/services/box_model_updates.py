@@ -0,0 +1,173 @@
+"""
+Keep the box classification model in step with user annotations.
+
+The boxes and bulk-annotate endpoints call update_box_model() with the boxes
+whose labels they saved. Only those boxes are featurized, with the same code
+train_model uses (ocr_box_model.sync_annotations), so the running statistics
+in layout-server.db stay equal to a full rebuild over the same data.
+
+ocr_box_model reads the pipeline's table layout (layout_config,
+video_metadata, full_frame_ocr with normalized coordinates and labels with
+box bounds). The API keeps that data in layout.db (video_layout_config,
+full_frame_box_labels) and fullOCR.db (pixel boxes), so fullOCR.db is
+attached to the layout.db connection and temporary views present both under
+the names ocr_box_model expects. Nothing is written to either database.
+
+The update runs in a worker thread so featurizing never blocks the event loop.
+"""
+
+import asyncio
+import logging
+import sqlite3
+from collections.abc import Iterable
+
+from ocr_box_model import run_model_migrations, sync_annotations
+
+from app.services.database_manager import (
+    get_layout_database_manager,
+    get_layout_server_database_manager,
+    get_ocr_database_manager,
+)
+
+logger = logging.getLogger(__name__)
+
+BoxKey = tuple[int, int]
+
+# Full-frame OCR index rate when video_preferences doesn't record one
+DEFAULT_INDEX_FRAMERATE_HZ = 10.0
+
+# Box bounds are derived from the normalized full_frame_ocr view with the
+# conversion ocr_box_model.train.build_frame_data_cache applies, so a labelled
+# box and its k-nn neighborhood get identical pixel coordinates.
+TRAINING_VIEWS = """
+    CREATE TEMP VIEW layout_config AS
+    SELECT
+        id, frame_width, frame_height,
+        crop_left, crop_top, crop_right, crop_bottom,
+        vertical_position AS vertical_center, anchor_type, anchor_position
+    FROM main.video_layout_config;
+
+    CREATE TEMP VIEW video_metadata AS
+    SELECT 1 AS id, (MAX(frame_index) + 1) / {framerate} AS duration_seconds
+    FROM ocr.full_frame_ocr
+    HAVING MAX(frame_index) IS NOT NULL;
+
+    CREATE TEMP VIEW full_frame_ocr AS
+    SELECT
+        o.frame_index,
+        o.box_index,
+        o.text,
+        o.frame_index / {framerate} AS timestamp_seconds,
+        CAST(o.bbox_left AS REAL) / c.frame_width AS x,
+        1 - CAST(o.bbox_bottom AS REAL) / c.frame_height AS y,
+        CAST(o.bbox_right - o.bbox_left AS REAL) / c.frame_width AS width,
+        CAST(o.bbox_bottom - o.bbox_top AS REAL) / c.frame_height AS height
+    FROM ocr.full_frame_ocr o, main.video_layout_config c
+    WHERE c.id = 1 AND o.bbox_left IS NOT NULL;
+
+    CREATE TEMP VIEW full_frame_box_labels AS
+    SELECT
+        'full_frame' AS annotation_source,
+        l.frame_index,
+        l.box_index,
+        l.label,
+        l.label_source,
+        CAST(o.x * c.frame_width AS INTEGER) AS box_left,
+        CAST((1 - o.y) * c.frame_height AS INTEGER)
+            - CAST(o.height * c.frame_height AS INTEGER) AS box_top,
+        CAST(o.x * c.frame_width AS INTEGER)
+            + CAST(o.width * c.frame_width AS INTEGER) AS box_right,
+        CAST((1 - o.y) * c.frame_height AS INTEGER) AS box_bottom
+    FROM main.full_frame_box_labels l
+    JOIN temp.full_frame_ocr o
+        ON o.frame_index = l.frame_index AND o.box_index = l.box_index
+    JOIN main.video_layout_config c ON c.id = 1;
+"""
+
+
+def get_index_framerate(layout_conn: sqlite3.Connection) -> float:
+    """Get the full-frame OCR index rate recorded in layout.db, if any."""
+    try:
+        row = layout_conn.execute(
+            "SELECT index_framerate_hz FROM video_preferences WHERE id = 1"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Column added by ocr_box_model.run_layout_migrations
+        return DEFAULT_INDEX_FRAMERATE_HZ
+    return row[0] if row and row[0] else DEFAULT_INDEX_FRAMERATE_HZ
+
+
+def attach_training_views(
+    layout_conn: sqlite3.Connection, ocr_conn: sqlite3.Connection
+) -> None:
+    """
+    Present layout.db and fullOCR.db under the tables ocr_box_model reads.
+
+    Attaches fullOCR.db to layout_conn as "ocr" and creates temporary views
+    that shadow the layout.db tables for the rest of this connection.
+    """
+    ocr_path = next(
+        row[2] for row in ocr_conn.execute("PRAGMA database_list") if row[1] == "main"
+    )
+    framerate = float(get_index_framerate(layout_conn))
+    layout_conn.execute("ATTACH DATABASE ? AS ocr", (ocr_path,))
+    layout_conn.executescript(TRAINING_VIEWS.format(framerate=repr(framerate)))
+
+
+def apply_box_label_changes(
+    layout_conn: sqlite3.Connection,
+    ocr_conn: sqlite3.Connection,
+    model_conn: sqlite3.Connection,
+    boxes: Iterable[BoxKey],
+) -> int | None:
+    """
+    Apply the current user labels of the given boxes to the model.
+
+    Args:
+        layout_conn: Connection to layout.db (annotations, layout config)
+        ocr_conn: Connection to fullOCR.db (OCR boxes)
+        model_conn: Connection to layout-server.db (model storage)
+        boxes: (frame_index, box_index) of every box whose label changed
+
+    Returns:
+        Number of training samples in the refreshed model, or None if
+        there is too little data for a trained model
+    """
+    attach_training_views(layout_conn, ocr_conn)
+    run_model_migrations(model_conn)
+    return sync_annotations(layout_conn, model_conn, boxes)
+
+
+async def update_box_model(
+    tenant_id: str, video_id: str, boxes: Iterable[BoxKey]
+) -> None:
+    """
+    Apply saved label changes to a video's box classification model.
+
+    Called after annotations are saved. Failures are logged rather than
+    raised so they never fail the save; a full retrain rebuilds the state.
+    """
+    boxes = list(boxes)
+    if not boxes:
+        return
+
+    try:
+        async with (
+            get_ocr_database_manager().get_database(tenant_id, video_id) as ocr_conn,
+            get_layout_database_manager().get_database(
+                tenant_id, video_id
+            ) as layout_conn,
+            # Writable so updated statistics are uploaded, not left in the cache
+            get_layout_server_database_manager().get_or_create_database(
+                tenant_id, video_id, writable=True
+            ) as model_conn,
+        ):
+            n_samples = await asyncio.to_thread(
+                apply_box_label_changes, layout_conn, ocr_conn, model_conn, boxes
+            )
+    except Exception:
+        logger.exception(f"Box model update failed for video {video_id}")
+        return
+
+    if n_samples is not None:
+        logger.info(f"Box model for video {video_id} now has {n_samples} samples")
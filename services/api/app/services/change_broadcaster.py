@@ -0,0 +1,158 @@
+"""Coalescing outbound change broadcaster for WebSocket sync sessions.
+
+Instead of querying and pushing server changes after every applied sync
+message, a session's broadcaster is notified of the new version and flushes
+once per short window: one query for everything since the last version the
+client has, sent as size-capped server_update messages.
+"""
+
+import asyncio
+import base64
+import logging
+from typing import Any
+
+from app.services.crsqlite_manager import ChangeRecord, CRSqliteManager
+from app.services.websocket_manager import SyncSession, WebSocketManager
+
+logger = logging.getLogger(__name__)
+
+
+def _to_wire(change: ChangeRecord) -> dict[str, Any]:
+    """JSON-safe change record; binary values are base64 encoded."""
+    return {
+        key: base64.b64encode(value).decode("ascii")
+        if isinstance(value, bytes)
+        else value
+        for key, value in change.items()
+    }
+
+
+class ChangeBroadcaster:
+    """Merges server changes for one session and pushes them in batches.
+
+    Tracks the highest server version already sent to the client, so rows
+    are never sent twice.
+
+    Args:
+        ws_manager: WebSocket manager used to send messages
+        cr_manager: CR-SQLite manager to read changes from
+        session: Sync session to push to
+        window_seconds: How long changes are merged before sending
+        max_message_bytes: Approximate size cap of one server_update message
+    """
+
+    def __init__(
+        self,
+        ws_manager: WebSocketManager,
+        cr_manager: CRSqliteManager,
+        session: SyncSession,
+        window_seconds: float = 0.03,
+        max_message_bytes: int = 256 * 1024,
+    ):
+        self._ws_manager = ws_manager
+        self._cr_manager = cr_manager
+        self._session = session
+        self._window = window_seconds
+        self._max_message_bytes = max_message_bytes
+
+        self._synced_version: int | None = None
+        self._target_version = 0
+        self._exclude_site_id: bytes | None = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.messages_sent = 0
+        self.changes_sent = 0
+
+    @property
+    def synced_version(self) -> int | None:
+        """Highest server version already sent to the client."""
+        return self._synced_version
+
+    def notify(self, version: int, exclude_site_id: bytes | None = None) -> None:
+        """Schedule a push of server changes up to ``version``.
+
+        Args:
+            version: Server version after applying a client message
+            exclude_site_id: The client's site_id (its own changes are not echoed)
+        """
+        if self._synced_version is None:
+            # Nothing before the first applied message is pushed
+            self._synced_version = version - 1
+        self._target_version = max(self._target_version, version)
+        if exclude_site_id is not None:
+            self._exclude_site_id = exclude_site_id
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background flush task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            # Merge everything applied within the window into one push
+            await asyncio.sleep(self._window)
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    f"Failed to push changes to {self._session.connection_id}"
+                )
+
+    async def flush(self) -> int:
+        """Send server changes the client doesn't have yet.
+
+        Returns:
+            Number of changes sent
+        """
+        async with self._flush_lock:
+            since = self._synced_version
+            target = self._target_version
+            if since is None or target <= since:
+                return 0
+
+            session = self._session
+            sent = 0
+            newest = target
+            async for batch in self._cr_manager.iter_changes_since(
+                tenant_id=session.tenant_id,
+                video_id=session.video_id,
+                db_name=session.db_name,
+                since_version=since,
+                exclude_site_id=self._exclude_site_id,
+                max_batch_bytes=self._max_message_bytes,
+            ):
+                newest = max(newest, batch[-1]["db_version"])
+                await self._ws_manager.send_message(
+                    session.connection_id,
+                    {
+                        "type": "server_update",
+                        "changes": [_to_wire(change) for change in batch],
+                        "version": newest,
+                    },
+                )
+                sent += len(batch)
+                self.messages_sent += 1
+
+            # Rows past the target came from the same snapshot, so they're sent
+            self._synced_version = max(self._synced_version or since, newest)
+            self.changes_sent += sent
+            if sent:
+                logger.debug(
+                    f"Pushed {sent} server changes to {session.connection_id} "
+                    f"(versions {since + 1}..{newest})"
+                )
+            return sent
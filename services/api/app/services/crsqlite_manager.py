@@ -7,20 +7,85 @@ synchronization. Manages downloading from and uploading to Wasabi S3.
 import asyncio
 import gzip
 import logging
+import shutil
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
 import apsw
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 
 from app.config import get_settings
+from app.repositories.captions import STATS_SCHEMA, STATS_TABLE
+from app.services.database_manifest import record_database_upload
 
 logger = logging.getLogger(__name__)
 
 # Type alias for change records
 ChangeRecord = dict[str, Any]
 
+# Chunk size for streaming gzip compression before upload
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+
+CHANGE_COLUMNS = (
+    "table",
+    "pk",
+    "cid",
+    "val",
+    "col_version",
+    "db_version",
+    "site_id",
+    "cl",
+    "seq",
+)
+
+_change_values = itemgetter(*CHANGE_COLUMNS)
+
+_INSERT_CHANGE = """
+    INSERT INTO crsql_changes
+    ("table", "pk", "cid", "val", "col_version", "db_version", "site_id", "cl", "seq")
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# One page of changes after a (db_version, seq) position; the plain
+# db_version bound lets the lookup seek instead of rescanning earlier pages
+_SELECT_CHANGES = """
+    SELECT "table", "pk", "cid", "val", "col_version", "db_version", "site_id", "cl", "seq"
+    FROM crsql_changes
+    WHERE db_version >= ? AND (db_version, seq) > (?, ?)
+"""
+
+# Rough per-value overhead when estimating the size of a change record
+_VALUE_OVERHEAD_BYTES = 8
+
+
+def _change_size(row: tuple) -> int:
+    """Approximate in-memory/wire size of a change row in bytes."""
+    size = 0
+    for value in row:
+        if isinstance(value, (bytes, str)):
+            size += len(value)
+        size += _VALUE_OVERHEAD_BYTES
+    return size
+
+
+def _next_batch(
+    rows: Iterator[tuple], batch_size: int, max_batch_bytes: int
+) -> list[ChangeRecord]:
+    """Pull up to batch_size rows (or about max_batch_bytes) from a cursor."""
+    batch: list[ChangeRecord] = []
+    batch_bytes = 0
+    for row in rows:
+        batch.append(dict(zip(CHANGE_COLUMNS, row, strict=True)))
+        batch_bytes += _change_size(row)
+        if len(batch) >= batch_size or batch_bytes >= max_batch_bytes:
+            break
+    return batch
+
 
 class CRSqliteManager:
     """Manages CR-SQLite working copies on local disk.
@@ -49,6 +114,13 @@ class CRSqliteManager:
             config=Config(signature_version="s3v4"),
         )
         self._bucket = self._settings.wasabi_bucket
+        # Large databases are uploaded in parts instead of one PUT
+        self._transfer_config = TransferConfig(
+            multipart_threshold=self._settings.wasabi_multipart_threshold_mb
+            * 1024
+            * 1024,
+            multipart_chunksize=self._settings.wasabi_multipart_chunk_mb * 1024 * 1024,
+        )
 
     def _working_path(self, tenant_id: str, video_id: str, db_name: str) -> Path:
         """Get local working copy path."""
@@ -105,13 +177,20 @@ class CRSqliteManager:
         tenant_id: str,
         video_id: str,
         db_name: str,
-    ) -> None:
+    ) -> tuple[int, int]:
         """Compress and upload database to Wasabi.
 
+        The database is gzipped in chunks to a temporary file and uploaded
+        with multipart upload above the configured threshold, so it is never
+        held in memory whole.
+
         Args:
             tenant_id: Tenant UUID
             video_id: Video UUID
             db_name: Database name
+
+        Returns:
+            Tuple of (original_size, compressed_size) in bytes
         """
         working_path = self._working_path(tenant_id, video_id, db_name)
         s3_key = self._s3_key(tenant_id, video_id, db_name)
@@ -119,26 +198,42 @@ class CRSqliteManager:
         # Close connection before upload to ensure all data is flushed
         self._close_connection(tenant_id, video_id, db_name)
 
-        def _upload():
+        def _upload() -> tuple[int, int]:
             logger.info(f"Uploading {working_path} to {s3_key}")
-            data = working_path.read_bytes()
-            compressed = gzip.compress(data, compresslevel=6)
-            self._s3.put_object(
-                Bucket=self._bucket,
-                Key=s3_key,
-                Body=compressed,
-                ContentType="application/gzip",
-            )
-            original_size = len(data)
-            compressed_size = len(compressed)
+            with tempfile.NamedTemporaryFile(
+                dir=working_path.parent, suffix=".gz.tmp", delete=False
+            ) as tmp:
+                compressed_path = Path(tmp.name)
+
+            try:
+                with (
+                    open(working_path, "rb") as f_in,
+                    gzip.open(compressed_path, "wb", compresslevel=6) as f_out,
+                ):
+                    shutil.copyfileobj(f_in, f_out, COMPRESS_CHUNK_SIZE)
+
+                original_size = working_path.stat().st_size
+                compressed_size = compressed_path.stat().st_size
+                self._s3.upload_file(
+                    str(compressed_path),
+                    self._bucket,
+                    s3_key,
+                    ExtraArgs={"ContentType": "application/gzip"},
+                    Config=self._transfer_config,
+                )
+            finally:
+                compressed_path.unlink(missing_ok=True)
+            record_database_upload(s3_key, compressed_size)
+
             ratio = (
                 (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
             )
             logger.info(
                 f"Uploaded {s3_key}: {original_size} -> {compressed_size} bytes ({ratio:.1f}% reduction)"
             )
+            return original_size, compressed_size
 
-        await asyncio.to_thread(_upload)
+        return await asyncio.to_thread(_upload)
 
     def _ensure_crr_initialized(self, conn: apsw.Connection, db_name: str) -> None:
         """Initialize tables as CRRs if not already done.
@@ -160,6 +255,28 @@ class CRSqliteManager:
                 conn.execute("SELECT crsql_as_crr('captions')")
                 logger.info(f"Initialized CRR tables for {db_name}")
 
+    def _ensure_stats_counters(self, conn: apsw.Connection, db_name: str) -> None:
+        """Add the caption stats counters to captions databases created without them.
+
+        The counters are local bookkeeping maintained by triggers, not a CRR,
+        so they are created in the working copy and uploaded with it.
+        """
+        if db_name != "captions":
+            return
+
+        def has_table(name: str) -> bool:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (name,),
+            ).fetchone()
+            return row is not None
+
+        if has_table("captions") and not has_table(STATS_TABLE):
+            with conn:
+                for statement in STATS_SCHEMA:
+                    conn.execute(statement)
+            logger.info(f"Added stats counters to {db_name}")
+
     def get_connection(
         self,
         tenant_id: str,
@@ -199,6 +316,8 @@ class CRSqliteManager:
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("PRAGMA synchronous=NORMAL")
 
+            self._ensure_stats_counters(conn, db_name)
+
             self._connections[key] = conn
             logger.debug(f"Created connection for {key}")
 
@@ -241,25 +360,7 @@ class CRSqliteManager:
             cursor = conn.cursor()
             try:
                 cursor.execute("BEGIN")
-                for change in changes:
-                    cursor.execute(
-                        """
-                        INSERT INTO crsql_changes
-                        ("table", "pk", "cid", "val", "col_version", "db_version", "site_id", "cl", "seq")
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            change["table"],
-                            change["pk"],
-                            change["cid"],
-                            change["val"],
-                            change["col_version"],
-                            change["db_version"],
-                            change["site_id"],
-                            change["cl"],
-                            change["seq"],
-                        ),
-                    )
+                cursor.executemany(_INSERT_CHANGE, map(_change_values, changes))
                 cursor.execute("COMMIT")
 
                 # Get new version
@@ -271,15 +372,24 @@ class CRSqliteManager:
 
         return await asyncio.to_thread(_apply)
 
-    async def get_changes_since(
+    async def iter_changes_since(
         self,
         tenant_id: str,
         video_id: str,
         db_name: str,
         since_version: int,
         exclude_site_id: bytes | None = None,
-    ) -> list[ChangeRecord]:
-        """Get changes since a specific version.
+        batch_size: int | None = None,
+        max_batch_bytes: int | None = None,
+    ) -> AsyncIterator[list[ChangeRecord]]:
+        """Stream changes since a specific version in bounded batches.
+
+        Each batch is its own keyset query on (db_version, seq), read to the
+        end in a worker thread, so the event loop isn't blocked, large
+        backlogs are never materialized at once, and no cursor stays open on
+        the shared connection while apply_changes uses it. Batches are not
+        one snapshot: changes committed while streaming have higher versions
+        and arrive in later batches.
 
         Args:
             tenant_id: Tenant UUID
@@ -287,53 +397,71 @@ class CRSqliteManager:
             db_name: Database name
             since_version: Version to get changes after
             exclude_site_id: Optional site_id to exclude (avoids echo of own changes)
+            batch_size: Max changes per batch (default from settings)
+            max_batch_bytes: Approximate max size of a batch in bytes (default
+                from settings); a batch always holds at least one change
 
-        Returns:
-            List of change records
+        Yields:
+            Lists of change records, ordered by db_version, seq
         """
         conn = self.get_connection(tenant_id, video_id, db_name)
+        batch_size = batch_size or self._settings.crsqlite_change_batch_size
+        max_batch_bytes = (
+            max_batch_bytes or self._settings.crsqlite_change_batch_max_bytes
+        )
 
-        def _query():
+        sql = _SELECT_CHANGES
+        site_bindings: tuple = ()
+        if exclude_site_id:
+            # Filter out changes from the specified site (avoid echo)
+            sql += " AND site_id IS NOT ?"
+            site_bindings = (exclude_site_id,)
+        sql += " ORDER BY db_version, seq LIMIT ?"
+
+        def _read_batch(after: tuple[int, int]) -> list[ChangeRecord]:
             cursor = conn.cursor()
-            if exclude_site_id:
-                # Filter out changes from the specified site (avoid echo)
-                rows = cursor.execute(
-                    """
-                    SELECT "table", "pk", "cid", "val", "col_version", "db_version", "site_id", "cl", "seq"
-                    FROM crsql_changes
-                    WHERE db_version > ? AND site_id IS NOT ?
-                    ORDER BY db_version, seq
-                    """,
-                    (since_version, exclude_site_id),
-                ).fetchall()
-            else:
-                # No filter - used for server-initiated pushes
+            try:
                 rows = cursor.execute(
-                    """
-                    SELECT "table", "pk", "cid", "val", "col_version", "db_version", "site_id", "cl", "seq"
-                    FROM crsql_changes
-                    WHERE db_version > ?
-                    ORDER BY db_version, seq
-                    """,
-                    (since_version,),
-                ).fetchall()
-
-            return [
-                {
-                    "table": row[0],
-                    "pk": row[1],
-                    "cid": row[2],
-                    "val": row[3],
-                    "col_version": row[4],
-                    "db_version": row[5],
-                    "site_id": row[6],
-                    "cl": row[7],
-                    "seq": row[8],
-                }
-                for row in rows
-            ]
+                    sql, (after[0], *after, *site_bindings, batch_size)
+                )
+                return _next_batch(rows, batch_size, max_batch_bytes)
+            finally:
+                cursor.close()
+
+        # seq starts at 0, so this is every change with db_version > since
+        after = (since_version + 1, -1)
+        while batch := await asyncio.to_thread(_read_batch, after):
+            yield batch
+            after = (batch[-1]["db_version"], batch[-1]["seq"])
 
-        return await asyncio.to_thread(_query)
+    async def get_changes_since(
+        self,
+        tenant_id: str,
+        video_id: str,
+        db_name: str,
+        since_version: int,
+        exclude_site_id: bytes | None = None,
+    ) -> list[ChangeRecord]:
+        """Get all changes since a specific version.
+
+        Prefer iter_changes_since() for backlogs of unknown size.
+
+        Args:
+            tenant_id: Tenant UUID
+            video_id: Video UUID
+            db_name: Database name
+            since_version: Version to get changes after
+            exclude_site_id: Optional site_id to exclude (avoids echo of own changes)
+
+        Returns:
+            List of change records
+        """
+        changes: list[ChangeRecord] = []
+        async for batch in self.iter_changes_since(
+            tenant_id, video_id, db_name, since_version, exclude_site_id
+        ):
+            changes.extend(batch)
+        return changes
 
     async def get_db_version(
         self,
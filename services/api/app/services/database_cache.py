@@ -0,0 +1,320 @@
+"""Host-wide, disk-persistent cache for SQLite databases downloaded from Wasabi.
+
+All API workers on a host share one cache directory. Each cached database has
+two sidecar files next to it:
+
+- ``<db>.etag``: JSON with the storage key, the ETag the file was downloaded
+  at, and when that ETag was last checked against Wasabi
+- ``<db>.lock``: lock file used with ``flock``. Connections hold a shared lock
+  while open; downloads, replacements and evictions take an exclusive lock,
+  so a file is never swapped out or deleted underneath an open connection.
+- ``<db>.dirty``: present while the file has local edits that are not yet in
+  Wasabi. A dirty file is never replaced, revalidated or evicted, and the
+  marker survives a crash so the edits can be uploaded on the next startup.
+
+LRU order is the database file's mtime, which is touched on every access, so
+a restarted worker picks up the warm cache without any in-memory state.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Chunk size for streaming gzip decompression
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+_SQLITE_SUFFIXES = ("-journal", "-wal", "-shm")
+
+
+def decompress_gzip_file(src_path: Path, dst_path: Path) -> None:
+    """Decompress a gzip file in fixed-size chunks."""
+    with gzip.open(src_path, "rb") as f_in, open(dst_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, DECOMPRESS_CHUNK_SIZE)
+
+
+def _sidecar(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+@dataclass
+class CacheLease:
+    """A cached database pinned by a shared lock until ``release()``."""
+
+    path: Path
+    created: bool = False
+    _fd: int = field(default=-1, repr=False)
+
+    def release(self) -> None:
+        """Drop the shared lock so the file can be replaced or evicted."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class SharedDatabaseCache:
+    """Cross-process LRU cache of database files keyed by storage key + ETag.
+
+    Args:
+        cache_dir: Directory shared by all workers on the host
+        max_size_bytes: Total size of cached databases before eviction
+        revalidate_seconds: How long a cached ETag is trusted before it is
+            checked against Wasabi again
+    """
+
+    def __init__(
+        self, cache_dir: Path, max_size_bytes: int, revalidate_seconds: float = 30.0
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.revalidate_seconds = revalidate_seconds
+
+    @contextmanager
+    def _flock(self, path: Path, mode: int) -> Iterator[bool]:
+        """Hold an flock on ``path``; yields False if a non-blocking lock failed."""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, mode)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _read_etag(self, path: Path) -> dict | None:
+        try:
+            return json.loads(_sidecar(path, ".etag").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_etag(self, path: Path, storage_key: str, etag: str | None) -> None:
+        sidecar = _sidecar(path, ".etag")
+        tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"key": storage_key, "etag": etag, "checked_at": time.time()})
+        )
+        os.replace(tmp, sidecar)
+
+    def _remove_files(self, path: Path) -> int:
+        """Delete a cached database and its metadata; returns bytes freed."""
+        try:
+            freed = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            freed = 0
+        for suffix in (*_SQLITE_SUFFIXES, ".etag", ".dirty"):
+            _sidecar(path, suffix).unlink(missing_ok=True)
+        return freed
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) for every cached database."""
+        entries = []
+        for sidecar in self.cache_dir.glob("*.etag"):
+            path = sidecar.with_name(sidecar.name.removesuffix(".etag"))
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        """Total size of cached databases."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict_if_needed(self, incoming_bytes: int = 0) -> int:
+        """Evict least recently used databases until ``incoming_bytes`` fit.
+
+        Databases with an open connection (shared lock held by any process)
+        are skipped.
+
+        Args:
+            incoming_bytes: Size of the file about to be added
+
+        Returns:
+            Number of databases evicted
+        """
+        evicted = 0
+        with self._flock(self.cache_dir / ".evict.lock", fcntl.LOCK_EX):
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, _, path in entries:
+                if total + incoming_bytes <= self.max_size_bytes:
+                    break
+                if self._is_dirty(path):
+                    continue
+                lock_mode = fcntl.LOCK_EX | fcntl.LOCK_NB
+                with self._flock(_sidecar(path, ".lock"), lock_mode) as locked:
+                    if not locked:
+                        logger.debug(f"Skipping eviction of in-use database {path}")
+                        continue
+                    total -= self._remove_files(path)
+                    evicted += 1
+        return evicted
+
+    def _cached_meta(self, path: Path, storage_key: str) -> dict | None:
+        """Sidecar metadata if ``path`` holds a copy of ``storage_key``."""
+        meta = self._read_etag(path)
+        if not path.exists() or meta is None or meta.get("key") != storage_key:
+            return None
+        return meta
+
+    def _is_fresh(self, meta: dict) -> bool:
+        return time.time() - meta["checked_at"] < self.revalidate_seconds
+
+    def _is_dirty(self, path: Path) -> bool:
+        return _sidecar(path, ".dirty").exists()
+
+    def _refresh(
+        self,
+        path: Path,
+        storage_key: str,
+        head: Callable[[str], str | None],
+        download: Callable[[str, Path], None],
+    ) -> bool:
+        """Make ``path`` current for ``storage_key``; caller holds the lock."""
+        meta = self._cached_meta(path, storage_key)
+        if meta is not None and (self._is_fresh(meta) or self._is_dirty(path)):
+            return True
+
+        etag = head(storage_key)
+        if etag is None:
+            self._remove_files(path)
+            return False
+
+        if meta is not None and meta["etag"] == etag:
+            self._write_etag(path, storage_key, etag)
+            return True
+
+        logger.info(f"Downloading {storage_key} (etag={etag}) into shared cache")
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            download(storage_key, tmp)
+            self.evict_if_needed(tmp.stat().st_size)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._write_etag(path, storage_key, etag)
+        return True
+
+    def acquire(
+        self,
+        path: Path,
+        storage_key: str,
+        head: Callable[[str], str | None],
+        download: Callable[[str, Path], None],
+        create: Callable[[Path], None] | None = None,
+    ) -> CacheLease | None:
+        """Ensure ``path`` holds the current copy of ``storage_key`` and pin it.
+
+        Until the lease is released the file holds a shared lock, so other
+        workers can read it concurrently but cannot replace or evict it.
+
+        Args:
+            path: Cache file location for this database
+            storage_key: Wasabi key of the database
+            head: Returns the object's current ETag, or None if missing
+            download: Writes the (decompressed) object to the given path
+            create: Optional callback that creates a new database at the given
+                path when the object does not exist
+
+        Returns:
+            CacheLease for the pinned file, or None if the object does not
+            exist and no ``create`` callback was given
+        """
+        lock_path = _sidecar(path, ".lock")
+
+        # Fast path: a fresh copy only needs the shared lock, so readers don't
+        # queue behind each other. A dirty copy is newer than Wasabi, so it is
+        # served without revalidating rather than waiting for the exclusive
+        # lock while the worker that edited it holds it pinned.
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        meta = self._cached_meta(path, storage_key)
+        if meta is not None and (self._is_fresh(meta) or self._is_dirty(path)):
+            os.utime(path)
+            return CacheLease(path, False, fd)
+        os.close(fd)
+
+        while True:
+            created = False
+            with self._flock(lock_path, fcntl.LOCK_EX):
+                if not self._refresh(path, storage_key, head, download):
+                    if create is None:
+                        return None
+                    create(path)
+                    self._write_etag(path, storage_key, None)
+                    created = True
+
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            # The entry may have been evicted between the two locks
+            if not path.exists():
+                os.close(fd)
+                continue
+            os.utime(path)
+            return CacheLease(path, created, fd)
+
+    def record_etag(self, path: Path, storage_key: str, etag: str | None) -> None:
+        """Record the ETag of a local copy that was just uploaded."""
+        self._write_etag(path, storage_key, etag)
+
+    def mark_dirty(self, path: Path, storage_key: str) -> None:
+        """Record that ``path`` has local edits not yet uploaded to Wasabi."""
+        _sidecar(path, ".dirty").write_text(storage_key)
+
+    def clear_dirty(self, path: Path) -> None:
+        """Record that every local edit of ``path`` has been uploaded."""
+        _sidecar(path, ".dirty").unlink(missing_ok=True)
+
+    def dirty_entries(self) -> list[tuple[Path, str]]:
+        """(path, storage key) of every database with edits not yet uploaded."""
+        entries = []
+        for marker in self.cache_dir.glob("*.dirty"):
+            path = marker.with_name(marker.name.removesuffix(".dirty"))
+            try:
+                storage_key = marker.read_text()
+            except FileNotFoundError:
+                continue
+            if path.exists():
+                entries.append((path, storage_key))
+        return entries
+
+    def pin(self, path: Path) -> CacheLease | None:
+        """Pin the local copy at ``path`` as is; None if it is not cached."""
+        fd = os.open(_sidecar(path, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        if not path.exists():
+            os.close(fd)
+            return None
+        return CacheLease(path, False, fd)
+
+    def invalidate(self, path: Path) -> None:
+        """Remove one database from the cache (waits for open connections)."""
+        with self._flock(_sidecar(path, ".lock"), fcntl.LOCK_EX):
+            self._remove_files(path)
+
+    def clear(self) -> None:
+        """Remove every database that has no open connection or pending edits."""
+        for _, _, path in self._entries():
+            if self._is_dirty(path):
+                continue
+            lock_mode = fcntl.LOCK_EX | fcntl.LOCK_NB
+            with self._flock(_sidecar(path, ".lock"), lock_mode) as locked:
+                if locked:
+                    self._remove_files(path)
@@ -1,16 +1,23 @@
 """Database manager for SQLite databases stored in Wasabi S3.
 
 Handles downloading, caching, and uploading of per-video SQLite databases.
-Uses LRU cache to minimize S3 operations.
+Downloads go into a host-wide SharedDatabaseCache so all workers reuse the
+same files, validated against the object's ETag.
+
+With write-back enabled (``sqlite_write_back``), writable contexts mark the
+database dirty on exit and a background flush uploads it once edits go quiet
+(debounce), once enough row changes have piled up, or at the latest after a
+maximum delay. The dirty state is also recorded next to the cached file, so
+edits left behind by a crashed worker are uploaded on the next startup.
 """
 
 import asyncio
 import hashlib
 import logging
-import shutil
 import sqlite3
-from collections import OrderedDict
+import time
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import AsyncGenerator
 
@@ -18,21 +25,71 @@ import boto3
 from botocore.exceptions import ClientError
 
 from app.config import Settings, get_settings
+from app.repositories.captions import STATS_SCHEMA
+from app.services.database_cache import (
+    CacheLease,
+    SharedDatabaseCache,
+    decompress_gzip_file,
+)
+from app.services.database_manifest import record_database_upload
 
 logger = logging.getLogger(__name__)
 
 
+def _file_change_counter(path: Path) -> bytes:
+    """SQLite header change counter; bumped by every committed write."""
+    with open(path, "rb") as f:
+        f.seek(24)
+        return f.read(4)
+
+
+def _data_version(conn: sqlite3.Connection) -> int:
+    """Changes when other connections commit; this connection's writes don't count."""
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+@dataclass
+class WriteBackStatus:
+    """Durability of a database's local edits."""
+
+    dirty: bool = False
+    pending_changes: int = 0
+    dirty_since: float | None = None
+    last_upload_at: float | None = None
+    last_error: str | None = None
+
+    @property
+    def durable(self) -> bool:
+        """True when every local edit has been uploaded to Wasabi."""
+        return not self.dirty
+
+
+@dataclass
+class _DirtyDatabase:
+    """A database with edits not yet uploaded; keeps its cache lease pinned."""
+
+    lease: CacheLease
+    status: WriteBackStatus
+    last_write_at: float
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    flush_task: asyncio.Task | None = None
+
+
 class DatabaseManager:
-    """Manages SQLite databases stored in Wasabi S3 with local LRU caching."""
+    """Manages SQLite databases stored in Wasabi S3 with a shared disk cache."""
 
     def __init__(self, settings: Settings | None = None):
         self._settings = settings or get_settings()
         self._cache_dir = Path(self._settings.sqlite_cache_dir)
-        self._cache_dir.mkdir(parents=True, exist_ok=True)
-        self._max_cache_size = self._settings.sqlite_cache_max_size_mb * 1024 * 1024
-        self._lru_order: OrderedDict[str, int] = OrderedDict()  # path -> size
-        self._current_cache_size = 0
+        self._cache = SharedDatabaseCache(
+            self._cache_dir,
+            max_size_bytes=self._settings.sqlite_cache_max_size_mb * 1024 * 1024,
+            revalidate_seconds=self._settings.sqlite_cache_revalidate_seconds,
+        )
         self._locks: dict[str, asyncio.Lock] = {}
+        self._write_back = self._settings.sqlite_write_back
+        self._dirty: dict[str, _DirtyDatabase] = {}
+        self._status: dict[str, WriteBackStatus] = {}
 
         # Initialize S3 client for Wasabi
         access_key = self._settings.effective_wasabi_access_key
@@ -62,7 +119,7 @@ class DatabaseManager:
         return self._locks[key]
 
     def _s3_key(
-        self, tenant_id: str, video_id: str, db_name: str = "captions.db"
+        self, tenant_id: str, video_id: str, db_name: str = "captions.db.gz"
     ) -> str:
         """Generate S3 key for a database file in client/ path."""
         return f"{tenant_id}/client/videos/{video_id}/{db_name}"
@@ -76,53 +133,92 @@ class DatabaseManager:
         hashed = hashlib.md5(key.encode()).hexdigest()[:16]
         return self._cache_dir / f"{hashed}_{db_name}"
 
-    async def _download_from_s3(self, s3_key: str, local_path: Path) -> bool:
-        """Download a file from S3 to local cache, decompressing if needed."""
-        import gzip
-
-        def _download():
-            try:
-                logger.info(
-                    f"Attempting to download from S3: bucket={self._bucket}, key={s3_key}"
-                )
-                # Check if we need to download a compressed version
-                is_compressed = s3_key.endswith(".gz")
-                download_path = (
-                    local_path if not is_compressed else Path(str(local_path) + ".gz")
-                )
-
-                self._s3.download_file(self._bucket, s3_key, str(download_path))
-
-                # Decompress if needed
-                if is_compressed:
-                    with gzip.open(download_path, "rb") as f_in:
-                        with open(local_path, "wb") as f_out:
-                            f_out.write(f_in.read())
-                    # Clean up compressed file
-                    download_path.unlink()
-
-                return True
-            except ClientError as e:
-                if e.response["Error"]["Code"] == "404":
-                    return False
-                raise
+    def _head_object(self, s3_key: str) -> dict | None:
+        """Get an object's metadata, or None if it does not exist."""
+        try:
+            return self._s3.head_object(Bucket=self._bucket, Key=s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _head_etag(self, s3_key: str) -> str | None:
+        """Get the current ETag of an object, or None if it does not exist."""
+        head = self._head_object(s3_key)
+        return head["ETag"] if head is not None else None
+
+    def _download_from_s3(self, s3_key: str, local_path: Path) -> None:
+        """Download a file from S3, decompressing .gz objects in a streaming fashion."""
+        logger.info(
+            f"Attempting to download from S3: bucket={self._bucket}, key={s3_key}"
+        )
+        if not s3_key.endswith(".gz"):
+            self._s3.download_file(self._bucket, s3_key, str(local_path))
+            return
+
+        download_path = Path(str(local_path) + ".gz")
+        try:
+            self._s3.download_file(self._bucket, s3_key, str(download_path))
+            decompress_gzip_file(download_path, local_path)
+        finally:
+            # Clean up compressed file
+            download_path.unlink(missing_ok=True)
+
+    async def _acquire(
+        self, s3_key: str, cache_path: Path, create: bool = False
+    ) -> CacheLease | None:
+        """Fetch a database into the shared cache (if stale) and pin it."""
+        create_fn = self._create_new_database if create else None
+        return await asyncio.to_thread(
+            self._cache.acquire,
+            cache_path,
+            s3_key,
+            self._head_etag,
+            self._download_from_s3,
+            create_fn,
+        )
 
-        return await asyncio.to_thread(_download)
+    async def _upload_and_record(self, lease: CacheLease, s3_key: str) -> None:
+        """Upload a cached database and record the new ETag for the local copy."""
+        await self._upload_to_s3(lease.path, s3_key)
+        # Record the uploaded object's ETag so this copy isn't downloaded again
+        head = await asyncio.to_thread(self._head_object, s3_key)
+        etag = head["ETag"] if head is not None else None
+        self._cache.record_etag(lease.path, s3_key, etag)
+        if head is not None:
+            await asyncio.to_thread(
+                record_database_upload,
+                s3_key,
+                head.get("ContentLength"),
+                head.get("LastModified"),
+            )
 
     async def _upload_to_s3(self, local_path: Path, s3_key: str) -> None:
-        """Upload a file from local cache to S3, compressed with gzip."""
+        """Upload a snapshot of a cached database to S3, compressed with gzip."""
         import gzip
+        import shutil
         import tempfile
 
         def _upload():
-            # Compress the database before uploading
-            with tempfile.NamedTemporaryFile(suffix=".gz", delete=False) as tmp:
-                compressed_path = Path(tmp.name)
-
-            try:
-                with open(local_path, "rb") as f_in:
-                    with gzip.open(compressed_path, "wb") as f_out:
-                        f_out.writelines(f_in)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                snapshot_path = Path(tmp_dir) / local_path.name
+                compressed_path = Path(tmp_dir) / f"{local_path.name}.gz"
+
+                # Other workers on the host may be committing to the shared
+                # file; the backup API copies a consistent snapshot
+                src = sqlite3.connect(str(local_path))
+                dst = sqlite3.connect(str(snapshot_path))
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+                    src.close()
+
+                with (
+                    open(snapshot_path, "rb") as f_in,
+                    gzip.open(compressed_path, "wb") as f_out,
+                ):
+                    shutil.copyfileobj(f_in, f_out)
 
                 # Upload compressed file with .gz extension
                 s3_key_gz = f"{s3_key}.gz" if not s3_key.endswith(".gz") else s3_key
@@ -132,38 +228,60 @@ class DatabaseManager:
                     s3_key_gz,
                     ExtraArgs={"ContentType": "application/gzip"},
                 )
-            finally:
-                # Clean up temporary compressed file
-                if compressed_path.exists():
-                    compressed_path.unlink()
 
         await asyncio.to_thread(_upload)
 
-    def _evict_if_needed(self, new_file_size: int) -> None:
-        """Evict oldest files from cache if needed to make room."""
-        while (
-            self._current_cache_size + new_file_size > self._max_cache_size
-            and self._lru_order
-        ):
-            oldest_path, oldest_size = self._lru_order.popitem(last=False)
-            cache_file = Path(oldest_path)
-            if cache_file.exists():
-                cache_file.unlink()
-            self._current_cache_size -= oldest_size
-
-    def _update_lru(self, cache_path: Path) -> None:
-        """Update LRU order for a cache file."""
-        path_str = str(cache_path)
-        if path_str in self._lru_order:
-            # Move to end (most recently used)
-            self._lru_order.move_to_end(path_str)
-        else:
-            # Add new entry
-            if cache_path.exists():
-                size = cache_path.stat().st_size
-                self._evict_if_needed(size)
-                self._lru_order[path_str] = size
-                self._current_cache_size += size
+    @asynccontextmanager
+    async def _open(
+        self, s3_key: str, cache_path: Path, writable: bool, create: bool = False
+    ) -> AsyncGenerator[sqlite3.Connection, None]:
+        """Open a cached database, then upload or mark it dirty if it was written."""
+        lock = self._get_lock(s3_key)
+
+        async with lock:
+            # A dirty database's local copy is authoritative and already pinned
+            dirty = self._dirty.get(s3_key)
+            lease = (
+                dirty.lease
+                if dirty is not None
+                else await self._acquire(s3_key, cache_path, create=create)
+            )
+            if lease is None:
+                raise FileNotFoundError(f"Database not found: {s3_key}")
+            keep_lease = False
+
+            try:
+                # Open connection; callers may hand it to a worker thread
+                # (asyncio.to_thread), the per-database lock serializes use
+                conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                data_version_before = _data_version(conn)
+                counter_before = _file_change_counter(cache_path)
+
+                try:
+                    yield conn
+                finally:
+                    # Other workers share the file, so only count this
+                    # connection's writes. total_changes misses schema
+                    # changes; a bumped header counter reveals them when no
+                    # other connection committed in the meantime.
+                    changes = conn.total_changes
+                    own_commit = (
+                        _file_change_counter(cache_path) != counter_before
+                        and _data_version(conn) == data_version_before
+                    )
+                    conn.close()
+
+                    modified = lease.created or changes > 0 or own_commit
+                    if (writable or lease.created) and modified:
+                        if self._write_back:
+                            self._mark_dirty(s3_key, lease, max(changes, 1))
+                            keep_lease = True
+                        else:
+                            await self._upload_and_record(lease, s3_key)
+            finally:
+                if not keep_lease and s3_key not in self._dirty:
+                    lease.release()
 
     @asynccontextmanager
     async def get_database(
@@ -172,8 +290,13 @@ class DatabaseManager:
         """
         Get a SQLite database connection with automatic S3 sync.
 
-        Downloads from S3 if not cached. Uploads back to S3 after writes.
-        Uses per-database locking for thread safety.
+        Downloads from S3 if not cached (or the cached ETag is stale). Uses
+        per-database locking for thread safety; the cached file stays pinned
+        against eviction while the connection is open.
+
+        Writable contexts that changed the database are uploaded back to S3:
+        with write-back enabled the database is marked dirty
+        and flushed in the background, see durability_status() and flush().
 
         Args:
             tenant_id: Tenant identifier for isolation
@@ -185,76 +308,147 @@ class DatabaseManager:
         """
         s3_key = self._s3_key(tenant_id, video_id)
         cache_path = self._cache_path(tenant_id, video_id)
-        lock = self._get_lock(s3_key)
-
-        async with lock:
-            # Download from S3 if not in cache
-            if not cache_path.exists():
-                downloaded = await self._download_from_s3(s3_key, cache_path)
-                if not downloaded:
-                    raise FileNotFoundError(f"Database not found: {s3_key}")
 
-            self._update_lru(cache_path)
-
-            # Open connection
-            conn = sqlite3.connect(str(cache_path))
-            conn.row_factory = sqlite3.Row
-
-            try:
-                yield conn
-            finally:
-                conn.close()
-
-                # Upload back to S3 if writable
-                if writable:
-                    await self._upload_to_s3(cache_path, s3_key)
+        async with self._open(s3_key, cache_path, writable) as conn:
+            yield conn
 
     @asynccontextmanager
     async def get_or_create_database(
-        self, tenant_id: str, video_id: str
+        self, tenant_id: str, video_id: str, writable: bool = False
     ) -> AsyncGenerator[sqlite3.Connection, None]:
         """
         Get or create a SQLite database with automatic S3 sync.
 
-        Creates a new database with schema if it doesn't exist.
+        Creates a new database with schema if it doesn't exist. A newly
+        created database is always uploaded; changes to an existing one only
+        if the context is writable.
 
         Args:
             tenant_id: Tenant identifier for isolation
             video_id: Video identifier
+            writable: If True, upload changes back to S3 after context exits
 
         Yields:
             SQLite connection object
         """
         s3_key = self._s3_key(tenant_id, video_id)
         cache_path = self._cache_path(tenant_id, video_id)
-        lock = self._get_lock(s3_key)
-        created = False
 
-        async with lock:
-            # Download from S3 if not in cache
-            if not cache_path.exists():
-                downloaded = await self._download_from_s3(s3_key, cache_path)
-                if not downloaded:
-                    # Create new database with schema
-                    created = True
-                    await self._create_new_database(cache_path)
+        async with self._open(
+            s3_key, cache_path, writable=writable, create=True
+        ) as conn:
+            yield conn
+
+    def _mark_dirty(self, s3_key: str, lease: CacheLease, changes: int) -> None:
+        """Record local edits and make sure a flush is scheduled."""
+        self._cache.mark_dirty(lease.path, s3_key)
+        now = time.time()
+        dirty = self._dirty.get(s3_key)
+        if dirty is None:
+            status = self._status.setdefault(s3_key, WriteBackStatus())
+            status.dirty = True
+            status.dirty_since = now
+            dirty = _DirtyDatabase(lease=lease, status=status, last_write_at=now)
+            self._dirty[s3_key] = dirty
+
+        dirty.status.pending_changes += changes
+        dirty.last_write_at = now
+        dirty.wake.set()
+
+        if dirty.flush_task is None or dirty.flush_task.done():
+            dirty.flush_task = asyncio.create_task(self._flush_when_due(s3_key))
+
+    async def _flush_when_due(self, s3_key: str) -> None:
+        """Wait out the debounce (bounded by the max delay), then flush."""
+        debounce = self._settings.sqlite_write_back_debounce_seconds
+        max_delay = self._settings.sqlite_write_back_max_delay_seconds
+        max_changes = self._settings.sqlite_write_back_max_pending_changes
+
+        while (dirty := self._dirty.get(s3_key)) is not None:
+            status = dirty.status
+            assert status.dirty_since is not None
+            now = time.time()
+            due_at = min(dirty.last_write_at + debounce, status.dirty_since + max_delay)
+            if status.pending_changes >= max_changes or now >= due_at:
+                if await self._flush_key(s3_key):
+                    return
+                # Retry a failed upload after another debounce period
+                due_at = time.time() + debounce
+
+            dirty.wake.clear()
+            try:
+                await asyncio.wait_for(dirty.wake.wait(), timeout=due_at - now)
+            except TimeoutError:
+                pass
+
+    async def _flush_key(self, s3_key: str) -> bool:
+        """Upload a dirty database; returns False if the upload failed."""
+        async with self._get_lock(s3_key):
+            dirty = self._dirty.get(s3_key)
+            if dirty is None:
+                return True
 
-            self._update_lru(cache_path)
+            status = dirty.status
+            pending = status.pending_changes
+            try:
+                await self._upload_and_record(dirty.lease, s3_key)
+            except Exception as e:
+                status.last_error = str(e)
+                logger.exception(f"Write-back upload failed for {s3_key}")
+                return False
+
+            logger.info(f"Write-back uploaded {s3_key} ({pending} changes)")
+            del self._dirty[s3_key]
+            self._cache.clear_dirty(dirty.lease.path)
+            dirty.lease.release()
+            status.dirty = False
+            status.pending_changes = 0
+            status.dirty_since = None
+            status.last_upload_at = time.time()
+            status.last_error = None
+            return True
+
+    def durability_status(self, tenant_id: str, video_id: str) -> WriteBackStatus:
+        """Get the write-back status of a database.
 
-            # Open connection
-            conn = sqlite3.connect(str(cache_path))
-            conn.row_factory = sqlite3.Row
+        Args:
+            tenant_id: Tenant identifier for isolation
+            video_id: Video identifier
 
-            try:
-                yield conn
-            finally:
-                conn.close()
+        Returns:
+            WriteBackStatus; ``durable`` is True once all edits are in Wasabi
+        """
+        s3_key = self._s3_key(tenant_id, video_id)
+        return self._status.get(s3_key, WriteBackStatus())
+
+    async def flush(self, tenant_id: str, video_id: str) -> bool:
+        """Upload a database's pending edits now.
+
+        Args:
+            tenant_id: Tenant identifier for isolation
+            video_id: Video identifier
+
+        Returns:
+            True if the database is durable afterwards
+        """
+        return await self._flush_key(self._s3_key(tenant_id, video_id))
 
-                # Upload to S3 if created or modified
-                if created:
-                    await self._upload_to_s3(cache_path, s3_key)
+    async def flush_all(self) -> int:
+        """Upload every dirty database (used on shutdown).
 
-    async def _create_new_database(self, cache_path: Path) -> None:
+        Returns:
+            Number of databases that failed to upload
+        """
+        failed = 0
+        for s3_key in list(self._dirty):
+            dirty = self._dirty.get(s3_key)
+            if dirty is not None and dirty.flush_task is not None:
+                dirty.flush_task.cancel()
+            if not await self._flush_key(s3_key):
+                failed += 1
+        return failed
+
+    def _create_new_database(self, cache_path: Path) -> None:
         """Create a new captions database with schema."""
 
         def _create():
@@ -300,29 +494,63 @@ class DatabaseManager:
                         ON captions(caption_frame_extents_state, caption_frame_extents_pending);
                     """
                 )
+                # Stats counters, maintained by triggers
+                for statement in STATS_SCHEMA:
+                    conn.execute(statement)
                 conn.commit()
             finally:
                 conn.close()
 
-        await asyncio.to_thread(_create)
+        _create()
 
-    async def invalidate_cache(self, tenant_id: str, video_id: str) -> None:
-        """Remove a database from the local cache."""
-        cache_path = self._cache_path(tenant_id, video_id)
-        path_str = str(cache_path)
+    async def recover_dirty(self) -> int:
+        """Upload edits left in the cache by a worker that exited uncleanly.
 
-        if path_str in self._lru_order:
-            self._current_cache_size -= self._lru_order.pop(path_str)
+        Databases that fail to upload stay dirty and are retried by the
+        background flush like any other pending edits.
 
-        if cache_path.exists():
-            cache_path.unlink()
+        Returns:
+            Number of databases that failed to upload
+        """
+        failed = 0
+        for cache_path, s3_key in self._cache.dirty_entries():
+            if s3_key in self._dirty:
+                continue
+            lease = await asyncio.to_thread(self._cache.pin, cache_path)
+            if lease is None:
+                continue
+            logger.warning(f"Uploading edits of {s3_key} left by a previous run")
+            self._mark_dirty(s3_key, lease, 0)
+            if not await self._flush_key(s3_key):
+                failed += 1
+        return failed
+
+    async def invalidate_cache(self, tenant_id: str, video_id: str) -> None:
+        """Remove a database from the local cache, uploading pending edits first.
+
+        Edits that still fail to upload are discarded with the cached file.
+        """
+        s3_key = self._s3_key(tenant_id, video_id)
+        await self._flush_key(s3_key)
+
+        # Our own lease would otherwise block the exclusive lock forever
+        async with self._get_lock(s3_key):
+            dirty = self._dirty.pop(s3_key, None)
+            if dirty is not None:
+                logger.error(f"Discarding edits of {s3_key} that failed to upload")
+                if dirty.flush_task is not None:
+                    dirty.flush_task.cancel()
+                dirty.lease.release()
+                dirty.status.dirty = False
+                dirty.status.pending_changes = 0
+                dirty.status.dirty_since = None
+
+            cache_path = self._cache_path(tenant_id, video_id)
+            await asyncio.to_thread(self._cache.invalidate, cache_path)
 
     async def clear_cache(self) -> None:
-        """Clear the entire local cache."""
-        self._lru_order.clear()
-        self._current_cache_size = 0
-        shutil.rmtree(self._cache_dir, ignore_errors=True)
-        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        """Clear every cached database that is not currently open."""
+        await asyncio.to_thread(self._cache.clear)
 
 
 class LayoutDatabaseManager(DatabaseManager):
@@ -342,7 +570,7 @@ class LayoutDatabaseManager(DatabaseManager):
         hashed = hashlib.md5(key.encode()).hexdigest()[:16]
         return self._cache_dir / f"{hashed}_{db_name}"
 
-    async def _create_new_database(self, cache_path: Path) -> None:
+    def _create_new_database(self, cache_path: Path) -> None:
         """Create a new layout database with schema."""
 
         def _create():
@@ -411,7 +639,7 @@ class LayoutDatabaseManager(DatabaseManager):
             finally:
                 conn.close()
 
-        await asyncio.to_thread(_create)
+        _create()
 
 
 class OcrDatabaseManager(DatabaseManager):
@@ -431,7 +659,7 @@ class OcrDatabaseManager(DatabaseManager):
         hashed = hashlib.md5(key.encode()).hexdigest()[:16]
         return self._cache_dir / f"{hashed}_{db_name}"
 
-    async def _create_new_database(self, cache_path: Path) -> None:
+    def _create_new_database(self, cache_path: Path) -> None:
         """Create a new OCR database with schema.
 
         Note: OCR databases are typically created by the processing pipeline,
@@ -473,7 +701,7 @@ class OcrDatabaseManager(DatabaseManager):
             finally:
                 conn.close()
 
-        await asyncio.to_thread(_create)
+        _create()
 
 
 class LayoutServerDatabaseManager(DatabaseManager):
@@ -497,7 +725,7 @@ class LayoutServerDatabaseManager(DatabaseManager):
         hashed = hashlib.md5(key.encode()).hexdigest()[:16]
         return self._cache_dir / f"{hashed}_{db_name}"
 
-    async def _create_new_database(self, cache_path: Path) -> None:
+    def _create_new_database(self, cache_path: Path) -> None:
         """Create a new layout-server database with schema."""
 
         def _create():
@@ -590,6 +818,23 @@ class LayoutServerDatabaseManager(DatabaseManager):
                         covariance_inverse TEXT
                     );
 
+                    -- Incremental training state: per-class running means and
+                    -- co-moments, and the feature vector of each annotated box
+                    CREATE TABLE IF NOT EXISTS box_classification_stats (
+                        label TEXT PRIMARY KEY CHECK (label IN ('in', 'out')),
+                        n_samples INTEGER NOT NULL DEFAULT 0,
+                        feature_means TEXT NOT NULL,
+                        comoments TEXT NOT NULL,
+                        updated_at TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS box_classification_samples (
+                        frame_index INTEGER NOT NULL,
+                        box_index INTEGER NOT NULL,
+                        label TEXT NOT NULL CHECK (label IN ('in', 'out')),
+                        features TEXT NOT NULL,
+                        PRIMARY KEY (frame_index, box_index)
+                    );
+
                     -- Analysis results computed by ML pipeline
                     CREATE TABLE IF NOT EXISTS analysis_results (
                         id INTEGER PRIMARY KEY CHECK (id = 1),
@@ -611,7 +856,7 @@ class LayoutServerDatabaseManager(DatabaseManager):
             finally:
                 conn.close()
 
-        await asyncio.to_thread(_create)
+        _create()
 
 
 # Singleton instances
@@ -651,3 +896,32 @@ def get_ocr_database_manager() -> OcrDatabaseManager:
     if _ocr_database_manager is None:
         _ocr_database_manager = OcrDatabaseManager()
     return _ocr_database_manager
+
+
+async def recover_dirty_databases() -> None:
+    """Upload edits a previous run left in the shared cache (for startup).
+
+    Every manager uploads the same way, so the captions manager recovers
+    dirty databases of all types.
+    """
+    failed = await get_database_manager().recover_dirty()
+    if failed:
+        logger.error(f"{failed} databases from a previous run failed to upload")
+
+
+async def flush_all_database_managers() -> None:
+    """Upload pending write-back edits from every manager (for shutdown)."""
+    for manager in (
+        _database_manager,
+        _layout_database_manager,
+        _layout_server_database_manager,
+        _ocr_database_manager,
+    ):
+        if manager is None:
+            continue
+        failed = await manager.flush_all()
+        if failed:
+            logger.error(
+                f"{failed} databases failed to upload on shutdown "
+                f"({manager.__class__.__name__})"
+            )
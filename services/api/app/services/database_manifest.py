@@ -0,0 +1,446 @@
+"""Host-local manifest of the per-video databases stored in Wasabi.
+
+Listing databases straight from the bucket means a nested listing per tenant
+plus a HEAD per database, which takes minutes for tenants with thousands of
+videos. Instead, every upload through the API records the object's size and
+timestamp here, and ``reconcile()`` rebuilds the entries from delimited
+listings (``Size``/``LastModified`` come with the listing), picking up objects
+written elsewhere such as pipeline outputs. The admin listing is then a
+single indexed query.
+
+The manifest is a small SQLite file shared by all workers on a host, kept on
+the working copy volume. ``ManifestReconciler`` reconciles it in the
+background once it is older than ``database_manifest_max_age_seconds``;
+requests only ever read it.
+"""
+
+import asyncio
+import logging
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Databases listed per video, in listing order
+DATABASE_NAMES = ("captions.db", "layout.db", "fullOCR.db")
+
+# Storage file for each database: {tenant}/{area}/videos/{video}/{file}
+_DATABASE_FILES = {
+    ("client", "captions.db.gz"): "captions.db",
+    ("client", "layout.db.gz"): "layout.db",
+    ("server", "fullOCR.db"): "fullOCR.db",
+}
+
+# Storage areas holding databases, listed by reconcile()
+_DATABASE_AREAS = sorted({area for area, _ in _DATABASE_FILES})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS databases (
+    tenant_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    database TEXT NOT NULL,
+    size_bytes INTEGER,
+    last_modified TEXT,
+    PRIMARY KEY (tenant_id, video_id, database)
+);
+CREATE INDEX IF NOT EXISTS idx_databases_video ON databases(video_id);
+
+-- When each tenant (or '*' for the whole bucket) was last reconciled
+CREATE TABLE IF NOT EXISTS reconciles (
+    scope TEXT PRIMARY KEY,
+    reconciled_at TEXT NOT NULL
+);
+"""
+
+
+def parse_database_key(s3_key: str) -> tuple[str, str, str] | None:
+    """
+    Split a storage key into (tenant_id, video_id, database).
+
+    Returns None for keys that aren't one of the listed databases.
+    """
+    parts = s3_key.split("/")
+    if len(parts) != 5 or parts[2] != "videos":
+        return None
+    tenant_id, area, _, video_id, file_name = parts
+    database = _DATABASE_FILES.get((area, file_name))
+    if database is None:
+        return None
+    return tenant_id, video_id, database
+
+
+def _timestamp(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.isoformat()
+
+
+def _list_pages(s3_client: Any, bucket: str, prefix: str) -> Iterator[dict]:
+    paginator = s3_client.get_paginator("list_objects_v2")
+    yield from paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/")
+
+
+def _list_folders(s3_client: Any, bucket: str, prefix: str) -> list[str]:
+    """List the folder prefixes (ending in "/") directly under a prefix."""
+    return [
+        folder["Prefix"]
+        for page in _list_pages(s3_client, bucket, prefix)
+        for folder in page.get("CommonPrefixes", [])
+    ]
+
+
+def _list_objects(s3_client: Any, bucket: str, prefix: str) -> list[dict]:
+    """List the objects directly under a prefix, without descending."""
+    return [
+        obj
+        for page in _list_pages(s3_client, bucket, prefix)
+        for obj in page.get("Contents", [])
+    ]
+
+
+@dataclass
+class ManifestEntry:
+    """One database of one video; size and timestamp are None if missing."""
+
+    tenant_id: str
+    video_id: str
+    database: str
+    present: bool
+    size_bytes: int | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class ManifestPage:
+    """A page of the listing plus totals over every matching entry."""
+
+    entries: list[ManifestEntry]
+    total: int
+    present: int
+
+
+class DatabaseManifest:
+    """SQLite index of database objects, keyed by tenant, video and database."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_upload(
+        self,
+        s3_key: str,
+        size_bytes: int | None,
+        last_modified: datetime | None = None,
+    ) -> bool:
+        """
+        Record a database object written to storage.
+
+        Args:
+            s3_key: Storage key of the uploaded object
+            size_bytes: Object size in bytes
+            last_modified: Object timestamp (defaults to now)
+
+        Returns:
+            True if the key is a listed database and was recorded
+        """
+        parsed = parse_database_key(s3_key)
+        if parsed is None:
+            return False
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO databases
+                    (tenant_id, video_id, database, size_bytes, last_modified)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    *parsed,
+                    size_bytes,
+                    _timestamp(last_modified or datetime.now(UTC)),
+                ),
+            )
+        return True
+
+    def reconcile(
+        self, s3_client: Any, bucket: str, tenant_id: str | None = None
+    ) -> int:
+        """
+        Rebuild entries from delimited listings of the bucket.
+
+        Lists tenants and videos with ``Delimiter="/"``, then the top level
+        of each video folder, so frame and chunk subtrees are never listed.
+
+        Args:
+            s3_client: boto3 S3 client
+            bucket: Bucket to list
+            tenant_id: Only rebuild this tenant's entries (default: all)
+
+        Returns:
+            Number of databases found
+        """
+        if tenant_id:
+            tenant_prefixes = [f"{tenant_id}/"]
+        else:
+            tenant_prefixes = _list_folders(s3_client, bucket, "")
+        rows = []
+        for tenant_prefix in tenant_prefixes:
+            for area in _DATABASE_AREAS:
+                videos_prefix = f"{tenant_prefix}{area}/videos/"
+                for video_prefix in _list_folders(s3_client, bucket, videos_prefix):
+                    for obj in _list_objects(s3_client, bucket, video_prefix):
+                        parsed = parse_database_key(obj["Key"])
+                        if parsed is not None:
+                            rows.append(
+                                (*parsed, obj["Size"], _timestamp(obj["LastModified"]))
+                            )
+
+        with self._connect() as conn:
+            if tenant_id:
+                conn.execute("DELETE FROM databases WHERE tenant_id = ?", (tenant_id,))
+            else:
+                conn.execute("DELETE FROM databases")
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO databases
+                    (tenant_id, video_id, database, size_bytes, last_modified)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO reconciles (scope, reconciled_at) VALUES (?, ?)",
+                (tenant_id or "*", _timestamp(datetime.now(UTC))),
+            )
+
+        logger.info(
+            f"Reconciled database manifest for {tenant_id or 'all tenants'}: "
+            f"{len(rows)} databases"
+        )
+        return len(rows)
+
+    def last_reconciled(self) -> datetime | None:
+        """When the whole bucket was last reconciled, or None if never."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT reconciled_at FROM reconciles WHERE scope = '*'"
+            ).fetchone()
+        return datetime.fromisoformat(row["reconciled_at"]) if row else None
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """
+        Check whether the manifest needs reconciling from the bucket.
+
+        Uploads made outside the API (e.g. pipeline outputs) only show up
+        after a reconcile, so the manifest goes stale after ``max_age_seconds``.
+        """
+        reconciled_at = self.last_reconciled()
+        if reconciled_at is None:
+            return True
+        age = datetime.now(UTC) - reconciled_at
+        return age >= timedelta(seconds=max_age_seconds)
+
+    def list_databases(
+        self,
+        search: str | None = None,
+        present: bool | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> ManifestPage:
+        """
+        List every listed database of every known video, missing ones included.
+
+        Args:
+            search: Case-insensitive substring of the video ID
+            present: Only existing (True) or only missing (False) databases
+            limit: Maximum number of entries to return
+            offset: Number of entries to skip
+        """
+        names = " UNION ALL ".join(
+            f"SELECT {i} AS position, '{name}' AS database"
+            for i, name in enumerate(DATABASE_NAMES)
+        )
+        listing = f"""
+            WITH videos AS (
+                SELECT DISTINCT tenant_id, video_id FROM databases
+                WHERE ?1 IS NULL OR instr(lower(video_id), lower(?1)) > 0
+            ),
+            names AS ({names}),
+            listing AS (
+                SELECT v.tenant_id, v.video_id, n.database, n.position,
+                    d.size_bytes, d.last_modified,
+                    d.database IS NOT NULL AS present
+                FROM videos v
+                CROSS JOIN names n
+                LEFT JOIN databases d
+                    ON d.tenant_id = v.tenant_id
+                    AND d.video_id = v.video_id
+                    AND d.database = n.database
+            )
+        """
+        where = "WHERE ?2 IS NULL OR present = ?2"
+        params = (search, present)
+
+        with self._connect() as conn:
+            totals = conn.execute(
+                f"{listing} SELECT COUNT(*) AS total, "
+                f"COALESCE(SUM(present), 0) AS present FROM listing {where}",
+                params,
+            ).fetchone()
+            rows = conn.execute(
+                f"""
+                {listing}
+                SELECT * FROM listing {where}
+                ORDER BY tenant_id, video_id, position
+                LIMIT ?3 OFFSET ?4
+                """,
+                (*params, limit if limit is not None else -1, offset),
+            ).fetchall()
+
+        return ManifestPage(
+            entries=[
+                ManifestEntry(
+                    tenant_id=row["tenant_id"],
+                    video_id=row["video_id"],
+                    database=row["database"],
+                    present=bool(row["present"]),
+                    size_bytes=row["size_bytes"],
+                    last_modified=row["last_modified"],
+                )
+                for row in rows
+            ],
+            total=totals["total"],
+            present=totals["present"],
+        )
+
+
+def record_database_upload(
+    s3_key: str, size_bytes: int | None, last_modified: datetime | None = None
+) -> None:
+    """Record an upload in the manifest; failures are logged, never raised."""
+    try:
+        get_database_manifest().record_upload(s3_key, size_bytes, last_modified)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Failed to record {s3_key} in database manifest: {e}")
+
+
+class ManifestReconciler:
+    """Background worker that reconciles the manifest once it goes stale.
+
+    Checks every minute and reconciles the whole bucket in a worker thread
+    when the manifest is older than ``database_manifest_max_age_seconds``.
+    The first check runs at startup. Workers on a host share the manifest,
+    so whichever gets there first reconciles it for all of them.
+    """
+
+    def __init__(self, manifest: DatabaseManifest | None = None):
+        self._running = False
+        self._task: asyncio.Task | None = None
+        self._settings = get_settings()
+        self._manifest = manifest
+
+    async def start(self) -> None:
+        """Start background worker."""
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info("Database manifest reconciler started")
+
+    async def stop(self) -> None:
+        """Stop background worker."""
+        self._running = False
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Database manifest reconciler stopped")
+
+    async def _run_loop(self) -> None:
+        """Main worker loop - runs every minute."""
+        while self._running:
+            try:
+                await self.reconcile_if_stale()
+            except (BotoCoreError, ClientError, OSError, sqlite3.Error) as e:
+                logger.error(f"Failed to reconcile database manifest: {e}")
+
+            # Wait 60 seconds before next check
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                break
+
+    async def reconcile_if_stale(self) -> bool:
+        """Reconcile the whole bucket if the manifest is stale.
+
+        Returns:
+            True if the manifest was reconciled
+        """
+        manifest = self._manifest or get_database_manifest()
+        max_age = self._settings.database_manifest_max_age_seconds
+        if not await asyncio.to_thread(manifest.is_stale, max_age):
+            return False
+
+        s3_client = boto3.client(
+            "s3",
+            endpoint_url=self._settings.wasabi_endpoint_url,
+            aws_access_key_id=self._settings.effective_wasabi_access_key,
+            aws_secret_access_key=self._settings.effective_wasabi_secret_key,
+            region_name=self._settings.wasabi_region,
+        )
+        await asyncio.to_thread(
+            manifest.reconcile, s3_client, self._settings.wasabi_bucket
+        )
+        return True
+
+
+# Singleton instances
+_database_manifest: DatabaseManifest | None = None
+
+
+def get_database_manifest() -> DatabaseManifest:
+    """Get the singleton DatabaseManifest for this host."""
+    global _database_manifest
+    if _database_manifest is None:
+        _database_manifest = DatabaseManifest(
+            Path(get_settings().effective_database_manifest_path)
+        )
+    return _database_manifest
+
+
+_manifest_reconciler: ManifestReconciler | None = None
+
+
+def get_manifest_reconciler() -> ManifestReconciler:
+    """Get singleton manifest reconciler."""
+    global _manifest_reconciler
+    if _manifest_reconciler is None:
+        _manifest_reconciler = ManifestReconciler()
+    return _manifest_reconciler
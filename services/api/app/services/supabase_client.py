@@ -5,7 +5,7 @@ for the CR-SQLite sync protocol.
 """
 
 import logging
-from datetime import datetime, timezone
+from datetime import UTC, datetime, timezone
 from functools import lru_cache
 from typing import Any
 
@@ -261,6 +261,69 @@ class DatabaseStateRepository:
 
         return new_version
 
+    async def update_sync_state(
+        self,
+        video_id: str,
+        db_name: str,
+        connection_id: str,
+        server_version: int,
+    ) -> bool:
+        """Write server_version and last_activity_at for the active writer.
+
+        The update only applies while ``connection_id`` still holds the client
+        lock, so a stale session can't overwrite a new lock holder's state.
+        server_version becomes MAX(server_version, ``server_version``): a
+        write-back that arrives late never lowers it.
+
+        Args:
+            video_id: Video UUID
+            db_name: Database name
+            connection_id: WebSocket connection expected to hold the lock
+            server_version: Server version to record
+
+        Returns:
+            True if the state was updated, False if the lock moved
+        """
+        now = datetime.now(UTC).isoformat()
+        response = (
+            self._table()
+            .update({"server_version": server_version, "last_activity_at": now})
+            .eq("video_id", video_id)
+            .eq("database_name", db_name)
+            .eq("active_connection_id", connection_id)
+            .eq("lock_type", "client")
+            .lt("server_version", server_version)
+            .execute()
+        )
+        if self._extract_list(response):
+            return True
+
+        # server_version is already at least as high; only record activity
+        response = (
+            self._table()
+            .update({"last_activity_at": now})
+            .eq("video_id", video_id)
+            .eq("database_name", db_name)
+            .eq("active_connection_id", connection_id)
+            .eq("lock_type", "client")
+            .execute()
+        )
+        return bool(self._extract_list(response))
+
+    async def advance_server_version(
+        self, video_id: str, db_name: str, server_version: int
+    ) -> None:
+        """Raise server_version to at least ``server_version`` (never lowers it).
+
+        Args:
+            video_id: Video UUID
+            db_name: Database name
+            server_version: Minimum server version to record
+        """
+        self._table().update({"server_version": server_version}).eq(
+            "video_id", video_id
+        ).eq("database_name", db_name).lt("server_version", server_version).execute()
+
     async def update_wasabi_version(
         self,
         video_id: str,
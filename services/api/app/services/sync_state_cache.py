@@ -0,0 +1,172 @@
+"""Per-session cache of video_database_state for WebSocket sync.
+
+A sync session checks its lock and hands out server versions from memory.
+Version and activity are written back to Supabase in the background, batched
+over a short interval, with one conditional update that only applies while
+the session still holds the client lock. When the lock has moved, the cache
+records the conflict and the session's next sync message is rejected.
+"""
+
+import asyncio
+import logging
+
+from app.services.supabase_client import DatabaseStateRepository, StateDict
+
+logger = logging.getLogger(__name__)
+
+
+class SyncStateCache:
+    """Cached sync state for one WebSocket session.
+
+    Args:
+        repo: State repository to write back to
+        video_id: Video UUID
+        db_name: Database name
+        connection_id: WebSocket connection owning this cache
+        state: State record read when the session connected
+        flush_interval_seconds: How long writes are batched before flushing
+    """
+
+    def __init__(
+        self,
+        repo: DatabaseStateRepository,
+        video_id: str,
+        db_name: str,
+        connection_id: str,
+        state: StateDict,
+        flush_interval_seconds: float = 1.0,
+    ):
+        self._repo = repo
+        self._video_id = video_id
+        self._db_name = db_name
+        self._connection_id = connection_id
+        self._state = state
+        self._flush_interval = flush_interval_seconds
+
+        self._server_version: int = state.get("server_version", 0)
+        self._dirty = False
+        self._conflict: tuple[str, str] | None = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def server_version(self) -> int:
+        """Latest server version handed out by this session."""
+        return self._server_version
+
+    def check(self) -> tuple[str, str] | None:
+        """Check that this session may still write.
+
+        Returns:
+            (error_code, message) if the session lost its lock, else None
+        """
+        if self._conflict is not None:
+            return self._conflict
+        if self._state.get("active_connection_id") != self._connection_id:
+            return ("SESSION_TRANSFERRED", "Editing moved to another window")
+        if self._state.get("lock_type") != "client":
+            return ("WORKFLOW_LOCKED", "Server is processing")
+        return None
+
+    def next_version(self) -> int:
+        """Hand out the next server version and schedule a write-back.
+
+        Returns:
+            New server version
+        """
+        self._server_version += 1
+        self.touch()
+        return self._server_version
+
+    def touch(self) -> None:
+        """Record activity and schedule a write-back."""
+        self._dirty = True
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start the background write-back task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the write-back task and flush anything pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            # Let more edits accumulate into this write
+            await asyncio.sleep(self._flush_interval)
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Write pending version and activity to the state store.
+
+        Returns:
+            True if nothing is pending or the write applied; False if the
+            lock moved or the write failed (it is retried on the next flush)
+        """
+        async with self._flush_lock:
+            if not self._dirty or self._conflict is not None:
+                return self._conflict is None
+
+            version = self._server_version
+            self._dirty = False
+            try:
+                applied = await self._repo.update_sync_state(
+                    self._video_id, self._db_name, self._connection_id, version
+                )
+            except Exception:
+                logger.warning(
+                    f"Sync state write failed for {self._video_id}/{self._db_name}",
+                    exc_info=True,
+                )
+                self.touch()
+                return False
+
+            if not applied:
+                try:
+                    await self._record_conflict(version)
+                except Exception:
+                    # Retried by the next flush, which finds the lock moved again
+                    logger.warning(
+                        f"Recording sync lock conflict failed for "
+                        f"{self._video_id}/{self._db_name}",
+                        exc_info=True,
+                    )
+                    self.touch()
+                return False
+            return True
+
+    async def _record_conflict(self, version: int) -> None:
+        """Work out why the lock moved; keep pending versions visible.
+
+        The conflict is only recorded once everything here succeeded, so a
+        failure leaves the flush to be retried.
+        """
+        state = await self._repo.get_state(self._video_id, self._db_name)
+        if state is None:
+            self._conflict = ("DB_NOT_FOUND", "Database state not found")
+            return
+
+        # Changes applied by this session must still count as unsaved
+        await self._repo.advance_server_version(self._video_id, self._db_name, version)
+
+        self._state = state
+        self._conflict = self.check() or (
+            "SESSION_TRANSFERRED",
+            "Editing moved to another window",
+        )
+        logger.info(
+            f"Sync lock moved for {self._video_id}/{self._db_name} "
+            f"({self._conflict[0]}), connection {self._connection_id}"
+        )
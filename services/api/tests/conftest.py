@@ -4,7 +4,7 @@ import sqlite3
 import tempfile
 from collections.abc import AsyncGenerator, Generator
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi import FastAPI
@@ -12,6 +12,7 @@ from httpx import ASGITransport, AsyncClient
 
 from app.dependencies import AuthContext
 from app.main import create_app
+from app.services.database_manifest import DatabaseManifest
 
 
 @pytest.fixture
@@ -42,6 +43,14 @@ def auth_context(test_tenant_id: str, test_user_id: str) -> AuthContext:
     )
 
 
+@pytest.fixture(autouse=True)
+def database_manifest(tmp_path: Path) -> Generator[DatabaseManifest, None, None]:
+    """Record uploads in a per-test database manifest."""
+    manifest = DatabaseManifest(tmp_path / "database-manifest.db")
+    with patch("app.services.database_manifest._database_manifest", manifest):
+        yield manifest
+
+
 @pytest.fixture
 def temp_db_dir() -> Generator[Path, None, None]:
     """Create a temporary directory for test databases."""
@@ -493,6 +502,44 @@ def mock_seeded_ocr_database_manager(seeded_ocr_db: Path):
     return MockOcrDatabaseManager(seeded_ocr_db)
 
 
+# =============================================================================
+# Layout-Server Database Fixtures (box classification model)
+# =============================================================================
+
+
+@pytest.fixture
+def model_db(temp_db_dir: Path) -> Generator[Path, None, None]:
+    """Create a test layout-server.db with the model tables."""
+    from ocr_box_model import run_model_migrations
+
+    db_path = temp_db_dir / "layout-server.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        """
+        CREATE TABLE box_classification_model (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            model_version TEXT,
+            trained_at TEXT
+        )
+        """
+    )
+    run_model_migrations(conn)
+    conn.commit()
+    conn.close()
+    yield db_path
+
+
+@pytest.fixture
+def mock_update_box_model() -> Generator[AsyncMock, None, None]:
+    """Replace the box model update run after annotations are saved."""
+    mock = AsyncMock()
+    with (
+        patch("app.routers.boxes.update_box_model", mock),
+        patch("app.routers.actions.update_box_model", mock),
+    ):
+        yield mock
+
+
 # =============================================================================
 # Boxes Endpoint Client Fixtures (requires both OCR and layout databases)
 # =============================================================================
@@ -565,6 +612,7 @@ async def boxes_client(
     auth_context: AuthContext,
     mock_seeded_ocr_database_manager,
     mock_seeded_boxes_layout_manager,
+    mock_update_box_model: AsyncMock,
 ) -> AsyncGenerator[AsyncClient, None]:
     """Create an async test client for boxes endpoint (requires both OCR and layout)."""
     from app.dependencies import get_auth_context
@@ -0,0 +1,182 @@
+"""Throughput of CR-SQLite change apply and streaming on a local apsw database.
+
+The CR-SQLite extension is not loaded here: crsql_changes is a plain table with
+the same columns and crsql_db_version() is registered as a Python function, so
+the benchmark measures the manager's batching rather than the CRDT merge.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import apsw
+import pytest
+
+from app.config import Settings
+from app.services.crsqlite_manager import CRSqliteManager, _change_size
+
+TENANT = "tenant-1"
+VIDEO = "video-1"
+DB_NAME = "captions"
+NUM_CHANGES = 100_000
+SERVER_SITE = b"s" * 16
+CLIENT_SITE = b"c" * 16
+# Longest the event loop may stall while a backlog streams
+MAX_EVENT_LOOP_GAP_SECONDS = 0.1
+
+
+def make_changes(count: int) -> list[dict]:
+    """Change records for count caption rows, split between two sites."""
+    return [
+        {
+            "table": "captions",
+            "pk": i.to_bytes(8, "big"),
+            "cid": "text",
+            "val": f"caption {i}",
+            "col_version": 1,
+            "db_version": i // 100 + 1,
+            "site_id": CLIENT_SITE if i % 2 else SERVER_SITE,
+            "cl": 1,
+            "seq": i % 100,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def cr_manager(tmp_path):
+    """CRSqliteManager over a working copy with a stand-in crsql_changes table."""
+    settings = Settings(working_copy_dir=str(tmp_path), crsqlite_extension_path="")
+    with (
+        patch("app.services.crsqlite_manager.get_settings", return_value=settings),
+        patch("app.services.crsqlite_manager.boto3.client"),
+    ):
+        manager = CRSqliteManager()
+
+    working_path = tmp_path / TENANT / VIDEO / f"{DB_NAME}.db"
+    working_path.parent.mkdir(parents=True)
+    conn = apsw.Connection(str(working_path))
+    conn.execute(
+        'CREATE TABLE crsql_changes ("table" TEXT, "pk" BLOB, "cid" TEXT, "val" ANY, '
+        '"col_version" INTEGER, "db_version" INTEGER, "site_id" BLOB, "cl" INTEGER, '
+        '"seq" INTEGER)'
+    )
+    conn.execute("CREATE INDEX idx_changes_version ON crsql_changes(db_version, seq)")
+    conn.close()
+
+    conn = manager.get_connection(TENANT, VIDEO, DB_NAME)
+    conn.create_scalar_function(
+        "crsql_db_version",
+        lambda: conn.execute("SELECT MAX(db_version) FROM crsql_changes").fetchone()[0],
+        0,
+    )
+    yield manager
+    manager.close_all_connections()
+
+
+@pytest.mark.load
+class TestCRSqliteChangeThroughput:
+    """Apply and stream 100k changes."""
+
+    async def test_apply_and_stream_100k_changes(self, cr_manager):
+        """Changes apply in one transaction and stream back in bounded batches."""
+        changes = make_changes(NUM_CHANGES)
+
+        start = time.perf_counter()
+        version = await cr_manager.apply_changes(TENANT, VIDEO, DB_NAME, changes)
+        apply_seconds = time.perf_counter() - start
+        assert version == NUM_CHANGES // 100
+
+        # Measure how long the event loop is blocked while streaming
+        max_gap = 0.0
+        streaming = True
+
+        async def ticker():
+            nonlocal max_gap
+            last = time.perf_counter()
+            while streaming:
+                await asyncio.sleep(0)
+                now = time.perf_counter()
+                max_gap = max(max_gap, now - last)
+                last = now
+
+        ticker_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        total = 0
+        max_batch_bytes = 64 * 1024
+        async for batch in cr_manager.iter_changes_since(
+            TENANT,
+            VIDEO,
+            DB_NAME,
+            since_version=0,
+            batch_size=2000,
+            max_batch_bytes=max_batch_bytes,
+        ):
+            assert len(batch) <= 2000
+            batch_bytes = sum(_change_size(tuple(c.values())) for c in batch)
+            last_size = _change_size(tuple(batch[-1].values()))
+            assert batch_bytes - last_size < max_batch_bytes
+            total += len(batch)
+        stream_seconds = time.perf_counter() - start
+        streaming = False
+        await ticker_task
+
+        assert total == NUM_CHANGES
+        # Each batch is read in a worker thread; the loop only waits on it
+        assert max_gap < MAX_EVENT_LOOP_GAP_SECONDS
+        print(
+            f"\napply: {NUM_CHANGES / apply_seconds:,.0f} changes/s, "
+            f"stream: {NUM_CHANGES / stream_seconds:,.0f} changes/s, "
+            f"max event loop gap: {max_gap * 1000:.1f} ms"
+        )
+
+    async def test_stream_excludes_site_and_orders(self, cr_manager):
+        """Echo filtering and (db_version, seq) ordering survive batching."""
+        await cr_manager.apply_changes(TENANT, VIDEO, DB_NAME, make_changes(1000))
+
+        streamed = []
+        async for batch in cr_manager.iter_changes_since(
+            TENANT,
+            VIDEO,
+            DB_NAME,
+            since_version=5,
+            exclude_site_id=CLIENT_SITE,
+            batch_size=7,
+        ):
+            streamed.extend(batch)
+
+        assert len(streamed) == 250
+        assert all(c["site_id"] == SERVER_SITE for c in streamed)
+        keys = [(c["db_version"], c["seq"]) for c in streamed]
+        assert keys == sorted(keys)
+        assert streamed == await cr_manager.get_changes_since(
+            TENANT, VIDEO, DB_NAME, since_version=5, exclude_site_id=CLIENT_SITE
+        )
+
+    async def test_failed_apply_rolls_back(self, cr_manager):
+        """A bad record rolls back the whole sync message."""
+        changes = make_changes(10)
+        del changes[5]["cid"]
+
+        with pytest.raises(KeyError):
+            await cr_manager.apply_changes(TENANT, VIDEO, DB_NAME, changes)
+
+        assert await cr_manager.get_changes_since(TENANT, VIDEO, DB_NAME, 0) == []
+
+    async def test_stream_interleaved_with_apply(self, cr_manager):
+        """Applying changes between batches neither fails nor skips rows."""
+        await cr_manager.apply_changes(TENANT, VIDEO, DB_NAME, make_changes(1000))
+        later = make_changes(1100)[1000:]
+
+        streamed = []
+        async for batch in cr_manager.iter_changes_since(
+            TENANT, VIDEO, DB_NAME, since_version=0, batch_size=100
+        ):
+            streamed.extend(batch)
+            if later:
+                await cr_manager.apply_changes(TENANT, VIDEO, DB_NAME, later)
+                later = []
+
+        assert len(streamed) == 1100
+        keys = [(c["db_version"], c["seq"]) for c in streamed]
+        assert keys == sorted(set(keys))
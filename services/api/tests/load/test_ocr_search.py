@@ -0,0 +1,87 @@
+"""Search latency on a 300k-row fullOCR.db with the trigram full-text index."""
+
+import random
+import sqlite3
+import time
+
+import pytest
+
+from app.repositories.ocr import OcrRepository
+
+NUM_ROWS = 300_000
+ROWS_PER_FRAME = 6
+CHARACTERS = "的一是不了人我在有他这中大来上个国到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可她里后小么心多天而能好都然没日于起还发成事只作当想看文无开手十用主行方"
+
+
+@pytest.fixture(scope="module")
+def ocr_conn(tmp_path_factory):
+    """fullOCR.db with 300k random CJK detections and a needle in a few frames."""
+    db_path = tmp_path_factory.mktemp("ocr") / "fullOCR.db"
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE full_frame_ocr (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            frame_id INTEGER NOT NULL,
+            frame_index INTEGER NOT NULL,
+            box_index INTEGER NOT NULL,
+            text TEXT,
+            confidence REAL,
+            bbox_left INTEGER,
+            bbox_top INTEGER,
+            bbox_right INTEGER,
+            bbox_bottom INTEGER,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    rng = random.Random(0)
+
+    def rows():
+        for i in range(NUM_ROWS):
+            frame, box = divmod(i, ROWS_PER_FRAME)
+            text = "".join(rng.choices(CHARACTERS, k=rng.randint(4, 20)))
+            if frame % 10_000 == 0:
+                text += "字幕组"
+            yield (frame, frame, box, text, 0.9, 0, 0, 10, 10)
+
+    conn.executemany(
+        "INSERT INTO full_frame_ocr (frame_id, frame_index, box_index, text, "
+        "confidence, bbox_left, bbox_top, bbox_right, bbox_bottom) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows(),
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.mark.load
+def test_search_300k_rows(ocr_conn):
+    """Indexed search answers in milliseconds; LIKE scans take far longer."""
+    repo = OcrRepository(ocr_conn)
+
+    start = time.perf_counter()
+    assert repo.ensure_search_index()
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frames = repo.search_frames("字幕组", limit=50)
+    search_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan = ocr_conn.execute(
+        "SELECT COUNT(*) FROM full_frame_ocr WHERE text LIKE '%字幕组%'"
+    ).fetchone()[0]
+    scan_seconds = time.perf_counter() - start
+
+    print(
+        f"\nindex build: {build_seconds:.2f}s, search: {search_seconds * 1000:.1f} ms, "
+        f"LIKE scan: {scan_seconds * 1000:.1f} ms"
+    )
+    expected_frames = NUM_ROWS // ROWS_PER_FRAME // 10_000
+    assert len(frames) == expected_frames
+    assert sum(f.totalDetections for f in frames) == scan
+    assert scan == expected_frames * ROWS_PER_FRAME
+    assert search_seconds < 0.05
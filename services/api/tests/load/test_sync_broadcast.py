@@ -0,0 +1,198 @@
+"""Load test: rapid sync messages against a local app with change coalescing.
+
+Each applied client message makes the fake CR-SQLite manager generate one
+server-side change (like a model prediction). The broadcaster should push all
+of them exactly once, merged into far fewer messages than were received.
+"""
+
+import base64
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.websocket_manager import WebSocketManager
+
+VIDEO = "video-1"
+USER = "user-1"
+TENANT = "tenant-1"
+CONNECTION = "conn-1"
+CLIENT_SITE = b"client-site"
+SERVER_SITE = b"server-site"
+NUM_MESSAGES = 500
+
+
+class FakeStateRepository:
+    """State store holding one client lock."""
+
+    def __init__(self):
+        self.state = {
+            "lock_holder_user_id": USER,
+            "lock_type": "client",
+            "active_connection_id": CONNECTION,
+            "server_version": 0,
+        }
+
+    async def get_state(self, video_id: str, db_name: str) -> dict:
+        return dict(self.state)
+
+    async def update_sync_state(
+        self, video_id: str, db_name: str, connection_id: str, server_version: int
+    ) -> bool:
+        self.state["server_version"] = server_version
+        return True
+
+    async def advance_server_version(
+        self, video_id: str, db_name: str, server_version: int
+    ) -> None:
+        self.state["server_version"] = server_version
+
+
+class FakeCRSqliteManager:
+    """In-memory change log; every applied message adds one server change."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+        self.version = 0
+        self.queries = 0
+
+    def has_working_copy(self, tenant_id: str, video_id: str, db_name: str) -> bool:
+        return True
+
+    async def apply_changes(
+        self, tenant_id: str, video_id: str, db_name: str, changes: list[dict]
+    ) -> int:
+        self.version += 1
+        for change in changes:
+            site_id = base64.b64decode(change["site_id"])
+            self.rows.append({**change, "site_id": site_id, "db_version": self.version})
+        self.rows.append(
+            {
+                "table": "captions",
+                "pk": b"prediction-%d" % self.version,
+                "cid": "prediction",
+                "val": 0.9,
+                "col_version": 1,
+                "db_version": self.version,
+                "site_id": SERVER_SITE,
+                "cl": 1,
+                "seq": len(changes),
+            }
+        )
+        return self.version
+
+    async def iter_changes_since(
+        self,
+        tenant_id: str,
+        video_id: str,
+        db_name: str,
+        since_version: int,
+        exclude_site_id: bytes | None = None,
+        batch_size: int | None = None,
+        max_batch_bytes: int | None = None,
+    ):
+        self.queries += 1
+        rows = [
+            row
+            for row in self.rows
+            if row["db_version"] > since_version and row["site_id"] != exclude_site_id
+        ]
+        for start in range(0, len(rows), 100):
+            yield rows[start : start + 100]
+
+
+def client_change(i: int) -> dict:
+    return {
+        "table": "captions",
+        "pk": base64.b64encode(i.to_bytes(4, "big")).decode(),
+        "cid": "text",
+        "val": f"caption {i}",
+        "col_version": 1,
+        "db_version": i,
+        "site_id": base64.b64encode(CLIENT_SITE).decode(),
+        "cl": 1,
+        "seq": 0,
+    }
+
+
+@pytest.mark.load
+class TestSyncBroadcastLoad:
+    """Hundreds of sync messages per second through the WebSocket endpoint."""
+
+    @pytest.mark.parametrize(
+        "client_version",
+        [0, NUM_MESSAGES * 10],
+        ids=["client-behind", "client-local-version-ahead"],
+    )
+    def test_rapid_edits_are_coalesced(self, client_version: int):
+        """Server changes arrive once each, in far fewer messages than edits.
+
+        The sync message's version is the client's local db_version; one far
+        ahead of the server's must not cause server changes to be skipped.
+        """
+        cr_manager = FakeCRSqliteManager()
+
+        with (
+            patch(
+                "app.routers.websocket_sync.jwt.decode",
+                return_value={"sub": USER, "tenant_id": TENANT},
+            ),
+            patch(
+                "app.routers.websocket_sync.DatabaseStateRepository",
+                return_value=FakeStateRepository(),
+            ),
+            patch(
+                "app.routers.websocket_sync.get_websocket_manager",
+                return_value=WebSocketManager(),
+            ),
+            patch(
+                "app.routers.websocket_sync.get_crsqlite_manager",
+                return_value=cr_manager,
+            ),
+        ):
+            client = TestClient(create_app())
+            with client.websocket_connect(
+                f"/videos/{VIDEO}/sync/captions?token=valid"
+            ) as websocket:
+                start = time.perf_counter()
+                for i in range(NUM_MESSAGES):
+                    websocket.send_text(
+                        json.dumps(
+                            {
+                                "type": "sync",
+                                "changes": [client_change(i)],
+                                "version": client_version + i,
+                            }
+                        )
+                    )
+
+                acks = 0
+                updates = 0
+                pushed: list[str] = []
+                while acks < NUM_MESSAGES or len(pushed) < NUM_MESSAGES:
+                    message = websocket.receive_json()
+                    if message["type"] == "ack":
+                        acks += 1
+                    elif message["type"] == "server_update":
+                        updates += 1
+                        pushed.extend(change["pk"] for change in message["changes"])
+                    else:
+                        pytest.fail(f"Unexpected message: {message}")
+                elapsed = time.perf_counter() - start
+
+        rate = NUM_MESSAGES / elapsed
+        print(
+            f"\n{NUM_MESSAGES} messages in {elapsed:.2f}s ({rate:,.0f}/s), "
+            f"{updates} server_update messages, {cr_manager.queries} queries"
+        )
+        # Every server change exactly once, none of the client's own rows
+        assert sorted(pushed) == sorted(
+            base64.b64encode(b"prediction-%d" % v).decode()
+            for v in range(1, NUM_MESSAGES + 1)
+        )
+        assert updates <= NUM_MESSAGES // 5
+        assert cr_manager.queries <= NUM_MESSAGES // 5
+        assert rate >= 200
@@ -3,7 +3,7 @@
 import sqlite3
 from collections.abc import AsyncGenerator
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi import FastAPI
@@ -71,6 +71,7 @@ async def actions_client(
     auth_context: AuthContext,
     mock_seeded_ocr_database_manager,
     mock_action_layout_manager,
+    mock_update_box_model: AsyncMock,
 ) -> AsyncGenerator[AsyncClient, None]:
     """Create an async test client for action endpoints."""
     from app.dependencies import get_auth_context
@@ -148,6 +149,30 @@ class TestBulkAnnotate:
         assert data["success"] is True
         assert data["framesAffected"] >= 0
 
+    async def test_bulk_annotate_updates_model(
+        self,
+        actions_client: AsyncClient,
+        test_tenant_id: str,
+        test_video_id: str,
+        mock_update_box_model: AsyncMock,
+    ):
+        """Should pass exactly the marked and cleared boxes to the model update."""
+        for action in ("mark_out", "clear"):
+            mock_update_box_model.reset_mock()
+            response = await actions_client.post(
+                f"/videos/{test_video_id}/actions/bulk-annotate",
+                json={
+                    "rectangle": {"left": 0, "top": 0, "right": 500, "bottom": 500},
+                    "action": action,
+                    "frame": 0,
+                },
+            )
+            assert response.status_code == 200
+
+            mock_update_box_model.assert_awaited_once_with(
+                test_tenant_id, test_video_id, [(0, 0), (0, 1)]
+            )
+
     async def test_bulk_annotate_requires_frame_or_all(
         self, actions_client: AsyncClient, test_video_id: str
     ):
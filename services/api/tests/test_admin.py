@@ -1,13 +1,16 @@
 """Tests for admin endpoints."""
 
 from collections.abc import AsyncGenerator
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
 from app.dependencies import AuthContext
+from app.services.database_manifest import DatabaseManifest
+from tests.unit.services.test_database_manifest import LocalDirectoryS3
 
 
 @pytest.fixture
@@ -21,23 +24,39 @@ def admin_context() -> AuthContext:
     )
 
 
+@pytest.fixture
+def manifest(tmp_path: Path) -> DatabaseManifest:
+    """Create an empty database manifest."""
+    return DatabaseManifest(tmp_path / "manifest.db")
+
+
+@pytest.fixture
+def mock_s3(tmp_path: Path) -> LocalDirectoryS3:
+    """Bucket holding a few databases and a video."""
+    s3 = LocalDirectoryS3(tmp_path / "bucket")
+    s3.put("tenant-1/client/videos/test-video-1/captions.db.gz", b"x" * 100)
+    s3.put("tenant-1/client/videos/test-video-1/layout.db.gz", b"x" * 200)
+    s3.put("tenant-1/client/videos/other-video/layout.db.gz", b"x" * 300)
+    s3.put("tenant-1/client/videos/other-video/video.mp4", b"x" * 900)
+    return s3
+
+
 @pytest.fixture
 async def admin_client(
     app: FastAPI,
     admin_context: AuthContext,
+    manifest: DatabaseManifest,
+    mock_s3: LocalDirectoryS3,
 ) -> AsyncGenerator[AsyncClient, None]:
     """Create an async test client for admin endpoints."""
     from app.dependencies import get_auth_context
 
     app.dependency_overrides[get_auth_context] = lambda: admin_context
 
-    # Mock boto3 client for S3 operations
-    mock_s3 = MagicMock()
-    mock_s3.get_paginator.return_value.paginate.return_value = [
-        {"CommonPrefixes": []}  # Empty bucket for testing
-    ]
-
-    with patch("app.routers.admin.boto3.client", return_value=mock_s3):
+    with (
+        patch("app.routers.admin.boto3.client", return_value=mock_s3),
+        patch("app.routers.admin.get_database_manifest", return_value=manifest),
+    ):
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             yield ac
@@ -74,6 +93,75 @@ class TestListDatabases:
         )
         assert response.status_code == 200
 
+    async def test_list_databases_from_manifest(
+        self,
+        admin_client: AsyncClient,
+        manifest: DatabaseManifest,
+        mock_s3: LocalDirectoryS3,
+    ):
+        """Should serve a reconciled manifest without listing the bucket."""
+        manifest.reconcile(mock_s3, "bucket")
+        list_calls = mock_s3.list_calls
+
+        response = await admin_client.get("/admin/databases")
+        data = response.json()
+
+        assert data["total"] == 6  # 2 videos x 3 databases
+        assert data["current"] == 3
+        first = data["databases"][0]
+        assert first["videoId"] == "other-video"
+        assert first["database"] == "captions.db"
+        assert first["status"] == "missing"
+        assert data["databases"][1]["sizeBytes"] == 300
+        assert mock_s3.list_calls == list_calls
+        assert mock_s3.head_calls == 0
+
+    async def test_list_databases_never_reconciles(
+        self, admin_client: AsyncClient, mock_s3: LocalDirectoryS3
+    ):
+        """Should not list the bucket even when the manifest is stale."""
+        response = await admin_client.get("/admin/databases")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+        assert mock_s3.list_calls == 0
+
+    async def test_list_databases_paginated(
+        self,
+        admin_client: AsyncClient,
+        manifest: DatabaseManifest,
+        mock_s3: LocalDirectoryS3,
+    ):
+        """Should page through databases with limit and offset."""
+        manifest.reconcile(mock_s3, "bucket")
+        response = await admin_client.get(
+            "/admin/databases",
+            params={"status": "current", "limit": 2, "offset": 2},
+        )
+        data = response.json()
+
+        assert data["total"] == 3
+        assert [(d["videoId"], d["database"]) for d in data["databases"]] == [
+            ("test-video-1", "layout.db")
+        ]
+
+
+class TestReconcileDatabases:
+    """Tests for POST /admin/databases/reconcile endpoint."""
+
+    async def test_reconcile(self, admin_client: AsyncClient, manifest):
+        """Should rebuild the manifest for a tenant."""
+        response = await admin_client.post(
+            "/admin/databases/reconcile", params={"tenantId": "tenant-1"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "success": True,
+            "tenantId": "tenant-1",
+            "databases": 3,
+        }
+        assert manifest.list_databases(present=True).total == 3
+
 
 class TestRepairDatabases:
     """Tests for POST /admin/databases/repair endpoint."""
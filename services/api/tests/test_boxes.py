@@ -1,5 +1,7 @@
 """Tests for consolidated /boxes endpoint."""
 
+from unittest.mock import AsyncMock
+
 from httpx import AsyncClient
 
 
@@ -128,6 +130,25 @@ class TestUpdateBoxes:
         assert data["updated"] == 2
         assert data["frame"]["frameIndex"] == 2
 
+    async def test_update_boxes_updates_model(
+        self,
+        boxes_client: AsyncClient,
+        test_tenant_id: str,
+        test_video_id: str,
+        mock_update_box_model: AsyncMock,
+    ):
+        """Should pass the saved boxes to the box classification model update."""
+        response = await boxes_client.put(
+            f"/videos/{test_video_id}/boxes",
+            params={"frame": 2},
+            json={"annotations": [{"boxIndex": 0, "status": "in"}]},
+        )
+        assert response.status_code == 200
+
+        mock_update_box_model.assert_awaited_once_with(
+            test_tenant_id, test_video_id, [(2, 0)]
+        )
+
     async def test_update_single_box(
         self, boxes_client: AsyncClient, test_video_id: str
     ):
@@ -1,5 +1,6 @@
 """Tests for CaptionRepository."""
 
+import random
 import sqlite3
 from pathlib import Path
 
@@ -304,3 +305,245 @@ class TestGapMerging:
 
         # Should have merged gaps: [0-59] and [91-150]
         assert len(gaps) == 2
+
+
+# =============================================================================
+# Overlap resolution properties
+# =============================================================================
+
+
+def _legacy_update(
+    conn: sqlite3.Connection, caption_id: int, input: CaptionUpdate
+) -> dict:
+    """Reference row-by-row overlap resolution (the original implementation)."""
+    start, end = input.startFrameIndex, input.endFrameIndex
+    original = conn.execute(
+        "SELECT * FROM captions WHERE id = ?", (caption_id,)
+    ).fetchone()
+    deleted, modified, gaps = [], [], []
+
+    overlapping = conn.execute(
+        "SELECT * FROM captions WHERE id != ? "
+        "AND NOT (end_frame_index < ? OR start_frame_index > ?)",
+        (caption_id, start, end),
+    ).fetchall()
+    for row in overlapping:
+        if row["start_frame_index"] >= start and row["end_frame_index"] <= end:
+            conn.execute("DELETE FROM captions WHERE id = ?", (row["id"],))
+            deleted.append(row["id"])
+            continue
+        if row["start_frame_index"] < start:
+            conn.execute(
+                "UPDATE captions SET end_frame_index = ?, "
+                "caption_frame_extents_pending = 1 WHERE id = ?",
+                (start - 1, row["id"]),
+            )
+            modified.append(row["id"])
+            if row["end_frame_index"] > end:
+                cursor = conn.execute(
+                    "INSERT INTO captions (start_frame_index, end_frame_index, "
+                    "caption_frame_extents_state, caption_frame_extents_pending, "
+                    "text) VALUES (?, ?, ?, 1, ?)",
+                    (
+                        end + 1,
+                        row["end_frame_index"],
+                        row["caption_frame_extents_state"],
+                        row["text"],
+                    ),
+                )
+                modified.append(cursor.lastrowid)
+        else:
+            conn.execute(
+                "UPDATE captions SET start_frame_index = ?, "
+                "caption_frame_extents_pending = 1 WHERE id = ?",
+                (end + 1, row["id"]),
+            )
+            modified.append(row["id"])
+
+    def create_or_merge_gap(gap_start: int, gap_end: int) -> None:
+        adjacent = conn.execute(
+            "SELECT * FROM captions WHERE caption_frame_extents_state = 'gap' "
+            "AND (end_frame_index = ? - 1 OR start_frame_index = ? + 1) "
+            "ORDER BY start_frame_index",
+            (gap_start, gap_end),
+        ).fetchall()
+        for gap in adjacent:
+            if gap["end_frame_index"] == gap_start - 1:
+                gap_start = gap["start_frame_index"]
+            else:
+                gap_end = gap["end_frame_index"]
+            conn.execute("DELETE FROM captions WHERE id = ?", (gap["id"],))
+        cursor = conn.execute(
+            "INSERT INTO captions (start_frame_index, end_frame_index, "
+            "caption_frame_extents_state, caption_frame_extents_pending) "
+            "VALUES (?, ?, 'gap', 0)",
+            (gap_start, gap_end),
+        )
+        gaps.append(cursor.lastrowid)
+
+    if start > original["start_frame_index"]:
+        create_or_merge_gap(original["start_frame_index"], start - 1)
+    if end < original["end_frame_index"]:
+        create_or_merge_gap(end + 1, original["end_frame_index"])
+
+    changed = (start, end) != (
+        original["start_frame_index"],
+        original["end_frame_index"],
+    )
+    conn.execute(
+        "UPDATE captions SET start_frame_index = ?, end_frame_index = ?, "
+        "caption_frame_extents_state = ?, caption_frame_extents_pending = 0, "
+        "image_needs_regen = ? WHERE id = ?",
+        (start, end, input.captionFrameExtentsState.value, int(changed), caption_id),
+    )
+    conn.commit()
+    return {"deleted": deleted, "modified": modified, "gaps": gaps}
+
+
+def _table_state(conn: sqlite3.Connection) -> list[tuple]:
+    """All caption rows, without timestamps."""
+    return conn.execute(
+        """
+        SELECT id, start_frame_index, end_frame_index, caption_frame_extents_state,
+            caption_frame_extents_pending, text, image_needs_regen
+        FROM captions ORDER BY id
+        """
+    ).fetchall()
+
+
+def _random_timeline(conn: sqlite3.Connection, rng: random.Random) -> list[int]:
+    """Fill captions.db with consecutive captions of random length and state."""
+    states = [state.value for state in CaptionFrameExtentsState]
+    frame = rng.randint(0, 5)
+    ids = []
+    for _ in range(rng.randint(1, 25)):
+        length = rng.choice([1, 1, 2, 3, 5, 10, 30])
+        cursor = conn.execute(
+            "INSERT INTO captions (start_frame_index, end_frame_index, "
+            "caption_frame_extents_state, caption_frame_extents_pending, text) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                frame,
+                frame + length - 1,
+                rng.choice(states),
+                rng.randint(0, 1),
+                f"caption {frame}",
+            ),
+        )
+        ids.append(cursor.lastrowid)
+        # Leave occasional holes in the timeline
+        frame += length + rng.choice([0, 0, 0, 0, 1, 4])
+    conn.commit()
+    return ids
+
+
+class TestOverlapResolutionProperties:
+    """Batched overlap resolution matches row-by-row resolution."""
+
+    @pytest.mark.parametrize("seed", range(300))
+    def test_matches_row_by_row_resolution(self, captions_db: Path, seed: int):
+        """Same final table, IDs and response as the original algorithm."""
+        rng = random.Random(seed)
+        conn = sqlite3.connect(str(captions_db))
+        conn.row_factory = sqlite3.Row
+        ids = _random_timeline(conn, rng)
+        reference = sqlite3.connect(":memory:")
+        reference.row_factory = sqlite3.Row
+        conn.backup(reference)
+
+        last_frame = conn.execute(
+            "SELECT MAX(end_frame_index) FROM captions"
+        ).fetchone()[0]
+        caption_id = rng.choice(ids)
+        start = rng.randint(0, last_frame + 5)
+        update = CaptionUpdate(
+            startFrameIndex=start,
+            endFrameIndex=rng.randint(start, last_frame + 10),
+            captionFrameExtentsState=rng.choice(list(CaptionFrameExtentsState)),
+        )
+
+        result = CaptionRepository(conn).update_caption_with_overlap_resolution(
+            caption_id, update
+        )
+        expected = _legacy_update(reference, caption_id, update)
+
+        assert _table_state(conn) == _table_state(reference)
+        assert sorted(result.deletedCaptions) == sorted(expected["deleted"])
+        assert sorted(c.id for c in result.modifiedCaptions) == sorted(
+            expected["modified"]
+        )
+        assert [c.id for c in result.createdGaps] == expected["gaps"]
+        assert result.caption.startFrameIndex == update.startFrameIndex
+        assert result.caption.endFrameIndex == update.endFrameIndex
+
+    def test_dragging_across_many_captions_reads_once(self, repo: CaptionRepository):
+        """Swallowing 100 tiny captions is one read plus one read-back."""
+        for frame in range(0, 204, 2):
+            repo.create_caption(
+                CaptionCreate(
+                    startFrameIndex=frame,
+                    endFrameIndex=frame + 1,
+                    captionFrameExtentsState=CaptionFrameExtentsState.PREDICTED,
+                )
+            )
+        statements: list[str] = []
+        repo.conn.set_trace_callback(statements.append)
+
+        result = repo.update_caption_with_overlap_resolution(
+            1,
+            CaptionUpdate(startFrameIndex=0, endFrameIndex=202),
+        )
+
+        selects = [sql for sql in statements if "SELECT" in sql]
+        assert len(selects) == 2
+        assert len(result.deletedCaptions) == 100
+        assert [c.startFrameIndex for c in result.modifiedCaptions] == [203]
+        assert [c.startFrameIndex for c in repo.list_captions()] == [0, 203]
+
+
+class TestStatsCounters:
+    """Tests for stored caption stats counters."""
+
+    def test_aggregate_without_counters(self, seeded_repo: CaptionRepository):
+        """Should compute stats in SQL when the counters table is missing."""
+        assert not seeded_repo.has_stats_counters()
+        assert seeded_repo.get_stats() == {
+            "annotation_count": 4,
+            "covered_frames": 301,
+            "needs_text_count": 4,
+            "predicted_count": 1,
+            "confirmed_count": 2,
+            "gap_count": 1,
+        }
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_counters_track_changes(self, captions_db: Path, seed: int):
+        """Counters match a fresh aggregate after arbitrary caption edits."""
+        rng = random.Random(seed)
+        conn = sqlite3.connect(str(captions_db))
+        conn.row_factory = sqlite3.Row
+        repo = CaptionRepository(conn)
+        ids = _random_timeline(conn, rng)
+        assert repo.ensure_stats_counters()
+
+        for _ in range(10):
+            caption_id = rng.choice(ids)
+            if repo.get_caption(caption_id) is None:
+                continue
+            action = rng.choice(["resolve", "text", "delete"])
+            if action == "resolve":
+                start = rng.randint(0, 200)
+                repo.update_caption_with_overlap_resolution(
+                    caption_id,
+                    CaptionUpdate(
+                        startFrameIndex=start, endFrameIndex=start + rng.randint(0, 40)
+                    ),
+                )
+            elif action == "text":
+                repo.update_caption_text(caption_id, CaptionTextUpdate(text="edited"))
+            else:
+                repo.delete_caption(caption_id)
+
+        stored = repo.get_stats()
+        conn.execute("DROP TABLE caption_stats")
+        assert stored == repo.get_stats()
@@ -166,6 +166,66 @@ class TestSearchText:
         assert len(detections) == 1
 
 
+class TestSearchIndex:
+    """Tests for the full-text search index."""
+
+    def test_index_built_lazily(self, seeded_repo: OcrRepository):
+        """First search builds the index for an existing database."""
+        assert not seeded_repo.has_search_index()
+
+        seeded_repo.search_text("Hello")
+
+        assert seeded_repo.has_search_index()
+
+    def test_index_follows_writes(self, seeded_repo: OcrRepository):
+        """Inserts, updates and deletes are reflected in search results."""
+        seeded_repo.ensure_search_index()
+        conn = seeded_repo.conn
+        conn.execute(
+            "INSERT INTO full_frame_ocr (frame_id, frame_index, box_index, text) "
+            "VALUES (9, 9, 0, '你好世界')"
+        )
+        conn.execute("UPDATE full_frame_ocr SET text = 'Goodbye' WHERE id = 1")
+        conn.execute("DELETE FROM full_frame_ocr WHERE text = 'Test'")
+        conn.commit()
+
+        assert [d.frameIndex for d in seeded_repo.search_text("你好世")] == [9]
+        assert [d.frameIndex for d in seeded_repo.search_text("Hello")] == [2]
+        assert seeded_repo.search_text("Test") == []
+
+    def test_short_query_falls_back_to_like(self, seeded_repo: OcrRepository):
+        """Queries shorter than a trigram still match substrings."""
+        detections = seeded_repo.search_text("he")
+        assert {d.text for d in detections} == {"Hello", "Another"}
+
+    def test_search_frames_groups_matches(self, seeded_repo: OcrRepository):
+        """Matches are grouped per frame with only matching detections."""
+        frames = seeded_repo.search_frames("o")
+        assert [f.frameIndex for f in frames] == [0, 1, 2]
+        assert frames[0].totalDetections == 2
+
+        frames = seeded_repo.search_frames("Hello", limit=1)
+        assert len(frames) == 1
+        assert [d.text for d in frames[0].detections] == ["Hello"]
+        assert frames[0].totalDetections == 1
+
+    def test_ranking_prefers_closer_matches(self, repo: OcrRepository):
+        """Detections that are mostly the search term rank first."""
+        repo.conn.executemany(
+            "INSERT INTO full_frame_ocr (frame_id, frame_index, box_index, text) "
+            "VALUES (?, ?, 0, ?)",
+            [
+                (0, 0, "the caption text is long and mentions 字幕组 once"),
+                (1, 1, "字幕组"),
+            ],
+        )
+        repo.conn.commit()
+
+        assert [f.frameIndex for f in repo.search_frames("字幕组")] == [1, 0]
+        assert [d.frameIndex for d in repo.search_text("字幕组", limit=1)] == [1]
+        assert repo.search_frames("字幕组 文") == []
+
+
 class TestGetStats:
     """Tests for get_stats method."""
 
@@ -215,3 +275,26 @@ class TestCountDetections:
         """Should return 0 for frame without detections."""
         count = seeded_repo.count_detections(frame_index=999)
         assert count == 0
+
+
+class TestStatsCache:
+    """Tests for cached OCR stats."""
+
+    def test_stats_cached_until_database_changes(self, seeded_ocr_db_connection):
+        """Should reuse stats until the database file is written."""
+        repo = OcrRepository(seeded_ocr_db_connection)
+        stats = repo.get_stats()
+
+        statements: list[str] = []
+        seeded_ocr_db_connection.set_trace_callback(statements.append)
+        assert repo.get_stats() == stats
+        assert not [sql for sql in statements if "full_frame_ocr" in sql]
+
+        seeded_ocr_db_connection.execute(
+            "INSERT INTO full_frame_ocr (frame_id, frame_index, box_index, text) "
+            "VALUES (9999, 9999, 0, 'new')"
+        )
+        seeded_ocr_db_connection.commit()
+        updated = repo.get_stats()
+        assert updated["total_detections"] == stats["total_detections"] + 1
+        assert updated["frames_with_ocr"] == stats["frames_with_ocr"] + 1
@@ -1,7 +1,16 @@
 """Tests for /stats endpoint."""
 
+import shutil
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
 from httpx import AsyncClient
 
+from app.config import Settings
+from app.repositories.captions import CaptionRepository
+from app.services.crsqlite_manager import CRSqliteManager
+
 
 class TestGetStats:
     """Tests for GET /{video_id}/stats endpoint."""
@@ -45,3 +54,71 @@ class TestGetStats:
         # Caption 2 (predicted, no text) and caption 3 (gap) need checking
         # Gap captions don't need text, so only caption 2 needs text
         assert data["stats"]["needsTextCount"] >= 1
+
+    async def test_stats_etag_not_modified(
+        self, stats_client: AsyncClient, test_video_id: str
+    ):
+        """Should answer 304 when polled with the current ETag."""
+        response = await stats_client.get(f"/videos/{test_video_id}/stats")
+        etag = response.headers["etag"]
+
+        cached = await stats_client.get(
+            f"/videos/{test_video_id}/stats", headers={"If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+
+        stale = await stats_client.get(
+            f"/videos/{test_video_id}/stats", headers={"If-None-Match": 'W/"stale"'}
+        )
+        assert stale.status_code == 200
+
+    async def test_stats_counters_follow_caption_changes(
+        self,
+        stats_client: AsyncClient,
+        test_video_id: str,
+        seeded_captions_db: Path,
+    ):
+        """Polls don't write the database; edits change the ETag."""
+        response = await stats_client.get(f"/videos/{test_video_id}/stats")
+        etag = response.headers["etag"]
+
+        conn = sqlite3.connect(str(seeded_captions_db))
+        conn.row_factory = sqlite3.Row
+        assert not CaptionRepository(conn).has_stats_counters()
+        conn.execute(
+            "UPDATE captions SET caption_frame_extents_state = 'gap' WHERE id = 1"
+        )
+        conn.commit()
+        conn.close()
+
+        response = await stats_client.get(
+            f"/videos/{test_video_id}/stats", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        # Caption 1 (frames 0-100) no longer counts as covered
+        assert response.json()["stats"]["coveredFrames"] == 200
+
+
+def test_working_copy_gets_stats_counters(seeded_captions_db: Path, tmp_path: Path):
+    """Opening a captions working copy adds counters seeded from its captions."""
+    settings = Settings(working_copy_dir=str(tmp_path), crsqlite_extension_path="")
+    with (
+        patch("app.services.crsqlite_manager.get_settings", return_value=settings),
+        patch("app.services.crsqlite_manager.boto3.client"),
+    ):
+        manager = CRSqliteManager()
+    working_path = tmp_path / "t" / "v" / "captions.db"
+    working_path.parent.mkdir(parents=True)
+    shutil.copy(seeded_captions_db, working_path)
+
+    manager.get_connection("t", "v", "captions")
+    manager.close_all_connections()
+
+    conn = sqlite3.connect(str(working_path))
+    conn.row_factory = sqlite3.Row
+    repo = CaptionRepository(conn)
+    assert repo.has_stats_counters()
+    assert repo.get_stats()["annotation_count"] == 4
+    conn.close()
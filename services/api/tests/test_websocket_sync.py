@@ -32,6 +32,26 @@ class MockDatabaseStateRepository:
     async def update_activity(self, _video_id: str, _db_name: str) -> None:
         pass
 
+    async def update_sync_state(
+        self, video_id: str, db_name: str, connection_id: str, server_version: int
+    ) -> bool:
+        state = self.states.get(f"{video_id}/{db_name}")
+        if (
+            not state
+            or state.get("active_connection_id") != connection_id
+            or state.get("lock_type") != "client"
+        ):
+            return False
+        state["server_version"] = server_version
+        return True
+
+    async def advance_server_version(
+        self, video_id: str, db_name: str, server_version: int
+    ) -> None:
+        state = self.states.get(f"{video_id}/{db_name}")
+        if state and state.get("server_version", 0) < server_version:
+            state["server_version"] = server_version
+
 
 class MockWebSocketManager:
     """Mock WebSocket manager for testing."""
@@ -0,0 +1,179 @@
+"""
+Unit tests for WasabiUploadWorker.
+Uses in-memory fakes for the CR-SQLite manager and state repository.
+"""
+
+import asyncio
+import gzip
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.config import Settings
+from app.services.background_tasks import WasabiUploadWorker
+from app.services.crsqlite_manager import CRSqliteManager
+
+
+class FakeCRSqliteManager:
+    """Uploads take ``seconds[video_id]``; listed videos fail their first try."""
+
+    def __init__(self, seconds: dict[str, float], flaky: set[str] | None = None):
+        self.seconds = seconds
+        self.flaky = set(flaky or ())
+        self.active = 0
+        self.max_active = 0
+        self.attempts: dict[str, int] = {}
+
+    def has_working_copy(self, tenant_id: str, video_id: str, db_name: str) -> bool:
+        return video_id in self.seconds
+
+    async def upload_to_wasabi(
+        self, tenant_id: str, video_id: str, db_name: str
+    ) -> tuple[int, int]:
+        self.attempts[video_id] = self.attempts.get(video_id, 0) + 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.seconds[video_id])
+        finally:
+            self.active -= 1
+        if video_id in self.flaky:
+            self.flaky.discard(video_id)
+            raise ConnectionError("connection reset")
+        return 1000, 100
+
+    def close_all_connections(self) -> None:
+        pass
+
+
+class FakeStateRepository:
+    def __init__(self, states: list[dict]):
+        self.states = states
+        self.wasabi_versions: dict[str, int] = {}
+
+    async def get_all_with_unsaved_changes(self) -> list[dict]:
+        return self.states
+
+    async def update_wasabi_version(
+        self, video_id: str, db_name: str, version: int
+    ) -> None:
+        self.wasabi_versions[video_id] = version
+
+
+def make_states(*video_ids: str) -> list[dict]:
+    return [
+        {
+            "video_id": video_id,
+            "database_name": "layout",
+            "tenant_id": "tenant-1",
+            "server_version": 7,
+        }
+        for video_id in video_ids
+    ]
+
+
+@pytest.fixture
+def make_worker():
+    def _make(**settings_overrides) -> WasabiUploadWorker:
+        settings = Settings(wasabi_upload_retry_base_seconds=0.01, **settings_overrides)
+        with patch("app.services.background_tasks.get_settings", return_value=settings):
+            return WasabiUploadWorker()
+
+    return _make
+
+
+async def drain(worker: WasabiUploadWorker, cr_manager, repo) -> float:
+    start = time.perf_counter()
+    with (
+        patch(
+            "app.services.background_tasks.get_crsqlite_manager",
+            return_value=cr_manager,
+        ),
+        patch(
+            "app.services.background_tasks.DatabaseStateRepository",
+            return_value=repo,
+        ),
+    ):
+        await worker._upload_all_pending()
+    return time.perf_counter() - start
+
+
+class TestWasabiUploadWorker:
+    """Test bounded-parallel uploads with retry."""
+
+    async def test_drain_time_is_bounded_by_largest_file(self, make_worker):
+        """A slow upload doesn't serialize the others."""
+        cr_manager = FakeCRSqliteManager({"big": 0.3, "a": 0.05, "b": 0.05, "c": 0.05})
+        repo = FakeStateRepository(make_states("big", "a", "b", "c"))
+        worker = make_worker(wasabi_upload_concurrency=4)
+
+        elapsed = await drain(worker, cr_manager, repo)
+
+        assert elapsed < 0.3 + 0.1
+        assert repo.wasabi_versions == {"big": 7, "a": 7, "b": 7, "c": 7}
+        assert worker.metrics.uploaded == 4
+        assert worker.metrics.bytes_uploaded == 400
+        assert worker.metrics.queue_depth == worker.metrics.in_flight == 0
+
+    async def test_concurrency_is_bounded(self, make_worker):
+        """No more than wasabi_upload_concurrency uploads run at once."""
+        videos = [f"v{i}" for i in range(10)]
+        cr_manager = FakeCRSqliteManager(dict.fromkeys(videos, 0.01))
+        worker = make_worker(wasabi_upload_concurrency=3)
+
+        await drain(worker, cr_manager, FakeStateRepository(make_states(*videos)))
+
+        assert cr_manager.max_active == 3
+        assert worker.metrics.uploaded == 10
+
+    async def test_failed_upload_is_retried(self, make_worker):
+        """A transient failure is retried; the version is recorded once it works."""
+        cr_manager = FakeCRSqliteManager({"a": 0.0, "b": 0.0}, flaky={"a"})
+        repo = FakeStateRepository(make_states("a", "b"))
+        worker = make_worker()
+
+        await drain(worker, cr_manager, repo)
+
+        assert cr_manager.attempts == {"a": 2, "b": 1}
+        assert repo.wasabi_versions == {"a": 7, "b": 7}
+        assert worker.metrics.retries == 1
+        assert worker.metrics.failed == 0
+
+    async def test_gives_up_after_max_attempts(self, make_worker):
+        """Persistent failures are counted and don't record a version."""
+        cr_manager = FakeCRSqliteManager({"a": 0.0}, flaky={"a"})
+        repo = FakeStateRepository(make_states("a"))
+        worker = make_worker(wasabi_upload_max_attempts=1)
+
+        await drain(worker, cr_manager, repo)
+
+        assert repo.wasabi_versions == {}
+        assert worker.metrics.failed == 1
+
+
+async def test_upload_streams_compressed_file(tmp_path):
+    """upload_to_wasabi uploads a gzip of the working copy via upload_file."""
+    settings = Settings(working_copy_dir=str(tmp_path), wasabi_bucket="bucket")
+    s3 = Mock()
+    uploaded = {}
+    s3.upload_file.side_effect = lambda path, bucket, key, **kwargs: uploaded.update(
+        key=key, data=Path(path).read_bytes(), config=kwargs["Config"]
+    )
+    with (
+        patch("app.services.crsqlite_manager.get_settings", return_value=settings),
+        patch("app.services.crsqlite_manager.boto3.client", return_value=s3),
+    ):
+        manager = CRSqliteManager()
+    working_path = tmp_path / "t" / "v" / "layout.db"
+    working_path.parent.mkdir(parents=True)
+    working_path.write_bytes(b"sqlite page " * 100_000)
+
+    original, compressed = await manager.upload_to_wasabi("t", "v", "layout")
+
+    assert uploaded["key"] == "t/client/videos/v/layout.db.gz"
+    assert gzip.decompress(uploaded["data"]) == working_path.read_bytes()
+    assert (original, compressed) == (1_200_000, len(uploaded["data"]))
+    assert uploaded["config"].multipart_threshold == 16 * 1024 * 1024
+    assert list(working_path.parent.glob("*.tmp")) == []
@@ -0,0 +1,339 @@
+"""
+Unit tests for the box model update run after annotations are saved.
+Uses layout.db and fullOCR.db created by the API's database managers and the
+conftest layout-server.db.
+"""
+
+import gzip
+import sqlite3
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from ocr_box_model import (
+    load_model,
+    load_sample_labels,
+    train_model,
+    verify_incremental_state,
+)
+
+from app.config import Settings
+from app.models.layout import BoxLabel, BoxLabelCreate, LabelSource
+from app.repositories.layout import LayoutRepository
+from app.services.box_model_updates import (
+    apply_box_label_changes,
+    attach_training_views,
+    update_box_model,
+)
+from app.services.database_manager import (
+    DatabaseManager,
+    LayoutDatabaseManager,
+    LayoutServerDatabaseManager,
+    OcrDatabaseManager,
+)
+from tests.unit.services.test_database_manager import FakeS3
+
+FRAMES = 12
+BOXES_PER_FRAME = 3
+FRAME_WIDTH = 1920
+FRAME_HEIGHT = 1080
+
+
+def create_database(manager_class: type[DatabaseManager], db_path: Path) -> None:
+    """Create a database with the schema its API manager creates."""
+    settings = Settings(sqlite_cache_dir=str(db_path.parent), wasabi_bucket="test")
+    with patch("app.services.database_manager.boto3.client"):
+        manager = manager_class(settings)
+    manager._create_new_database(db_path)
+
+
+@pytest.fixture
+def api_layout_db(temp_db_dir: Path) -> Path:
+    """layout.db as LayoutDatabaseManager creates it, with a layout config."""
+    db_path = temp_db_dir / "api-layout.db"
+    create_database(LayoutDatabaseManager, db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "INSERT INTO video_layout_config (id, frame_width, frame_height) VALUES (1, ?, ?)",
+        (FRAME_WIDTH, FRAME_HEIGHT),
+    )
+    conn.execute("INSERT INTO video_preferences (id) VALUES (1)")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def api_ocr_db(temp_db_dir: Path) -> Path:
+    """fullOCR.db as OcrDatabaseManager creates it, with pixel boxes."""
+    db_path = temp_db_dir / "api-fullOCR.db"
+    create_database(OcrDatabaseManager, db_path)
+    conn = sqlite3.connect(str(db_path))
+    rows = []
+    for fi in range(FRAMES):
+        for bi in range(BOXES_PER_FRAME):
+            left = 190 + 480 * bi + 19 * fi
+            top = 160 + 320 * bi
+            rows.append(
+                (
+                    fi,
+                    fi,
+                    bi,
+                    "Caption" if bi == 0 else "logo",
+                    left,
+                    top,
+                    left + 380 - 95 * bi,
+                    top + 54 + 11 * (fi % 3),
+                )
+            )
+    conn.executemany(
+        """
+        INSERT INTO full_frame_ocr
+            (frame_id, frame_index, box_index, text, bbox_left, bbox_top, bbox_right, bbox_bottom)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def ocr_conn(api_ocr_db: Path):
+    conn = sqlite3.connect(str(api_ocr_db))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def model_conn(model_db: Path):
+    conn = sqlite3.connect(str(model_db))
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def set_user_label(
+    db_path: Path, frame_index: int, box_index: int, label: BoxLabel | None
+) -> None:
+    """Save (or with label None, clear) a user label like the annotation UI."""
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        repo = LayoutRepository(conn)
+        if label is None:
+            existing = repo.get_box_label_by_position(
+                frame_index, box_index, LabelSource.USER
+            )
+            if existing:
+                repo.delete_box_label(existing.id)
+        else:
+            repo.create_box_label(
+                BoxLabelCreate(
+                    frameIndex=frame_index,
+                    boxIndex=box_index,
+                    label=label,
+                    labelSource=LabelSource.USER,
+                )
+            )
+    finally:
+        conn.close()
+
+
+def label_all(db_path: Path) -> list[tuple[int, int]]:
+    boxes = []
+    for fi in range(FRAMES):
+        set_user_label(db_path, fi, 0, BoxLabel.IN)
+        set_user_label(db_path, fi, 1, BoxLabel.OUT)
+        boxes.extend([(fi, 0), (fi, 1)])
+    return boxes
+
+
+def open_training_views(layout_db: Path, ocr_conn: sqlite3.Connection):
+    conn = sqlite3.connect(str(layout_db))
+    attach_training_views(conn, ocr_conn)
+    return conn
+
+
+def test_changes_match_full_rebuild(
+    api_layout_db: Path, ocr_conn, model_conn, model_db: Path
+):
+    def apply(boxes: list[tuple[int, int]]) -> int | None:
+        conn = sqlite3.connect(str(api_layout_db))
+        try:
+            return apply_box_label_changes(conn, ocr_conn, model_conn, boxes)
+        finally:
+            conn.close()
+
+    assert apply(label_all(api_layout_db)) == 24
+
+    set_user_label(api_layout_db, 3, 2, BoxLabel.OUT)
+    set_user_label(api_layout_db, 4, 1, BoxLabel.IN)
+    set_user_label(api_layout_db, 5, 0, None)
+
+    assert apply([(3, 2), (4, 1), (5, 0)]) == 24
+    samples = load_sample_labels(model_conn)
+    assert samples[(3, 2)] == "out"
+    assert samples[(4, 1)] == "in"
+    assert (5, 0) not in samples
+
+    views_conn = open_training_views(api_layout_db, ocr_conn)
+    try:
+        assert verify_incremental_state(views_conn, model_conn)
+        scratch_conn = sqlite3.connect(":memory:")
+        scratch_conn.execute(
+            "CREATE TABLE box_classification_model (id INTEGER PRIMARY KEY, "
+            "model_version TEXT, trained_at TEXT)"
+        )
+        train_model(views_conn, scratch_conn)
+    finally:
+        views_conn.close()
+
+    incremental, rebuilt = load_model(model_conn), load_model(scratch_conn)
+    assert incremental is not None and rebuilt is not None
+    for a, b in zip(
+        incremental.in_features + incremental.out_features,
+        rebuilt.in_features + rebuilt.out_features,
+        strict=True,
+    ):
+        assert a.mean == pytest.approx(b.mean, rel=1e-9, abs=1e-12)
+        assert a.std == pytest.approx(b.std, rel=1e-9, abs=1e-12)
+
+
+def test_views_match_ocr_boxes(api_layout_db: Path, ocr_conn):
+    """Labelled boxes get the fullOCR.db pixel bounds back."""
+    set_user_label(api_layout_db, 7, 1, BoxLabel.OUT)
+
+    conn = open_training_views(api_layout_db, ocr_conn)
+    try:
+        row = conn.execute(
+            "SELECT box_left, box_top, box_right, box_bottom, annotation_source "
+            "FROM full_frame_box_labels"
+        ).fetchone()
+        duration = conn.execute(
+            "SELECT duration_seconds FROM video_metadata"
+        ).fetchone()
+    finally:
+        conn.close()
+
+    expected = ocr_conn.execute(
+        "SELECT bbox_left, bbox_top, bbox_right, bbox_bottom FROM full_frame_ocr "
+        "WHERE frame_index = 7 AND box_index = 1"
+    ).fetchone()
+    assert row[:4] == expected
+    assert row[4] == "full_frame"
+    assert duration == (FRAMES / 10.0,)
+
+
+def test_layout_db_is_not_modified(api_layout_db: Path, ocr_conn, model_conn):
+    set_user_label(api_layout_db, 0, 0, BoxLabel.IN)
+    before = api_layout_db.read_bytes()
+
+    conn = sqlite3.connect(str(api_layout_db))
+    try:
+        apply_box_label_changes(conn, ocr_conn, model_conn, [(0, 0)])
+        assert conn.total_changes == 0
+    finally:
+        conn.close()
+
+    assert api_layout_db.read_bytes() == before
+    assert load_sample_labels(model_conn) == {(0, 0): "in"}
+
+
+class Manager:
+    """Database manager serving one local file, like DatabaseManager."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.writable: list[bool] = []
+
+    @asynccontextmanager
+    async def _connect(self):
+        # Same connection options as DatabaseManager
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_database(self, tenant_id: str, video_id: str, writable: bool = False):
+        self.writable.append(writable)
+        return self._connect()
+
+    def get_or_create_database(
+        self, tenant_id: str, video_id: str, writable: bool = False
+    ):
+        self.writable.append(writable)
+        return self._connect()
+
+
+def patch_managers(ocr_manager, layout_manager, model_manager):
+    return (
+        patch(
+            "app.services.box_model_updates.get_ocr_database_manager",
+            return_value=ocr_manager,
+        ),
+        patch(
+            "app.services.box_model_updates.get_layout_database_manager",
+            return_value=layout_manager,
+        ),
+        patch(
+            "app.services.box_model_updates.get_layout_server_database_manager",
+            return_value=model_manager,
+        ),
+    )
+
+
+async def test_update_runs_in_worker_thread(
+    api_layout_db: Path, api_ocr_db: Path, model_db: Path
+):
+    """Connections from the database managers are used off the event loop."""
+    boxes = label_all(api_layout_db)
+    model_manager = Manager(model_db)
+
+    ocr_patch, layout_patch, model_patch = patch_managers(
+        Manager(api_ocr_db), Manager(api_layout_db), model_manager
+    )
+    with ocr_patch, layout_patch, model_patch:
+        await update_box_model("tenant-1", "video-1", boxes)
+
+    assert model_manager.writable == [True]
+    conn = sqlite3.connect(str(model_db))
+    try:
+        assert len(load_sample_labels(conn)) == 2 * FRAMES
+    finally:
+        conn.close()
+
+
+async def test_updated_model_is_uploaded(
+    api_layout_db: Path, api_ocr_db: Path, model_db: Path, tmp_path: Path
+):
+    """Updates to an existing layout-server.db are uploaded to Wasabi."""
+    fake_s3 = FakeS3()
+    key = "tenant-1/server/videos/video-1/layout-server.db.gz"
+    fake_s3.put(key, gzip.compress(model_db.read_bytes()))
+    settings = Settings(
+        sqlite_cache_dir=str(tmp_path / "cache"),
+        sqlite_write_back=False,
+        wasabi_bucket="test-bucket",
+    )
+    with patch("app.services.database_manager.boto3.client") as mock_boto:
+        mock_boto.return_value = fake_s3.client
+        model_manager = LayoutServerDatabaseManager(settings)
+
+    ocr_patch, layout_patch, model_patch = patch_managers(
+        Manager(api_ocr_db), Manager(api_layout_db), model_manager
+    )
+    with ocr_patch, layout_patch, model_patch:
+        await update_box_model("tenant-1", "video-1", label_all(api_layout_db))
+
+    uploaded = tmp_path / "uploaded.db"
+    uploaded.write_bytes(gzip.decompress(fake_s3.objects[key]))
+    conn = sqlite3.connect(str(uploaded))
+    try:
+        assert len(load_sample_labels(conn)) == 2 * FRAMES
+    finally:
+        conn.close()
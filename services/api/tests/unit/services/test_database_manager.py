@@ -0,0 +1,401 @@
+"""
+Unit tests for DatabaseManager and the shared database cache.
+Uses an in-memory fake of the boto3 S3 client.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import Settings
+from app.services.database_cache import SharedDatabaseCache
+from app.services.database_manager import DatabaseManager
+
+TENANT = "tenant-1"
+VIDEO = "video-1"
+KEY = f"{TENANT}/client/videos/{VIDEO}/captions.db.gz"
+
+
+class FakeS3:
+    """Minimal S3 client storing objects in a dict."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.client = Mock()
+        self.client.head_object.side_effect = self.head_object
+        self.client.download_file.side_effect = self.download_file
+        self.client.upload_file.side_effect = self.upload_file
+
+    def put(self, key: str, data: bytes) -> None:
+        self.objects[key] = data
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {
+            "ETag": f'"{hashlib.md5(self.objects[Key]).hexdigest()}"',
+            "ContentLength": len(self.objects[Key]),
+        }
+
+    def download_file(self, bucket, key, path):
+        Path(path).write_bytes(self.objects[key])
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        self.objects[key] = Path(path).read_bytes()
+
+
+def make_db_gz(tmp_path: Path, text: str) -> bytes:
+    """Gzipped captions database with one caption."""
+    path = tmp_path / f"src-{text}.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE captions (id INTEGER PRIMARY KEY, text TEXT)")
+    conn.execute("INSERT INTO captions (text) VALUES (?)", (text,))
+    conn.commit()
+    conn.close()
+    return gzip.compress(path.read_bytes())
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def make_manager(fake_s3, tmp_path):
+    """Create managers that share one cache dir, like workers on one host."""
+
+    def _make(
+        revalidate_seconds: int = 30,
+        sqlite_write_back: bool = True,
+        **settings_overrides,
+    ) -> DatabaseManager:
+        settings = Settings(
+            sqlite_cache_dir=str(tmp_path / "cache"),
+            sqlite_cache_revalidate_seconds=revalidate_seconds,
+            sqlite_write_back=sqlite_write_back,
+            wasabi_bucket="test-bucket",
+            **settings_overrides,
+        )
+        with patch("app.services.database_manager.boto3.client") as mock_boto:
+            mock_boto.return_value = fake_s3.client
+            return DatabaseManager(settings)
+
+    return _make
+
+
+async def read_caption(manager: DatabaseManager) -> str:
+    async with manager.get_database(TENANT, VIDEO) as conn:
+        return conn.execute("SELECT text FROM captions").fetchone()[0]
+
+
+class TestDatabaseManagerCache:
+    """Test shared, ETag-validated caching."""
+
+    async def test_workers_share_downloaded_file(self, make_manager, fake_s3, tmp_path):
+        """A second manager on the same host reuses the first one's download."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "hello"))
+
+        assert await read_caption(make_manager()) == "hello"
+        assert await read_caption(make_manager(revalidate_seconds=0)) == "hello"
+
+        assert fake_s3.client.download_file.call_count == 1
+
+    async def test_changed_etag_downloads_again(self, make_manager, fake_s3, tmp_path):
+        """A new object version replaces the cached copy."""
+        manager = make_manager(revalidate_seconds=0)
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v1"))
+        assert await read_caption(manager) == "v1"
+
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v2"))
+
+        assert await read_caption(manager) == "v2"
+        assert fake_s3.client.download_file.call_count == 2
+
+    async def test_missing_database_raises(self, make_manager):
+        """Missing objects raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            await read_caption(make_manager())
+
+    async def test_created_database_is_not_downloaded_back(self, make_manager, fake_s3):
+        """After create + upload, the cached copy matches the uploaded ETag."""
+        manager = make_manager(revalidate_seconds=0)
+
+        async with manager.get_or_create_database(TENANT, VIDEO) as conn:
+            conn.execute(
+                "INSERT INTO captions (start_frame_index, end_frame_index) VALUES (0, 10)"
+            )
+            conn.commit()
+        await manager.flush(TENANT, VIDEO)
+
+        assert KEY in fake_s3.objects
+        async with manager.get_database(TENANT, VIDEO) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM captions").fetchone()[0] == 1
+        fake_s3.client.download_file.assert_not_called()
+
+
+async def edit_caption(manager: DatabaseManager, text: str) -> None:
+    async with manager.get_database(TENANT, VIDEO, writable=True) as conn:
+        conn.execute("UPDATE captions SET text = ?", (text,))
+        conn.commit()
+
+
+class TestWriteBack:
+    """Test deferred, coalesced uploads of writable databases."""
+
+    async def test_burst_of_edits_is_one_upload(self, make_manager, fake_s3, tmp_path):
+        """50 edits inside the debounce window produce a single upload."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back_debounce_seconds=0.05)
+
+        for i in range(50):
+            await edit_caption(manager, f"v{i + 1}")
+        status = manager.durability_status(TENANT, VIDEO)
+        assert not status.durable
+        assert status.pending_changes == 50
+        fake_s3.client.upload_file.assert_not_called()
+
+        await asyncio.sleep(0.2)
+
+        assert fake_s3.client.upload_file.call_count == 1
+        assert manager.durability_status(TENANT, VIDEO).durable
+        conn = sqlite3.connect(":memory:")
+        conn.deserialize(gzip.decompress(fake_s3.objects[KEY]))
+        assert conn.execute("SELECT text FROM captions").fetchone()[0] == "v50"
+
+    async def test_pending_change_threshold_flushes_early(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """Reaching the pending change limit uploads without waiting."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(
+            sqlite_write_back_debounce_seconds=60,
+            sqlite_write_back_max_pending_changes=3,
+        )
+
+        for i in range(3):
+            await edit_caption(manager, f"v{i}")
+        await asyncio.sleep(0.05)
+
+        assert fake_s3.client.upload_file.call_count == 1
+        assert manager.durability_status(TENANT, VIDEO).durable
+
+    async def test_upload_is_recorded_in_manifest(
+        self, make_manager, fake_s3, tmp_path, database_manifest
+    ):
+        """Uploads record the object's size in the database manifest."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back=False)
+
+        await edit_caption(manager, "v1")
+
+        page = database_manifest.list_databases(present=True)
+        assert [(e.video_id, e.database, e.size_bytes) for e in page.entries] == [
+            (VIDEO, "captions.db", len(fake_s3.objects[KEY]))
+        ]
+
+    async def test_flush_all_on_shutdown(self, make_manager, fake_s3, tmp_path):
+        """flush_all uploads pending edits immediately."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back_debounce_seconds=60)
+        await edit_caption(manager, "v1")
+
+        assert await manager.flush_all() == 0
+
+        assert fake_s3.client.upload_file.call_count == 1
+        assert manager.durability_status(TENANT, VIDEO).last_upload_at is not None
+
+    async def test_failed_upload_stays_dirty(self, make_manager, fake_s3, tmp_path):
+        """A failed upload keeps the edits pending and records the error."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back_debounce_seconds=60)
+        await edit_caption(manager, "v1")
+        fake_s3.client.upload_file.side_effect = OSError("network down")
+
+        assert not await manager.flush(TENANT, VIDEO)
+
+        status = manager.durability_status(TENANT, VIDEO)
+        assert not status.durable
+        assert status.last_error == "network down"
+        fake_s3.client.upload_file.side_effect = fake_s3.upload_file
+        assert await manager.flush(TENANT, VIDEO)
+        assert manager.durability_status(TENANT, VIDEO).last_error is None
+
+    async def test_unmodified_writable_context_does_not_upload(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """Opening writable without changing anything doesn't mark it dirty."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager()
+
+        async with manager.get_database(TENANT, VIDEO, writable=True) as conn:
+            conn.execute("SELECT * FROM captions").fetchall()
+
+        assert manager.durability_status(TENANT, VIDEO).durable
+        assert await manager.flush_all() == 0
+        fake_s3.client.upload_file.assert_not_called()
+
+    async def test_other_workers_writes_are_not_uploaded(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """A commit by another worker to the shared file isn't this context's change."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager()
+
+        async with manager.get_database(TENANT, VIDEO, writable=True) as conn:
+            path = conn.execute("PRAGMA database_list").fetchone()[2]
+            other = sqlite3.connect(path)
+            other.execute("UPDATE captions SET text = 'other'")
+            other.commit()
+            other.close()
+
+        assert manager.durability_status(TENANT, VIDEO).durable
+        fake_s3.client.upload_file.assert_not_called()
+
+    async def test_schema_change_is_uploaded(self, make_manager, fake_s3, tmp_path):
+        """Schema-only writes (not counted in total_changes) still mark it dirty."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back=False)
+
+        async with manager.get_database(TENANT, VIDEO, writable=True) as conn:
+            conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY)")
+            conn.commit()
+
+        assert fake_s3.client.upload_file.call_count == 1
+
+    async def test_write_back_disabled_uploads_immediately(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """With write-back off, each writable context uploads on exit."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back=False)
+
+        await edit_caption(manager, "v1")
+        await edit_caption(manager, "v2")
+
+        assert fake_s3.client.upload_file.call_count == 2
+
+    async def test_upload_is_a_consistent_snapshot(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """Another worker's commit in progress on the shared file isn't uploaded torn."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back=False)
+
+        async with manager.get_database(TENANT, VIDEO, writable=True) as conn:
+            conn.execute("UPDATE captions SET text = 'v1'")
+            conn.commit()
+            path = conn.execute("PRAGMA database_list").fetchone()[2]
+
+            # Another worker's large transaction spills pages into the file
+            other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            other.execute("PRAGMA cache_size = 1")
+            other.execute("BEGIN IMMEDIATE")
+            other.executemany(
+                "INSERT INTO captions (text) VALUES (?)", [("x" * 500,)] * 2000
+            )
+            committer = threading.Timer(0.3, other.execute, ["COMMIT"])
+            committer.start()
+
+        committer.join()
+        other.close()
+        uploaded = sqlite3.connect(":memory:")
+        uploaded.deserialize(gzip.decompress(fake_s3.objects[KEY]))
+        assert uploaded.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert uploaded.execute("SELECT COUNT(*) FROM captions").fetchone()[0] == 2001
+
+    async def test_invalidate_after_failed_upload(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """Invalidating a database whose upload failed doesn't wait on its lease."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        manager = make_manager(sqlite_write_back_debounce_seconds=60)
+        await edit_caption(manager, "v1")
+        fake_s3.client.upload_file.side_effect = OSError("network down")
+
+        await asyncio.wait_for(manager.invalidate_cache(TENANT, VIDEO), timeout=5)
+
+        assert manager.durability_status(TENANT, VIDEO).durable
+        fake_s3.client.upload_file.side_effect = fake_s3.upload_file
+        assert await read_caption(manager) == "v0"
+
+    async def test_edits_left_by_crashed_worker_are_uploaded(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """A dirty copy isn't replaced by Wasabi's and is uploaded on startup."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        crashed = make_manager(sqlite_write_back_debounce_seconds=60)
+        await edit_caption(crashed, "v1")
+        # The worker dies without flushing: its lease goes with the process
+        crashed._dirty.pop(KEY).lease.release()
+
+        manager = make_manager(revalidate_seconds=0)
+        assert await read_caption(manager) == "v1"
+        fake_s3.client.download_file.assert_called_once()
+
+        assert await manager.recover_dirty() == 0
+        conn = sqlite3.connect(":memory:")
+        conn.deserialize(gzip.decompress(fake_s3.objects[KEY]))
+        assert conn.execute("SELECT text FROM captions").fetchone()[0] == "v1"
+        assert manager.durability_status(TENANT, VIDEO).durable
+        assert await make_manager().recover_dirty() == 0
+        assert fake_s3.client.upload_file.call_count == 1
+
+    async def test_other_worker_reads_dirty_copy_without_waiting(
+        self, make_manager, fake_s3, tmp_path
+    ):
+        """A stale dirty copy is served under the shared lock, not revalidated."""
+        fake_s3.put(KEY, make_db_gz(tmp_path, "v0"))
+        writer = make_manager(sqlite_write_back_debounce_seconds=60)
+        await edit_caption(writer, "v1")
+
+        reader = make_manager(revalidate_seconds=0)
+        assert await asyncio.wait_for(read_caption(reader), timeout=5) == "v1"
+
+        assert await writer.flush_all() == 0
+
+
+class TestSharedDatabaseCache:
+    """Test eviction and persistence of the shared cache."""
+
+    def _acquire(self, cache: SharedDatabaseCache, name: str, size: int):
+        return cache.acquire(
+            cache.cache_dir / name,
+            name,
+            head=lambda key: '"etag"',
+            download=lambda key, path: path.write_bytes(b"x" * size),
+        )
+
+    def test_pinned_entries_are_not_evicted(self, tmp_path):
+        """An entry with an open lease survives eviction; LRU entries go first."""
+        cache = SharedDatabaseCache(tmp_path, max_size_bytes=2500)
+        pinned = self._acquire(cache, "a.db", 1000)
+        self._acquire(cache, "b.db", 1000).release()
+
+        self._acquire(cache, "c.db", 1000).release()
+        self._acquire(cache, "d.db", 1000).release()
+
+        assert (tmp_path / "a.db").exists()
+        assert not (tmp_path / "b.db").exists()
+        pinned.release()
+        self._acquire(cache, "e.db", 1000).release()
+        assert not (tmp_path / "a.db").exists()
+
+    def test_restart_reuses_warm_files(self, tmp_path):
+        """A new cache instance serves existing files without downloading."""
+        self._acquire(SharedDatabaseCache(tmp_path, 10_000), "a.db", 100).release()
+        download = Mock()
+
+        lease = SharedDatabaseCache(tmp_path, 10_000).acquire(
+            tmp_path / "a.db", "a.db", head=lambda key: '"etag"', download=download
+        )
+
+        assert lease is not None
+        lease.release()
+        download.assert_not_called()
@@ -0,0 +1,251 @@
+"""
+Unit tests for DatabaseManifest.
+Uses a local-directory stand-in for the S3 bucket.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.config import Settings
+from app.services.database_manifest import (
+    DatabaseManifest,
+    ManifestReconciler,
+    parse_database_key,
+)
+
+
+class LocalDirectoryS3:
+    """Serves list_objects_v2 pages from files under a directory."""
+
+    def __init__(self, root: Path, page_size: int = 2):
+        self.root = root
+        self.page_size = page_size
+        self.list_calls = 0
+        self.head_calls = 0
+        self.listed_keys: list[str] = []
+
+    def put(self, key: str, data: bytes = b"sqlite") -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def get_paginator(self, operation: str):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str = "", Delimiter: str = ""):
+        self.list_calls += 1
+        objects = sorted(
+            (path.relative_to(self.root).as_posix(), path.stat())
+            for path in self.root.rglob("*")
+            if path.is_file()
+        )
+        contents = []
+        folders: list[str] = []
+        for key, stat in objects:
+            if not key.startswith(Prefix):
+                continue
+            rest = key[len(Prefix) :]
+            if Delimiter and Delimiter in rest:
+                folder = Prefix + rest.split(Delimiter)[0] + Delimiter
+                if folder not in folders:
+                    folders.append(folder)
+                continue
+            self.listed_keys.append(key)
+            contents.append(
+                {
+                    "Key": key,
+                    "Size": stat.st_size,
+                    "LastModified": datetime.fromtimestamp(stat.st_mtime, UTC),
+                }
+            )
+        for start in range(0, max(len(contents), len(folders), 1), self.page_size):
+            yield {
+                "Contents": contents[start : start + self.page_size],
+                "CommonPrefixes": [
+                    {"Prefix": folder}
+                    for folder in folders[start : start + self.page_size]
+                ],
+            }
+
+    def head_object(self, **kwargs):
+        self.head_calls += 1
+        raise AssertionError("reconcile must not HEAD objects")
+
+
+@pytest.fixture
+def bucket(tmp_path: Path) -> LocalDirectoryS3:
+    s3 = LocalDirectoryS3(tmp_path / "bucket")
+    s3.put("tenant-a/client/videos/v1/captions.db.gz", b"x" * 10)
+    s3.put("tenant-a/client/videos/v1/layout.db.gz", b"x" * 20)
+    s3.put("tenant-a/server/videos/v1/fullOCR.db", b"x" * 30)
+    s3.put("tenant-a/client/videos/v1/full_frames/frame_0001.jpg")
+    s3.put("tenant-a/client/videos/v1/cropped_frames/modulo_16/chunk_0001.webm")
+    s3.put("tenant-a/client/videos/v2/layout.db.gz", b"x" * 5)
+    s3.put("tenant-b/client/videos/v3/captions.db.gz", b"x" * 7)
+    return s3
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> DatabaseManifest:
+    return DatabaseManifest(tmp_path / "manifest.db")
+
+
+class TestParseDatabaseKey:
+    """Test mapping storage keys to databases."""
+
+    def test_known_databases(self):
+        assert parse_database_key("t/client/videos/v/captions.db.gz") == (
+            "t",
+            "v",
+            "captions.db",
+        )
+        assert parse_database_key("t/server/videos/v/fullOCR.db") == (
+            "t",
+            "v",
+            "fullOCR.db",
+        )
+
+    def test_other_objects(self):
+        assert parse_database_key("t/client/videos/v/video.mp4") is None
+        assert parse_database_key("t/client/videos/v/full_frames/1.jpg") is None
+        assert parse_database_key("t/server/videos/v/captions.db.gz") is None
+
+
+def test_default_path_is_on_working_copy_volume():
+    settings = Settings(working_copy_dir="/data/working", database_manifest_path="")
+    assert settings.effective_database_manifest_path == "/data/database-manifest.db"
+
+
+class TestDatabaseManifest:
+    """Test reconcile, upload recording and listing."""
+
+    def test_reconcile_reads_sizes_from_listings(self, manifest, bucket):
+        """Reconcile reads sizes from listings and never HEADs objects."""
+        assert manifest.is_stale(max_age_seconds=300)
+
+        assert manifest.reconcile(bucket, "bucket") == 5
+
+        assert bucket.head_calls == 0
+        assert not manifest.is_stale(max_age_seconds=300)
+        page = manifest.list_databases()
+        assert page.total == 9  # 3 videos x 3 databases
+        assert page.present == 5
+        v1 = [e for e in page.entries if e.video_id == "v1"]
+        assert [(e.database, e.size_bytes) for e in v1] == [
+            ("captions.db", 10),
+            ("layout.db", 20),
+            ("fullOCR.db", 30),
+        ]
+
+    def test_reconcile_skips_frame_subtrees(self, manifest, bucket):
+        """Only the top level of each video folder is listed."""
+        manifest.reconcile(bucket, "bucket")
+
+        assert bucket.listed_keys
+        assert all(parse_database_key(key) for key in bucket.listed_keys)
+        # Tenants, 2 tenants x 2 areas of videos, then 4 video folders
+        assert bucket.list_calls == 1 + 4 + 4
+
+    def test_manifest_goes_stale(self, manifest, bucket):
+        """A reconciled manifest is stale again once older than the max age."""
+        manifest.reconcile(bucket, "bucket")
+        reconciled_at = manifest.last_reconciled()
+
+        assert reconciled_at is not None
+        assert datetime.now(UTC) - reconciled_at < timedelta(minutes=1)
+        assert not manifest.is_stale(max_age_seconds=60)
+        assert manifest.is_stale(max_age_seconds=0)
+
+    def test_missing_databases_are_listed(self, manifest, bucket):
+        manifest.reconcile(bucket, "bucket")
+
+        page = manifest.list_databases(search="V2", present=False)
+
+        assert [(e.video_id, e.database) for e in page.entries] == [
+            ("v2", "captions.db"),
+            ("v2", "fullOCR.db"),
+        ]
+        assert all(e.size_bytes is None for e in page.entries)
+
+    def test_pagination(self, manifest, bucket):
+        manifest.reconcile(bucket, "bucket")
+        all_entries = manifest.list_databases().entries
+
+        pages = [manifest.list_databases(limit=4, offset=o) for o in (0, 4, 8)]
+
+        assert [e for page in pages for e in page.entries] == all_entries
+        assert {page.total for page in pages} == {9}
+
+    def test_record_upload(self, manifest, bucket):
+        """Uploads update the manifest without listing the bucket."""
+        manifest.reconcile(bucket, "bucket")
+        list_calls = bucket.list_calls
+
+        assert manifest.record_upload("tenant-b/client/videos/v3/layout.db.gz", 99)
+        assert not manifest.record_upload("tenant-b/client/videos/v3/video.mp4", 1)
+
+        page = manifest.list_databases(search="v3", present=True)
+        assert [(e.database, e.size_bytes) for e in page.entries] == [
+            ("captions.db", 7),
+            ("layout.db", 99),
+        ]
+        assert bucket.list_calls == list_calls
+
+    def test_reconcile_one_tenant(self, manifest, bucket):
+        """A tenant reconcile replaces only that tenant's entries."""
+        manifest.reconcile(bucket, "bucket")
+        manifest.record_upload("tenant-a/client/videos/gone/captions.db.gz", 1)
+        manifest.record_upload("tenant-b/client/videos/new/captions.db.gz", 1)
+
+        assert manifest.reconcile(bucket, "bucket", tenant_id="tenant-a") == 4
+
+        videos = {(e.tenant_id, e.video_id) for e in manifest.list_databases().entries}
+        assert videos == {
+            ("tenant-a", "v1"),
+            ("tenant-a", "v2"),
+            ("tenant-b", "v3"),
+            ("tenant-b", "new"),
+        }
+
+
+class TestManifestReconciler:
+    """Test the background reconcile of a stale manifest."""
+
+    async def test_reconciles_only_when_stale(self, manifest, bucket):
+        settings = Settings(
+            wasabi_bucket="bucket", database_manifest_max_age_seconds=300
+        )
+        with (
+            patch("app.services.database_manifest.get_settings", return_value=settings),
+            patch("app.services.database_manifest.boto3.client", return_value=bucket),
+        ):
+            reconciler = ManifestReconciler(manifest)
+
+            assert await reconciler.reconcile_if_stale()
+            list_calls = bucket.list_calls
+            assert not await reconciler.reconcile_if_stale()
+
+        assert bucket.list_calls == list_calls
+        assert manifest.list_databases(present=True).total == 5
+
+    async def test_start_and_stop(self, manifest, bucket):
+        """The first check runs as soon as the worker starts."""
+        settings = Settings(wasabi_bucket="bucket")
+        with (
+            patch("app.services.database_manifest.get_settings", return_value=settings),
+            patch("app.services.database_manifest.boto3.client", return_value=bucket),
+        ):
+            reconciler = ManifestReconciler(manifest)
+            await reconciler.start()
+            for _ in range(100):
+                if manifest.last_reconciled() is not None:
+                    break
+                await asyncio.sleep(0.01)
+            await reconciler.stop()
+
+        assert not manifest.is_stale(max_age_seconds=300)
@@ -0,0 +1,214 @@
+"""
+Unit tests for SyncStateCache.
+Uses an in-memory fake of DatabaseStateRepository with simulated latency.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.supabase_client import DatabaseStateRepository
+from app.services.sync_state_cache import SyncStateCache
+
+VIDEO = "video-1"
+DB = "layout"
+CONN = "conn-1"
+ROUND_TRIP_SECONDS = 0.05
+
+
+class FakeStateRepository:
+    """In-memory state store that counts round trips."""
+
+    def __init__(self, state: dict):
+        self.state = state
+        self.round_trips = 0
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(ROUND_TRIP_SECONDS)
+
+    async def get_state(self, video_id: str, db_name: str) -> dict | None:
+        await self._round_trip()
+        return dict(self.state) if self.state else None
+
+    async def update_sync_state(
+        self, video_id: str, db_name: str, connection_id: str, server_version: int
+    ) -> bool:
+        await self._round_trip()
+        if (
+            self.state.get("active_connection_id") != connection_id
+            or self.state.get("lock_type") != "client"
+        ):
+            return False
+        self.state["server_version"] = max(self.state["server_version"], server_version)
+        self.state["last_activity_at"] = time.time()
+        return True
+
+    async def advance_server_version(
+        self, video_id: str, db_name: str, server_version: int
+    ) -> None:
+        await self._round_trip()
+        self.state["server_version"] = max(self.state["server_version"], server_version)
+
+
+@pytest.fixture
+def repo():
+    return FakeStateRepository(
+        {
+            "server_version": 10,
+            "active_connection_id": CONN,
+            "lock_type": "client",
+        }
+    )
+
+
+def make_cache(repo: FakeStateRepository, interval: float = 60) -> SyncStateCache:
+    return SyncStateCache(
+        repo,  # type: ignore[arg-type]
+        video_id=VIDEO,
+        db_name=DB,
+        connection_id=CONN,
+        state=dict(repo.state),
+        flush_interval_seconds=interval,
+    )
+
+
+class TestSyncStateCache:
+    """Test local version hand-out and batched write-back."""
+
+    async def test_versions_are_local_and_written_back_once(self, repo):
+        """Rapid edits don't wait on the state store; one write covers them."""
+        cache = make_cache(repo, interval=0.05)
+        cache.start()
+
+        start = time.perf_counter()
+        versions = []
+        for _ in range(100):
+            assert cache.check() is None
+            versions.append(cache.next_version())
+        elapsed = time.perf_counter() - start
+
+        assert versions == list(range(11, 111))
+        assert elapsed < ROUND_TRIP_SECONDS
+        assert repo.round_trips == 0
+
+        await asyncio.sleep(0.2)
+
+        assert repo.round_trips == 1
+        assert repo.state["server_version"] == 110
+        await cache.close()
+
+    async def test_close_flushes_pending(self, repo):
+        """Closing the session writes pending state."""
+        cache = make_cache(repo)
+        cache.start()
+        cache.next_version()
+
+        await cache.close()
+
+        assert repo.state["server_version"] == 11
+
+    async def test_session_transfer_is_detected_on_write_back(self, repo):
+        """A lock moved to another connection rejects further writes."""
+        cache = make_cache(repo)
+        cache.next_version()
+        repo.state["active_connection_id"] = "conn-2"
+        repo.state["server_version"] = 5
+
+        assert not await cache.flush()
+
+        assert cache.check() == (
+            "SESSION_TRANSFERRED",
+            "Editing moved to another window",
+        )
+        # Pending changes still count as unsaved
+        assert repo.state["server_version"] == 11
+
+    async def test_workflow_lock_is_detected_on_write_back(self, repo):
+        """A server lock taken while editing is reported as WORKFLOW_LOCKED."""
+        cache = make_cache(repo)
+        cache.touch()
+        repo.state["lock_type"] = "server"
+
+        assert not await cache.flush()
+
+        assert cache.check() == ("WORKFLOW_LOCKED", "Server is processing")
+        assert repo.state["server_version"] == 10
+
+    async def test_failed_conflict_lookup_is_retried(self, repo):
+        """An error while recording a conflict doesn't stop the write-back."""
+        cache = make_cache(repo, interval=0.01)
+        cache.start()
+        get_state = repo.get_state
+        calls = 0
+
+        async def flaky_get_state(video_id: str, db_name: str) -> dict | None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ConnectionError("state store unavailable")
+            return await get_state(video_id, db_name)
+
+        repo.get_state = flaky_get_state  # type: ignore[method-assign]
+        repo.state["active_connection_id"] = "conn-2"
+        cache.next_version()
+
+        await asyncio.sleep(0.3)
+
+        assert calls == 2
+        assert cache.check() is not None
+        assert repo.state["server_version"] == 11
+        await cache.close()
+
+
+class FakeStateTable:
+    """Applies the filters of a supabase update to one in-memory row."""
+
+    def __init__(self, row: dict):
+        self.row = row
+
+    def update(self, values: dict):
+        filters = []
+        query = MagicMock()
+        query.eq.side_effect = lambda column, value: (
+            filters.append(lambda row: row[column] == value) or query
+        )
+        query.lt.side_effect = lambda column, value: (
+            filters.append(lambda row: row[column] < value) or query
+        )
+
+        def execute():
+            if not all(f(self.row) for f in filters):
+                return MagicMock(data=[])
+            self.row.update(values)
+            return MagicMock(data=[dict(self.row)])
+
+        query.execute.side_effect = execute
+        return query
+
+
+async def test_update_sync_state_never_lowers_server_version():
+    """The write-back keeps MAX(server_version, new) but still records activity."""
+    row = {
+        "video_id": VIDEO,
+        "database_name": DB,
+        "active_connection_id": CONN,
+        "lock_type": "client",
+        "server_version": 20,
+        "last_activity_at": None,
+    }
+    state_repo = DatabaseStateRepository(MagicMock())
+    state_repo._table = lambda: FakeStateTable(row)  # type: ignore[method-assign]
+
+    assert await state_repo.update_sync_state(VIDEO, DB, CONN, 15)
+    assert row["server_version"] == 20
+    assert row["last_activity_at"] is not None
+
+    assert await state_repo.update_sync_state(VIDEO, DB, CONN, 25)
+    assert row["server_version"] == 25
+
+    row["active_connection_id"] = "conn-2"
+    assert not await state_repo.update_sync_state(VIDEO, DB, CONN, 30)
+    assert row["server_version"] == 25